@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Under ASGI the SSE endpoints are served by excel_data.views.sse_asgi, so open event streams
+wait on the event loop instead of each pinning a worker thread:
+
+    gunicorn dashboard.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
@@ -13,4 +18,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from excel_data.views.sse_asgi import sse_router  # noqa: E402
+
+application = sse_router(django_application)
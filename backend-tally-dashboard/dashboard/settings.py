@@ -56,6 +56,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'excel_data.middleware.auth_context_middleware.AuthContextMiddleware',  # Decode JWT + load user/tenant once
     'excel_data.middleware.tenant_middleware.TenantMiddleware',  # Custom tenant middleware
     'excel_data.middleware.session_middleware.SingleSessionMiddleware',  # Single session enforcement
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -164,7 +165,7 @@ else:
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'excel_data.utils.authentication.RequestContextJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -181,12 +182,31 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# SSE fan-out between processes: 'postgres' relays events through LISTEN/NOTIFY on the
+# default database (one listener connection per process), 'memory' keeps them in-process
+SSE_BROADCAST_BACKEND = config('SSE_BROADCAST_BACKEND', default='postgres')
+
 # Celery toggle (we are not using Celery/Redis in this environment)
-# This is used by excel_data.utils.chart_sync.sync_chart_data_batch_async
-# to avoid attempting Redis/Celery connections and use a thread fallback instead.
+# Upload jobs use Celery when enabled and the background task queue below otherwise.
 CELERY_ENABLED = config('CELERY_ENABLED', default=False, cast=bool)
+
+# Background tasks without Celery (excel_data/utils/task_queue.py): 'database' stores them in
+# the BackgroundTask table (retried, survive restarts, run by in-process worker threads and
+# `manage.py run_task_worker`), 'thread' runs them in daemon threads
+BACKGROUND_TASKS_BACKEND = config('BACKGROUND_TASKS_BACKEND', default='database')
+BACKGROUND_TASKS_IN_PROCESS_WORKER = config('BACKGROUND_TASKS_IN_PROCESS_WORKER', default=True, cast=bool)
+BACKGROUND_TASKS_IN_PROCESS_THREADS = config('BACKGROUND_TASKS_IN_PROCESS_THREADS', default=2, cast=int)
+BACKGROUND_TASKS_TENANT_CONCURRENCY = config('BACKGROUND_TASKS_TENANT_CONCURRENCY', default=2, cast=int)  # Running tasks per tenant
+BACKGROUND_TASKS_MAX_ATTEMPTS = config('BACKGROUND_TASKS_MAX_ATTEMPTS', default=3, cast=int)
+BACKGROUND_TASKS_RETRY_DELAY = 60  # Seconds before the first retry, doubled for each further one
+BACKGROUND_TASKS_LOCK_TIMEOUT = 30 * 60  # Claims not refreshed for this long belong to dead workers
+# Rebuilds of one tenant-month (services/rebuild_scheduler.py) requested within this many
+# seconds of each other run once; a burst of requests delays the rebuild by at most MAX_WAIT
+BACKGROUND_TASKS_COALESCE_WINDOW = config('BACKGROUND_TASKS_COALESCE_WINDOW', default=5, cast=int)
+BACKGROUND_TASKS_COALESCE_MAX_WAIT = config('BACKGROUND_TASKS_COALESCE_MAX_WAIT', default=60, cast=int)
+
 if not CELERY_ENABLED:
-    print("⚙️ Celery disabled (CELERY_ENABLED=False) - using thread-based background tasks")
+    print(f"⚙️ Celery disabled (CELERY_ENABLED=False) - using {BACKGROUND_TASKS_BACKEND} background tasks")
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -235,6 +255,14 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 11000  # Set a higher limit (default is 1000)
 
+# Spreadsheet uploads (excel_data/utils/upload_reader.py): rejected above these limits before
+# any row is parsed, and parsed in chunks of UPLOAD_CHUNK_ROWS rows
+UPLOAD_MAX_BYTES = config('UPLOAD_MAX_BYTES', default=20 * 1024 * 1024, cast=int)
+UPLOAD_MAX_ROWS = config('UPLOAD_MAX_ROWS', default=50000, cast=int)
+UPLOAD_CHUNK_ROWS = config('UPLOAD_CHUNK_ROWS', default=2000, cast=int)
+# Running upload jobs not refreshed for this long belong to dead workers and may be claimed again
+UPLOAD_JOB_STALE_MINUTES = config('UPLOAD_JOB_STALE_MINUTES', default=10, cast=int)
+
 # Security Settings for Production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -341,9 +369,17 @@ if DEBUG:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # Cache Configuration
-# Use database cache for persistent, shared cache across server restarts
-CACHES = {
-    'default': {
+# Tiered cache: a per-process LRU in front of a shared tier. The shared tier is Redis when
+# CACHE_REDIS_URL is set, otherwise the database cache table (persistent across restarts).
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+
+if CACHE_REDIS_URL:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    }
+else:
+    SHARED_CACHE = {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'cache_table',
         'OPTIONS': {
@@ -351,6 +387,21 @@ CACHES = {
             'CULL_FREQUENCY': 3,   # Remove 1/3 of entries when MAX_ENTRIES is reached
         }
     }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'excel_data.utils.tiered_cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': config('CACHE_LOCAL_MAX_ENTRIES', default=256, cast=int),
+            'LOCAL_TIMEOUT': config('CACHE_LOCAL_TIMEOUT', default=10, cast=int),  # seconds in process memory
+            'SYNC_INTERVAL': 1,  # seconds between cross-process invalidation checks
+            # Cache generation counters are read from the shared tier only, so bumping one
+            # does not flush every process's local tier
+            'SHARED_ONLY_PREFIXES': ('cache_generation_',),
+        }
+    },
+    'shared': SHARED_CACHE,
 }
 
 # Cache timeout settings (in seconds)
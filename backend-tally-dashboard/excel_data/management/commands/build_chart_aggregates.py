@@ -2,10 +2,8 @@
 Management command to build ChartAggregatedData from existing SalaryData and CalculatedSalary records
 """
 from django.core.management.base import BaseCommand
-from django.db import transaction
-from excel_data.models import (
-    Tenant, SalaryData, CalculatedSalary, ChartAggregatedData
-)
+from excel_data.models import Tenant, ChartAggregatedData
+from excel_data.services.cache_service import CHARTS, bump_cache_generation
 
 
 class Command(BaseCommand):
@@ -49,7 +47,10 @@ class Command(BaseCommand):
         # Clear existing data if requested
         if clear_existing:
             self.stdout.write(self.style.WARNING('Clearing existing ChartAggregatedData...'))
+            cleared_tenant_ids = set(ChartAggregatedData.objects.values_list('tenant_id', flat=True).distinct())
             deleted_count = ChartAggregatedData.objects.all().delete()[0]
+            for tenant_id in cleared_tenant_ids:
+                bump_cache_generation(tenant_id, CHARTS, reason="chart_aggregates_cleared")
             self.stdout.write(self.style.SUCCESS(f'Deleted {deleted_count} existing records'))
         
         total_excel = 0
@@ -81,66 +82,31 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('='*60))
 
     def _process_salary_data(self, tenant):
-        """Process SalaryData records for a tenant"""
-        salary_records = SalaryData.objects.filter(tenant=tenant).select_related('tenant')
-        
-        if not salary_records.exists():
+        """Process SalaryData records for a tenant (one set-based statement)"""
+        try:
+            success_count = ChartAggregatedData.refresh_from_salary_data(tenant.id)
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'    Error processing SalaryData: {e}'))
+            return 0, 1
+        
+        if not success_count:
             self.stdout.write(self.style.WARNING('  No SalaryData found'))
             return 0, 0
         
-        self.stdout.write(f'  Processing {salary_records.count()} SalaryData records...')
-        
-        success_count = 0
-        error_count = 0
-        
-        with transaction.atomic():
-            for salary_record in salary_records:
-                try:
-                    chart_data, created = ChartAggregatedData.aggregate_from_salary_data(salary_record)
-                    success_count += 1
-                    if created and success_count % 100 == 0:
-                        self.stdout.write(f'    Created {success_count} records...', ending='\r')
-                except Exception as e:
-                    error_count += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'    Error processing {salary_record.name} ({salary_record.month} {salary_record.year}): {e}'
-                        )
-                    )
-        
         self.stdout.write(self.style.SUCCESS(f'  ✓ Excel: Created/Updated {success_count} ChartAggregatedData records'))
-        return success_count, error_count
+        return success_count, 0
 
     def _process_calculated_salary(self, tenant):
-        """Process CalculatedSalary records for a tenant"""
-        calc_records = CalculatedSalary.objects.filter(
-            tenant=tenant
-        ).select_related('tenant', 'payroll_period')
-        
-        if not calc_records.exists():
+        """Process CalculatedSalary records for a tenant (one set-based statement)"""
+        try:
+            success_count = ChartAggregatedData.refresh_from_calculated_salary(tenant.id)
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'    Error processing CalculatedSalary: {e}'))
+            return 0, 1
+        
+        if not success_count:
             self.stdout.write(self.style.WARNING('  No CalculatedSalary found'))
             return 0, 0
         
-        self.stdout.write(f'  Processing {calc_records.count()} CalculatedSalary records...')
-        
-        success_count = 0
-        error_count = 0
-        
-        with transaction.atomic():
-            for calc_record in calc_records:
-                try:
-                    chart_data, created = ChartAggregatedData.aggregate_from_calculated_salary(calc_record)
-                    success_count += 1
-                    if created and success_count % 100 == 0:
-                        self.stdout.write(f'    Created {success_count} records...', ending='\r')
-                except Exception as e:
-                    error_count += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'    Error processing {calc_record.employee_name} ({calc_record.payroll_period}): {e}'
-                        )
-                    )
-        
         self.stdout.write(self.style.SUCCESS(f'  ✓ Frontend: Created/Updated {success_count} ChartAggregatedData records'))
-        return success_count, error_count
-
+        return success_count, 0
@@ -0,0 +1,65 @@
+"""
+Management command to recount MonthlyAttendanceSummary and monthly Attendance from DailyAttendance.
+
+Day-to-day saves maintain these aggregates incrementally; run this periodically (or after
+raw SQL imports) to correct any drift.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from excel_data.models import Tenant, DailyAttendance
+from excel_data.services.attendance_summary_service import AttendanceSummaryService
+
+
+class Command(BaseCommand):
+    help = 'Recount MonthlyAttendanceSummary and monthly Attendance records from DailyAttendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant subdomain (optional, processes all tenants if not specified)',
+        )
+        parser.add_argument(
+            '--year',
+            type=int,
+            help='Year to reconcile (defaults to the current year)',
+        )
+        parser.add_argument(
+            '--month',
+            type=int,
+            help='Month number 1-12 (optional, reconciles every month with daily attendance in the year if not specified)',
+        )
+
+    def handle(self, *args, **options):
+        tenant_subdomain = options.get('tenant')
+        year = options.get('year') or date.today().year
+        month = options.get('month')
+
+        if tenant_subdomain:
+            tenants = Tenant.objects.filter(subdomain=tenant_subdomain)
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f'Tenant "{tenant_subdomain}" not found'))
+                return
+        else:
+            tenants = Tenant.objects.all()
+
+        total_rows = 0
+        for tenant in tenants:
+            if month:
+                months = [month]
+            else:
+                months = sorted(set(
+                    DailyAttendance.all_objects.filter(tenant=tenant, date__year=year)
+                    .values_list('date__month', flat=True)
+                    .distinct()
+                ))
+
+            for month_num in months:
+                with transaction.atomic():
+                    rows = AttendanceSummaryService.reconcile_month(tenant, year, month_num)
+                total_rows += rows
+                self.stdout.write(f'📊 {tenant.subdomain} {year}-{month_num:02d}: {rows} employees reconciled')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Reconcile complete: {total_rows} employee-months'))
@@ -0,0 +1,66 @@
+"""
+Management command to resume background upload jobs that failed or were interrupted.
+
+Resumed jobs skip their completed stages and continue the row insert from the last committed
+chunk. Jobs queued as database background tasks are picked up again by the task queue when
+their worker dies; this command is for failed jobs, Celery deployments and the 'thread'
+backend (where this command runs the jobs itself). Running jobs are only resumed once their
+worker stopped refreshing them for --stale-minutes, also with --job.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from excel_data.models import UploadJob
+from excel_data.services.upload_job_service import UploadJobService
+
+
+class Command(BaseCommand):
+    help = 'Resume upload jobs that stopped making progress (and, optionally, failed ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='Upload job ID (optional, resumes every stale job if not specified)',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=getattr(settings, 'UPLOAD_JOB_STALE_MINUTES', 10),
+            help='Queued/running jobs without progress for this long are resumed (default: UPLOAD_JOB_STALE_MINUTES)',
+        )
+        parser.add_argument(
+            '--failed',
+            action='store_true',
+            help='Also retry failed jobs',
+        )
+
+    def handle(self, *args, **options):
+        job_id = options.get('job')
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+
+        if job_id:
+            jobs = UploadJob.all_objects.filter(id=job_id)
+        else:
+            statuses = [UploadJob.STATUS_QUEUED, UploadJob.STATUS_RUNNING]
+            if options.get('failed'):
+                statuses.append(UploadJob.STATUS_FAILED)
+            jobs = UploadJob.all_objects.filter(status__in=statuses, updated_at__lt=cutoff)
+
+        # Daemon-thread jobs run here: the thread would die with this command
+        inline = (
+            not getattr(settings, 'CELERY_ENABLED', True)
+            and getattr(settings, 'BACKGROUND_TASKS_BACKEND', 'database') == 'thread'
+        )
+
+        resumed = 0
+        for job in jobs:
+            if UploadJobService.resume(job, inline=inline, stale_before=cutoff) is None:
+                self.stdout.write(self.style.WARNING(f'Upload job {job.id} is {job.status} or was picked up by a worker, not resuming'))
+                continue
+            resumed += 1
+            self.stdout.write(f'🔄 Resumed upload job {job.id} ({job.kind} {job.month} {job.year}, {job.rows_processed}/{job.rows_total} rows)')
+
+        self.stdout.write(self.style.SUCCESS(f'Resumed {resumed} upload job(s)'))
@@ -0,0 +1,54 @@
+"""
+Management command to run the database-backed background task worker (utils/task_queue.py).
+
+Runs tasks queued with BACKGROUND_TASKS_BACKEND = 'database' (the CELERY_ENABLED=False
+default). Any number of these workers can run next to the web processes; they share the
+queue through SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+import threading
+
+from django.core.management.base import BaseCommand
+from excel_data.utils.task_queue import TaskWorker, purge_finished_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (payroll, chart aggregation, upload jobs) from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=2,
+            help='Number of tasks run at the same time by this worker (default: 2)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the tasks that are runnable now and exit',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=7,
+            help='Delete finished tasks older than this many days on start (default: 7, 0 keeps them)',
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days']:
+            deleted = purge_finished_tasks(options['purge_days'])
+            self.stdout.write(f'🗑️ Deleted {deleted} finished background task(s)')
+
+        if options['once']:
+            count = TaskWorker().run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} background task(s)'))
+            return
+
+        threads = [
+            threading.Thread(target=TaskWorker().run_forever, name=f'background-task-worker-{i}', daemon=True)
+            for i in range(max(options['threads'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(self.style.SUCCESS(f'Background task worker running with {len(threads)} thread(s)'))
+        for thread in threads:
+            thread.join()
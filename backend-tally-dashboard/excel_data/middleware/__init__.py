@@ -1,5 +1,6 @@
 # Middleware package
+from .auth_context_middleware import AuthContextMiddleware
 from .tenant_middleware import TenantMiddleware
 from .session_middleware import SingleSessionMiddleware
 
-__all__ = ['TenantMiddleware', 'SingleSessionMiddleware']
+__all__ = ['AuthContextMiddleware', 'TenantMiddleware', 'SingleSessionMiddleware']
@@ -0,0 +1,22 @@
+"""
+Auth context middleware: authenticate the bearer token once per request
+"""
+from django.utils.deprecation import MiddlewareMixin
+from ..utils.authentication import get_auth_context
+
+
+class AuthContextMiddleware(MiddlewareMixin):
+    """
+    Validates the request's JWT and loads user + tenant + permissions in one query,
+    storing the result on request.auth_context for TenantMiddleware,
+    SingleSessionMiddleware and DRF (RequestContextJWTAuthentication) to reuse.
+    Must run before those middleware.
+    """
+    
+    # __call__ is synchronous; under ASGI Django runs it in a thread around the (async) view
+    async_capable = False
+
+    def __call__(self, request):
+        if request.headers.get('Authorization'):
+            get_auth_context(request)
+        return self.get_response(request)
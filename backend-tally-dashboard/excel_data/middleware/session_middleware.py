@@ -4,8 +4,6 @@ Session validation middleware for single-login-per-user enforcement
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +14,9 @@ class SingleSessionMiddleware(MiddlewareMixin):
     Middleware to enforce single-session-per-user policy
     """
     
+    # __call__ is synchronous; under ASGI Django runs it in a thread around the (async) view
+    async_capable = False
+    
     # Endpoints that should skip session validation
     SKIP_SESSION_VALIDATION = [
         '/api/auth/login/',
@@ -62,21 +63,10 @@ class SingleSessionMiddleware(MiddlewareMixin):
     
     def authenticate_user(self, request):
         """
-        Authenticate user using JWT token
+        User authenticated by the request's JWT, reusing the per-request auth context
         """
-        try:
-            jwt_auth = JWTAuthentication()
-            auth_result = jwt_auth.authenticate(request)
-            if auth_result:
-                user, token = auth_result
-                return user
-        except (InvalidToken, TokenError):
-            # Token is invalid or expired
-            pass
-        except Exception as e:
-            logger.error(f"JWT authentication error: {e}")
-        
-        return None
+        from ..utils.authentication import get_auth_context
+        return get_auth_context(request).user
     
     def validate_user_session(self, user, request):
         """
@@ -1,9 +1,6 @@
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from ..models import Tenant
 import logging
-import jwt
-from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +10,9 @@ class TenantMiddleware(MiddlewareMixin):
     Allows public endpoints to work without tenant context
     """
     
+    # __call__ is synchronous; under ASGI Django runs it in a thread around the (async) view
+    async_capable = False
+    
     # Public endpoints that don't require tenant context
     PUBLIC_ENDPOINTS = [
         '/api/public/signup/',
@@ -46,13 +46,13 @@ class TenantMiddleware(MiddlewareMixin):
         
         # Add tenant to thread local for model access
         if tenant:
-            from ..utils.utils import set_current_tenant
+            from ..utils.tenant_context import set_current_tenant
             set_current_tenant(tenant)
         
         response = self.get_response(request)
         
         # Clear tenant from thread local
-        from ..utils.utils import clear_current_tenant
+        from ..utils.tenant_context import clear_current_tenant
         clear_current_tenant()
         
         return response
@@ -72,51 +72,48 @@ class TenantMiddleware(MiddlewareMixin):
         if tenant_from_token:
             return tenant_from_token
         
+        # Methods 2-5 are dictionary lookups in the process-local tenant registry
+        from ..services.tenant_registry import TenantRegistry
+        
         # Method 2: Header-based (for API clients)
         tenant_id_header = request.headers.get('X-Tenant-ID')
         if tenant_id_header:
-            try:
-                return Tenant.objects.get(id=tenant_id_header, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = TenantRegistry.by_id(tenant_id_header)
+            if tenant:
+                return tenant
         
         tenant_subdomain_header = request.headers.get('X-Tenant-Subdomain')
         if tenant_subdomain_header:
-            try:
-                return Tenant.objects.get(subdomain=tenant_subdomain_header, is_active=True)
-            except Tenant.DoesNotExist:
-                pass
+            tenant = TenantRegistry.by_subdomain(tenant_subdomain_header)
+            if tenant:
+                return tenant
         
         # Method 3: Query parameter
         tenant_id_param = request.GET.get('tenant_id')
         if tenant_id_param:
-            try:
-                return Tenant.objects.get(id=tenant_id_param, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = TenantRegistry.by_id(tenant_id_param)
+            if tenant:
+                return tenant
         
         tenant_param = request.GET.get('tenant')
         if tenant_param:
-            try:
-                return Tenant.objects.get(subdomain=tenant_param, is_active=True)
-            except Tenant.DoesNotExist:
-                pass
+            tenant = TenantRegistry.by_subdomain(tenant_param)
+            if tenant:
+                return tenant
         
         # Method 4: Subdomain resolution (optional)
         host = request.get_host().split(':')[0]  # Remove port if present
         subdomain = self.extract_subdomain(host)
         
         if subdomain:
-            try:
-                return Tenant.objects.get(subdomain=subdomain, is_active=True)
-            except Tenant.DoesNotExist:
-                pass
+            tenant = TenantRegistry.by_subdomain(subdomain)
+            if tenant:
+                return tenant
         
         # Method 5: Custom domain (optional)
-        try:
-            return Tenant.objects.get(custom_domain=host, is_active=True)
-        except Tenant.DoesNotExist:
-            pass
+        tenant = TenantRegistry.by_custom_domain(host)
+        if tenant:
+            return tenant
         
         # No tenant found - this is OK for single-tenant setups
         logger.info(f"No tenant found for host: {host} - using default tenant resolution")
@@ -140,44 +137,18 @@ class TenantMiddleware(MiddlewareMixin):
 
     def get_tenant_from_jwt(self, request):
         """
-        Extract tenant from JWT token in Authorization header
+        Tenant of the user authenticated by the request's JWT (see utils/authentication.py;
+        the token is validated and the user + tenant loaded once per request)
         """
-        try:
-            auth_header = request.headers.get('Authorization')
-            logger.debug(f"Auth header: {auth_header}")
-            
-            if not auth_header or not auth_header.startswith('Bearer '):
-                logger.debug("No valid Authorization header found")
-                return None
-            
-            token = auth_header.split(' ')[1]
-            logger.debug(f"Token extracted: {token[:20]}...")
-            
-            # Get the JWT secret from settings
-            secret_key = settings.SECRET_KEY
-            
-            # Decode the token
-            payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-            logger.debug(f"JWT payload: {payload}")
-            
-            user_id = payload.get('user_id')
-            
-            if user_id:
-                # Import here to avoid circular imports
-                from ..models import CustomUser
-                try:
-                    user = CustomUser.objects.select_related('tenant').get(id=user_id)
-                    if user.tenant and user.tenant.is_active:
-                        logger.debug(f"Found tenant: {user.tenant.name}")
-                        return user.tenant
-                    else:
-                        logger.debug(f"User {user_id} has no active tenant")
-                except CustomUser.DoesNotExist:
-                    logger.debug(f"User {user_id} not found")
-                    pass
-                    
-        except (jwt.InvalidTokenError, jwt.DecodeError, KeyError, ValueError) as e:
-            logger.debug(f"JWT decode error: {e}")
-            pass
+        from ..utils.authentication import get_auth_context
         
-        return None
+        context = get_auth_context(request)
+        if context.user is None:
+            return None
+        
+        tenant = context.tenant
+        if tenant:
+            logger.debug(f"Found tenant: {tenant.name}")
+        else:
+            logger.debug(f"User {context.user.id} has no active tenant")
+        return tenant
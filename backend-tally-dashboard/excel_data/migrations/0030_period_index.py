@@ -0,0 +1,90 @@
+# Integer period key (year * 12 + month number) on period-bearing models.
+# The columns are generated and stored by the database, so existing rows are backfilled
+# when the column is added and every write path (save, bulk_create, update, raw SQL)
+# keeps them current.
+
+from django.db import migrations, models
+from django.db.models.functions import Upper
+from django.db.models.lookups import In
+
+MONTH_NAMES = [
+    ('JAN', 'JANUARY'), ('FEB', 'FEBRUARY'), ('MAR', 'MARCH'), ('APR', 'APRIL'), ('MAY', 'MAY'), ('JUN', 'JUNE'),
+    ('JUL', 'JULY'), ('AUG', 'AUGUST'), ('SEP', 'SEPTEMBER'), ('OCT', 'OCTOBER'), ('NOV', 'NOVEMBER'), ('DEC', 'DECEMBER'),
+]
+
+
+def period_index_expression():
+    # year * 12 + month number as of this migration (excel_data.utils.periods changes later)
+    return models.F('year') * 12 + models.Case(
+        *[
+            models.When(In(Upper('month'), sorted(set(names))), then=models.Value(number))
+            for number, names in enumerate(MONTH_NAMES, start=1)
+        ],
+        default=None,
+        output_field=models.IntegerField(),
+    )
+
+
+def period_index_field():
+    return models.GeneratedField(
+        expression=period_index_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0029_add_existing_chartaggregateddata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollperiod',
+            name='period_index',
+            field=period_index_field(),
+        ),
+        migrations.AddField(
+            model_name='salarydata',
+            name='period_index',
+            field=period_index_field(),
+        ),
+        migrations.AddField(
+            model_name='chartaggregateddata',
+            name='period_index',
+            field=period_index_field(),
+        ),
+        migrations.AddIndex(
+            model_name='payrollperiod',
+            index=models.Index(fields=['tenant', '-period_index'], name='payrollperiod_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarydata',
+            index=models.Index(fields=['tenant', '-period_index'], name='salary_period_index_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chartaggregateddata',
+            index=models.Index(fields=['tenant', 'period_index', 'department'], name='chartdata_period_idx'),
+        ),
+        migrations.AlterModelOptions(
+            name='payrollperiod',
+            options={'ordering': ['-period_index']},
+        ),
+        migrations.AlterModelOptions(
+            name='salarydata',
+            options={'ordering': ['-period_index', 'name']},
+        ),
+        migrations.AlterModelOptions(
+            name='chartaggregateddata',
+            options={
+                'ordering': ['-period_index', 'employee_name'],
+                'verbose_name': 'Chart Aggregated Data',
+                'verbose_name_plural': 'Chart Aggregated Data',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='calculatedsalary',
+            options={'ordering': ['-payroll_period__period_index', 'employee_name']},
+        ),
+    ]
@@ -0,0 +1,25 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0033_backgroundtask_dedupe_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('calculated_salary', 'Calculated salary')], max_length=30)),
+                ('object_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_outbox', to='excel_data.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'id'], name='change_outbox_tenant_idx')],
+            },
+        ),
+    ]
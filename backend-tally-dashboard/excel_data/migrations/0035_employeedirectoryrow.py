@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0034_changeoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDirectoryRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee_id', models.CharField(default='', max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('department', models.CharField(default='', max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_salary', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('period_index', models.IntegerField()),
+                ('data', models.JSONField(default=dict)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='directory_row', to='excel_data.employeeprofile')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='excel_data.tenant')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['tenant', 'name', 'profile'], name='dir_row_name_idx'),
+                    models.Index(fields=['tenant', 'employee_id', 'profile'], name='dir_row_code_idx'),
+                    models.Index(fields=['tenant', 'last_salary', 'profile'], name='dir_row_salary_idx'),
+                    models.Index(fields=['tenant', 'department', 'name', 'profile'], name='dir_row_dept_idx'),
+                    models.Index(fields=['tenant', 'is_active', 'name', 'profile'], name='dir_row_active_idx'),
+                    models.Index(fields=['tenant', 'period_index'], name='dir_row_period_idx'),
+                ],
+            },
+        ),
+    ]
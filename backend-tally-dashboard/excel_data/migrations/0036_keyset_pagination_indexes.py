@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0035_employeedirectoryrow'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='advanceledger',
+            index=models.Index(fields=['tenant', '-advance_date', '-id'], name='advance_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['tenant', '-date', 'name', 'id'], name='attendance_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['tenant', 'is_active', 'first_name', 'id'], name='employee_name_order_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# period_index accepts the same month strings as excel_data.utils.periods.month_number():
+# surrounding spaces are ignored and '6' / '06' are read as June.
+# Generated columns cannot be altered in place, so each column is dropped and re-added
+# (recomputed for every row) together with its index.
+
+from django.db import migrations, models
+from django.db.models.functions import Trim, Upper
+from django.db.models.lookups import In
+
+MONTH_NAMES = [
+    ('JAN', 'JANUARY'), ('FEB', 'FEBRUARY'), ('MAR', 'MARCH'), ('APR', 'APRIL'), ('MAY', 'MAY'), ('JUN', 'JUNE'),
+    ('JUL', 'JULY'), ('AUG', 'AUGUST'), ('SEP', 'SEPTEMBER'), ('OCT', 'OCTOBER'), ('NOV', 'NOVEMBER'), ('DEC', 'DECEMBER'),
+]
+
+
+def period_index_expression():
+    # year * 12 + month number as of this migration (excel_data.utils.periods may change later)
+    whens = []
+    for number, names in enumerate(MONTH_NAMES, start=1):
+        spellings = set(names) | {str(number), f"{number:02d}"}
+        whens.append(models.When(In(Upper(Trim('month')), sorted(spellings)), then=models.Value(number)))
+    return models.F('year') * 12 + models.Case(*whens, default=None, output_field=models.IntegerField())
+
+
+def period_index_field():
+    return models.GeneratedField(
+        expression=period_index_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
+
+
+INDEXES = {
+    'payrollperiod': models.Index(fields=['tenant', '-period_index'], name='payrollperiod_period_idx'),
+    'salarydata': models.Index(fields=['tenant', '-period_index'], name='salary_period_index_idx'),
+    'chartaggregateddata': models.Index(fields=['tenant', 'period_index', 'department'], name='chartdata_period_idx'),
+}
+
+
+def replace_period_index(model_name, index):
+    return [
+        migrations.RemoveIndex(model_name=model_name, name=index.name),
+        migrations.RemoveField(model_name=model_name, name='period_index'),
+        migrations.AddField(model_name=model_name, name='period_index', field=period_index_field()),
+        migrations.AddIndex(model_name=model_name, index=index),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0036_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        operation
+        for model_name, index in INDEXES.items()
+        for operation in replace_period_index(model_name, index)
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('excel_data', '0037_period_index_month_spellings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='merge',
+            field=models.CharField(blank=True, default='', help_text="Function combining the kwargs of coalesced calls, as 'module:qualname'", max_length=255),
+        ),
+    ]
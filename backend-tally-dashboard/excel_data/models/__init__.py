@@ -66,6 +66,26 @@ from .chart_data import (
     ChartAggregatedData,
 )
 
+# Upload Job Models
+from .upload import (
+    UploadJob,
+)
+
+# Background Task Models
+from .task import (
+    BackgroundTask,
+)
+
+# Change Outbox Models
+from .outbox import (
+    ChangeOutbox,
+)
+
+# Employee Directory Models
+from .directory import (
+    EmployeeDirectoryRow,
+)
+
 # Define all models to be imported via 'from excel_data.models import *'
 __all__ = [
     # Tenant Models
@@ -107,4 +127,16 @@ __all__ = [
     
     # Chart Data Models
     'ChartAggregatedData',
+    
+    # Upload Job Models
+    'UploadJob',
+    
+    # Background Task Models
+    'BackgroundTask',
+    
+    # Change Outbox Models
+    'ChangeOutbox',
+    
+    # Employee Directory Models
+    'EmployeeDirectoryRow',
 ]
\ No newline at end of file
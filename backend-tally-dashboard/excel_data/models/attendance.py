@@ -25,6 +25,10 @@ class Attendance(TenantAwareModel):
         ordering = ['-date', 'name']
         # Ensure we don't have duplicate entries for the same employee on the same date
         unique_together = ['tenant', 'employee_id', 'date']
+        indexes = [
+            # Keyset pages of AttendanceViewSet.list in the default order
+            models.Index(fields=['tenant', '-date', 'name', 'id'], name='attendance_list_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.date}"
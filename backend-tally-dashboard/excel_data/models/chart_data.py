@@ -1,6 +1,22 @@
-from django.db import models
-from decimal import Decimal
+from django.db import connection, models
 from .tenant import TenantAwareModel
+from ..utils.periods import MONTH_ABBRS, MONTH_NUMBERS, period_index, period_index_expression
+
+
+def _month_abbr_sql(column):
+    """SQL mapping a month column to JAN..DEC, with the spellings of month_number() ('JAN' if unrecognised)"""
+    whens = ' '.join(f"WHEN '{name}' THEN '{MONTH_ABBRS[number - 1]}'" for name, number in MONTH_NUMBERS.items())
+    return f"CASE UPPER(TRIM({column})) {whens} ELSE 'JAN' END"
+
+
+# Columns written by the set-based refreshes, in the order of their SELECT lists
+_REFRESH_COLUMNS = (
+    'tenant_id', 'employee_id', 'employee_name', 'department', 'year', 'month', 'period_key',
+    'payroll_period_id', 'basic_salary', 'present_days', 'absent_days', 'total_working_days',
+    'attendance_percentage', 'ot_hours', 'ot_charges', 'late_minutes', 'late_deduction',
+    'gross_salary', 'net_payable', 'tds_amount', 'advance_deduction', 'total_advance_balance',
+    'incentive', 'data_source', 'is_paid', 'aggregated_at', 'created_at', 'updated_at',
+)
 
 
 class ChartAggregatedData(TenantAwareModel):
@@ -20,6 +36,12 @@ class ChartAggregatedData(TenantAwareModel):
     year = models.IntegerField(db_index=True)
     month = models.CharField(max_length=20, db_index=True)  # Short name: JAN, FEB, MAR, etc.
     period_key = models.CharField(max_length=50, db_index=True)  # Format: "JAN-2025"
+    # year * 12 + month number, computed by the database (see utils/periods.py)
+    period_index = models.GeneratedField(
+        expression=period_index_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
     payroll_period = models.ForeignKey(
         'excel_data.PayrollPeriod', 
         on_delete=models.SET_NULL, 
@@ -66,7 +88,10 @@ class ChartAggregatedData(TenantAwareModel):
         verbose_name = 'Chart Aggregated Data'
         verbose_name_plural = 'Chart Aggregated Data'
         unique_together = ['tenant', 'employee_id', 'year', 'month']
-        ordering = ['-year', '-month', 'employee_name']
+        ordering = ['-period_index', 'employee_name']
+        indexes = [
+            models.Index(fields=['tenant', 'period_index', 'department'], name='chartdata_period_idx'),
+        ]
     
     def __str__(self):
         return f"{self.employee_name} - {self.month} {self.year} ({self.data_source})"
@@ -77,6 +102,9 @@ class ChartAggregatedData(TenantAwareModel):
             self.attendance_percentage = (self.present_days / self.total_working_days) * 100
         else:
             self.attendance_percentage = 0
+        # update_or_create() saves only its defaults: keep the percentage in step with them
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'attendance_percentage'}
         super().save(*args, **kwargs)
     
     @classmethod
@@ -197,4 +225,117 @@ class ChartAggregatedData(TenantAwareModel):
             }
         )
         return chart_data, created
-
+    
+    @classmethod
+    def refresh_from_salary_data(cls, tenant_id, year=None, month=None, bump_generation=True):
+        """
+        Upsert ChartAggregatedData for a tenant's SalaryData (one month, or every month when
+        year and month are omitted) in one INSERT ... SELECT ... ON CONFLICT statement.
+        
+        Set-based counterpart of aggregate_from_salary_data(), with the same mapping.
+        Rows whose months normalise to the same abbreviation ('JUNE'/'JUN') collapse into
+        the most recently updated one. Returns the number of rows written.
+        
+        Bumps the tenant's CHARTS generation once the write commits; callers that report the
+        change to ChartSnapshotService themselves pass bump_generation=False.
+        """
+        from django.apps import apps
+        salary_table = apps.get_model('excel_data', 'SalaryData')._meta.db_table
+        
+        month_abbr = _month_abbr_sql('s.month')
+        working_days = "COALESCE(NULLIF(COALESCE(s.days, 0) + COALESCE(s.absent, 0), 0), 30)"
+        select = f"""
+            SELECT DISTINCT ON (s.employee_id, s.year, {month_abbr})
+                s.tenant_id, s.employee_id, s.name, COALESCE(s.department, ''), s.year, {month_abbr},
+                {month_abbr} || '-' || s.year, NULL,
+                COALESCE(s.salary, 0), COALESCE(s.days, 0), COALESCE(s.absent, 0), {working_days},
+                ROUND(COALESCE(s.days, 0)::numeric / {working_days} * 100, 2),
+                COALESCE(s.ot, 0), COALESCE(s.charges, 0), COALESCE(s.late, 0), COALESCE(s.charge, 0),
+                COALESCE(NULLIF(s.amt, 0), s.sal_ot, 0), COALESCE(s.nett_payable, 0), COALESCE(s.tds, 0),
+                COALESCE(s.advance, 0), COALESCE(s.total_old_adv, 0), COALESCE(s.incentive, 0),
+                'excel', FALSE, NOW(), NOW(), NOW()
+            FROM {salary_table} s
+            WHERE s.tenant_id = %s AND s.employee_id IS NOT NULL AND s.year IS NOT NULL{{filters}}
+            ORDER BY s.employee_id, s.year, {month_abbr}, s.updated_at DESC, s.id DESC
+        """
+        # payroll_period is not taken from SalaryData: existing links are kept
+        return cls._refresh_from_select(
+            select, 's', tenant_id, year, month, keep=('payroll_period_id',), bump_generation=bump_generation,
+        )
+    
+    @classmethod
+    def refresh_from_calculated_salary(cls, tenant_id, year=None, month=None, ids=None, returning=(), bump_generation=True):
+        """
+        Upsert ChartAggregatedData for a tenant's CalculatedSalary rows (one payroll period,
+        only the rows with the given ids, or every row) in one INSERT ... SELECT ... ON
+        CONFLICT statement.
+        
+        Set-based counterpart of aggregate_from_calculated_salary(), with the same mapping.
+        Returns the number of rows written, or the `returning` columns of each written row.
+        The CHARTS generation is bumped as in refresh_from_salary_data().
+        """
+        from django.apps import apps
+        calculated_table = apps.get_model('excel_data', 'CalculatedSalary')._meta.db_table
+        period_table = apps.get_model('excel_data', 'PayrollPeriod')._meta.db_table
+        
+        month_abbr = _month_abbr_sql('p.month')
+        select = f"""
+            SELECT DISTINCT ON (c.employee_id, p.year, {month_abbr})
+                c.tenant_id, c.employee_id, c.employee_name, COALESCE(c.department, ''), p.year, {month_abbr},
+                {month_abbr} || '-' || p.year, c.payroll_period_id,
+                c.basic_salary, c.present_days, c.absent_days, c.total_working_days,
+                CASE WHEN c.total_working_days > 0
+                     THEN ROUND(c.present_days / c.total_working_days * 100, 2) ELSE 0 END,
+                c.ot_hours, c.ot_charges, c.late_minutes, c.late_deduction,
+                c.gross_salary, c.net_payable, c.tds_amount,
+                c.advance_deduction_amount, c.total_advance_balance, c.incentive,
+                'frontend', c.is_paid, NOW(), NOW(), NOW()
+            FROM {calculated_table} c
+            JOIN {period_table} p ON p.id = c.payroll_period_id
+            WHERE c.tenant_id = %s{{filters}}
+            ORDER BY c.employee_id, p.year, {month_abbr}, c.calculation_timestamp DESC, c.id DESC
+        """
+        return cls._refresh_from_select(
+            select, 'p', tenant_id, year, month,
+            id_column='c.id', ids=ids, returning=returning, bump_generation=bump_generation,
+        )
+    
+    @classmethod
+    def _refresh_from_select(cls, select, period_alias, tenant_id, year, month, keep=(), id_column=None, ids=None,
+                             returning=(), bump_generation=True):
+        """Run INSERT INTO chart data <select> ON CONFLICT DO UPDATE for one tenant (and period or source ids)"""
+        params = [tenant_id]
+        filters = ''
+        if ids is not None:
+            filters = f" AND {id_column} = ANY(%s)"
+            params.append(list(ids))
+        if year is not None and month is not None:
+            index = period_index(year, month)
+            if index is not None:
+                filters += f" AND {period_alias}.period_index = %s"
+                params.append(index)
+            else:
+                filters += f" AND {period_alias}.year = %s AND {period_alias}.month = %s"
+                params.extend([year, month])
+        
+        updates = ', '.join(
+            f"{column} = EXCLUDED.{column}"
+            for column in _REFRESH_COLUMNS
+            if column not in ('tenant_id', 'employee_id', 'year', 'month', 'created_at') + tuple(keep)
+        )
+        sql = (
+            f"INSERT INTO {cls._meta.db_table} ({', '.join(_REFRESH_COLUMNS)}) "
+            f"{select.format(filters=filters)} "
+            f"ON CONFLICT (tenant_id, employee_id, year, month) DO UPDATE SET {updates}"
+        )
+        if returning:
+            sql += f" RETURNING {', '.join(returning)}"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            written = cursor.fetchall() if returning else cursor.rowcount
+        
+        if bump_generation and written:
+            from ..services.cache_service import CHARTS, bump_cache_generation
+            # Bumped after commit, so a snapshot rebuilt in between cannot keep the old rows
+            bump_cache_generation(tenant_id, CHARTS, reason="chart_data_refreshed")
+        return written
@@ -0,0 +1,43 @@
+from django.db import models
+from .tenant import TenantAwareModel
+
+
+class EmployeeDirectoryRow(TenantAwareModel):
+    """
+    Denormalized employee directory entry, one per EmployeeProfile
+    (see services/employee_directory.py)
+
+    `data` holds the entry exactly as EmployeeProfileViewSet.directory_data returns it; the
+    columns beside it exist only to filter, sort and page on. The rows are refreshed from
+    EmployeeProfile, SalaryData and attendance writes, so serving a page is one index range
+    scan instead of projecting the whole tenant.
+    """
+    profile = models.OneToOneField(
+        'excel_data.EmployeeProfile',
+        on_delete=models.CASCADE,
+        related_name='directory_row',
+    )
+    employee_id = models.CharField(max_length=50, default='')
+    name = models.CharField(max_length=255)
+    department = models.CharField(max_length=100, default='')
+    is_active = models.BooleanField(default=True)
+    last_salary = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # year * 12 + month of the month whose attendance `data` counts
+    period_index = models.IntegerField()
+    data = models.JSONField(default=dict)
+
+    class Meta:
+        app_label = 'excel_data'
+        indexes = [
+            # One index per server-side sort, each ending with the unique profile id
+            models.Index(fields=['tenant', 'name', 'profile'], name='dir_row_name_idx'),
+            models.Index(fields=['tenant', 'employee_id', 'profile'], name='dir_row_code_idx'),
+            models.Index(fields=['tenant', 'last_salary', 'profile'], name='dir_row_salary_idx'),
+            # Department and status filters, in name order
+            models.Index(fields=['tenant', 'department', 'name', 'profile'], name='dir_row_dept_idx'),
+            models.Index(fields=['tenant', 'is_active', 'name', 'profile'], name='dir_row_active_idx'),
+            models.Index(fields=['tenant', 'period_index'], name='dir_row_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.employee_id})"
@@ -75,6 +75,8 @@ class EmployeeProfile(TenantAwareModel):
             models.Index(fields=['tenant', 'is_active'], name='employee_active_idx'),
             models.Index(fields=['tenant', 'employee_id'], name='employee_id_idx'),
             models.Index(fields=['is_active', 'employee_id'], name='employee_lookup_idx'),
+            # Keyset pages of DailyAttendanceViewSet.all_records
+            models.Index(fields=['tenant', 'is_active', 'first_name', 'id'], name='employee_name_order_idx'),
         ]
 
     def save(self, *args, **kwargs):
@@ -42,6 +42,8 @@ class AdvanceLedger(TenantAwareModel):
             models.Index(fields=['tenant', 'employee_id', 'status'], name='advance_payroll_idx'),
             models.Index(fields=['tenant', 'for_month'], name='advance_month_idx'),
             models.Index(fields=['employee_id', 'status'], name='advance_status_idx'),
+            # Keyset pages of AdvancePaymentViewSet.list, newest first
+            models.Index(fields=['tenant', '-advance_date', '-id'], name='advance_date_idx'),
         ]
 
 
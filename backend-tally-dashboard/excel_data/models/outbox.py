@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class ChangeOutbox(models.Model):
+    """
+    Keys of rows changed by bulk writers, waiting to be applied to derived tables
+    (see services/change_outbox.py)
+
+    bulk_update()/bulk_create() skip the post_save receivers that keep ChartAggregatedData
+    in step, so bulk writers record the changed rows here in their own transaction. A
+    consumer applies each batch of changes with one set-based statement and deletes it.
+    """
+    SOURCE_CALCULATED_SALARY = 'calculated_salary'
+    SOURCE_CHOICES = [
+        (SOURCE_CALCULATED_SALARY, 'Calculated salary'),
+    ]
+
+    tenant = models.ForeignKey('excel_data.Tenant', on_delete=models.CASCADE, related_name='change_outbox')
+    source = models.CharField(max_length=30, choices=SOURCE_CHOICES)
+    object_id = models.BigIntegerField()  # Primary key of the changed source row
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'excel_data'
+        indexes = [
+            models.Index(fields=['tenant', 'id'], name='change_outbox_tenant_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.object_id} (tenant {self.tenant_id})"
@@ -1,6 +1,6 @@
 from django.db import models
-from decimal import Decimal
 from .tenant import TenantAwareModel
+from ..utils.periods import period_index_expression
 
 
 class DataSource(models.TextChoices):
@@ -16,6 +16,12 @@ class PayrollPeriod(TenantAwareModel):
     """
     year = models.IntegerField()
     month = models.CharField(max_length=20)
+    # year * 12 + month number, computed by the database (see utils/periods.py)
+    period_index = models.GeneratedField(
+        expression=period_index_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
     data_source = models.CharField(max_length=20, choices=DataSource.choices, default=DataSource.FRONTEND)
     is_locked = models.BooleanField(default=False, help_text="Locked periods cannot be modified")
     calculation_date = models.DateTimeField(auto_now_add=True)
@@ -27,7 +33,10 @@ class PayrollPeriod(TenantAwareModel):
     class Meta:
         app_label = 'excel_data'
         unique_together = ['tenant', 'year', 'month']
-        ordering = ['-year', '-month']
+        ordering = ['-period_index']
+        indexes = [
+            models.Index(fields=['tenant', '-period_index'], name='payrollperiod_period_idx'),
+        ]
     
     def __str__(self):
         return f"{self.month} {self.year} - {self.get_data_source_display()}"
@@ -87,7 +96,7 @@ class CalculatedSalary(TenantAwareModel):
     class Meta:
         app_label = 'excel_data'
         unique_together = ['tenant', 'payroll_period', 'employee_id']
-        ordering = ['-payroll_period__year', '-payroll_period__month', 'employee_name']
+        ordering = ['-payroll_period__period_index', 'employee_name']
     
     def save(self, *args, **kwargs):
         """Auto-calculate salary components unless explicitly skipped or data source is UPLOADED.
@@ -102,73 +111,58 @@ class CalculatedSalary(TenantAwareModel):
         """Autonomous salary calculation logic using standardized formula:
         Gross Salary = (Base Salary ÷ Working Days × Present Days) + OT Charges - Late Deduction
         """
-        # 1. Calculate salary for present days using standardized formula
-        if self.total_working_days > 0:
-            daily_salary = self.basic_salary / self.total_working_days
-            self.salary_for_present_days = daily_salary * self.present_days
-        else:
-            self.salary_for_present_days = self.basic_salary
-        
-        # 2. Calculate OT charges using employee-specific OT rate
-        if self.employee_ot_rate > 0:
-            self.ot_charges = self.employee_ot_rate * self.ot_hours
-        elif self.basic_salary_per_hour > 0:
-            # Fallback to basic salary per hour calculation
-            self.ot_charges = self.basic_salary_per_hour * self.ot_hours
-        else:
-            # No OT rate available - calculate from basic salary
-            if self.total_working_days > 0:
-                # Calculate hourly rate from basic salary (assuming 8 hours per day)
-                hourly_rate = self.basic_salary / (self.total_working_days * Decimal('8'))
-                self.ot_charges = hourly_rate * self.ot_hours
-            else:
-                self.ot_charges = Decimal('0')
-        
-        # 3. Calculate late deduction using standardized approach
-        # Use OT rate per minute for consistency across all calculation methods
-        if self.employee_ot_rate > 0:
-            late_deduction_per_minute = self.employee_ot_rate / Decimal('60')
-        elif self.basic_salary_per_minute > 0:
-            late_deduction_per_minute = self.basic_salary_per_minute
-        else:
-            # No OT rate available - calculate from basic salary
-            if self.total_working_days > 0:
-                # Calculate hourly rate from basic salary (assuming 8 hours per day)
-                hourly_rate = self.basic_salary / (self.total_working_days * Decimal('8'))
-                late_deduction_per_minute = hourly_rate / Decimal('60')
-            else:
-                late_deduction_per_minute = Decimal('0')
-        self.late_deduction = late_deduction_per_minute * self.late_minutes
-        
-        # 4. Calculate gross salary using standardized formula
-        # Note: Incentive is moved to a separate field and not included in gross salary
-        self.gross_salary = self.salary_for_present_days + self.ot_charges - self.late_deduction
-        
-        # 5. Calculate TDS using employee-specific TDS rate
-        # TDS is calculated on gross salary + incentive
-        if self.employee_tds_rate > 0:
-            tds_rate = self.employee_tds_rate / 100
-        else:
-            # Fallback to period TDS rate
-            tds_rate = self.payroll_period.tds_rate / 100
+        type(self).calculate_salaries([self])
+    
+    @classmethod
+    def calculate_salaries(cls, calculated_salaries):
+        """Calculate salary components for many instances at once with the shared payroll kernel.
         
-        # TDS is calculated on gross salary + incentive
-        taxable_amount = self.gross_salary + self.incentive
-        self.tds_amount = taxable_amount * tds_rate
-        self.salary_after_tds = taxable_amount - self.tds_amount
+        Inputs per instance:
+        - OT rate: employee-specific OT rate, else basic salary per hour (kernel falls back to
+          basic salary ÷ (working days × 8) when neither is set)
+        - TDS: employee-specific TDS rate, else the payroll period TDS rate
+        - Advance: admin-edited non-zero deduction is kept, otherwise auto-calculated
+        """
+        from ..services.payroll_kernel import compute_payroll, paise_to_decimal
         
-        # 6. Calculate advance deduction
-        if not self.advance_deduction_editable or self.advance_deduction_amount == 0:
-            # Auto-calculate: deduct up to 50% of net salary or remaining balance, whichever is lower
-            max_deduction = self.salary_after_tds * Decimal('0.5')
-            # Ensure we don't deduct more than the salary itself or more than available advance
-            self.advance_deduction_amount = min(max_deduction, self.total_advance_balance, self.salary_after_tds)
+        calculated_salaries = list(calculated_salaries)
+        if not calculated_salaries:
+            return
         
-        # 7. Calculate remaining advance balance
-        self.remaining_advance_balance = self.total_advance_balance - self.advance_deduction_amount
+        columns = compute_payroll(
+            basic_salary=[cs.basic_salary for cs in calculated_salaries],
+            working_days=[cs.total_working_days for cs in calculated_salaries],
+            present_days=[cs.present_days for cs in calculated_salaries],
+            ot_hours=[cs.ot_hours for cs in calculated_salaries],
+            late_minutes=[cs.late_minutes for cs in calculated_salaries],
+            ot_rate=[
+                cs.employee_ot_rate if cs.employee_ot_rate > 0 else cs.basic_salary_per_hour
+                for cs in calculated_salaries
+            ],
+            tds_percentage=[
+                cs.employee_tds_rate if cs.employee_tds_rate > 0 else cs.payroll_period.tds_rate
+                for cs in calculated_salaries
+            ],
+            advance_balance=[cs.total_advance_balance for cs in calculated_salaries],
+            incentive=[cs.incentive for cs in calculated_salaries],
+            advance_override=[
+                cs.advance_deduction_amount
+                if cs.advance_deduction_editable and cs.advance_deduction_amount != 0 else None
+                for cs in calculated_salaries
+            ],
+        )
+        decimals = {name: paise_to_decimal(values) for name, values in columns.items()}
         
-        # 8. Calculate final net payable (ensure it's never negative)
-        self.net_payable = max(Decimal('0'), self.salary_after_tds - self.advance_deduction_amount)
+        for index, cs in enumerate(calculated_salaries):
+            cs.salary_for_present_days = decimals['salary_for_present_days'][index]
+            cs.ot_charges = decimals['ot_charges'][index]
+            cs.late_deduction = decimals['late_deduction'][index]
+            cs.gross_salary = decimals['gross_salary'][index]
+            cs.tds_amount = decimals['tds_amount'][index]
+            cs.salary_after_tds = decimals['salary_after_tds'][index]
+            cs.advance_deduction_amount = decimals['advance_deduction'][index]
+            cs.remaining_advance_balance = decimals['remaining_advance_balance'][index]
+            cs.net_payable = decimals['net_payable'][index]
     
     def __str__(self):
         return f"{self.employee_name} - {self.payroll_period}"
@@ -1,5 +1,6 @@
 from django.db import models
 from .tenant import TenantAwareModel
+from ..utils.periods import period_index_expression
 
 
 class SalaryData(TenantAwareModel):
@@ -14,6 +15,12 @@ class SalaryData(TenantAwareModel):
     # Basic Information
     year = models.IntegerField(null=True, blank=True)
     month = models.CharField(max_length=20, null=True, blank=True)
+    # year * 12 + month number, computed by the database (see utils/periods.py)
+    period_index = models.GeneratedField(
+        expression=period_index_expression(),
+        output_field=models.IntegerField(null=True),
+        db_persist=True,
+    )
     date = models.DateField(null=True, blank=True)
     
     # Template Fields (exact column names)
@@ -46,11 +53,12 @@ class SalaryData(TenantAwareModel):
     class Meta:
         app_label = 'excel_data'
         unique_together = ['tenant', 'employee_id', 'year', 'month']
-        ordering = ['-year', '-month', 'name']
+        ordering = ['-period_index', 'name']
         indexes = [
             models.Index(fields=['tenant', 'employee_id', '-year', '-month'], name='salary_lookup_idx'),
             models.Index(fields=['employee_id', '-year', '-month'], name='salary_employee_idx'),
             models.Index(fields=['tenant', '-year', '-month'], name='salary_period_idx'),
+            models.Index(fields=['tenant', '-period_index'], name='salary_period_index_idx'),
         ]
 
     def save(self, *args, **kwargs):
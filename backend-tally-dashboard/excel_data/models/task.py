@@ -0,0 +1,64 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundTask(models.Model):
+    """
+    A background function call stored in the database (see utils/task_queue.py)
+
+    Used instead of daemon threads when Celery is disabled: a task row is written in the
+    caller's transaction, claimed by a worker with SELECT ... FOR UPDATE SKIP LOCKED, retried
+    on failure and reclaimed when its worker stops heart-beating.
+
+    Tasks with a dedupe_key are coalesced (see task_queue.enqueue_coalesced): at most one of
+    them is pending and at most one runs at a time.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    func = models.CharField(max_length=255, help_text="Function to call, as 'module:qualname'")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Tasks of one tenant share the per-tenant concurrency limit
+    tenant = models.ForeignKey('excel_data.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='background_tasks')
+    # Tasks doing the same work share a key, e.g. 'rebuild:12:charts:2025-06'
+    dedupe_key = models.CharField(max_length=200, blank=True, default='')
+    merge = models.CharField(max_length=255, blank=True, default='', help_text="Function combining the kwargs of coalesced calls, as 'module:qualname'")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    last_error = models.TextField(blank=True, default='')
+
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)  # Claim time, refreshed by the worker's heartbeat
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'excel_data'
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='bg_task_claim_idx'),
+            models.Index(fields=['status', 'tenant'], name='bg_task_tenant_idx'),
+        ]
+        constraints = [
+            # One pending task per key: duplicates merge into it
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status='pending') & ~models.Q(dedupe_key=''),
+                name='bg_task_pending_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.func} ({self.status}, attempt {self.attempts}/{self.max_attempts})"
@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
-from ..utils.utils import get_current_tenant
+from ..utils.tenant_context import get_current_tenant
 
 
 class Tenant(models.Model):
@@ -0,0 +1,68 @@
+from django.db import models
+from .tenant import TenantAwareModel
+
+
+class UploadJob(TenantAwareModel):
+    """
+    A salary or attendance upload processed in the background (see services/upload_job_service.py)
+
+    The stored file is parsed and written in stages; finished stages and the number of rows
+    written are checkpointed here, so an interrupted job resumes where it stopped.
+    """
+    KIND_SALARY = 'salary'
+    KIND_ATTENDANCE = 'attendance'
+    KIND_CHOICES = [
+        (KIND_SALARY, 'Salary'),
+        (KIND_ATTENDANCE, 'Attendance'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_NEEDS_CONFIRMATION = 'needs_confirmation'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_NEEDS_CONFIRMATION, 'Needs confirmation'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    FINISHED_STATUSES = (STATUS_NEEDS_CONFIRMATION, STATUS_COMPLETED, STATUS_FAILED)
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    user = models.ForeignKey('CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_jobs')
+
+    # Upload
+    file_path = models.CharField(max_length=500, help_text="Storage name of the uploaded file")
+    file_name = models.CharField(max_length=255)
+    year = models.IntegerField()
+    month = models.CharField(max_length=20)  # Month name for salary, month number for attendance
+
+    # Progress checkpoints
+    stage = models.CharField(max_length=30, blank=True, default='')  # Stage being processed
+    stages_completed = models.JSONField(default=list, blank=True)
+    total_rows = models.IntegerField(default=0)  # Rows in the file
+    rows_total = models.IntegerField(default=0)  # Rows with a name, to write or reject
+    rows_processed = models.IntegerField(default=0)  # Rows written or rejected so far
+    records_created = models.IntegerField(default=0)
+    records_updated = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # First row errors
+    result = models.JSONField(default=dict, blank=True)  # Missing employees, payroll period, failure
+    attempts = models.IntegerField(default=0)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'excel_data'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', '-created_at'], name='upload_job_tenant_idx'),
+            models.Index(fields=['status', 'updated_at'], name='upload_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} upload {self.file_name} ({self.status})"
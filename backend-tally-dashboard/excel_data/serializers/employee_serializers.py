@@ -168,7 +168,7 @@ class EmployeeTableSerializer(serializers.ModelSerializer):
         return obj.full_name
 
     def get_latest_salary(self, obj):
-        latest = SalaryData.objects.filter(employee_id=obj.employee_id).order_by('-year', '-month').first()
+        latest = SalaryData.objects.filter(employee_id=obj.employee_id).order_by('-period_index').first()
         return float(latest.nett_payable) if latest else 0
 
     def get_attendance_percentage(self, obj):
@@ -185,7 +185,7 @@ class EmployeeTableSerializer(serializers.ModelSerializer):
         # 1. Get attendance data from uploaded Salary Excel
         latest_salary = SalaryData.objects.filter(
             employee_id=obj.employee_id
-        ).order_by('-year', '-month').first()
+        ).order_by('-period_index').first()
         
         if latest_salary:
             total_present_days += float(latest_salary.days or 0)
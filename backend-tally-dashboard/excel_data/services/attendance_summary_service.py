@@ -0,0 +1,275 @@
+"""
+Attendance Summary Service
+
+Keeps the per-employee monthly aggregates (MonthlyAttendanceSummary and the monthly
+Attendance row) in step with DailyAttendance.
+
+Single-row changes are applied as deltas: the old -> new difference of the changed daily
+row is added to the summary with an atomic F() update, so marking one employee costs a
+constant number of queries regardless of how many days the month already holds.
+A full recount only happens through reconcile_month(), which is used when a summary row
+does not exist yet and by the reconcile_attendance_summaries management command.
+"""
+
+import calendar
+import logging
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Floor, Greatest
+from django.utils import timezone
+
+from ..models import Attendance, DailyAttendance, EmployeeProfile, MonthlyAttendanceSummary
+
+logger = logging.getLogger(__name__)
+
+# PRESENT and PAID_LEAVE count as a full day, HALF_DAY as half a day
+FULL_DAY_STATUSES = ('PRESENT', 'PAID_LEAVE')
+HALF_DAY_STATUSES = ('HALF_DAY',)
+
+MONTH_NAMES = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+# Fields captured from a DailyAttendance row to compute its contribution
+SNAPSHOT_FIELDS = ('tenant_id', 'employee_id', 'date', 'attendance_status', 'ot_hours', 'late_minutes')
+
+
+class AttendanceSummaryService:
+    """
+    Delta-based maintenance and set-based reconciliation of monthly attendance aggregates
+    """
+
+    @staticmethod
+    def snapshot(daily):
+        """Capture the fields of a DailyAttendance instance that feed the monthly aggregates"""
+        return {field: getattr(daily, field) for field in SNAPSHOT_FIELDS}
+
+    @staticmethod
+    def contribution(attendance_status, ot_hours, late_minutes):
+        """Return the (present_days, ot_hours, late_minutes) a single daily row adds to its month"""
+        if attendance_status in FULL_DAY_STATUSES:
+            present = Decimal('1')
+        elif attendance_status in HALF_DAY_STATUSES:
+            present = Decimal('0.5')
+        else:
+            present = Decimal('0')
+        return present, Decimal(str(ot_hours or 0)), int(late_minutes or 0)
+
+    @staticmethod
+    def apply_change(old=None, new=None):
+        """
+        Apply the difference between two snapshots of the same daily row to the monthly aggregates.
+
+        Args:
+            old: Snapshot before the change (None for an insert)
+            new: Snapshot after the change (None for a delete)
+        """
+        deltas = {}
+        keys = {}
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if not snapshot:
+                continue
+            key = (snapshot['tenant_id'], snapshot['employee_id'], snapshot['date'].year, snapshot['date'].month)
+            keys[sign] = key
+            present, ot_hours, late_minutes = AttendanceSummaryService.contribution(
+                snapshot['attendance_status'], snapshot['ot_hours'], snapshot['late_minutes']
+            )
+            current = deltas.get(key, (Decimal('0'), Decimal('0'), 0))
+            deltas[key] = (
+                current[0] + sign * present,
+                current[1] + sign * ot_hours,
+                current[2] + sign * late_minutes,
+            )
+
+        for (tenant_id, employee_id, year, month), delta in deltas.items():
+            # A row entering the month must leave a summary behind even when it adds nothing
+            # (e.g. the first ABSENT day), as reconcile_month does
+            entering = keys.get(1) == (tenant_id, employee_id, year, month) and keys.get(-1) != keys.get(1)
+            AttendanceSummaryService._apply_delta(tenant_id, employee_id, year, month, *delta, ensure_row=entering)
+
+    @staticmethod
+    def _apply_delta(tenant_id, employee_id, year, month, present_days, ot_hours, late_minutes, ensure_row=False):
+        """Add a delta to one employee-month; falls back to a recount when no summary row exists"""
+        if not (present_days or ot_hours or late_minutes):
+            if ensure_row and not MonthlyAttendanceSummary.all_objects.filter(
+                tenant_id=tenant_id, employee_id=employee_id, year=year, month=month
+            ).exists():
+                AttendanceSummaryService.reconcile_month(tenant_id, year, month, employee_ids=[employee_id])
+            return
+
+        updated = MonthlyAttendanceSummary.all_objects.filter(
+            tenant_id=tenant_id, employee_id=employee_id, year=year, month=month
+        ).update(
+            present_days=F('present_days') + present_days,
+            ot_hours=F('ot_hours') + ot_hours,
+            late_minutes=F('late_minutes') + late_minutes,
+            last_updated=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            AttendanceSummaryService.reconcile_month(tenant_id, year, month, employee_ids=[employee_id])
+            return
+
+        if not AttendanceSummaryService._refresh_monthly_attendance(tenant_id, employee_id, year, month):
+            AttendanceSummaryService.reconcile_month(tenant_id, year, month, employee_ids=[employee_id])
+
+    @staticmethod
+    def _refresh_monthly_attendance(tenant_id, employee_id, year, month):
+        """Copy the summary totals onto the monthly Attendance row in one UPDATE; returns rows updated"""
+        summary = MonthlyAttendanceSummary.all_objects.filter(
+            tenant_id=OuterRef('tenant_id'), employee_id=OuterRef('employee_id'), year=year, month=month
+        )
+        summary_present = Subquery(summary.values('present_days')[:1], output_field=DecimalField())
+
+        return Attendance.all_objects.filter(
+            tenant_id=tenant_id, employee_id=employee_id, date=date(year, month, 1)
+        ).update(
+            present_days=Cast(Floor(summary_present), IntegerField()),
+            absent_days=Greatest(
+                Cast(Floor(F('total_working_days') - summary_present), IntegerField()),
+                Value(0),
+            ),
+            ot_hours=Subquery(summary.values('ot_hours')[:1]),
+            late_minutes=Subquery(summary.values('late_minutes')[:1]),
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def reconcile_month(tenant, year, month, employee_ids=None, employees=None):
+        """
+        Recount MonthlyAttendanceSummary and Attendance from DailyAttendance for a tenant-month.
+
+        Uses one grouped aggregate query, one employee lookup and one upsert per model,
+        independent of how many employees are affected.
+
+        Args:
+            tenant: Tenant instance or id
+            year: Year
+            month: Month number (1-12)
+            employee_ids: Restrict the recount to these employees (all employees when None)
+            employees: Optional {employee_id: EmployeeProfile} already loaded by the caller
+
+        Returns:
+            int: Number of employee-months written
+        """
+        tenant_id = getattr(tenant, 'id', tenant)
+        daily_qs = DailyAttendance.all_objects.filter(tenant_id=tenant_id, date__year=year, date__month=month)
+        if employee_ids is not None:
+            daily_qs = daily_qs.filter(employee_id__in=employee_ids)
+
+        totals = {
+            row['employee_id']: row
+            for row in daily_qs.values('employee_id').annotate(
+                present_days=Sum(
+                    Case(
+                        When(attendance_status__in=FULL_DAY_STATUSES, then=Value(Decimal('1'))),
+                        When(attendance_status__in=HALF_DAY_STATUSES, then=Value(Decimal('0.5'))),
+                        default=Value(Decimal('0')),
+                        output_field=DecimalField(max_digits=5, decimal_places=1),
+                    )
+                ),
+                ot_hours=Sum('ot_hours'),
+                late_minutes=Sum('late_minutes'),
+                employee_name=Max('employee_name'),
+                department=Max('department'),
+            )
+        }
+
+        # Employees whose daily rows are all gone keep their rows, zeroed
+        stale_summaries = MonthlyAttendanceSummary.all_objects.filter(tenant_id=tenant_id, year=year, month=month)
+        stale_attendance = Attendance.all_objects.filter(tenant_id=tenant_id, date=date(year, month, 1))
+        if employee_ids is not None:
+            stale_summaries = stale_summaries.filter(employee_id__in=employee_ids)
+            stale_attendance = stale_attendance.filter(employee_id__in=employee_ids)
+        stale_summaries.exclude(employee_id__in=list(totals)).update(
+            present_days=0, ot_hours=0, late_minutes=0, last_updated=timezone.now()
+        )
+        stale_attendance.exclude(employee_id__in=list(totals)).update(
+            present_days=0, ot_hours=0, late_minutes=0, absent_days=F('total_working_days')
+        )
+
+        if not totals:
+            return 0
+
+        from .salary_service import SalaryCalculationService
+
+        if employees is None:
+            employees = {
+                emp.employee_id: emp
+                for emp in EmployeeProfile.all_objects.filter(
+                    tenant_id=tenant_id, employee_id__in=list(totals), is_active=True
+                ).only(
+                    'employee_id', 'first_name', 'last_name', 'department', 'date_of_joining',
+                    'off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday',
+                    'off_friday', 'off_saturday', 'off_sunday',
+                )
+            }
+
+        days_in_month = calendar.monthrange(year, month)[1]
+        now = timezone.now()
+        summaries = []
+        attendance_rows = []
+
+        for employee_id, row in totals.items():
+            present_days = row['present_days'] or Decimal('0')
+            employee = employees.get(employee_id)
+
+            if employee:
+                employee_name = f"{employee.first_name} {employee.last_name}".strip()
+                department = employee.department or 'General'
+                try:
+                    total_working_days = SalaryCalculationService._calculate_employee_working_days(
+                        employee, year, MONTH_NAMES[month - 1]
+                    )
+                except Exception as e:
+                    total_working_days = days_in_month
+                    logger.warning(f"Could not calculate working days for employee {employee_id}: {e}")
+            else:
+                employee_name = row['employee_name']
+                department = row['department'] or 'General'
+                total_working_days = days_in_month
+
+            summaries.append(MonthlyAttendanceSummary(
+                tenant_id=tenant_id,
+                employee_id=employee_id,
+                year=year,
+                month=month,
+                present_days=present_days,
+                ot_hours=row['ot_hours'] or Decimal('0'),
+                late_minutes=row['late_minutes'] or 0,
+                last_updated=now,
+            ))
+            attendance_rows.append(Attendance(
+                tenant_id=tenant_id,
+                employee_id=employee_id,
+                name=employee_name,
+                department=department,
+                date=date(year, month, 1),
+                calendar_days=days_in_month,
+                total_working_days=total_working_days,
+                present_days=int(present_days),
+                absent_days=int(max(Decimal('0'), (total_working_days or days_in_month) - present_days)),
+                ot_hours=row['ot_hours'] or Decimal('0'),
+                late_minutes=row['late_minutes'] or 0,
+            ))
+
+        MonthlyAttendanceSummary.all_objects.bulk_create(
+            summaries,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['tenant', 'employee_id', 'year', 'month'],
+            update_fields=['present_days', 'ot_hours', 'late_minutes', 'last_updated', 'updated_at'],
+        )
+        Attendance.all_objects.bulk_create(
+            attendance_rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['tenant', 'employee_id', 'date'],
+            update_fields=[
+                'name', 'department', 'calendar_days', 'total_working_days',
+                'present_days', 'absent_days', 'ot_hours', 'late_minutes', 'updated_at',
+            ],
+        )
+
+        logger.info(f"🔁 Reconciled attendance summaries for {len(summaries)} employees - tenant {tenant_id}, {year}-{month:02d}")
+        return len(summaries)
@@ -0,0 +1,101 @@
+"""
+Change Outbox Service
+
+bulk_update()/bulk_create() bypass the post_save receivers in signals.py, so payroll
+writers that use them (marking salaries paid, bulk period edits, direct period saves,
+batch calculation, uploaded-salary processing) left ChartAggregatedData.is_paid and
+net_payable behind the payroll.
+
+Those writers now call record_changes() in their own transaction with the ids of the rows
+they wrote. The ids land in the ChangeOutbox table together with the data, and a
+coalesced background task per tenant (apply_changes) upserts the derived chart rows for
+a whole batch of ids with one INSERT ... SELECT ... ON CONFLICT statement, then deletes
+the batch in the same transaction. A failed run leaves the changes in the outbox for the
+retry (or the tenant's next change).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from ..utils.task_queue import enqueue_coalesced, run_in_background
+
+logger = logging.getLogger(__name__)
+
+# Outbox rows applied per statement
+BATCH_SIZE = 5000
+
+
+def record_changes(tenant_id, source, object_ids):
+    """
+    Record changed source rows (call inside the writer's transaction) and schedule the
+    tenant's consumer for after the commit; returns the number of rows recorded
+    """
+    from ..models import ChangeOutbox
+
+    object_ids = sorted({object_id for object_id in object_ids if object_id is not None})
+    if not object_ids:
+        return 0
+
+    ChangeOutbox.objects.bulk_create(
+        [ChangeOutbox(tenant_id=tenant_id, source=source, object_id=object_id) for object_id in object_ids],
+        batch_size=1000,
+    )
+    if getattr(settings, 'BACKGROUND_TASKS_BACKEND', 'database') == 'database':
+        # One consumer per tenant: changes recorded while it is pending share its run
+        enqueue_coalesced(
+            apply_changes, tenant_id,
+            key=f"outbox:{tenant_id}", tenant_id=tenant_id, window=0, max_wait=0,
+        )
+    else:
+        run_in_background(apply_changes, tenant_id, tenant_id=tenant_id)
+    return len(object_ids)
+
+
+def record_calculated_salary_changes(tenant_id, calculated_salaries):
+    """record_changes() for CalculatedSalary instances written with bulk_update/bulk_create"""
+    from ..models import ChangeOutbox
+    return record_changes(
+        tenant_id, ChangeOutbox.SOURCE_CALCULATED_SALARY,
+        [calculated_salary.pk for calculated_salary in calculated_salaries],
+    )
+
+
+def apply_changes(tenant_id, batch_size=BATCH_SIZE):
+    """
+    Background task: apply a tenant's recorded changes to ChartAggregatedData, one
+    set-based statement per batch; returns the number of outbox rows applied
+    """
+    from ..models import ChangeOutbox, ChartAggregatedData, Tenant
+    from .chart_snapshot_service import SNAPSHOT_COLUMNS, ChartSnapshotService
+
+    tenant = Tenant.objects.get(id=tenant_id)
+    applied = 0
+    while True:
+        with transaction.atomic():
+            claimed = list(
+                ChangeOutbox.objects.select_for_update(skip_locked=True)
+                .filter(tenant_id=tenant_id).order_by('id')
+                .values_list('id', 'source', 'object_id')[:batch_size]
+            )
+            if not claimed:
+                break
+
+            salary_ids = {
+                object_id for _, source, object_id in claimed
+                if source == ChangeOutbox.SOURCE_CALCULATED_SALARY
+            }
+            # Deleted salaries are not found here; their chart rows go with the post_delete signal
+            chart_rows = ChartAggregatedData.refresh_from_calculated_salary(
+                tenant_id, ids=salary_ids, returning=SNAPSHOT_COLUMNS, bump_generation=False,
+            ) if salary_ids else []
+            ChangeOutbox.objects.filter(id__in=[outbox_id for outbox_id, _, _ in claimed]).delete()
+
+        if chart_rows:
+            ChartSnapshotService.apply_values(tenant, chart_rows, reason="change_outbox")
+        applied += len(claimed)
+        logger.info(f"📤 Applied {len(claimed)} outbox change(s) for tenant {tenant_id}: {len(chart_rows)} chart rows")
+        if len(claimed) < batch_size:
+            break
+    return applied
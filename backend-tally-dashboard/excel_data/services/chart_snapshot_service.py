@@ -0,0 +1,433 @@
+"""
+Chart Snapshot Service
+
+Per-tenant columnar snapshot of ChartAggregatedData for the frontend_charts dashboard.
+
+The snapshot holds one NumPy array per column (period, department, employee, salary and
+attendance figures) and is loaded with a single query. Every chart series of a dashboard
+request - current stats, previous period, departments, salary distribution, trends and
+top-N lists - is then computed from it in one pass, without further queries.
+
+Snapshots live in process memory (bounded LRU over tenants) and are tied to the tenant's
+CHARTS cache generation. Writers report their changes through apply_rows(),
+remove_rows() or apply_period(): once the writer's transaction commits, those bump the
+generation and patch the local snapshot in place when no other process wrote in between;
+any other change to the generation makes the next read rebuild the snapshot. Writers that cannot report rows bump the generation
+themselves; as a backstop against a writer that does neither, a snapshot is also rebuilt
+once it is CHART_SNAPSHOT_MAX_AGE seconds old (the TTL the cached chart responses had).
+
+Import this module inside functions: NumPy must not be loaded at Django startup.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from ..utils.periods import MONTH_ABBRS, MONTH_NUMBERS, period_index, period_label  # noqa: F401 (re-exported)
+from .cache_service import CHARTS, bump_cache_generation, get_cache_generations
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the salary distribution buckets (net payable)
+SALARY_BUCKETS = [25000, 50000, 75000, 100000]
+SALARY_BUCKET_LABELS = ['0-25K', '25K-50K', '50K-75K', '75K-100K', '100K+']
+
+# ChartAggregatedData columns loaded into the snapshot (order matters: see ChartSnapshot.upsert)
+SNAPSHOT_COLUMNS = (
+    'employee_id', 'employee_name', 'department', 'year', 'month',
+    'net_payable', 'present_days', 'total_working_days', 'ot_hours', 'late_minutes',
+    'attendance_percentage',
+)
+NUMERIC_COLUMNS = ('net_payable', 'present_days', 'total_working_days', 'ot_hours', 'late_minutes', 'attendance_percentage')
+
+
+class _Vocabulary:
+    """String <-> integer code mapping for a categorical column"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ChartSnapshot:
+    """
+    Columnar in-memory copy of a tenant's ChartAggregatedData rows
+
+    Rows are appended into capacity-doubling arrays; updated and deleted rows are masked
+    out through `alive` and dropped on the next rebuild.
+    """
+
+    def __init__(self, generation=None, capacity=1024):
+        self.generation = generation
+        self.built_at = time.monotonic()  # patches keep it: only a rebuild re-reads every row
+        self.size = 0
+        self.employees = _Vocabulary()
+        self.names = _Vocabulary()
+        self.departments = _Vocabulary()
+        self.row_index = {}  # (employee_id, period) -> row
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.period = np.zeros(capacity, dtype=np.int32)
+        self.employee = np.zeros(capacity, dtype=np.int32)
+        self.name = np.zeros(capacity, dtype=np.int32)
+        self.department = np.zeros(capacity, dtype=np.int32)
+        self.numeric = {column: np.zeros(capacity, dtype=np.float64) for column in NUMERIC_COLUMNS}
+
+    @classmethod
+    def from_rows(cls, rows, generation=None):
+        """Build a snapshot from ChartAggregatedData value tuples ordered as SNAPSHOT_COLUMNS"""
+        rows = list(rows)
+        snapshot = cls(generation, capacity=max(1024, len(rows)))
+        for row in rows:
+            snapshot.upsert(row)
+        return snapshot
+
+    # ==================== Patching ====================
+
+    def _grow(self):
+        capacity = len(self.alive) * 2
+        for attr in ('alive', 'period', 'employee', 'name', 'department'):
+            array = getattr(self, attr)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            setattr(self, attr, grown)
+        for column, array in self.numeric.items():
+            grown = np.zeros(capacity, dtype=np.float64)
+            grown[:self.size] = array[:self.size]
+            self.numeric[column] = grown
+
+    def upsert(self, row):
+        """Insert or replace one row (tuple ordered as SNAPSHOT_COLUMNS); returns False for unknown months"""
+        employee_id, employee_name, department, year, month = row[:5]
+        period = period_index(year, month)
+        if period is None:
+            return False
+
+        self.remove(employee_id, period)
+        if self.size == len(self.alive):
+            self._grow()
+
+        i = self.size
+        self.size += 1
+        self.alive[i] = True
+        self.period[i] = period
+        self.employee[i] = self.employees.code(employee_id)
+        self.name[i] = self.names.code(employee_name)
+        self.department[i] = self.departments.code(department or '')
+        for column, value in zip(NUMERIC_COLUMNS, row[5:]):
+            self.numeric[column][i] = float(value or 0)
+        self.row_index[(employee_id, period)] = i
+        return True
+
+    def remove(self, employee_id, period):
+        i = self.row_index.pop((employee_id, period), None)
+        if i is not None:
+            self.alive[i] = False
+
+    def remove_period(self, period):
+        n = self.size
+        self.alive[:n] &= self.period[:n] != period
+        self.row_index = {key: i for key, i in self.row_index.items() if key[1] != period}
+
+    # ==================== Queries ====================
+
+    def _department_code(self, department):
+        """Code of a department filter: None = all departments, -1 = unknown department"""
+        if not department or department == 'All':
+            return None
+        return self.departments.codes.get(department, -1)
+
+    def _select(self, periods, department):
+        n = self.size
+        mask = self.alive[:n] & np.isin(self.period[:n], np.asarray(list(periods), dtype=np.int32))
+        department_code = self._department_code(department)
+        if department_code is not None:
+            mask &= self.department[:n] == department_code
+        return np.flatnonzero(mask)
+
+    def has_rows(self, periods, department=None):
+        return self._select(periods, department).size > 0
+
+    def chart_series(self, periods, department=None, previous_period=None, trend_periods=()):
+        """
+        Compute every chart series for the selected periods in one pass over the snapshot
+
+        Args:
+            periods: Selected integer periods (current stats, departments, distribution, top-N)
+            department: Department filter (None / 'All' for every department)
+            previous_period: Integer period compared against for the *Change figures
+            trend_periods: Integer periods of the salary / OT / late trends
+
+        Returns:
+            dict: Current totals, departments, salary_distribution, top_salaried,
+                  top_attendance, previous (None without rows) and trends
+        """
+        periods = set(periods)
+        trend_periods = set(trend_periods)
+        wanted = periods | trend_periods | ({previous_period} if previous_period else set())
+        rows = self._select(wanted, department)
+
+        period = self.period[rows]
+        employee = self.employee[rows]
+        values = {column: array[rows] for column, array in self.numeric.items()}
+
+        current = np.isin(period, np.asarray(list(periods), dtype=np.int32))
+        result = self._current_series(rows[current], employee[current], {c: v[current] for c, v in values.items()})
+
+        result['previous'] = None
+        if previous_period:
+            previous = period == previous_period
+            if previous.any():
+                result['previous'] = {
+                    'employees': int(np.unique(employee[previous]).size),
+                    'present_days': float(values['present_days'][previous].sum()),
+                    'working_days': float(values['total_working_days'][previous].sum()),
+                    'ot_hours': float(values['ot_hours'][previous].sum()),
+                    'late_minutes': float(values['late_minutes'][previous].sum()),
+                }
+
+        result['trends'] = []
+        if trend_periods:
+            in_trends = np.isin(period, np.asarray(list(trend_periods), dtype=np.int32))
+            trend_keys, inverse = np.unique(period[in_trends], return_inverse=True)
+            counts = np.bincount(inverse)
+            averages = {
+                column: np.bincount(inverse, weights=values[column][in_trends]) / counts
+                for column in ('net_payable', 'ot_hours', 'late_minutes')
+            }
+            for j in range(len(trend_keys) - 1, -1, -1):  # newest first
+                result['trends'].append({
+                    'period': int(trend_keys[j]),
+                    'label': period_label(int(trend_keys[j])),
+                    'average_salary': float(averages['net_payable'][j]),
+                    'average_ot_hours': float(averages['ot_hours'][j]),
+                    'average_late_minutes': float(averages['late_minutes'][j]),
+                })
+        return result
+
+    def _current_series(self, rows, employee, values):
+        net = values['net_payable']
+        result = {
+            'total_employees': int(np.unique(employee).size),
+            'total_present_days': float(values['present_days'].sum()),
+            'total_working_days': float(values['total_working_days'].sum()),
+            'total_ot_hours': float(values['ot_hours'].sum()),
+            'total_late_minutes': float(values['late_minutes'].sum()),
+            'departments': [],
+            'salary_distribution': [],
+            'top_salaried': [],
+            'top_attendance': [],
+        }
+
+        # Departments: sums per department, headcount = distinct employees per department
+        department = self.department[rows]
+        codes, inverse = np.unique(department, return_inverse=True)
+        row_counts = np.bincount(inverse, minlength=len(codes))
+        sums = {column: np.bincount(inverse, weights=array, minlength=len(codes)) for column, array in values.items()}
+        pairs = np.unique(inverse.astype(np.int64) * max(len(self.employees.values), 1) + employee)
+        headcount = np.bincount(pairs // max(len(self.employees.values), 1), minlength=len(codes))
+        for j in np.argsort(-sums['net_payable'], kind='stable'):
+            result['departments'].append({
+                'department': self.departments.values[codes[j]] or 'Unknown',
+                'headcount': int(headcount[j]),
+                'total_salary': float(sums['net_payable'][j]),
+                'average_salary': float(sums['net_payable'][j] / row_counts[j]),
+                'total_ot_hours': float(sums['ot_hours'][j]),
+                'total_late_minutes': float(sums['late_minutes'][j]),
+                'present_days': float(sums['present_days'][j]),
+                'working_days': float(sums['total_working_days'][j]),
+            })
+
+        # Salary distribution buckets
+        buckets = np.bincount(np.searchsorted(SALARY_BUCKETS, net, side='right'), minlength=len(SALARY_BUCKET_LABELS))
+        result['salary_distribution'] = [
+            {'range': label, 'count': int(count)} for label, count in zip(SALARY_BUCKET_LABELS, buckets)
+        ]
+
+        # Top 5 salaried: highest net payable per (employee, name, department)
+        if rows.size:
+            groups, group_inverse = np.unique(
+                np.stack([employee, self.name[rows], department], axis=1), axis=0, return_inverse=True
+            )
+            group_inverse = group_inverse.reshape(-1)
+            max_salary = np.full(len(groups), -np.inf)
+            np.maximum.at(max_salary, group_inverse, net)
+            for j in np.argsort(-max_salary, kind='stable')[:5]:
+                result['top_salaried'].append({
+                    'name': self.names.values[groups[j][1]],
+                    'salary': float(max_salary[j]),
+                    'department': self.departments.values[groups[j][2]] or 'Unknown',
+                })
+
+            # Top 5 attendance rows; ties (unordered in SQL) go to the newest period, then by name
+            attendance = values['attendance_percentage']
+            candidates = np.flatnonzero(attendance >= np.partition(attendance, -5)[-5]) if attendance.size > 5 else range(attendance.size)
+            top = sorted(
+                candidates,
+                key=lambda j: (-attendance[j], -self.period[rows[j]], self.names.values[self.name[rows[j]]]),
+            )[:5]
+            for j in top:
+                result['top_attendance'].append({
+                    'name': self.names.values[self.name[rows[j]]],
+                    'attendance_percentage': float(values['attendance_percentage'][j]),
+                    'department': self.departments.values[department[j]] or 'Unknown',
+                })
+        return result
+
+
+_snapshots = OrderedDict()  # tenant id -> ChartSnapshot
+_lock = threading.Lock()
+
+
+class ChartSnapshotService:
+    """
+    Process-local store of per-tenant chart snapshots
+    """
+
+    @staticmethod
+    def _max_tenants():
+        return getattr(settings, 'CHART_SNAPSHOT_MAX_TENANTS', 64)
+
+    @staticmethod
+    def _max_age():
+        return getattr(settings, 'CHART_SNAPSHOT_MAX_AGE', 300)
+
+    @staticmethod
+    def _load(tenant, generation):
+        from ..models import ChartAggregatedData
+
+        rows = ChartAggregatedData.all_objects.filter(tenant=tenant).values_list(*SNAPSHOT_COLUMNS)
+        snapshot = ChartSnapshot.from_rows(rows, generation)
+        logger.info(f"📊 Built chart snapshot for tenant {tenant.id}: {snapshot.size} rows")
+        return snapshot
+
+    @staticmethod
+    def get(tenant):
+        """Return the tenant's snapshot, rebuilding it when the CHARTS generation moved on or it is too old"""
+        generation = get_cache_generations(tenant, CHARTS)[CHARTS]
+        with _lock:
+            snapshot = _snapshots.get(tenant.id)
+            if (
+                snapshot is not None and snapshot.generation == generation
+                and time.monotonic() - snapshot.built_at < ChartSnapshotService._max_age()
+            ):
+                _snapshots.move_to_end(tenant.id)
+                return snapshot
+
+        # Load outside the lock; the generation was read first, so a concurrent write
+        # leaves this snapshot behind the counter and the next read rebuilds it
+        snapshot = ChartSnapshotService._load(tenant, generation)
+        with _lock:
+            _snapshots[tenant.id] = snapshot
+            _snapshots.move_to_end(tenant.id)
+            while len(_snapshots) > ChartSnapshotService._max_tenants():
+                _snapshots.popitem(last=False)
+        return snapshot
+
+    @staticmethod
+    def _patch(tenant, patch, reason):
+        """
+        Bump the tenant's CHARTS generation and apply `patch` to the local snapshot once the
+        current transaction commits (right away outside one)
+
+        A rolled back write then never reaches a snapshot, and no process sees the new
+        generation while the rows are still uncommitted - it would rebuild from the old rows.
+        """
+        transaction.on_commit(lambda: ChartSnapshotService._apply_patch(tenant, patch, reason))
+
+    @staticmethod
+    def _apply_patch(tenant, patch, reason):
+        """
+        Bump the tenant's CHARTS generation and apply `patch` to the local snapshot.
+
+        The patch is only applied when the bump moved the generation by exactly one, i.e. no
+        other process wrote since the snapshot was built; otherwise the snapshot is dropped.
+        Runs after the writer's commit, so the bump is not deferred again.
+        """
+        bump_cache_generation(tenant, CHARTS, reason=reason, defer=False)
+        generation = get_cache_generations(tenant, CHARTS)[CHARTS]
+        with _lock:
+            snapshot = _snapshots.get(tenant.id)
+            if snapshot is None:
+                return
+            if snapshot.generation is not None and generation == snapshot.generation + 1:
+                patch(snapshot)
+                snapshot.generation = generation
+                if snapshot.size > 2 * len(snapshot.row_index) + 1024:
+                    del _snapshots[tenant.id]  # mostly dead rows: rebuild compact on next read
+            else:
+                del _snapshots[tenant.id]
+
+    @staticmethod
+    def apply_rows(tenant, chart_rows, reason="chart_data_synced"):
+        """Report saved ChartAggregatedData instances"""
+        rows = [tuple(getattr(row, column) for column in SNAPSHOT_COLUMNS) for row in chart_rows]
+        ChartSnapshotService.apply_values(tenant, rows, reason)
+
+    @staticmethod
+    def apply_values(tenant, rows, reason="chart_data_synced"):
+        """Report saved ChartAggregatedData rows given as SNAPSHOT_COLUMNS tuples"""
+
+        def patch(snapshot):
+            for row in rows:
+                snapshot.upsert(row)
+
+        ChartSnapshotService._patch(tenant, patch, reason)
+
+    @staticmethod
+    def remove_rows(tenant, keys, reason="chart_data_deleted"):
+        """Report deleted ChartAggregatedData rows as (employee_id, year, month) keys"""
+        keys = [(employee_id, period_index(year, month)) for employee_id, year, month in keys]
+
+        def patch(snapshot):
+            for employee_id, period in keys:
+                snapshot.remove(employee_id, period)
+
+        ChartSnapshotService._patch(tenant, patch, reason)
+
+    @staticmethod
+    def apply_period(tenant, year, month, reason="chart_sync"):
+        """Report a batch rewrite of one period; the period slice is re-read with one query"""
+        from ..models import ChartAggregatedData
+
+        period = period_index(year, month)
+
+        def committed():
+            if period is None:
+                bump_cache_generation(tenant, CHARTS, reason=reason, defer=False)
+                return
+            rows = list(
+                ChartAggregatedData.all_objects.filter(tenant=tenant, period_index=period)
+                .values_list(*SNAPSHOT_COLUMNS)
+            )
+
+            def patch(snapshot):
+                snapshot.remove_period(period)
+                for row in rows:
+                    snapshot.upsert(row)
+
+            ChartSnapshotService._apply_patch(tenant, patch, reason)
+
+        # The slice is read after the commit, so it holds what other processes will read
+        transaction.on_commit(committed)
+
+    @staticmethod
+    def clear(tenant=None):
+        """Drop cached snapshots (all tenants when tenant is None)"""
+        with _lock:
+            if tenant is None:
+                _snapshots.clear()
+            else:
+                _snapshots.pop(tenant.id, None)
@@ -0,0 +1,307 @@
+"""
+Employee Directory Service
+
+Builds the employee directory entries served by EmployeeProfileViewSet.directory_data with
+a single SQL projection:
+
+- the latest SalaryData row of each employee (last salary and uploaded attendance) comes
+  from a LATERAL ... ORDER BY period_index DESC LIMIT 1 join;
+- manually marked DailyAttendance is counted per status with one GROUP BY over the
+  current month only (an index range on (tenant, date));
+- the latest uploaded Attendance row (OT/late fallback) is another LATERAL join.
+
+The cost follows the headcount, not the years of attendance history. Working days depend
+only on the month and the employee's off days, so they are computed once per off-day
+pattern.
+
+The projection is not run per request: its entries are stored in the EmployeeDirectoryRow
+read model and refreshed for the employees a write touched (EmployeeProfile, SalaryData,
+DailyAttendance and Attendance receivers in signals.py, and the bulk writers that bypass
+them) through a coalesced DIRECTORY rebuild. directory_page() then serves any page, sort
+and filter as one index range scan with a keyset cursor (utils/cursor_pagination.py).
+"""
+
+import calendar
+import logging
+from datetime import date
+from functools import lru_cache
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..utils.bulk_upsert import bulk_upsert
+from ..utils.cursor_pagination import DEFAULT_PAGE_SIZE, paginate
+from ..utils.periods import period_index
+
+logger = logging.getLogger(__name__)
+
+OFF_DAY_FIELDS = ('off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday', 'off_friday', 'off_saturday', 'off_sunday')
+OFF_DAY_LABELS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+EMPLOYEE_COLUMNS = (
+    'id', 'employee_id', 'first_name', 'last_name', 'department', 'designation', 'employment_type',
+    'date_of_joining', 'location_branch', 'mobile_number', 'email', 'is_active', 'inactive_marked_at',
+    'basic_salary', 'shift_start_time', 'shift_end_time',
+) + OFF_DAY_FIELDS
+
+# Server-side sorts of the directory; each ends with the unique profile id (see the
+# EmployeeDirectoryRow indexes)
+DIRECTORY_SORTS = {
+    'name': ('name', 'profile_id'),
+    'employee_id': ('employee_id', 'profile_id'),
+    'department': ('department', 'name', 'profile_id'),
+    'last_salary': ('last_salary', 'profile_id'),
+}
+
+# EmployeeDirectoryRow columns refreshed from a new projection
+ROW_UPDATE_FIELDS = ['employee_id', 'name', 'department', 'is_active', 'last_salary', 'period_index', 'data']
+
+
+@lru_cache(maxsize=1024)
+def working_days(year, month, off_days):
+    """Days of the month that are not off days; off_days is a Monday-first tuple of 7 flags"""
+    _, days_in_month = calendar.monthrange(year, month)
+    return sum(
+        1 for day in range(1, days_in_month + 1)
+        if not off_days[date(year, month, day).weekday()]
+    )
+
+
+def _directory_sql():
+    from django.apps import apps
+
+    employee_table = apps.get_model('excel_data', 'EmployeeProfile')._meta.db_table
+    salary_table = apps.get_model('excel_data', 'SalaryData')._meta.db_table
+    daily_table = apps.get_model('excel_data', 'DailyAttendance')._meta.db_table
+    attendance_table = apps.get_model('excel_data', 'Attendance')._meta.db_table
+    employee_columns = ', '.join(f"e.{column}" for column in EMPLOYEE_COLUMNS)
+
+    return f"""
+        SELECT {employee_columns},
+               s.nett_payable, s.month, s.year, s.days, s.absent, s.ot, s.late,
+               d.employee_id IS NOT NULL, COALESCE(d.present, 0), COALESCE(d.absent, 0), COALESCE(d.half_day, 0),
+               a.ot_hours, a.late_minutes
+        FROM {employee_table} e
+        LEFT JOIN LATERAL (
+            SELECT nett_payable, month, year, days, absent, ot, late
+            FROM {salary_table}
+            WHERE tenant_id = e.tenant_id AND employee_id = e.employee_id
+            ORDER BY period_index DESC NULLS LAST, id DESC
+            LIMIT 1
+        ) s ON TRUE
+        LEFT JOIN (
+            SELECT employee_id,
+                   COUNT(*) FILTER (WHERE attendance_status IN ('PRESENT', 'PAID_LEAVE')) AS present,
+                   COUNT(*) FILTER (WHERE attendance_status = 'ABSENT') AS absent,
+                   COUNT(*) FILTER (WHERE attendance_status = 'HALF_DAY') AS half_day
+            FROM {daily_table}
+            WHERE tenant_id = %(tenant_id)s AND date BETWEEN %(month_start)s AND %(month_end)s
+            GROUP BY employee_id
+        ) d ON d.employee_id = e.employee_id
+        LEFT JOIN LATERAL (
+            SELECT ot_hours, late_minutes
+            FROM {attendance_table}
+            WHERE tenant_id = e.tenant_id AND employee_id = e.employee_id
+            ORDER BY date DESC
+            LIMIT 1
+        ) a ON TRUE
+        WHERE e.tenant_id = %(tenant_id)s{{employee_filter}}
+        ORDER BY e.first_name, e.last_name, e.id
+    """
+
+
+def directory_rows(tenant_id, employee_ids=None, today=None):
+    """
+    Directory entries (response dicts) of a tenant's employees, ordered by name; only the
+    given employee_ids (EmployeeProfile.employee_id values) when passed
+    """
+    today = today or timezone.now().date()
+    year, month = today.year, today.month
+    params = {
+        'tenant_id': tenant_id,
+        'month_start': date(year, month, 1),
+        'month_end': date(year, month, calendar.monthrange(year, month)[1]),
+    }
+    employee_filter = ''
+    if employee_ids is not None:
+        employee_filter = " AND e.employee_id = ANY(%(employee_ids)s)"
+        params['employee_ids'] = list(employee_ids)
+
+    with connection.cursor() as cursor:
+        cursor.execute(_directory_sql().format(employee_filter=employee_filter), params)
+        return [_directory_entry(row, year, month) for row in cursor.fetchall()]
+
+
+def _directory_entry(row, year, month):
+    """Response dict of one projected row"""
+    employee = dict(zip(EMPLOYEE_COLUMNS, row))
+    (
+        salary_amount, salary_month, salary_year, salary_days, salary_absent, salary_ot, salary_late,
+        has_daily, daily_present, daily_absent, daily_half, attendance_ot, attendance_late,
+    ) = row[len(EMPLOYEE_COLUMNS):]
+
+    off_days = tuple(bool(employee[field]) for field in OFF_DAY_FIELDS)
+    month_working_days = working_days(year, month, off_days)
+
+    # Latest uploaded salary sheet plus this month's manually marked days
+    has_salary = salary_amount is not None  # NOT NULL column: NULL means no salary row
+    present_days = float(salary_days or 0) + daily_present + daily_half * 0.5
+    absent_days = float(salary_absent or 0) + daily_absent + daily_half * 0.5
+    total_ot_hours = float(salary_ot or 0)
+    total_late_minutes = int(salary_late or 0)
+    # Uploaded attendance sheet fills in missing OT/late
+    if has_salary or has_daily:
+        if total_ot_hours == 0:
+            total_ot_hours = float(attendance_ot or 0)
+        if total_late_minutes == 0:
+            total_late_minutes = int(attendance_late or 0)
+
+    total_days = present_days + absent_days
+    if total_days > 0:
+        attendance_percentage = (present_days / total_days) * 100
+    else:
+        attendance_percentage = 0
+        absent_days = month_working_days  # No data means all absent
+
+    return {
+        'id': employee['id'],
+        'employee_id': employee['employee_id'],
+        'name': f"{employee['first_name']} {employee['last_name']}",
+        'department': employee['department'] or '',
+        'designation': employee['designation'] or '',
+        'employment_type': employee['employment_type'] or 'FULL_TIME',
+        'date_of_joining': employee['date_of_joining'].isoformat() if employee['date_of_joining'] else None,
+        'location_branch': employee['location_branch'] or 'Main Office',
+        'mobile_number': employee['mobile_number'] or '',
+        'email': employee['email'] or '',
+        'is_active': employee['is_active'],
+        'inactive_marked_at': employee['inactive_marked_at'].isoformat() if employee['inactive_marked_at'] else None,
+        'basic_salary': float(employee['basic_salary']) if employee['basic_salary'] else 0,
+        'shift_start_time': employee['shift_start_time'].strftime('%H:%M') if employee['shift_start_time'] else None,
+        'shift_end_time': employee['shift_end_time'].strftime('%H:%M') if employee['shift_end_time'] else None,
+        'last_salary': float(salary_amount) if salary_amount else 0,
+        'last_month': f"{salary_month} {salary_year}" if salary_month else 'N/A',
+        'off_days': ', '.join(label for label, is_off in zip(OFF_DAY_LABELS, off_days) if is_off) or 'None',
+        # Individual off day flags
+        **{field: employee[field] for field in OFF_DAY_FIELDS},
+        # Current month attendance data
+        'current_month': f"{month}/{year}",
+        'attendance': {
+            'present_days': present_days,
+            'absent_days': absent_days,
+            'working_days': month_working_days,
+            'attendance_percentage': round(attendance_percentage, 1),
+            'total_ot_hours': total_ot_hours,
+            'total_late_minutes': total_late_minutes,
+        },
+    }
+
+
+def refresh_directory(tenant_id, employee_ids=None, today=None):
+    """
+    Rewrite the EmployeeDirectoryRow of the given employees (EmployeeProfile.employee_id
+    values; all of the tenant's when None) from a new projection; returns the rows written
+    """
+    from ..models import EmployeeDirectoryRow
+
+    today = today or timezone.now().date()
+    current_period = period_index(today.year, today.month)
+    rows = [
+        EmployeeDirectoryRow(
+            tenant_id=tenant_id,
+            profile_id=entry['id'],
+            employee_id=entry['employee_id'] or '',
+            name=entry['name'],
+            department=entry['department'],
+            is_active=entry['is_active'],
+            last_salary=entry['last_salary'],
+            period_index=current_period,
+            data=entry,
+        )
+        for entry in directory_rows(tenant_id, employee_ids=employee_ids, today=today)
+    ]
+    # Deleted employees lose their row with the profile (ON DELETE CASCADE)
+    return bulk_upsert(EmployeeDirectoryRow, rows, ['profile'], ROW_UPDATE_FIELDS)
+
+
+def rebuild_directory(tenant_id, year, month, employee_ids=None):
+    """
+    Background task of the DIRECTORY rebuild domain; the month only keys the coalescing,
+    the rows always count the month the task runs in
+    """
+    count = refresh_directory(tenant_id, employee_ids=employee_ids)
+    logger.info(f"📇 Refreshed {count} directory row(s) for tenant {tenant_id}")
+    return count
+
+
+def schedule_directory_refresh(tenant_id, employee_ids=None):
+    """
+    Refresh the directory rows of some employees (None: all) in the background once the
+    current transaction commits; requests within the coalescing window share one run
+    """
+    from .cache_service import DIRECTORY
+    from .rebuild_scheduler import schedule_rebuild
+
+    if employee_ids is not None:
+        employee_ids = sorted({employee_id for employee_id in employee_ids if employee_id})
+        if not employee_ids:
+            return
+    today = timezone.now().date()
+    transaction.on_commit(
+        lambda: schedule_rebuild(tenant_id, DIRECTORY, today.year, today.month, employee_ids=employee_ids)
+    )
+
+
+def ensure_directory_current(tenant_id, today=None):
+    """
+    Build the tenant's directory rows in place when there are none yet or they count an
+    earlier month's attendance (first request after a deploy or a month change); returns
+    True if it did
+    """
+    from ..models import EmployeeDirectoryRow
+
+    today = today or timezone.now().date()
+    oldest = (
+        EmployeeDirectoryRow.all_objects.filter(tenant_id=tenant_id)
+        .order_by('period_index').values_list('period_index', flat=True).first()
+    )
+    if oldest is not None and oldest >= period_index(today.year, today.month):
+        return False
+    refresh_directory(tenant_id, today=today)
+    return True
+
+
+def directory_queryset(tenant_id, department=None, status=None):
+    """The tenant's directory rows, filtered by department and 'active'/'inactive' status"""
+    from ..models import EmployeeDirectoryRow
+
+    rows = EmployeeDirectoryRow.all_objects.filter(tenant_id=tenant_id)
+    if department:
+        rows = rows.filter(department=department)
+    if status in ('active', 'inactive'):
+        rows = rows.filter(is_active=status == 'active')
+    return rows
+
+
+def directory_ordering(sort):
+    """Ordering of a sort parameter ('name', '-last_salary', ...); ValueError if unknown"""
+    descending = sort.startswith('-')
+    fields = DIRECTORY_SORTS.get(sort.lstrip('-'))
+    if fields is None:
+        raise ValueError(f"Unknown sort '{sort}'; use one of {', '.join(DIRECTORY_SORTS)}")
+    return tuple(f"-{field}" if descending else field for field in fields)
+
+
+def directory_page(tenant_id, sort='name', cursor=None, page_size=DEFAULT_PAGE_SIZE, offset=0,
+                   department=None, status=None):
+    """
+    One page of directory entries after `cursor` (or `offset`); returns (entries,
+    next_cursor). Raises ValueError for an unknown sort and InvalidCursor for a foreign
+    cursor.
+    """
+    ordering = directory_ordering(sort)
+    rows, next_cursor = paginate(
+        directory_queryset(tenant_id, department, status).values('data', *(field.lstrip('-') for field in ordering)),
+        ordering, cursor=cursor, page_size=page_size, offset=offset,
+    )
+    return [row['data'] for row in rows], next_cursor
@@ -0,0 +1,166 @@
+"""
+Columnar Payroll Kernel
+
+Single implementation of the gross / TDS / advance / net salary formulas, shared by
+CalculatedSalary.calculate_salary, UnifiedSalaryCalculator, the batch payroll engine and
+the simple payroll preview endpoints.
+
+All inputs are 1-D arrays (one element per employee). Money is carried internally as
+int64 paise and fractional quantities (present days, OT hours, TDS %) as int64
+hundredths, so every derived column is an exact rational value rounded half-up to two
+decimal places - the same result Decimal arithmetic would give, without a Python loop.
+OT rates are often repeating decimals (Base Salary ÷ 240), so they are carried in units of
+RATE_SCALE per rupee and only the charge itself is rounded to paise.
+
+Formula:
+    Salary for present days = Base Salary ÷ Working Days × Present Days
+    OT Charges              = OT Rate × OT Hours
+    Late Deduction          = OT Rate ÷ 60 × Late Minutes
+    Gross Salary            = Salary for present days + OT Charges - Late Deduction
+    TDS                     = (Gross Salary + Incentive) × TDS %
+    Advance Deduction       = min(Advance Balance, 50% of Salary after TDS, Salary after TDS)
+    Net Payable             = max(0, Salary after TDS - Advance Deduction)
+
+When no OT rate is available it falls back to Base Salary ÷ (Working Days × 8 hours).
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+HOURS_PER_DAY = 8
+RATE_SCALE = 10 ** 8  # OT rates in 1e-8 rupees per hour: a 1 crore salary ÷ 240 x 1000 hours still fits int64
+RATE_TO_PAISE = RATE_SCALE // 100
+DEFAULT_MAX_ADVANCE_DEDUCTION_PERCENTAGE = 50
+
+# Money columns returned by compute_payroll (int64 paise)
+PAYROLL_COLUMNS = (
+    'salary_for_present_days',
+    'ot_charges',
+    'late_deduction',
+    'gross_salary',
+    'taxable_amount',
+    'tds_amount',
+    'salary_after_tds',
+    'advance_deduction',
+    'net_payable',
+    'remaining_advance_balance',
+)
+
+
+def _scaled(values, size, scale=100):
+    """Convert a scalar/sequence of Decimal, float or None to an int64 array scaled by `scale`"""
+    if values is None:
+        return np.zeros(size, dtype=np.int64)
+    arr = np.nan_to_num(np.asarray(values, dtype=np.float64))  # None -> nan -> 0
+    return np.rint(np.broadcast_to(arr, (size,)) * scale).astype(np.int64)
+
+
+def _div_round(numerator, denominator):
+    """Element-wise numerator / denominator rounded half away from zero; 0 where denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    safe_den = np.where(denominator == 0, 1, denominator)
+    magnitude = (2 * np.abs(numerator) + safe_den) // (2 * safe_den)
+    return np.where(denominator == 0, 0, np.sign(numerator) * magnitude)
+
+
+def compute_payroll(
+    basic_salary,
+    working_days,
+    present_days,
+    ot_hours,
+    late_minutes,
+    ot_rate,
+    tds_percentage,
+    advance_balance,
+    incentive=None,
+    advance_override=None,
+    max_advance_deduction_percentage=DEFAULT_MAX_ADVANCE_DEDUCTION_PERCENTAGE,
+):
+    """
+    Compute every derived payroll column for a batch of employees at once.
+
+    Args:
+        basic_salary: Base monthly salary per employee
+        working_days: Employee-specific working days (int)
+        present_days: Present days (supports halves)
+        ot_hours: Overtime hours
+        late_minutes: Late minutes (int)
+        ot_rate: OT rate per hour; 0 falls back to base salary ÷ (working days × 8)
+        tds_percentage: Effective TDS percentage (e.g. 5 for 5%)
+        advance_balance: Outstanding advance balance
+        incentive: Incentive added to the taxable amount (optional)
+        advance_override: Fixed advance deduction per employee; None/NaN entries are auto-calculated
+        max_advance_deduction_percentage: Cap for the automatic advance deduction
+
+    Returns:
+        dict mapping each name in PAYROLL_COLUMNS to an int64 array of paise
+    """
+    working_days = np.atleast_1d(np.asarray(working_days, dtype=np.int64))
+    size = working_days.shape[0]
+
+    basic = _scaled(basic_salary, size)              # paise
+    present = _scaled(present_days, size)            # hundredths of a day
+    ot = _scaled(ot_hours, size)                     # hundredths of an hour
+    late = _scaled(late_minutes, size, scale=1)      # minutes
+    rate = _scaled(ot_rate, size, scale=RATE_SCALE)  # 1e-8 rupees per hour
+    tds = _scaled(tds_percentage, size)              # hundredths of a percent
+    balance = _scaled(advance_balance, size)         # paise
+    bonus = _scaled(incentive, size)                 # paise
+
+    has_rate = rate > 0
+    fallback_den = working_days * HOURS_PER_DAY      # base salary ÷ this = hourly rate
+
+    salary_for_present_days = _div_round(basic * present, working_days * 100)
+    ot_charges = np.where(
+        has_rate,
+        _div_round(rate * ot, RATE_TO_PAISE * 100),
+        _div_round(basic * ot, fallback_den * 100),
+    )
+    late_deduction = np.where(
+        has_rate,
+        _div_round(rate * late, RATE_TO_PAISE * 60),
+        _div_round(basic * late, fallback_den * 60),
+    )
+
+    gross_salary = salary_for_present_days + ot_charges - late_deduction
+    taxable_amount = gross_salary + bonus
+    tds_amount = _div_round(taxable_amount * tds, 10000)
+    salary_after_tds = taxable_amount - tds_amount
+
+    max_deduction = _div_round(salary_after_tds * int(max_advance_deduction_percentage), 100)
+    advance_deduction = np.maximum(
+        0, np.minimum(np.minimum(balance, max_deduction), salary_after_tds)
+    )
+    if advance_override is not None:
+        override = np.broadcast_to(np.asarray(advance_override, dtype=np.float64), (size,))  # None -> nan
+        advance_deduction = np.where(
+            np.isnan(override), advance_deduction, np.rint(np.nan_to_num(override) * 100).astype(np.int64)
+        )
+
+    net_payable = np.maximum(0, salary_after_tds - advance_deduction)
+    remaining_advance_balance = balance - advance_deduction
+
+    return {
+        'salary_for_present_days': salary_for_present_days,
+        'ot_charges': ot_charges,
+        'late_deduction': late_deduction,
+        'gross_salary': gross_salary,
+        'taxable_amount': taxable_amount,
+        'tds_amount': tds_amount,
+        'salary_after_tds': salary_after_tds,
+        'advance_deduction': advance_deduction,
+        'net_payable': net_payable,
+        'remaining_advance_balance': remaining_advance_balance,
+    }
+
+
+def paise_to_decimal(values):
+    """Convert an int64 paise array to a list of two-decimal Decimals"""
+    return [Decimal(int(v)).scaleb(-2) for v in np.atleast_1d(values)]
+
+
+def paise_to_float(values):
+    """Convert an int64 paise array to a list of floats rounded to two decimals"""
+    return (np.atleast_1d(values) / 100.0).round(2).tolist()
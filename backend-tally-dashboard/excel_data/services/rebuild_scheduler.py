@@ -0,0 +1,96 @@
+"""
+Rebuild Scheduler
+
+Coalesces rebuilds of derived data (monthly attendance aggregates, uploaded payroll, chart
+aggregates, employee directory rows) per (tenant, domain, year, month).
+
+An upload of a correction sheet, re-marking a day or several payroll edits each used to
+start their own full rebuild of the same month, often concurrently. schedule_rebuild()
+queues the rebuild as a coalesced background task instead (task_queue.enqueue_coalesced):
+requests for the same key within BACKGROUND_TASKS_COALESCE_WINDOW seconds merge into one
+pending task, and the queue never runs two tasks with the same key at once. Ten rapid
+edits cost one rebuild.
+"""
+
+import logging
+from datetime import date
+
+from ..utils.periods import month_number
+from ..utils.task_queue import enqueue_coalesced, resolve_func, run_in_background
+from .cache_service import ATTENDANCE, CHARTS, DIRECTORY, PAYROLL
+
+logger = logging.getLogger(__name__)
+
+# Task function of each domain; called as func(tenant_id, year, month, **options)
+REBUILD_FUNCS = {
+    ATTENDANCE: 'excel_data.services.rebuild_scheduler:rebuild_attendance_month',
+    PAYROLL: 'excel_data.services.upload_processing:mark_uploaded_salaries_paid',
+    CHARTS: 'excel_data.utils.chart_sync:_sync_chart_data_batch_worker',
+    DIRECTORY: 'excel_data.services.employee_directory:rebuild_directory',
+}
+
+
+# Options that are part of the coalescing key: requests that differ in them never merge
+REBUILD_KEY_OPTIONS = {
+    CHARTS: ('source',),  # an Excel and a frontend sync of one month rebuild different rows
+}
+
+
+def rebuild_key(tenant_id, domain, year, month, **options):
+    """Dedupe key of a tenant-month rebuild ('JUN', 'June' and 6 give the same key)"""
+    key = f"rebuild:{tenant_id}:{domain}:{int(year)}-{month_number(month):02d}"
+    for name in REBUILD_KEY_OPTIONS.get(domain, ()):
+        key += f":{options.get(name)}"
+    return key
+
+
+def _merge_employee_ids(old, new):
+    """Rebuild the union of the requested employees (None: all of them)"""
+    if old.get('employee_ids') is None or new.get('employee_ids') is None:
+        return {**new, 'employee_ids': None}
+    return {**new, 'employee_ids': sorted(set(old['employee_ids']) | set(new['employee_ids']))}
+
+
+REBUILD_MERGES = {
+    ATTENDANCE: _merge_employee_ids,
+    DIRECTORY: _merge_employee_ids,
+}
+
+
+def schedule_rebuild(tenant_id, domain, year, month, **options):
+    """
+    Queue a rebuild of one tenant-month of `domain`, merged with pending ones for the same
+    month; returns the BackgroundTask
+
+    Options are passed to the domain's rebuild function; the latest request's options win
+    (attendance and directory employee lists are merged), except REBUILD_KEY_OPTIONS, which
+    keep requests apart. With BACKGROUND_TASKS_BACKEND =
+    'thread' there is no task table to coalesce in and every request starts its own thread.
+    """
+    from django.conf import settings
+
+    func = resolve_func(REBUILD_FUNCS[domain])
+    if getattr(settings, 'BACKGROUND_TASKS_BACKEND', 'database') != 'database':
+        return run_in_background(func, tenant_id, year, month, tenant_id=tenant_id, **options)
+
+    task, created = enqueue_coalesced(
+        func, tenant_id, year, month,
+        key=rebuild_key(tenant_id, domain, year, month, **options),
+        tenant_id=tenant_id,
+        merge=REBUILD_MERGES.get(domain),
+        **options,
+    )
+    logger.info(f"🔁 {'Scheduled' if created else 'Coalesced'} {domain} rebuild for tenant {tenant_id} - {month} {year} (task {task.id})")
+    return task
+
+
+def rebuild_attendance_month(tenant_id, year, month, employee_ids=None):
+    """Background task: reconcile a month's attendance aggregates; raises so it is retried"""
+    from ..models import Tenant
+    from ..utils.utils import run_bulk_aggregation
+
+    tenant = Tenant.objects.get(id=tenant_id)
+    result = run_bulk_aggregation(tenant, date(int(year), month_number(month), 1), employee_ids=employee_ids)
+    if result['status'] == 'error':
+        raise RuntimeError(result['message'])
+    return result['status']
@@ -167,7 +167,7 @@ class SalaryCalculationService:
         # return working_days
     
     @staticmethod
-    def calculate_salary_for_period(tenant, year: int, month: str, force_recalculate: bool = False):
+    def calculate_salary_for_period(tenant, year: int, month: str, force_recalculate: bool = False, batch: bool = True):
         """
         Calculate salaries for all active employees for a given period
         
@@ -176,6 +176,8 @@ class SalaryCalculationService:
             year: Year (e.g., 2025)
             month: Month name (e.g., "JUNE")
             force_recalculate: Whether to recalculate existing records
+            batch: Preload all inputs and write with bulk operations (constant query count).
+                Set to False to fall back to the per-employee path.
         
         Returns:
             dict: Summary of calculation results
@@ -210,6 +212,12 @@ class SalaryCalculationService:
                 'data_source': data_source
             }
             
+            if batch:
+                SalaryCalculationService._calculate_period_batch(
+                    payroll_period, active_employees, force_recalculate, results
+                )
+                return results
+            
             for employee in active_employees:
                 try:
                     calculated_salary = SalaryCalculationService._calculate_employee_salary(
@@ -227,6 +235,183 @@ class SalaryCalculationService:
             
             return results
     
+    @staticmethod
+    def _calculate_period_batch(payroll_period: PayrollPeriod, active_employees, force_recalculate: bool, results: dict):
+        """
+        Set-based variant of the per-employee loop in calculate_salary_for_period.
+        
+        All inputs for the period are preloaded in a fixed number of queries, every salary
+        is computed in memory with the same rules as _calculate_employee_salary() (a single
+        payroll kernel pass covers all rows), and the results are written with
+        bulk_create/bulk_update; the written rows are recorded in the change outbox, whose
+        consumer refreshes their chart rows in one statement (bulk writes bypass the
+        post_save chart signal).
+        """
+        from django.db.models import Count, Q, F, OuterRef, Subquery
+        from django.utils import timezone
+        from .change_outbox import record_calculated_salary_changes
+        
+        tenant = payroll_period.tenant
+        year = payroll_period.year
+        month = payroll_period.month
+        month_num = SalaryCalculationService._get_month_number(month)
+        month_start = date(year, month_num, 1)
+        month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        today = date.today()
+        partial_end = today if (year == today.year and month_num == today.month) else month_end
+        is_uploaded_period = payroll_period.data_source == DataSource.UPLOADED
+        
+        # 1. Employees
+        employees = list(active_employees)
+        employee_ids = [emp.employee_id for emp in employees if emp.employee_id]
+        
+        # 2. Existing calculations for the period
+        existing_map = {
+            cs.employee_id: cs
+            for cs in CalculatedSalary.objects.filter(tenant=tenant, payroll_period=payroll_period)
+        }
+        
+        # 3. Uploaded salary rows
+        uploaded_map = {}
+        for salary_record in SalaryData.objects.filter(tenant=tenant, year=year, month=month):
+            uploaded_map.setdefault(salary_record.employee_id, salary_record)
+        
+        # 4. Monthly summaries
+        summary_map = {
+            summary.employee_id: summary
+            for summary in MonthlyAttendanceSummary.objects.filter(tenant=tenant, year=year, month=month_num)
+        }
+        
+        # 5. Monthly Attendance records
+        attendance_map = {}
+        for attendance_record in Attendance.objects.filter(
+            tenant=tenant, date__year=year, date__month=month_num
+        ):
+            attendance_map.setdefault(attendance_record.employee_id, attendance_record)
+        
+        # 6. DailyAttendance aggregates per employee (explicit absences + on-the-fly fallback)
+        daily_qs = DailyAttendance.objects.filter(
+            tenant=tenant, date__gte=month_start, date__lte=month_end
+        )
+        if force_recalculate:
+            # Partial month: stop at today and ignore rows before a mid-month joining date
+            doj = EmployeeProfile.objects.filter(
+                tenant=tenant, employee_id=OuterRef('employee_id')
+            ).values('date_of_joining')[:1]
+            daily_qs = daily_qs.filter(date__lte=partial_end).annotate(doj=Subquery(doj)).filter(
+                Q(doj__isnull=True) | Q(doj__lt=month_start) | Q(doj__gt=month_end) | Q(date__gte=F('doj'))
+            )
+        daily_map = {
+            row['employee_id']: row
+            for row in daily_qs.values('employee_id').annotate(
+                total=Count('id'),
+                present_full=Count('id', filter=Q(attendance_status__in=['PRESENT', 'PAID_LEAVE'])),
+                half_days=Count('id', filter=Q(attendance_status='HALF_DAY')),
+                explicit_absent=Count('id', filter=Q(attendance_status='ABSENT')),
+                total_ot=Sum('ot_hours'),
+                total_late=Sum('late_minutes'),
+            )
+        }
+        
+        # 7. Advance balances
+        advance_map = {
+            row['employee_id']: row['total'] or Decimal('0')
+            for row in AdvanceLedger.objects.filter(
+                tenant=tenant,
+                employee_id__in=employee_ids,
+                status__in=['PENDING', 'PARTIALLY_PAID'],
+            ).values('employee_id').annotate(total=Sum('remaining_balance'))
+        }
+        
+        to_create = []
+        to_update = []
+        to_calculate = []
+        unchanged = []
+        now = timezone.now()
+        
+        for employee in employees:
+            try:
+                if not employee.employee_id:
+                    logger.error(f"Employee {employee.full_name} (ID: {employee.id}) has no employee_id")
+                    continue
+                
+                existing = existing_map.get(employee.employee_id)
+                if existing and not force_recalculate:
+                    # Ensure uploaded periods are reflected as paid in existing records
+                    if is_uploaded_period and not existing.is_paid:
+                        existing.is_paid = True
+                        existing.payment_date = today
+                        existing.calculation_timestamp = now
+                        to_update.append(existing)
+                    else:
+                        unchanged.append(existing)
+                    results['updated'] += 1
+                    continue
+                
+                uploaded_salary = uploaded_map.get(employee.employee_id)
+                if uploaded_salary and is_uploaded_period:
+                    salary_data = SalaryCalculationService._salary_data_from_upload(
+                        payroll_period, employee, uploaded_salary
+                    )
+                else:
+                    attendance_data = SalaryCalculationService._resolve_attendance_data(
+                        employee, year, month, force_recalculate,
+                        salary_record=uploaded_salary,
+                        summary=summary_map.get(employee.employee_id),
+                        attendance_record=attendance_map.get(employee.employee_id),
+                        daily_row=daily_map.get(employee.employee_id),
+                        period_bounds=(month_start, partial_end),
+                    )
+                    salary_data = SalaryCalculationService._salary_data_from_attendance(
+                        payroll_period, employee, attendance_data,
+                        advance_map.get(employee.employee_id, Decimal('0')),
+                    )
+                
+                if existing:
+                    calculated_salary = existing
+                    for key, value in salary_data.items():
+                        setattr(calculated_salary, key, value)
+                    calculated_salary.calculation_timestamp = now
+                    to_update.append(calculated_salary)
+                    results['updated'] += 1
+                else:
+                    calculated_salary = CalculatedSalary(tenant=tenant, **salary_data)
+                    to_create.append(calculated_salary)
+                    results['calculated'] += 1
+                
+                # Same rule as CalculatedSalary.save(): uploaded values are used as-is
+                if not is_uploaded_period:
+                    to_calculate.append(calculated_salary)
+            except Exception as e:
+                logger.error(f"Error calculating salary for {employee.employee_id}: {str(e)}")
+                results['errors'].append(f"{employee.employee_id}: {str(e)}")
+        
+        # One vectorized kernel pass for every recalculated row
+        CalculatedSalary.calculate_salaries(to_calculate)
+        
+        if to_create:
+            CalculatedSalary.objects.bulk_create(to_create, batch_size=1000)
+        if to_update:
+            update_fields = [
+                field.name for field in CalculatedSalary._meta.concrete_fields
+                if not field.primary_key and field.name not in ('tenant', 'payroll_period', 'employee_id', 'created_at')
+            ]
+            for calculated_salary in to_update:
+                calculated_salary.updated_at = now
+            CalculatedSalary.objects.bulk_update(to_update, update_fields, batch_size=1000)
+        
+        # Chart rows of every row written follow through the change outbox
+        if to_create or to_update:
+            record_calculated_salary_changes(tenant.id, to_create + to_update)
+            from .cache_service import bump_cache_generation, PAYROLL
+            bump_cache_generation(tenant, PAYROLL, reason="batch_salary_calculation")
+        
+        logger.info(
+            f"Batch payroll for {month} {year}: created={len(to_create)}, updated={len(to_update)}, "
+            f"unchanged={len(unchanged)}, errors={len(results['errors'])}"
+        )
+        return results
+    
     @staticmethod
     def _determine_data_source(tenant, year: int, month: str) -> str:
         """Determine if period should use uploaded data or frontend calculations"""
@@ -291,37 +476,9 @@ class SalaryCalculationService:
         if uploaded_salary and payroll_period.data_source == DataSource.UPLOADED:
             # Skip calculation entirely for uploaded data - use Excel values directly
             # Set _skip_auto_calc flag to prevent any calculation in CalculatedSalary.save()
-            salary_data = {
-                'payroll_period': payroll_period,
-                'employee_id': employee.employee_id,
-                'employee_name': uploaded_salary.name,
-                'department': uploaded_salary.department or 'General',
-                'basic_salary': uploaded_salary.salary or Decimal('0'),
-                'basic_salary_per_hour': uploaded_salary.hour_rs or Decimal('0'),
-                'basic_salary_per_minute': uploaded_salary.charge or Decimal('0'),
-                'employee_ot_rate': uploaded_salary.hour_rs or Decimal('0'),
-                'employee_tds_rate': uploaded_salary.tds or Decimal('0'),
-                'total_working_days': int((uploaded_salary.days or 0) + (uploaded_salary.absent or 0)),
-                'present_days': Decimal(str(uploaded_salary.days or 0)),
-                'absent_days': Decimal(str(uploaded_salary.absent or 0)),
-                'ot_hours': uploaded_salary.ot or Decimal('0'),
-                'late_minutes': int(uploaded_salary.late or 0),
-                'salary_for_present_days': uploaded_salary.sl_wo_ot or Decimal('0'),
-                'ot_charges': uploaded_salary.charges or Decimal('0'),
-                'late_deduction': uploaded_salary.amt or Decimal('0'),
-                'incentive': uploaded_salary.incentive or Decimal('0'),
-                'gross_salary': uploaded_salary.sal_ot or Decimal('0'),
-                'tds_amount': uploaded_salary.tds or Decimal('0'),
-                'salary_after_tds': uploaded_salary.sal_tds or Decimal('0'),
-                'total_advance_balance': uploaded_salary.total_old_adv or Decimal('0'),
-                'advance_deduction_amount': uploaded_salary.advance or Decimal('0'),
-                'advance_deduction_editable': True,
-                'remaining_advance_balance': uploaded_salary.balnce_adv or Decimal('0'),
-                'net_payable': uploaded_salary.nett_payable or Decimal('0'),
-                'data_source': DataSource.UPLOADED,
-                'is_paid': True,
-                'payment_date': date.today(),
-            }
+            salary_data = SalaryCalculationService._salary_data_from_upload(
+                payroll_period, employee, uploaded_salary
+            )
         else:
             # Use normal calculation logic for FRONTEND data
             # Get attendance data (with force calculation support)
@@ -332,47 +489,9 @@ class SalaryCalculationService:
             # Get advance balance
             advance_balance = SalaryCalculationService._get_advance_balance(employee.employee_id)
             
-            # Calculate per-hour and per-minute rates
-            basic_salary = employee.basic_salary or Decimal('0')
-            # Use employee-specific working days instead of period working days
-            working_days = SalaryCalculationService._calculate_employee_working_days(
-                employee, payroll_period.year, payroll_period.month
+            salary_data = SalaryCalculationService._salary_data_from_attendance(
+                payroll_period, employee, attendance_data, advance_balance
             )
-            hours_per_day = 8  # Standard working hours
-            minutes_per_day = hours_per_day * 60
-            
-            basic_salary_per_hour = basic_salary / (working_days * hours_per_day) if working_days > 0 else Decimal('0')
-            basic_salary_per_minute = basic_salary / (working_days * minutes_per_day) if working_days > 0 else Decimal('0')
-            
-            # Use employee's OT rate if available, otherwise calculate from basic salary
-            if employee.ot_charge_per_hour:
-                ot_rate_per_hour = employee.ot_charge_per_hour
-            else:
-                # Calculate OT rate as Basic Salary ÷ 240 hours (standard formula)
-                ot_rate_per_hour = basic_salary / Decimal('240') if basic_salary > 0 else Decimal('0')
-            
-            # Use employee's TDS percentage if available, otherwise use period default
-            employee_tds_rate = employee.tds_percentage if employee.tds_percentage is not None else payroll_period.tds_rate
-            
-            # Prepare salary calculation data
-            salary_data = {
-                'payroll_period': payroll_period,
-                'employee_id': employee.employee_id,
-                'employee_name': f"{employee.first_name} {employee.last_name}",
-                'department': employee.department or 'General',
-                'basic_salary': basic_salary,
-                'basic_salary_per_hour': basic_salary_per_hour,
-                'basic_salary_per_minute': basic_salary_per_minute,
-                'employee_ot_rate': ot_rate_per_hour,
-                'employee_tds_rate': employee_tds_rate,
-                'total_working_days': attendance_data['total_working_days'],
-                'present_days': attendance_data['present_days'],
-                'absent_days': attendance_data['absent_days'],
-                'ot_hours': attendance_data['ot_hours'],
-                'late_minutes': attendance_data['late_minutes'],
-                'total_advance_balance': advance_balance,
-                'data_source': payroll_period.data_source,
-            }
         
         # Create or update calculated salary
         if existing:
@@ -391,6 +510,155 @@ class SalaryCalculationService:
             calculated_salary.save()
             return calculated_salary
     
+    @staticmethod
+    def _salary_data_from_upload(payroll_period: PayrollPeriod, employee: EmployeeProfile, uploaded_salary: SalaryData) -> dict:
+        """Map an uploaded SalaryData row onto CalculatedSalary fields (Excel values are used as-is)"""
+        return {
+            'payroll_period': payroll_period,
+            'employee_id': employee.employee_id,
+            'employee_name': uploaded_salary.name,
+            'department': uploaded_salary.department or 'General',
+            'basic_salary': uploaded_salary.salary or Decimal('0'),
+            'basic_salary_per_hour': uploaded_salary.hour_rs or Decimal('0'),
+            'basic_salary_per_minute': uploaded_salary.charge or Decimal('0'),
+            'employee_ot_rate': uploaded_salary.hour_rs or Decimal('0'),
+            'employee_tds_rate': uploaded_salary.tds or Decimal('0'),
+            'total_working_days': int((uploaded_salary.days or 0) + (uploaded_salary.absent or 0)),
+            'present_days': Decimal(str(uploaded_salary.days or 0)),
+            'absent_days': Decimal(str(uploaded_salary.absent or 0)),
+            'ot_hours': uploaded_salary.ot or Decimal('0'),
+            'late_minutes': int(uploaded_salary.late or 0),
+            'salary_for_present_days': uploaded_salary.sl_wo_ot or Decimal('0'),
+            'ot_charges': uploaded_salary.charges or Decimal('0'),
+            'late_deduction': uploaded_salary.amt or Decimal('0'),
+            'incentive': uploaded_salary.incentive or Decimal('0'),
+            'gross_salary': uploaded_salary.sal_ot or Decimal('0'),
+            'tds_amount': uploaded_salary.tds or Decimal('0'),
+            'salary_after_tds': uploaded_salary.sal_tds or Decimal('0'),
+            'total_advance_balance': uploaded_salary.total_old_adv or Decimal('0'),
+            'advance_deduction_amount': uploaded_salary.advance or Decimal('0'),
+            'advance_deduction_editable': True,
+            'remaining_advance_balance': uploaded_salary.balnce_adv or Decimal('0'),
+            'net_payable': uploaded_salary.nett_payable or Decimal('0'),
+            'data_source': DataSource.UPLOADED,
+            'is_paid': True,
+            'payment_date': date.today(),
+        }
+    
+    @staticmethod
+    def _salary_data_from_attendance(payroll_period: PayrollPeriod, employee: EmployeeProfile, attendance_data: dict, advance_balance: Decimal) -> dict:
+        """Build CalculatedSalary input fields for a frontend-tracked employee"""
+        # Calculate per-hour and per-minute rates
+        basic_salary = employee.basic_salary or Decimal('0')
+        # Use employee-specific working days instead of period working days
+        working_days = SalaryCalculationService._calculate_employee_working_days(
+            employee, payroll_period.year, payroll_period.month
+        )
+        hours_per_day = 8  # Standard working hours
+        minutes_per_day = hours_per_day * 60
+        
+        basic_salary_per_hour = basic_salary / (working_days * hours_per_day) if working_days > 0 else Decimal('0')
+        basic_salary_per_minute = basic_salary / (working_days * minutes_per_day) if working_days > 0 else Decimal('0')
+        
+        # Use employee's OT rate if available, otherwise calculate from basic salary
+        if employee.ot_charge_per_hour:
+            ot_rate_per_hour = employee.ot_charge_per_hour
+        else:
+            # Calculate OT rate as Basic Salary ÷ 240 hours (standard formula)
+            ot_rate_per_hour = basic_salary / Decimal('240') if basic_salary > 0 else Decimal('0')
+        
+        # Use employee's TDS percentage if available, otherwise use period default
+        employee_tds_rate = employee.tds_percentage if employee.tds_percentage is not None else payroll_period.tds_rate
+        
+        return {
+            'payroll_period': payroll_period,
+            'employee_id': employee.employee_id,
+            'employee_name': f"{employee.first_name} {employee.last_name}",
+            'department': employee.department or 'General',
+            'basic_salary': basic_salary,
+            'basic_salary_per_hour': basic_salary_per_hour,
+            'basic_salary_per_minute': basic_salary_per_minute,
+            'employee_ot_rate': ot_rate_per_hour,
+            'employee_tds_rate': employee_tds_rate,
+            'total_working_days': attendance_data['total_working_days'],
+            'present_days': attendance_data['present_days'],
+            'absent_days': attendance_data['absent_days'],
+            'ot_hours': attendance_data['ot_hours'],
+            'late_minutes': attendance_data['late_minutes'],
+            'total_advance_balance': advance_balance,
+            'data_source': payroll_period.data_source,
+        }
+    
+    @staticmethod
+    def _resolve_attendance_data(employee: EmployeeProfile, year: int, month: str, force_calculate_partial: bool,
+                                 salary_record=None, summary=None, attendance_record=None, daily_row=None,
+                                 period_bounds=None) -> dict:
+        """
+        Same source precedence as _get_attendance_data(), but from preloaded rows
+        (used by the batch engine). daily_row is the per-employee DailyAttendance
+        aggregate: total, present_full, half_days, explicit_absent, total_ot, total_late.
+        """
+        if not force_calculate_partial:
+            if salary_record:
+                return {
+                    'total_working_days': salary_record.days + salary_record.absent,
+                    'present_days': Decimal(str(salary_record.days)),
+                    'absent_days': Decimal(str(salary_record.absent)),
+                    'ot_hours': salary_record.ot,
+                    'late_minutes': salary_record.late,
+                }
+            
+            employee_working_days = SalaryCalculationService._calculate_employee_working_days(employee, year, month)
+            
+            if summary:
+                return {
+                    'total_working_days': employee_working_days,
+                    'present_days': Decimal(str(summary.present_days)),
+                    'absent_days': Decimal(str(daily_row['explicit_absent'] if daily_row else 0)),  # Only explicit absences
+                    'ot_hours': summary.ot_hours,
+                    'late_minutes': summary.late_minutes,
+                }
+            
+            if attendance_record:
+                return {
+                    'total_working_days': employee_working_days,
+                    'present_days': Decimal(str(attendance_record.present_days)),
+                    'absent_days': Decimal(str(attendance_record.absent_days)),
+                    'ot_hours': attendance_record.ot_hours,
+                    'late_minutes': attendance_record.late_minutes,
+                }
+        else:
+            month_num = SalaryCalculationService._get_month_number(month)
+            month_start, end_date = period_bounds
+            start_date = employee.date_of_joining if (
+                employee.date_of_joining
+                and employee.date_of_joining.year == year
+                and employee.date_of_joining.month == month_num
+            ) else month_start
+            employee_working_days = SalaryCalculationService._calculate_employee_working_days_for_period(
+                employee, start_date, end_date
+            )
+        
+        if daily_row and daily_row['total']:
+            half_count = daily_row['half_days']
+            total_present = daily_row['present_full'] + (half_count * 0.5)
+            explicit_absent = daily_row['explicit_absent'] + (half_count * 0.5)
+            return {
+                'total_working_days': employee_working_days,
+                'present_days': Decimal(str(total_present)),
+                'absent_days': Decimal(str(explicit_absent)),  # Only explicit absences
+                'ot_hours': daily_row['total_ot'] or Decimal('0'),
+                'late_minutes': daily_row['total_late'] or 0,
+            }
+        
+        return {
+            'total_working_days': employee_working_days,
+            'present_days': Decimal('0'),
+            'absent_days': Decimal('0'),
+            'ot_hours': Decimal('0'),
+            'late_minutes': 0,
+        }
+    
     @staticmethod
     def _get_attendance_data(employee: EmployeeProfile, year: int, month: str, force_calculate_partial: bool = False) -> dict:
         """
@@ -486,8 +754,8 @@ class SalaryCalculationService:
                 and employee.date_of_joining.month == month_num
             ) else date(year, month_num, 1)
 
-            end_date = current_date if (year == current_date.year and month_num == current_date.month) else date(
-                year, month_num, (date(year, month_num, 1).replace(day=28) + timedelta(days=4)).day
+            end_date = current_date if (year == current_date.year and month_num == current_date.month) else (
+                (date(year, month_num, 1).replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
             )
 
             employee_working_days = SalaryCalculationService._calculate_employee_working_days_for_period(
@@ -0,0 +1,106 @@
+"""
+Tenant Registry
+
+Process-local lookup table for TenantMiddleware's non-JWT tenant resolution (X-Tenant-ID /
+X-Tenant-Subdomain headers, ?tenant_id= / ?tenant= parameters, subdomain and custom
+domain). Each (field, value) pair is resolved with at most one query and remembered,
+including misses, so repeated requests - and the custom-domain probe that runs for every
+request without a token, even on localhost - become dictionary lookups.
+
+Entries are tied to a registry version stored in the cache. Tenant save/delete (see
+signals.py) bumps it, which drops this process's entries immediately and other workers'
+entries once the cache layer propagates the bump. QuerySet.update() on Tenant bypasses the
+signals; call TenantRegistry.invalidate() after such updates.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_VERSION_KEY = 'tenant_registry_version'
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (field, value) -> Tenant | None (negative entry)
+_version = None
+
+
+def _max_entries():
+    return getattr(settings, 'TENANT_REGISTRY_MAX_ENTRIES', 1024)
+
+
+def _current_version():
+    version = cache.get(REGISTRY_VERSION_KEY)
+    if version is None:
+        # Start from the current time so an evicted counter never reuses an old version
+        cache.add(REGISTRY_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(REGISTRY_VERSION_KEY)
+    return version
+
+
+class TenantRegistry:
+    """Cached active-tenant lookups by id, subdomain and custom domain"""
+
+    @staticmethod
+    def by_id(tenant_id):
+        try:
+            tenant_id = int(tenant_id)
+        except (TypeError, ValueError):
+            return None
+        return TenantRegistry._lookup('id', tenant_id)
+
+    @staticmethod
+    def by_subdomain(subdomain):
+        return TenantRegistry._lookup('subdomain', subdomain) if subdomain else None
+
+    @staticmethod
+    def by_custom_domain(host):
+        return TenantRegistry._lookup('custom_domain', host) if host else None
+
+    @staticmethod
+    def _lookup(field, value):
+        """Active tenant whose `field` equals `value`, or None; a copy, so callers may modify it"""
+        global _version
+
+        version = _current_version()
+        key = (field, value)
+        with _lock:
+            if version != _version:
+                _entries.clear()
+                _version = version
+            if key in _entries:
+                _entries.move_to_end(key)
+                tenant = _entries[key]
+                return copy.copy(tenant) if tenant is not None else None
+
+        from ..models import Tenant
+
+        tenant = Tenant.objects.filter(is_active=True, **{field: value}).first()
+
+        with _lock:
+            # Only remember the result if no invalidation happened while querying
+            if version == _version:
+                _entries[key] = tenant
+                while len(_entries) > _max_entries():
+                    _entries.popitem(last=False)
+        return copy.copy(tenant) if tenant is not None else None
+
+    @staticmethod
+    def invalidate(reason="tenant_change"):
+        """Drop cached tenant lookups in this process and, via the cache, in every other worker"""
+        global _version
+
+        try:
+            cache.incr(REGISTRY_VERSION_KEY)
+        except ValueError:
+            cache.set(REGISTRY_VERSION_KEY, int(time.time() * 1000), None)
+        with _lock:
+            _entries.clear()
+            _version = None
+        logger.info(f"Tenant registry invalidated - Reason: {reason}")
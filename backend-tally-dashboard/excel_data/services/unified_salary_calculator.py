@@ -166,40 +166,46 @@ class UnifiedSalaryCalculator:
         """
         Calculate complete salary breakdown using standardized formulas
         
+        Delegates to the shared columnar payroll kernel so this path produces exactly
+        the same numbers as CalculatedSalary and the payroll preview endpoints.
+        
         Returns:
             Complete salary calculation with all components
         """
+        from .payroll_kernel import compute_payroll, paise_to_decimal
         
-        # Calculate gross salary components
-        gross_calc = UnifiedSalaryCalculator.calculate_gross_salary(
-            base_salary=base_salary,
-            working_days=working_days,
-            present_days=present_days,
-            ot_hours=ot_hours,
-            ot_rate_per_hour=ot_rate_per_hour,
-            late_minutes=late_minutes,
-            incentive=incentive
-        )
-        
-        # Calculate TDS
-        tds_calc = UnifiedSalaryCalculator.calculate_tds(
-            gross_salary=gross_calc['gross_salary'],
-            incentive=incentive,
-            tds_percentage=tds_percentage
+        columns = compute_payroll(
+            basic_salary=[base_salary],
+            working_days=[working_days],
+            present_days=[present_days],
+            ot_hours=[ot_hours],
+            late_minutes=[late_minutes],
+            ot_rate=[ot_rate_per_hour],
+            tds_percentage=[tds_percentage],
+            advance_balance=[total_advance_balance],
+            incentive=[incentive],
+            max_advance_deduction_percentage=max_advance_deduction_percentage,
         )
+        result = {name: paise_to_decimal(values)[0] for name, values in columns.items()}
         
-        # Calculate advance deduction
-        advance_calc = UnifiedSalaryCalculator.calculate_advance_deduction(
-            salary_after_tds=tds_calc['salary_after_tds'],
-            total_advance_balance=total_advance_balance,
-            max_deduction_percentage=max_advance_deduction_percentage
-        )
-        
-        # Combine all calculations
         return {
-            **gross_calc,
-            **tds_calc,
-            **advance_calc,
+            'salary_for_present_days': result['salary_for_present_days'],
+            'ot_charges': result['ot_charges'],
+            'late_deduction': result['late_deduction'],
+            'gross_salary': result['gross_salary'],
+            'incentive': incentive,
+            'taxable_amount': result['taxable_amount'],
+            'daily_rate': base_salary / Decimal(str(working_days)) if working_days > 0 else Decimal('0'),
+            'late_deduction_per_minute': ot_rate_per_hour / Decimal('60') if ot_rate_per_hour > 0 else Decimal('0'),
+            'tds_amount': result['tds_amount'],
+            'salary_after_tds': result['salary_after_tds'],
+            'tds_percentage': tds_percentage,
+            'advance_deduction': result['advance_deduction'],
+            'net_salary': result['net_payable'],
+            'remaining_advance_balance': result['remaining_advance_balance'],
+            'max_deduction': (
+                result['salary_after_tds'] * max_advance_deduction_percentage / Decimal('100')
+            ).quantize(Decimal('0.01')),
             'base_salary': base_salary,
             'working_days': working_days,
             'present_days': present_days,
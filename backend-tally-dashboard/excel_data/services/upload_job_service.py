@@ -0,0 +1,449 @@
+"""
+Upload Job Service
+
+Background processing of salary and attendance uploads. The upload request only checks the
+file, stores it (default_storage, under upload_jobs/<tenant id>/) and creates an UploadJob;
+a worker then runs the job's stages in order:
+
+    parse           read the sheet's name and department columns and match employees by
+                    name; stops the job as needs_confirmation when some employees do not exist
+    insert          read the sheet again UPLOAD_CHUNK_ROWS rows at a time, validate each chunk
+                    and upsert it in one transaction together with its row errors and the
+                    job's rows_processed checkpoint
+    payroll_period  (salary) create/flag the UPLOADED PayrollPeriod, clear payroll caches
+    payroll         (salary) CalculatedSalary records marked as paid
+    charts          (salary) ChartAggregatedData and the chart snapshot of the month
+    caches          (attendance) clear attendance and chart caches
+
+Only one chunk of the sheet is held at a time, plus the key columns of the whole file: the
+employees are matched in one go, so IDs generated for new names follow row order.
+
+Completed stages are recorded on the job, so running it again skips them and continues the
+insert from its checkpoint - when the task queue re-runs a job whose worker died, or through
+the resume_upload_jobs command. A worker first claims the job with a conditional update: a
+queued job, or a running one whose worker stopped refreshing updated_at for
+UPLOAD_JOB_STALE_MINUTES (a heartbeat refreshes it while the stages run). A job dispatched
+twice therefore runs once.
+Progress (job id, status and percentage only) is published as an 'upload_job' SSE event on
+the uploading user's stream; the details - row errors, missing employees, results - are read
+from the tenant-scoped GET upload-jobs/<id>/.
+"""
+
+import logging
+import threading
+import uuid
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Attendance, SalaryData, UploadJob
+from ..utils.bulk_upsert import bulk_upsert
+from ..utils.task_queue import run_in_background
+from ..utils.upload_reader import EXCEL_EXTENSIONS, UploadFileError, check_upload, upload_chunks
+from .employee_directory import schedule_directory_refresh
+
+logger = logging.getLogger(__name__)
+
+STAGES = {
+    UploadJob.KIND_SALARY: ('parse', 'insert', 'payroll_period', 'payroll', 'charts'),
+    UploadJob.KIND_ATTENDANCE: ('parse', 'insert', 'caches'),
+}
+
+# Derived-data stages: a failure is recorded on the job (result['stage_errors']) and the job
+# goes on, as the thread-based post-upload processing did
+BEST_EFFORT_STAGES = ('payroll', 'charts')
+
+# Row errors kept on the job (error_count has the total)
+MAX_STORED_ERRORS = 100
+
+
+class UploadJobService:
+    """
+    Create, run and report background upload jobs
+    """
+
+    @staticmethod
+    def wants_job(request):
+        """True when the upload request asks for background processing (async=true)"""
+        return str(request.data.get('async', '')).strip().lower() in ('1', 'true', 'yes')
+
+    @classmethod
+    def create(cls, tenant, user, kind, file_obj, year, month):
+        """
+        Check and store an uploaded file, create its UploadJob and dispatch it once the
+        surrounding transaction commits. Raises UploadFileError for rejected files.
+        """
+        check_upload(file_obj, EXCEL_EXTENSIONS)
+        file_path = default_storage.save(
+            f"upload_jobs/{tenant.id}/{uuid.uuid4().hex}_{file_obj.name}", file_obj
+        )
+        job = UploadJob.objects.create(
+            tenant=tenant,
+            user=user if getattr(user, 'is_authenticated', False) else None,
+            kind=kind,
+            file_path=file_path,
+            file_name=file_obj.name,
+            year=int(year),
+            month=str(month),
+        )
+        logger.info(f"📥 Upload job {job.id} queued: {kind} {month} {year} ({file_obj.name}) for tenant {tenant.id}")
+        transaction.on_commit(lambda: cls.dispatch(job.id))
+        return job
+
+    @classmethod
+    def dispatch(cls, job_id):
+        """Run a job on Celery when CELERY_ENABLED, otherwise as a background task"""
+        if getattr(settings, 'CELERY_ENABLED', True):
+            try:
+                from ..tasks import run_upload_job_task
+                task = run_upload_job_task.delay(job_id)
+                logger.info(f"🔄 [Celery] Queued upload job {job_id} as task {task.id}")
+                return task
+            except Exception as e:
+                logger.error(f"❌ Failed to queue upload job {job_id} on Celery: {e}")
+
+        # Without Celery: a database-backed background task (utils/task_queue.py)
+        job = UploadJob.all_objects.only('tenant_id').get(id=job_id)
+        task = run_in_background(run_upload_job, job_id, tenant_id=job.tenant_id)
+        logger.info(f"🔄 [Background] Queued upload job {job_id}")
+        return task
+
+    @classmethod
+    def resume(cls, job, inline=False, stale_before=None):
+        """
+        Queue an interrupted or failed job again (or run it here with inline=True); it
+        continues from its checkpoints. Returns None for jobs that are done, running jobs
+        updated since stale_before (default: stale_cutoff()) and jobs that a worker claimed or
+        updated since `job` was read.
+        """
+        if job.status in (UploadJob.STATUS_NEEDS_CONFIRMATION, UploadJob.STATUS_COMPLETED):
+            return None
+        if job.status == UploadJob.STATUS_RUNNING and job.updated_at >= (stale_before or cls.stale_cutoff()):
+            return None
+        # Only the job as it was read: a running worker keeps refreshing updated_at
+        requeued = UploadJob.all_objects.filter(pk=job.pk, status=job.status, updated_at=job.updated_at).update(
+            status=UploadJob.STATUS_QUEUED,
+            finished_at=None,
+            result={key: value for key, value in job.result.items() if key != 'error'},
+            updated_at=timezone.now(),
+        )
+        if not requeued:
+            return None
+        return cls.run(job.id) if inline else cls.dispatch(job.id)
+
+    @staticmethod
+    def stale_cutoff():
+        """Running jobs not updated since are taken for a dead worker's"""
+        return timezone.now() - timedelta(minutes=getattr(settings, 'UPLOAD_JOB_STALE_MINUTES', 10))
+
+    @classmethod
+    def claim(cls, job_id):
+        """
+        Mark a queued job (or a stale running one) as running for this worker; returns the job,
+        or None when it is finished or another worker runs it
+        """
+        now = timezone.now()
+        claimed = UploadJob.all_objects.filter(
+            Q(status=UploadJob.STATUS_QUEUED) | Q(status=UploadJob.STATUS_RUNNING, updated_at__lt=cls.stale_cutoff()),
+            pk=job_id,
+        ).update(
+            status=UploadJob.STATUS_RUNNING,
+            attempts=F('attempts') + 1,
+            started_at=Coalesce('started_at', now),
+            updated_at=now,
+        )
+        if not claimed:
+            return None
+        return UploadJob.all_objects.select_related('tenant').get(id=job_id)
+
+    @classmethod
+    def run(cls, job_id):
+        """
+        Run (or resume) a job's remaining stages; returns the job. Finished jobs, and jobs
+        another worker runs, are left as they are.
+        """
+        job = cls.claim(job_id)
+        if job is None:
+            job = UploadJob.all_objects.get(id=job_id)
+            if job.status not in UploadJob.FINISHED_STATUSES:
+                logger.info(f"📥 Upload job {job.id} is {job.status} in another worker, not running it")
+            return job
+        cls.publish(job)
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=cls._heartbeat, args=(job.id, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            cls._run_stages(job)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        # Failed jobs keep their file so they can be resumed
+        if job.status != UploadJob.STATUS_FAILED:
+            try:
+                default_storage.delete(job.file_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not delete upload file {job.file_path}: {e}")
+
+        logger.info(f"📥 Upload job {job.id} {job.status}: {job.rows_processed}/{job.rows_total} rows, {job.error_count} errors")
+        return job
+
+    @classmethod
+    def _heartbeat(cls, job_id, stop):
+        """Refresh a running job's updated_at during long stages, so it is not taken for a dead worker's"""
+        interval = max(getattr(settings, 'UPLOAD_JOB_STALE_MINUTES', 10) * 60 / 3, 1)
+        try:
+            while not stop.wait(interval):
+                UploadJob.all_objects.filter(pk=job_id, status=UploadJob.STATUS_RUNNING).update(updated_at=timezone.now())
+        finally:
+            connection.close()
+
+    @classmethod
+    def _run_stages(cls, job):
+        """Run the claimed job's remaining stages and record the outcome on it"""
+        context = {}
+        try:
+            for stage in STAGES[job.kind]:
+                if stage in job.stages_completed:
+                    continue
+                job.stage = stage
+                job.save(update_fields=['stage', 'updated_at'])
+                cls.publish(job)
+
+                try:
+                    proceed = getattr(cls, f"_stage_{stage}")(job, context)
+                except Exception as e:
+                    if stage not in BEST_EFFORT_STAGES:
+                        raise
+                    logger.error(f"❌ Upload job {job.id}: stage {stage} failed: {e}")
+                    job.result = {**job.result, 'stage_errors': {**job.result.get('stage_errors', {}), stage: str(e)}}
+                    job.save(update_fields=['result', 'updated_at'])
+                    continue
+
+                if not proceed:
+                    break
+                job.stages_completed = [*job.stages_completed, stage]
+                job.save(update_fields=['stages_completed', 'updated_at'])
+            else:
+                job.status = UploadJob.STATUS_COMPLETED
+        except UploadFileError as e:
+            job.status = UploadJob.STATUS_FAILED
+            job.result = {**job.result, 'error': str(e)}
+        except Exception as e:
+            logger.exception(f"❌ Upload job {job.id} failed in stage {job.stage}")
+            job.status = UploadJob.STATUS_FAILED
+            job.result = {**job.result, 'error': f"Error processing file: {e}"}
+
+        job.stage = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'stage', 'result', 'finished_at', 'updated_at'])
+        cls.publish(job)
+
+    # Stages: return False to stop the job (status already set), True to continue
+
+    @classmethod
+    def _chunks(cls, job):
+        """The stored file's typed rows, UPLOAD_CHUNK_ROWS at a time, indexed by file row"""
+        from .upload_processing import ATTENDANCE_NUMERIC_COLUMNS, SALARY_NUMERIC_COLUMNS
+
+        numeric_columns = SALARY_NUMERIC_COLUMNS if job.kind == UploadJob.KIND_SALARY else ATTENDANCE_NUMERIC_COLUMNS
+        with default_storage.open(job.file_path, 'rb') as file_obj:
+            yield from upload_chunks(file_obj, numeric_columns=numeric_columns, extensions=EXCEL_EXTENSIONS)
+
+    @classmethod
+    def _matched(cls, job, context):
+        """
+        The employee IDs of the rows that become records (indexed by file row) and the
+        missing employees, from a first pass over the key columns; once per run
+        """
+        if 'employee_ids' not in context:
+            import pandas as pd
+            from .upload_processing import attendance_upload_keys, match_upload_employees, salary_upload_keys
+
+            upload_keys = salary_upload_keys if job.kind == UploadJob.KIND_SALARY else attendance_upload_keys
+            parts, total_rows = [], 0
+            for chunk in cls._chunks(job):
+                total_rows += len(chunk)
+                parts.append(upload_keys(chunk))
+            keys = pd.concat(parts)
+            if job.kind == UploadJob.KIND_SALARY and keys.empty:
+                raise UploadFileError("No valid employee names found in the uploaded file")
+
+            context['employee_ids'], context['missing_employees'] = match_upload_employees(
+                keys['name'], keys['department'], job.tenant, basic_salaries=keys.get('basic_salary'),
+            )
+            context['total_rows'] = total_rows
+        return context['employee_ids']
+
+    @classmethod
+    def _stage_parse(cls, job, context):
+        employee_ids = cls._matched(job, context)
+        job.total_rows = context['total_rows']
+        if context['missing_employees']:
+            # Employees must exist: the client confirms and creates them, then uploads again
+            job.status = UploadJob.STATUS_NEEDS_CONFIRMATION
+            job.result = {
+                **job.result,
+                'error': 'Missing employees found',
+                'missing_employees': context['missing_employees'],
+                'total_missing': len(context['missing_employees']),
+            }
+            job.save(update_fields=['total_rows', 'result', 'updated_at'])
+            return False
+
+        # Rows with a name; the insert stage writes them or reports their errors
+        job.rows_total = len(employee_ids)
+        job.save(update_fields=['total_rows', 'rows_total', 'updated_at'])
+        return True
+
+    @classmethod
+    def _stage_insert(cls, job, context):
+        from .upload_processing import prepare_attendance_upload, prepare_salary_upload
+
+        employee_ids = cls._matched(job, context)
+        rows = employee_ids.index
+        tenant = job.tenant
+
+        if job.kind == UploadJob.KIND_SALARY:
+            from .upload_processing import SALARY_UPDATE_FIELDS
+            prepare = prepare_salary_upload
+            model, conflict_fields, update_fields = SalaryData, ['tenant', 'employee_id', 'year', 'month'], SALARY_UPDATE_FIELDS
+            existing = SalaryData.objects.filter(tenant=tenant, year=job.year, month=job.month)
+        else:
+            from .upload_processing import ATTENDANCE_UPDATE_FIELDS
+            prepare = prepare_attendance_upload
+            model, conflict_fields, update_fields = Attendance, ['tenant', 'employee_id', 'date'], ATTENDANCE_UPDATE_FIELDS
+            existing = Attendance.objects.filter(tenant=tenant, date=date(job.year, int(job.month), 1))
+
+        # Resume after the last committed chunk: rows_processed counts the rows of `rows` done
+        if job.rows_processed < len(rows):
+            first_row = rows[job.rows_processed]
+            for chunk in cls._chunks(job):
+                chunk = chunk[chunk.index >= first_row]
+                if chunk.empty:
+                    continue
+                prepared = prepare(chunk, tenant, job.year, job.month, employee_ids=employee_ids)
+                chunk_ids = {record['employee_id'] for record in prepared.records}
+                with transaction.atomic():
+                    updated = existing.filter(employee_id__in=chunk_ids).count()
+                    if prepared.records:
+                        bulk_upsert(model, [model(tenant=tenant, **record) for record in prepared.records], conflict_fields, update_fields)
+                    UploadJob.all_objects.filter(pk=job.pk).update(
+                        rows_processed=rows.searchsorted(chunk.index[-1], side='right'),
+                        records_created=F('records_created') + len(chunk_ids) - updated,
+                        records_updated=F('records_updated') + updated,
+                        error_count=F('error_count') + len(prepared.errors),
+                        errors=(job.errors + prepared.errors)[:MAX_STORED_ERRORS],
+                        updated_at=timezone.now(),
+                    )
+                job.refresh_from_db(fields=[
+                    'rows_processed', 'records_created', 'records_updated', 'error_count', 'errors', 'updated_at',
+                ])
+                cls.publish(job)
+        schedule_directory_refresh(tenant.id, employee_ids.unique().tolist())
+        return True
+
+    @classmethod
+    def _stage_payroll_period(cls, job, context):
+        from .upload_processing import record_salary_upload_period
+        payroll_period, period_created = record_salary_upload_period(job.tenant, job.year, job.month)
+        job.result = {
+            **job.result,
+            'payroll_period_id': payroll_period.id,
+            'period_created': period_created,
+            'data_source': payroll_period.data_source,
+        }
+        job.save(update_fields=['result', 'updated_at'])
+        return True
+
+    @classmethod
+    def _stage_payroll(cls, job, context):
+        from .upload_processing import mark_uploaded_salaries_paid
+        mark_uploaded_salaries_paid(job.tenant_id, job.year, job.month)
+        return True
+
+    @classmethod
+    def _stage_charts(cls, job, context):
+        from ..utils.chart_sync import _sync_from_salary_data
+        from .chart_snapshot_service import ChartSnapshotService
+        synced_count = _sync_from_salary_data(job.tenant, job.year, job.month)
+        ChartSnapshotService.apply_period(job.tenant, job.year, job.month)
+        logger.info(f"📊 Upload job {job.id}: synced {synced_count} chart records")
+        return True
+
+    @classmethod
+    def _stage_caches(cls, job, context):
+        from .cache_service import ATTENDANCE, CHARTS, bump_cache_generation
+        bump_cache_generation(job.tenant, ATTENDANCE, CHARTS, reason="attendance_upload")
+        return True
+
+    # Reporting
+
+    @staticmethod
+    def progress(job):
+        """Percentage of the job's rows inserted"""
+        return round(100 * job.rows_processed / job.rows_total, 1) if job.rows_total else 0
+
+    @staticmethod
+    def status_payload(job):
+        """JSON status of a job, as returned by the status endpoint"""
+        stages = STAGES[job.kind]
+        return {
+            'job_id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'stage': job.stage,
+            'stages': [{'name': stage, 'completed': stage in job.stages_completed} for stage in stages],
+            'file_name': job.file_name,
+            'year': job.year,
+            'month': job.month,
+            'total_rows_in_file': job.total_rows,
+            'rows_total': job.rows_total,
+            'rows_processed': job.rows_processed,
+            'progress': UploadJobService.progress(job),
+            'records_created': job.records_created,
+            'records_updated': job.records_updated,
+            'errors': job.errors[:10],  # Show first 10 errors only
+            'total_errors': job.error_count,
+            'result': job.result,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+    @staticmethod
+    def event_payload(job):
+        """The SSE progress event of a job: no file contents, clients fetch those from the status endpoint"""
+        return {
+            'job_id': job.id,
+            'status': job.status,
+            'progress': UploadJobService.progress(job),
+        }
+
+    @classmethod
+    def publish(cls, job):
+        """Send the job's progress to the uploading user's SSE stream (the tenant's without a user)"""
+        from ..utils.sse_broadcaster import InMemorySSEBroadcaster
+        topic = (
+            InMemorySSEBroadcaster.user_topic(job.user_id) if job.user_id
+            else InMemorySSEBroadcaster.tenant_topic(job.tenant_id)
+        )
+        try:
+            InMemorySSEBroadcaster.publish(
+                InMemorySSEBroadcaster.CHANNEL_NAME,
+                'upload_job',
+                cls.event_payload(job),
+                topics=[topic],
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not publish upload job {job.id} progress: {e}")
+
+
+def run_upload_job(job_id):
+    """Background task entry point (utils/task_queue.py)"""
+    UploadJobService.run(job_id)
@@ -0,0 +1,482 @@
+"""
+Upload Processing
+
+Turns a parsed salary or attendance sheet into model field values, column-wise. Shared by
+the synchronous upload views and the upload job worker (upload_job_service.py), so both
+validate the sheet, match employees by name and coerce numbers the same way.
+
+prepare_salary_upload() / prepare_attendance_upload() never write: they return a
+PreparedUpload holding the records (model fields, in row order), the per-row errors and,
+when some names match no active employee, the details the client has to confirm before
+anything is written.
+
+The upload job worker never holds the whole sheet: it reads the key columns of every chunk
+with salary_upload_keys() / attendance_upload_keys(), matches them once with
+match_upload_employees(), and then prepares and writes the file chunk by chunk, passing the
+matched employee IDs in.
+"""
+
+import calendar
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+from ..utils.periods import month_number
+from ..utils.upload_reader import UploadFileError
+from ..utils.utils import (
+    clean_numeric_column,
+    decimal_list,
+    is_valid_name,
+    match_employee_ids_by_name,
+    text_column,
+    validate_excel_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_COLUMNS = [
+    "NAME",
+    "SALARY",
+    "ABSENT",
+    "Present Days",
+    "Working Days",
+    "SL W/O OT",
+    "OT",
+    "HOUR RS",
+    "OT CHARGES",  # Renamed from CHARGES for clarity
+    "LATE",
+    "LATE CHARGE",  # Renamed from CHARGE for clarity
+    "AMT",
+    "SAL+OT",
+    "25TH ADV",
+    "OLD ADV",
+    "NETT PAYABLE",
+    "Department",
+    "Total old ADV",
+    "Balnce Adv",
+    "INCENTIVE",
+    "TDS",
+    "SAL-TDS",
+    "ADVANCE",
+]
+
+SALARY_NUMERIC_COLUMNS = [col for col in TEMPLATE_COLUMNS if col not in ("NAME", "Department")]
+
+# Alternative column names mapped to the template names
+SALARY_COLUMN_ALIASES = {
+    'Basic Salary': 'SALARY',
+    'basic_salary': 'SALARY',
+    'BasicSalary': 'SALARY',
+    'basic salary': 'SALARY',
+}
+
+# SalaryData field -> upload column
+SALARY_DECIMAL_FIELDS = {
+    "salary": "SALARY",
+    "sl_wo_ot": "SL W/O OT",
+    "ot": "OT",
+    "hour_rs": "HOUR RS",
+    "charges": "OT CHARGES",
+    "charge": "LATE CHARGE",
+    "amt": "AMT",
+    "sal_ot": "SAL+OT",
+    "adv_25th": "25TH ADV",
+    "old_adv": "OLD ADV",
+    "nett_payable": "NETT PAYABLE",
+    "total_old_adv": "Total old ADV",
+    "balnce_adv": "Balnce Adv",
+    "incentive": "INCENTIVE",
+    "tds": "TDS",
+    "sal_tds": "SAL-TDS",
+    "advance": "ADVANCE",
+}
+SALARY_INT_FIELDS = {
+    "absent": "ABSENT",
+    "late": "LATE",
+}
+
+# SalaryData fields rewritten when an uploaded row already exists
+SALARY_UPDATE_FIELDS = [
+    "name", "salary", "absent", "days", "sl_wo_ot", "ot", "hour_rs", "charges", "late", "charge",
+    "amt", "sal_ot", "adv_25th", "old_adv", "nett_payable", "department", "total_old_adv",
+    "balnce_adv", "incentive", "tds", "sal_tds", "advance", "date",
+]
+
+ATTENDANCE_REQUIRED_COLUMNS = ['Name', 'Department', 'Present Days', 'Absent Days', 'OT Hours', 'Late Minutes']
+ATTENDANCE_OPTIONAL_COLUMNS = ['Working Days']
+ATTENDANCE_NUMERIC_COLUMNS = ['Present Days', 'Absent Days', 'OT Hours', 'Late Minutes', 'Working Days']
+
+# Attendance fields rewritten when an uploaded row already exists
+ATTENDANCE_UPDATE_FIELDS = [
+    'name', 'department', 'total_working_days', 'present_days',
+    'absent_days', 'ot_hours', 'late_minutes', 'calendar_days',
+]
+
+
+@dataclass
+class PreparedUpload:
+    """Model field values of an upload's valid rows, with what was rejected"""
+    records: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    missing_employees: list = field(default_factory=list)
+    total_rows: int = 0
+
+
+def _missing_employee_details(names, departments, employee_ids, known, basic_salaries=None):
+    """Rows whose name matches no active employee, as the upload confirmation dialog expects them"""
+    missing_names = names[~known]
+    name_parts = missing_names.str.split(' ', n=1, expand=True).reindex(columns=[0, 1])
+    # Clean up last name - avoid "nan" values
+    last_names = name_parts[1].fillna('')
+    last_names = last_names.where(~last_names.str.lower().isin(['nan', 'none']), '')
+
+    details = [
+        {
+            'employee_id': employee_id,
+            'name': name,
+            'first_name': first_name,
+            'last_name': last_name,
+            'department': department,
+            'row_number': index + 2  # Excel row number (accounting for header)
+        }
+        for index, employee_id, name, first_name, last_name, department in zip(
+            missing_names.index, employee_ids[~known], missing_names,
+            name_parts[0], last_names, departments[~known],
+        )
+    ]
+    if basic_salaries is not None:
+        # Basic salary from Excel - crucial for the new employee profile
+        for detail, basic_salary in zip(details, basic_salaries[~known].fillna(0).tolist()):
+            detail['basic_salary'] = basic_salary
+    return details
+
+
+def _salary_rows(df):
+    """Rows of a salary sheet (or chunk) with a valid name, template columns checked and blanks defaulted"""
+    df = df.rename(columns={col: SALARY_COLUMN_ALIASES[col] for col in df.columns if col in SALARY_COLUMN_ALIASES})
+
+    # Replace NaN values with defaults before processing (numeric columns are typed already)
+    df = df.fillna({
+        "NAME": "",
+        "Department": "",
+        **{column: 0 for column in SALARY_NUMERIC_COLUMNS},
+    })
+
+    # Validate columns (Employee ID and Working Days are optional)
+    required_columns = [col for col in TEMPLATE_COLUMNS if col not in ["Working Days"]]
+    is_valid, error_message = validate_excel_columns(df.columns.tolist(), required_columns, ["Working Days"])
+    if not is_valid:
+        raise UploadFileError(error_message)
+
+    # Filter out invalid rows BEFORE processing
+    return df[df["NAME"].apply(is_valid_name)]
+
+
+def _check_attendance_columns(df):
+    missing_columns = [col for col in ATTENDANCE_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise UploadFileError(
+            f'Invalid file format. Expected monthly summary columns: {", ".join(ATTENDANCE_REQUIRED_COLUMNS)}'
+        )
+
+
+def salary_upload_keys(df):
+    """Name, department and basic salary of the rows of a salary sheet (or chunk) that become records"""
+    import pandas as pd
+
+    valid_rows = _salary_rows(df)
+    return pd.DataFrame({
+        'name': text_column(valid_rows, "NAME"),
+        'department': text_column(valid_rows, "Department"),
+        'basic_salary': clean_numeric_column(valid_rows["SALARY"]),
+    })
+
+
+def attendance_upload_keys(df):
+    """Name and department of the rows of an attendance sheet (or chunk)"""
+    import pandas as pd
+
+    _check_attendance_columns(df)
+    return pd.DataFrame({'name': text_column(df, 'Name'), 'department': text_column(df, 'Department')})
+
+
+def match_upload_employees(names, departments, tenant, basic_salaries=None):
+    """
+    Employee IDs for upload rows; returns (employee ID Series aligned with names, details of
+    the rows whose name matches no active employee)
+    """
+    employee_ids, existing_employee_set = match_employee_ids_by_name(names, departments, tenant)
+    employee_ids = employee_ids.astype(str).str.strip()
+    known = employee_ids.isin(existing_employee_set)
+    if known.all():
+        return employee_ids, []
+    return employee_ids, _missing_employee_details(names, departments, employee_ids, known, basic_salaries)
+
+
+def prepare_salary_upload(df, tenant, year, month, employee_ids=None):
+    """
+    SalaryData field values for a salary sheet (template columns, see TEMPLATE_COLUMNS)
+
+    employee_ids, when given, are the IDs matched for the whole file (indexed by file row):
+    the sheet is then one chunk of it and its names are not matched again.
+
+    Raises UploadFileError when the sheet's columns do not match the template or no row has
+    a valid name.
+    """
+    import pandas as pd
+
+    valid_rows = _salary_rows(df)
+    if len(valid_rows) == 0 and employee_ids is None:
+        raise UploadFileError("No valid employee names found in the uploaded file")
+
+    prepared = PreparedUpload(total_rows=len(df))
+    names = text_column(valid_rows, "NAME")
+    departments = text_column(valid_rows, "Department")
+
+    # Numeric columns: blanks are 0; amounts that are not numbers fail their row,
+    # day/minute counts that are not numbers count as 0 (as clean_int_value)
+    amounts = {
+        field_name: clean_numeric_column(valid_rows[column])
+        for field_name, column in SALARY_DECIMAL_FIELDS.items()
+    }
+    counts = {
+        field_name: clean_numeric_column(valid_rows[column]).fillna(0).astype(int)
+        for field_name, column in SALARY_INT_FIELDS.items()
+    }
+    working_days = (
+        clean_numeric_column(valid_rows["Working Days"]).fillna(0).astype(int)
+        if "Working Days" in valid_rows.columns else pd.Series(0, index=valid_rows.index)
+    )
+    # FIXED: Always use 30 working days unless the sheet provides them
+    counts["days"] = working_days.where(working_days > 0, 30)
+
+    if employee_ids is None:
+        # Employee IDs: names joined against active employees, new IDs generated for the rest
+        employee_ids, prepared.missing_employees = match_upload_employees(
+            names, departments, tenant, basic_salaries=amounts["salary"],
+        )
+        # Employees must exist: report the missing ones for confirmation, write nothing
+        if prepared.missing_employees:
+            return prepared
+    else:
+        employee_ids = employee_ids.reindex(valid_rows.index)
+
+    invalid = pd.Series(False, index=valid_rows.index)
+    for field_name, values in amounts.items():
+        column = SALARY_DECIMAL_FIELDS[field_name]
+        bad = values.isna() & ~invalid
+        for index in values.index[bad]:
+            prepared.errors.append(f"Row {index + 2}: '{valid_rows.at[index, column]}' is not a number ({column})")
+        invalid |= bad
+    valid = ~invalid
+
+    # Records straight from the column arrays
+    salary_date = date(int(year), month_number(month) or 1, 1)
+    columns = {
+        "employee_id": employee_ids[valid].tolist(),
+        "name": names[valid].tolist(),
+        "department": departments[valid].tolist(),
+        **{field_name: values[valid].tolist() for field_name, values in counts.items()},
+        **{field_name: decimal_list(values[valid]) for field_name, values in amounts.items()},
+    }
+    prepared.records = [
+        {**dict(zip(columns, values)), "year": int(year), "month": month, "date": salary_date}
+        for values in zip(*columns.values())
+    ]
+    return prepared
+
+
+def prepare_attendance_upload(df, tenant, year, month, employee_ids=None):
+    """
+    Attendance field values for a monthly attendance summary sheet (month is a number)
+
+    employee_ids, when given, are the IDs matched for the whole file (indexed by file row):
+    the sheet is then one chunk of it and its names are not matched again.
+
+    Raises UploadFileError when required columns are missing.
+    """
+    import pandas as pd
+
+    _check_attendance_columns(df)
+
+    prepared = PreparedUpload(total_rows=len(df))
+    names = text_column(df, 'Name')
+    departments = text_column(df, 'Department')
+
+    if employee_ids is None:
+        # Employee IDs: names joined against active employees, new IDs generated for the rest
+        employee_ids, prepared.missing_employees = match_upload_employees(names, departments, tenant)
+        if prepared.missing_employees:
+            return prepared
+    else:
+        employee_ids = employee_ids.reindex(df.index)
+
+    # Numeric columns: blanks are 0, cells that are not numbers fail their row
+    numbers = {
+        column: clean_numeric_column(df[column])
+        for column in ('Present Days', 'Absent Days', 'OT Hours', 'Late Minutes')
+    }
+    # OPTIMIZED: Use standard 30 days for bulk performance (DOJ calc in background if needed)
+    if 'Working Days' in df.columns:
+        numbers['Working Days'] = clean_numeric_column(df['Working Days'])
+        working_days = numbers['Working Days'].where(numbers['Working Days'] > 0, 30)
+    else:
+        working_days = pd.Series(30.0, index=df.index)
+
+    row_errors = {}
+    for column, values in numbers.items():
+        for index in values.index[values.isna()]:
+            row_errors.setdefault(index, f"Row {index + 2}: '{df.at[index, column]}' is not a number ({column})")
+    prepared.errors = [row_errors[index] for index in sorted(row_errors)]
+    valid = ~df.index.isin(list(row_errors))
+
+    attendance_date = date(int(year), int(month), 1)
+    calendar_days = calendar.monthrange(int(year), int(month))[1]
+    prepared.records = [
+        {
+            'employee_id': employee_id,
+            'name': name,
+            'department': department,
+            'date': attendance_date,
+            'calendar_days': calendar_days,
+            'total_working_days': total_working_days,
+            'present_days': present_days,
+            'absent_days': absent_days,
+            'ot_hours': ot_hours,
+            'late_minutes': late_minutes,
+        }
+        for employee_id, name, department, total_working_days, present_days, absent_days, ot_hours, late_minutes in zip(
+            employee_ids[valid].tolist(),
+            names[valid].tolist(),
+            departments[valid].tolist(),
+            working_days[valid].astype(int).tolist(),
+            numbers['Present Days'][valid].tolist(),
+            numbers['Absent Days'][valid].tolist(),
+            numbers['OT Hours'][valid].tolist(),
+            numbers['Late Minutes'][valid].astype(int).tolist(),
+        )
+    ]
+    return prepared
+
+
+def record_salary_upload_period(tenant, year, month):
+    """
+    Create (or switch to UPLOADED) the PayrollPeriod of an uploaded salary month and clear the
+    payroll and chart caches; returns (payroll_period, created)
+    """
+    from ..models import DataSource, PayrollPeriod
+    from .cache_service import CHARTS, PAYROLL, bump_cache_generation
+
+    number = month_number(month) or 1
+    payroll_period, period_created = PayrollPeriod.objects.get_or_create(
+        tenant=tenant,
+        year=int(year),
+        month=month,
+        defaults={
+            'data_source': DataSource.UPLOADED,
+            'working_days_in_month': len([d for d in range(1, calendar.monthrange(int(year), number)[1] + 1)
+                                          if calendar.weekday(int(year), number, d) < 5]),
+            'tds_rate': Decimal('5.00')
+        }
+    )
+
+    # If period already exists, update data source to UPLOADED
+    if not period_created:
+        payroll_period.data_source = DataSource.UPLOADED
+        payroll_period.save()
+
+    # Clear payroll overview, charts and directory caches to show new data immediately
+    bump_cache_generation(tenant, PAYROLL, CHARTS, reason="salary_upload")
+
+    logger.info(f"✨ Cleared payroll, charts, and directory cache for tenant {tenant.id} after salary upload")
+    return payroll_period, period_created
+
+
+def mark_uploaded_salaries_paid(tenant_id, year, month):
+    """
+    Turn a month's uploaded SalaryData into CalculatedSalary records marked as paid, using the
+    Excel values as they are (no auto-calculation); returns the number of records created
+    """
+    from django.db import transaction
+    from ..models import CalculatedSalary, DataSource, PayrollPeriod, SalaryData, Tenant
+    from .change_outbox import record_calculated_salary_changes
+
+    tenant = Tenant.objects.get(id=tenant_id)
+    logger.info(f"💰 [BG] Starting payroll calculation for {month} {year}")
+
+    # Get uploaded salary data
+    salary_data = SalaryData.objects.filter(
+        tenant_id=tenant_id, year=year, month=month
+    )
+
+    if not salary_data.exists():
+        logger.warning(f"💰 [BG] No SalaryData found for {month} {year}")
+        return 0
+
+    period = PayrollPeriod.objects.get(
+        tenant_id=tenant_id, year=year, month=month
+    )
+
+    calculated_salaries = []
+    for sd in salary_data:
+        # CalculatedSalary record with Excel values (bulk_create: no auto-calculation)
+        calculated_salaries.append(CalculatedSalary(
+            tenant_id=tenant_id,
+            payroll_period=period,
+            employee_id=sd.employee_id,
+            employee_name=sd.name,
+            department=sd.department or 'General',
+            basic_salary=sd.salary or Decimal('0'),
+            basic_salary_per_hour=sd.hour_rs or Decimal('0'),
+            basic_salary_per_minute=sd.charge or Decimal('0'),
+            employee_ot_rate=sd.hour_rs or Decimal('0'),
+            employee_tds_rate=sd.tds or Decimal('0'),
+            total_working_days=int((sd.days or 0) + (sd.absent or 0)),
+            present_days=Decimal(str(sd.days or 0)),
+            absent_days=Decimal(str(sd.absent or 0)),
+            ot_hours=sd.ot or Decimal('0'),
+            late_minutes=int(sd.late or 0),
+            salary_for_present_days=sd.sl_wo_ot or Decimal('0'),
+            ot_charges=sd.charges or Decimal('0'),
+            late_deduction=sd.amt or Decimal('0'),
+            incentive=sd.incentive or Decimal('0'),
+            gross_salary=sd.sal_ot or Decimal('0'),
+            tds_amount=sd.tds or Decimal('0'),
+            salary_after_tds=sd.sal_tds or Decimal('0'),
+            total_advance_balance=sd.total_old_adv or Decimal('0'),
+            advance_deduction_amount=sd.advance or Decimal('0'),
+            advance_deduction_editable=True,
+            remaining_advance_balance=sd.balnce_adv or Decimal('0'),
+            net_payable=sd.nett_payable or Decimal('0'),
+            data_source=DataSource.UPLOADED,
+            is_paid=True,
+            payment_date=date.today(),
+        ))
+
+    with transaction.atomic():
+        CalculatedSalary.objects.bulk_create(calculated_salaries, batch_size=1000)
+        # Chart rows follow through the change outbox (bulk_create skips post_save)
+        record_calculated_salary_changes(tenant_id, calculated_salaries)
+
+    created = len(calculated_salaries)
+    logger.info(f"💰 [BG] Created {created} CalculatedSalary records marked as paid")
+
+    # Clear caches so frontend reflects paid status immediately
+    try:
+        from .cache_service import invalidate_payroll_payment_caches
+
+        cache_result = invalidate_payroll_payment_caches(
+            tenant=tenant,
+            period_id=period.id,
+            reason="uploaded_salary_data_marked_paid"
+        )
+
+        if cache_result['success']:
+            logger.info(f"🧹 [BG] Cache invalidation successful: {cache_result['cleared_count']} keys cleared for tenant {tenant_id}, period {period.id}")
+        else:
+            logger.warning(f"⚠️ [BG] Cache invalidation failed: {cache_result.get('error', 'Unknown error')}")
+    except Exception as cache_exc:
+        logger.warning(f"⚠️ [BG] Cache clear failed: {cache_exc}")
+
+    return created
@@ -3,7 +3,8 @@ Celery tasks for background processing
 """
 import logging
 from celery import shared_task
-from django.db import transaction
+
+from .utils.chart_sync import _sync_from_calculated_salary, _sync_from_salary_data
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +26,7 @@ def sync_chart_data_batch_task(self, tenant_id, year, month, source='excel'):
         - Task monitoring via Celery Flower
         - Proper error handling and logging
     """
-    from excel_data.models import Tenant, SalaryData, CalculatedSalary, ChartAggregatedData
+    from excel_data.models import Tenant
     
     try:
         # Re-fetch tenant
@@ -41,13 +42,9 @@ def sync_chart_data_batch_task(self, tenant_id, year, month, source='excel'):
         else:
             raise ValueError(f"Invalid source: {source}")
         
-        # Clear cache after sync
-        from django.core.cache import cache
-        cache_pattern = f"frontend_charts_{tenant_id}_*"
-        try:
-            cache.delete_pattern(cache_pattern)
-        except AttributeError:
-            cache.delete(f"frontend_charts_{tenant_id}")
+        # Clear cache and refresh this period in the tenant's chart snapshot
+        from .services.chart_snapshot_service import ChartSnapshotService
+        ChartSnapshotService.apply_period(tenant, year, month)
         
         return {
             'status': 'success',
@@ -67,64 +64,6 @@ def sync_chart_data_batch_task(self, tenant_id, year, month, source='excel'):
         raise self.retry(exc=exc)
 
 
-def _sync_from_salary_data(tenant, year, month):
-    """
-    Sync ChartAggregatedData from SalaryData (Excel uploads)
-    """
-    from excel_data.models import SalaryData
-    
-    salary_records = SalaryData.objects.filter(
-        tenant=tenant,
-        year=year,
-        month=month
-    ).select_related('tenant')
-    
-    if not salary_records.exists():
-        logger.warning(f"No SalaryData found for {month} {year}")
-        return 0
-    
-    synced_count = 0
-    with transaction.atomic():
-        for salary_record in salary_records:
-            try:
-                from excel_data.models import ChartAggregatedData
-                ChartAggregatedData.aggregate_from_salary_data(salary_record)
-                synced_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to sync {salary_record.name}: {e}")
-    
-    return synced_count
-
-
-def _sync_from_calculated_salary(tenant, year, month):
-    """
-    Sync ChartAggregatedData from CalculatedSalary (Frontend forms)
-    """
-    from excel_data.models import CalculatedSalary
-    
-    calc_records = CalculatedSalary.objects.filter(
-        tenant=tenant,
-        payroll_period__year=year,
-        payroll_period__month=month
-    ).select_related('tenant', 'payroll_period')
-    
-    if not calc_records.exists():
-        logger.warning(f"No CalculatedSalary found for {month} {year}")
-        return 0
-    
-    synced_count = 0
-    with transaction.atomic():
-        for calc_record in calc_records:
-            try:
-                from excel_data.models import ChartAggregatedData
-                ChartAggregatedData.aggregate_from_calculated_salary(calc_record)
-                synced_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to sync {calc_record.employee_name}: {e}")
-    
-    return synced_count
-
-
 @shared_task
 def cleanup_old_chart_data(days=90):
     """
@@ -137,11 +76,31 @@ def cleanup_old_chart_data(days=90):
     from django.utils import timezone
     from excel_data.models import ChartAggregatedData
     
+    from excel_data.services.cache_service import CHARTS, bump_cache_generation
+    
     cutoff_date = timezone.now() - timedelta(days=days)
-    deleted_count, _ = ChartAggregatedData.objects.filter(
-        created_at__lt=cutoff_date
-    ).delete()
+    old_rows = ChartAggregatedData.objects.filter(created_at__lt=cutoff_date)
+    tenant_ids = set(old_rows.values_list('tenant_id', flat=True).distinct())
+    deleted_count, _ = old_rows.delete()
+    
+    # The chart snapshots of the affected tenants still hold the deleted rows
+    for tenant_id in tenant_ids:
+        bump_cache_generation(tenant_id, CHARTS, reason="chart_data_cleanup")
     
     logger.info(f"🗑️ [Celery] Cleaned up {deleted_count} old chart records")
     return {'deleted_count': deleted_count}
 
+
+
+@shared_task
+def run_upload_job_task(job_id):
+    """
+    Celery task running (or resuming) a background upload job
+
+    Args:
+        job_id: UploadJob ID (int)
+    """
+    from .services.upload_job_service import UploadJobService
+    
+    job = UploadJobService.run(job_id)
+    return {'job_id': job.id, 'status': job.status, 'rows_processed': job.rows_processed}
@@ -0,0 +1,122 @@
+"""
+Per-request JWT auth context
+
+The bearer token of a request is validated once and its user is loaded together with the
+tenant and UserPermissions in a single query. The result is stored on the Django request
+(request.auth_context) and reused by TenantMiddleware, SingleSessionMiddleware and DRF
+(RequestContextJWTAuthentication), instead of each of them decoding the token and
+loading the user again.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+logger = logging.getLogger(__name__)
+
+
+class AuthContext:
+    """Outcome of authenticating one request's bearer token"""
+
+    __slots__ = ('raw_token', 'user', 'token', 'error')
+
+    def __init__(self, raw_token=None, user=None, token=None, error=None):
+        self.raw_token = raw_token
+        self.user = user
+        self.token = token
+        self.error = error
+
+    @property
+    def tenant(self):
+        """The user's tenant when it is active, else None"""
+        tenant = self.user.tenant if self.user else None
+        return tenant if tenant and tenant.is_active else None
+
+
+class RequestContextJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves each request once
+
+    authenticate() returns the context already resolved for the underlying Django request
+    (re-raising its validation error, if any), so DRF neither re-decodes the token nor
+    re-loads the user.
+    """
+
+    def authenticate(self, request):
+        context = get_auth_context(getattr(request, '_request', request))
+        if context.error is not None:
+            raise context.error
+        if context.user is None:
+            return None
+        return context.user, context.token
+
+    def get_user(self, validated_token):
+        """JWTAuthentication.get_user, loading tenant and permissions in the same query"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = self.user_model.objects.select_related('tenant', 'permissions').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class SSETicket(Token):
+    """
+    Short-lived token that only opens event streams
+
+    EventSource cannot send an Authorization header, so a stream URL carries a ticket rather
+    than the access token. Its own token_type keeps it from being accepted as an access token.
+    """
+    token_type = 'sse_ticket'
+    lifetime = timedelta(seconds=60)
+
+
+def get_auth_context(request):
+    """
+    AuthContext of a Django request, resolved on first use
+
+    Requests without a bearer token get an empty context. Invalid tokens, unknown or
+    inactive users are recorded in `error` rather than raised, so middleware can carry on
+    and DRF raises the same error it always has.
+    """
+    context = getattr(request, 'auth_context', None)
+    if context is not None:
+        return context
+
+    authenticator = RequestContextJWTAuthentication()
+    context = AuthContext()
+    try:
+        header = authenticator.get_header(request)
+        raw_token = authenticator.get_raw_token(header) if header is not None else None
+        if raw_token is not None:
+            context.raw_token = raw_token
+            context.token = authenticator.get_validated_token(raw_token)
+            context.user = authenticator.get_user(context.token)
+    except (AuthenticationFailed, InvalidToken, TokenError) as e:
+        context.user = None
+        context.token = None
+        context.error = e
+        logger.debug(f"JWT authentication failed: {e}")
+
+    request.auth_context = context
+    return context
@@ -0,0 +1,97 @@
+"""
+Parameterized bulk upsert writer
+
+Writes model instances with a single PostgreSQL
+``INSERT ... VALUES %s ON CONFLICT (...) DO UPDATE SET col = EXCLUDED.col`` statement per
+page, using psycopg2's execute_values. Values are always sent as query parameters (no
+string concatenation or manual quoting) and statement size is bounded by ``page_size``.
+
+On other database backends it falls back to ``bulk_create(update_conflicts=True)``.
+"""
+import logging
+
+from django.db import connections, router
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def bulk_upsert(model, objs, conflict_fields, update_fields, page_size=DEFAULT_PAGE_SIZE, using=None):
+    """
+    Insert model instances, updating the given fields of rows that already exist.
+
+    auto_now / auto_now_add fields are populated as in save(); an auto_now field such as
+    updated_at is always refreshed on conflict. When several objects share the same
+    conflict key only the last one is written.
+
+    Args:
+        model: Model class to write
+        objs: Iterable of unsaved model instances
+        conflict_fields: Field names forming the unique constraint, e.g. ['tenant', 'employee_id', 'date']
+        update_fields: Field names overwritten from the incoming row on conflict
+        page_size: Maximum number of rows per statement
+        using: Database alias (defaults to the router's write database)
+
+    Returns:
+        int: Number of rows written
+    """
+    opts = model._meta
+    conflict_attnames = [opts.get_field(name).attname for name in conflict_fields]
+    objs = list({
+        tuple(getattr(obj, attname) for attname in conflict_attnames): obj
+        for obj in objs
+    }.values())
+    if not objs:
+        return 0
+
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+
+    if connection.vendor != 'postgresql':
+        model._base_manager.using(using).bulk_create(
+            objs,
+            batch_size=page_size,
+            update_conflicts=True,
+            unique_fields=conflict_fields,
+            update_fields=_with_auto_now(opts, update_fields),
+        )
+        return len(objs)
+
+    # Generated columns (period_index) are computed by the database
+    fields = [f for f in opts.concrete_fields if not f.primary_key and not f.generated]
+    qn = connection.ops.quote_name
+
+    columns = ', '.join(qn(f.column) for f in fields)
+    conflict_columns = ', '.join(qn(opts.get_field(name).column) for name in conflict_fields)
+    assignments = ', '.join(
+        f"{qn(opts.get_field(name).column)} = EXCLUDED.{qn(opts.get_field(name).column)}"
+        for name in _with_auto_now(opts, update_fields)
+    )
+
+    sql = (
+        f"INSERT INTO {qn(opts.db_table)} ({columns}) VALUES %s "
+        f"ON CONFLICT ({conflict_columns}) DO UPDATE SET {assignments}"
+    )
+
+    rows = [
+        tuple(f.get_db_prep_save(f.pre_save(obj, add=True), connection) for f in fields)
+        for obj in objs
+    ]
+
+    from psycopg2.extras import execute_values
+
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, rows, page_size=page_size)
+
+    logger.info(f"Bulk upserted {len(rows)} {opts.model_name} rows in {(len(rows) + page_size - 1) // page_size} statement(s)")
+    return len(rows)
+
+
+def _with_auto_now(opts, update_fields):
+    """Append auto_now fields (e.g. updated_at) to update_fields so conflicts refresh them"""
+    names = list(update_fields)
+    for field in opts.concrete_fields:
+        if getattr(field, 'auto_now', False) and field.name not in names:
+            names.append(field.name)
+    return names
@@ -0,0 +1,157 @@
+"""
+Keyset (cursor) pagination
+
+OFFSET pagination reads and throws away every row before the page, so page 50 costs fifty
+times page one, and caching a whole result set to slice it keeps every row in memory. A
+keyset page instead continues after the sort key of the last row it returned:
+
+    WHERE (name, id) > ('Rao', 412) ORDER BY name, id LIMIT 101
+
+which is one range scan on an index over the sort columns, whatever the depth.
+
+The position travels as an opaque cursor (url-safe base64 of the last row's sort values).
+Orderings must end with a unique column so the position is exact, and their columns must
+not be NULL.
+
+Totals are optional: COUNT(*) is as expensive as reading every page, so callers ask for an
+exact count, a planner estimate (approximate_count) or none.
+"""
+
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Estimates below this are replaced by an exact COUNT(*), which is cheap at that size
+EXACT_COUNT_THRESHOLD = 10000
+
+COUNT_EXACT = 'exact'
+COUNT_APPROXIMATE = 'approximate'
+COUNT_NONE = 'none'
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced for this ordering"""
+
+
+def encode_cursor(values):
+    """Opaque cursor for a list of sort values"""
+    payload = json.dumps(list(values), cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    """Sort values of a cursor; raises InvalidCursor if it does not fit the ordering"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {exc}") from exc
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Invalid cursor: it does not match the requested sort")
+    return values
+
+
+def page_size_param(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Page size from a query parameter, clamped to 1..maximum (default when missing or invalid)"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum)) if size > 0 else default
+
+
+def after_filter(ordering, values):
+    """
+    Q selecting the rows after `values` in `ordering` (field names, '-' for descending):
+    a > x OR (a = x AND b > y) OR ..., plus a leading a >= x bound that the index range
+    scan can use
+    """
+    fields = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+    condition = Q()
+    for position, (name, descending) in enumerate(fields):
+        equal = Q(**{previous: values[index] for index, (previous, _) in enumerate(fields[:position])})
+        condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": values[position]})
+    first, descending = fields[0]
+    return Q(**{f"{first}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+
+def _sort_value(row, name):
+    name = name.lstrip('-')
+    if isinstance(row, dict):
+        return row[name]
+    return getattr(row, name)
+
+
+def paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE, offset=0):
+    """
+    One page of `queryset` (model instances or .values() dicts, which must include the
+    ordering fields) after `cursor`; returns (rows, next_cursor), next_cursor None on the
+    last page
+
+    `offset` (ignored with a cursor) serves clients that still page by offset; it costs the
+    skipped rows, and the returned cursor lets them continue without it.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(after_filter(ordering, decode_cursor(cursor, ordering)))
+        offset = 0
+
+    rows = list(queryset[offset:offset + page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(_sort_value(rows[-1], name) for name in ordering)
+
+
+def paginate_list(rows, cursor=None, page_size=DEFAULT_PAGE_SIZE, offset=0):
+    """
+    paginate() for rows that are already in memory (e.g. generated from other tables),
+    positioned by index; returns (rows, next_cursor)
+    """
+    if cursor:
+        offset = decode_cursor(cursor, ('position',))[0]
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor("Invalid cursor: bad position")
+    end = offset + page_size
+    return rows[offset:end], (encode_cursor([end]) if end < len(rows) else None)
+
+
+def approximate_count(queryset):
+    """Row count of a queryset from the PostgreSQL planner's estimate (no table scan)"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_param(value, default=COUNT_NONE):
+    """Count mode of a query parameter ('exact', 'approximate' or 'none')"""
+    value = (value or '').lower()
+    return value if value in (COUNT_EXACT, COUNT_APPROXIMATE, COUNT_NONE) else default
+
+
+def count_rows(queryset, mode):
+    """
+    Total for a page response as (count, is_approximate); (None, False) for mode 'none'.
+    Approximate counts fall back to COUNT(*) while the estimate is small.
+    """
+    if mode == COUNT_APPROXIMATE:
+        estimate = approximate_count(queryset)
+        if estimate >= EXACT_COUNT_THRESHOLD:
+            return estimate, True
+        mode = COUNT_EXACT
+    if mode == COUNT_EXACT:
+        return queryset.count(), False
+    return None, False
@@ -0,0 +1,96 @@
+"""
+Integer payroll periods
+
+Months are stored as free-form strings ("JUNE" on PayrollPeriod, "JUN" on
+ChartAggregatedData, either on SalaryData). Those models also carry a database-generated
+`period_index` column = year * 12 + month number, which every period filter and sort uses:
+"last 12 months" becomes one range scan on (tenant, period_index).
+"""
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Trim, Upper
+from django.db.models.lookups import In
+
+MONTH_ABBRS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+MONTH_FULL_NAMES = [
+    'JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE',
+    'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER',
+]
+# Every month spelling recognised by month_number() and the generated period_index columns
+# (upper-cased, without surrounding spaces)
+MONTH_NUMBERS = {
+    **{name: number for number, name in enumerate(MONTH_FULL_NAMES, start=1)},
+    **{abbr: number for number, abbr in enumerate(MONTH_ABBRS, start=1)},
+    **{str(number): number for number in range(1, 13)},
+    **{f"{number:02d}": number for number in range(1, 10)},
+}
+
+
+def month_number(month):
+    """
+    1-12 for a month name, abbreviation or number (any case, surrounding spaces ignored);
+    None if unrecognised. Strings are matched exactly as period_index_expression() does.
+    """
+    if isinstance(month, str):
+        month = month.strip(' ')
+        return MONTH_NUMBERS.get(month.upper()) if month.isascii() else None
+    return month if month and 1 <= int(month) <= 12 else None
+
+
+def period_index(year, month):
+    """Integer period (year * 12 + month) for a year and a month name/abbreviation/number"""
+    month = month_number(month)
+    if not month or not year:
+        return None
+    return int(year) * 12 + month
+
+
+def period_year_month(index):
+    """(year, month number) of an integer period"""
+    year, month = divmod(index - 1, 12)
+    return year, month + 1
+
+
+def period_label(index):
+    """'JUN/2025' style label of an integer period"""
+    year, month = period_year_month(index)
+    return f"{MONTH_ABBRS[month - 1]}/{year}"
+
+
+def period_index_expression(year='year', month='month'):
+    """
+    Database expression for year * 12 + month number, used by the generated period_index
+    columns. Accepts the same strings as month_number(); anything else gives NULL.
+
+    Migrations keep their own copy of the expression: changing it needs a new migration.
+    """
+    return F(year) * 12 + Case(
+        *[
+            When(
+                In(Upper(Trim(month)), sorted(name for name, value in MONTH_NUMBERS.items() if value == number)),
+                then=Value(number),
+            )
+            for number in range(1, 13)
+        ],
+        default=None,
+        output_field=IntegerField(),
+    )
+
+
+def period_date_range(index):
+    """(first day, last day) of an integer period"""
+    import calendar
+    from datetime import date
+
+    year, month = period_year_month(index)
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def period_date_q(indexes, field='date'):
+    """Q matching dates inside any of the given periods, as index-friendly date ranges"""
+    from django.db.models import Q
+
+    q = Q(pk__in=[])
+    for index in sorted(set(indexes)):
+        first_day, last_day = period_date_range(index)
+        q |= Q(**{f'{field}__range': (first_day, last_day)})
+    return q
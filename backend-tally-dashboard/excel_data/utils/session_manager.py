@@ -319,12 +319,10 @@ class SessionManager:
                 }, status=status.HTTP_409_CONFLICT)
                 return True, session_user, error_response
             
-            # Also check JWT token as fallback
-            from rest_framework_simplejwt.authentication import JWTAuthentication
-            jwt_auth = JWTAuthentication()
-            auth_result = jwt_auth.authenticate(request)
-            if auth_result:
-                current_user, token = auth_result
+            # Also check JWT token as fallback (already resolved for this request)
+            from .authentication import get_auth_context
+            current_user = get_auth_context(getattr(request, '_request', request)).user
+            if current_user:
                 
                 # Send SSE notification about JWT token conflict
                 if SSE_AVAILABLE:
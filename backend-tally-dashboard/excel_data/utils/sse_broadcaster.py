@@ -1,12 +1,23 @@
 """
 In-memory SSE broadcaster - No Redis required!
 Works great for development and single-server deployments
+
+Subscribers are either thread queues (sync SSE view under WSGI) or asyncio queues (async SSE
+view under ASGI). publish() may be called from any thread: asyncio queues are fed through
+their event loop with call_soon_threadsafe, so an idle async stream costs no thread.
+
+With SSE_BROADCAST_BACKEND = 'postgres' events are relayed between processes through
+PostgreSQL LISTEN/NOTIFY (see sse_pg_relay.py); the publish/subscribe API is unchanged.
+
+Queue items are event dicts {'event_type', 'data', 'message'}; 'message' is the rendered SSE
+frame, serialized once per event and shared by every subscriber - streams write it as is.
 """
+import asyncio
 import json
 import logging
 import queue
 import threading
-from typing import Dict, Set
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -15,107 +26,246 @@ class InMemorySSEBroadcaster:
     """
     Simple in-memory event broadcaster for SSE
     No external dependencies required - uses only Python standard library
+    
+    Subscriptions are indexed by topic. A subscriber either listens to a whole channel or to a
+    set of topics on it - e.g. user_topic(user) and tenant_topic(tenant) for an authenticated
+    dashboard. An event published with topics only reaches the queues of those topics; an
+    event without topics is a broadcast to everyone on the channel.
+    Each event is rendered to its SSE message once and the same object is handed to every
+    subscriber.
     """
     
-    # Class-level storage for listeners (shared across all instances)
-    _listeners: Dict[str, Set[queue.Queue]] = {}
+    # Class-level storage for listeners (shared across all instances):
+    # index key ("<channel>" or "<channel>|<topic>") -> subscriber queues
+    _listeners: Dict[str, Set[Union[queue.Queue, asyncio.Queue]]] = {}
+    _channels: Dict[str, Set[Union[queue.Queue, asyncio.Queue]]] = {}  # channel -> every queue on it
+    _subscriptions: Dict[Union[queue.Queue, asyncio.Queue], Tuple[str, Tuple[str, ...]]] = {}  # queue -> (channel, index keys)
+    _loops: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}  # event loop of each asyncio queue
     _lock = threading.Lock()
     
+    QUEUE_SIZE = 100
+    
     CHANNEL_NAME = 'session_conflicts'
     
+    @staticmethod
+    def user_topic(user) -> str:
+        return f"user:{getattr(user, 'id', user)}"
+    
+    @staticmethod
+    def tenant_topic(tenant) -> str:
+        return f"tenant:{getattr(tenant, 'id', tenant)}"
+    
     @classmethod
-    def subscribe(cls, channel: str = CHANNEL_NAME) -> queue.Queue:
+    def topics_for_ticket(cls, raw_ticket: Optional[str]) -> Optional[list]:
         """
-        Subscribe to a channel and return a queue for receiving events
+        Topics of the user an SSE ticket was issued to (their user and tenant topics), or None
+        when the ticket is missing, expired or not an SSE ticket - the stream is then refused.
+        EventSource cannot send headers, so streams pass the ticket as a query parameter.
         """
+        if not raw_ticket:
+            return None
+        from .authentication import RequestContextJWTAuthentication, SSETicket
+        
+        try:
+            user = RequestContextJWTAuthentication().get_user(SSETicket(raw_ticket))
+        except Exception as e:
+            logger.debug(f"SSE ticket rejected: {e}")
+            return None
+        topics = [cls.user_topic(user)]
+        if user.tenant_id:
+            topics.append(cls.tenant_topic(user.tenant_id))
+        return topics
+    
+    @staticmethod
+    def _index_keys(channel: str, topics: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        if not topics:
+            return (channel,)
+        return tuple(f"{channel}|{topic}" for topic in dict.fromkeys(topics))
+    
+    @classmethod
+    def _register(cls, event_queue, channel: str, topics: Optional[Iterable[str]]):
+        keys = cls._index_keys(channel, topics)
         with cls._lock:
-            if channel not in cls._listeners:
-                cls._listeners[channel] = set()
-            
-            # Create a queue for this subscriber
-            event_queue = queue.Queue(maxsize=100)
-            cls._listeners[channel].add(event_queue)
-            
-            logger.info(f"New subscriber to channel '{channel}'. Total: {len(cls._listeners[channel])}")
-            return event_queue
+            for key in keys:
+                cls._listeners.setdefault(key, set()).add(event_queue)
+            cls._channels.setdefault(channel, set()).add(event_queue)
+            cls._subscriptions[event_queue] = (channel, keys)
+            total = len(cls._subscriptions)
+        logger.info(f"New subscriber to channel '{channel}' (topics: {list(topics) if topics else 'all'}). Total: {total}")
+    
+    @classmethod
+    def subscribe(cls, channel: str = CHANNEL_NAME, topics: Optional[Iterable[str]] = None) -> queue.Queue:
+        """
+        Subscribe to a channel (or only to some of its topics) and return a queue for receiving events
+        """
+        event_queue = queue.Queue(maxsize=cls.QUEUE_SIZE)
+        cls._register(event_queue, channel, topics)
+        cls._start_relay()
+        return event_queue
+    
+    @classmethod
+    def subscribe_async(cls, channel: str = CHANNEL_NAME, topics: Optional[Iterable[str]] = None) -> asyncio.Queue:
+        """
+        Subscribe from a coroutine and return an asyncio queue bound to the running event loop
+        """
+        event_queue = asyncio.Queue(maxsize=cls.QUEUE_SIZE)
+        with cls._lock:
+            cls._loops[event_queue] = asyncio.get_running_loop()
+        cls._register(event_queue, channel, topics)
+        cls._start_relay()
+        return event_queue
+    
+    @classmethod
+    def _relay(cls):
+        """Cross-process relay (PostgresSSERelay) or None for in-process delivery only"""
+        from .sse_pg_relay import PostgresSSERelay
+        return PostgresSSERelay.get(cls._deliver)
+    
+    @classmethod
+    def _start_relay(cls):
+        """Make sure this process listens for relayed events once it has subscribers"""
+        try:
+            relay = cls._relay()
+            if relay:
+                relay.ensure_listening()
+        except Exception as e:
+            logger.error(f"Could not start SSE relay listener: {e}")
     
     @classmethod
     def unsubscribe(cls, event_queue: queue.Queue, channel: str = CHANNEL_NAME):
         """
-        Unsubscribe from a channel
+        Unsubscribe a queue (from every topic it was subscribed to)
         """
         with cls._lock:
-            if channel in cls._listeners:
-                cls._listeners[channel].discard(event_queue)
-                logger.info(f"Subscriber removed from channel '{channel}'. Remaining: {len(cls._listeners[channel])}")
+            cls._remove(event_queue)
+            remaining = len(cls._subscriptions)
+        logger.info(f"Subscriber removed from channel '{channel}'. Remaining: {remaining}")
+    
+    @classmethod
+    def _remove(cls, event_queue):
+        """Drop a queue from the index; caller holds the lock"""
+        cls._loops.pop(event_queue, None)
+        channel, keys = cls._subscriptions.pop(event_queue, (None, ()))
+        for index, key in ((cls._channels, channel), *((cls._listeners, key) for key in keys)):
+            subscribers = index.get(key)
+            if subscribers is not None:
+                subscribers.discard(event_queue)
+                if not subscribers:
+                    del index[key]
     
     @classmethod
-    def publish(cls, channel: str, event_type: str, data: dict):
+    def publish(cls, channel: str, event_type: str, data: dict, topics: Optional[Iterable[str]] = None):
         """
-        Publish an event to all subscribers of a channel
+        Publish an event on a channel - to the subscribers of the given topics, or to everyone
+        on the channel without topics - in every process when relayed
         """
         event_data = {
             'event_type': event_type,
             'data': data
         }
+        topics = list(topics or ())
+        
+        logger.info(f"📡 Publishing event: {event_type} to channel: {channel} (topics: {topics or 'none'})")
+        logger.debug(f"📡 Event data: {data}")
+        
+        relay = cls._relay()
+        if relay and relay.notify(channel, event_data, topics):
+            # Every listening process - this one included - delivers it from its relay listener.
+            # A process whose listener is down (reconnecting) would miss it: deliver here.
+            if not relay.listening.is_set():
+                cls._deliver(channel, event_data, topics)
+            return
         
-        logger.info(f"📡 Publishing event: {event_type} to channel: {channel}")
-        logger.info(f"📡 Event data: {data}")
+        cls._deliver(channel, event_data, topics)
+    
+    @classmethod
+    def _deliver(cls, channel: str, event_data: dict, topics: Iterable[str] = ()):
+        """
+        Hand an event to the interested subscribers of this process
+        """
+        event_type = event_data.get('event_type', 'unknown')
+        # Rendered once; every subscriber gets the same (read-only) event dict
+        event_data = {
+            **event_data,
+            'message': f"event: {event_type}\ndata: {json.dumps(event_data.get('data', {}), default=str)}\n\n",
+        }
         
         with cls._lock:
-            if channel not in cls._listeners or not cls._listeners[channel]:
-                logger.warning(f"⚠️ No subscribers for channel '{channel}'")
-                return
+            if topics:
+                targets = set()
+                for key in cls._index_keys(channel, topics):
+                    targets.update(cls._listeners.get(key, ()))
+            else:
+                targets = set(cls._channels.get(channel, ()))
             
-            subscriber_count = len(cls._listeners[channel])
-            logger.info(f"📡 Sending to {subscriber_count} subscribers")
-            
-            # Send to all subscribers
-            dead_queues = set()
+            dead_queues = []
             sent_count = 0
-            for event_queue in cls._listeners[channel]:
+            for event_queue in targets:
                 try:
-                    # Non-blocking put - if queue is full, skip this subscriber
-                    event_queue.put_nowait(event_data)
+                    loop = cls._loops.get(event_queue)
+                    if loop is not None:
+                        # asyncio queues are not thread-safe: hand the put to their event loop
+                        loop.call_soon_threadsafe(cls._put_async, event_queue, event_data)
+                    else:
+                        # Non-blocking put - if queue is full, skip this subscriber
+                        event_queue.put_nowait(event_data)
                     sent_count += 1
                 except queue.Full:
-                    logger.warning(f"Subscriber queue full, skipping event")
+                    logger.warning("Subscriber queue full, skipping event")
                 except Exception as e:
                     logger.error(f"Error sending to subscriber: {e}")
-                    dead_queues.add(event_queue)
+                    dead_queues.append(event_queue)
             
-            # Clean up dead queues
+            # Clean up dead queues (including asyncio queues whose event loop has closed)
             for dead_queue in dead_queues:
-                cls._listeners[channel].discard(dead_queue)
-            
-            logger.info(f"✅ Published {event_type} to {sent_count}/{subscriber_count} subscribers")
+                cls._remove(dead_queue)
+        
+        if targets:
+            logger.info(f"✅ Published {event_type} to {sent_count}/{len(targets)} subscribers")
+        else:
+            logger.debug(f"No subscribers for {event_type} on channel '{channel}'")
+    
+    @staticmethod
+    def _put_async(event_queue: asyncio.Queue, event_data: dict):
+        """Runs on the subscriber's event loop"""
+        try:
+            event_queue.put_nowait(event_data)
+        except asyncio.QueueFull:
+            logger.warning("Async subscriber queue full, skipping event")
     
     @classmethod
     def get_subscriber_count(cls, channel: str = CHANNEL_NAME) -> int:
         """
-        Get the number of active subscribers for a channel
+        Get the number of active subscribers for a channel (whole-channel and topic subscribers)
         """
         with cls._lock:
-            return len(cls._listeners.get(channel, set()))
+            return len(cls._channels.get(channel, ()))
 
 
 class SSENotifier:
     """Simplified SSE notifier using in-memory broadcasting"""
     
     @staticmethod
-    def publish_conflict_event(event_type, data):
+    def publish_conflict_event(event_type, data, users=(), tenants=()):
         """
         Publish a session conflict event
         
         Args:
             event_type: Type of conflict ('ip_conflict', 'session_conflict', 'login_attempt')
             data: Dictionary containing event details
+            users: Users the event concerns - it goes to their own streams only, never to the
+                   other sessions of their tenant
+            tenants: Tenants whose every stream gets the event (tenant-wide events)
+            Everyone on the channel gets it when both are empty.
         """
+        topics = [InMemorySSEBroadcaster.user_topic(user) for user in users]
+        topics += [InMemorySSEBroadcaster.tenant_topic(tenant) for tenant in tenants]
         try:
             InMemorySSEBroadcaster.publish(
                 InMemorySSEBroadcaster.CHANNEL_NAME,
                 event_type,
-                data
+                data,
+                topics=topics
             )
             logger.info(f"Published SSE event: {event_type} for IP: {data.get('ip_address', 'unknown')}")
         except Exception as e:
@@ -147,7 +297,7 @@ class SSENotifier:
                 'role': attempting_user.role
             }
         
-        SSENotifier.publish_conflict_event('ip_conflict', data)
+        SSENotifier.publish_conflict_event('ip_conflict', data, users=[u for u in (existing_user, attempting_user) if u])
     
     @staticmethod
     def notify_session_conflict(user, ip_address):
@@ -167,7 +317,7 @@ class SSENotifier:
             }
         }
         
-        SSENotifier.publish_conflict_event('session_conflict', data)
+        SSENotifier.publish_conflict_event('session_conflict', data, users=[user])
     
     @staticmethod
     def notify_login_attempt_blocked(user, ip_address, reason):
@@ -189,7 +339,7 @@ class SSENotifier:
             'reason': reason
         }
         
-        SSENotifier.publish_conflict_event('login_attempt_blocked', data)
+        SSENotifier.publish_conflict_event('login_attempt_blocked', data, users=[user])
     
     @staticmethod
     def notify_force_logout(user, ip_address, reason):
@@ -212,5 +362,5 @@ class SSENotifier:
             'action': 'force_logout'
         }
         
-        SSENotifier.publish_conflict_event('force_logout', data)
+        SSENotifier.publish_conflict_event('force_logout', data, users=[user])
 
@@ -0,0 +1,133 @@
+"""
+Cross-process SSE relay over PostgreSQL LISTEN/NOTIFY
+
+InMemorySSEBroadcaster only reaches subscribers of its own process, so an event published by
+one gunicorn worker (e.g. a force-logout from a login request) never reached streams held by
+other workers or nodes. With SSE_BROADCAST_BACKEND = 'postgres' publish() sends the event as
+a NOTIFY on the database we already run, and every process that has SSE subscribers keeps one
+LISTEN connection (a daemon thread) that hands received events to its local subscribers -
+including the publishing process, so each subscriber gets an event exactly once.
+
+NOTIFY issued inside a transaction is delivered on commit (and dropped on rollback). Payloads
+over Postgres' 8000 byte limit, non-Postgres databases and NOTIFY errors fall back to
+in-process delivery.
+"""
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'hrms_sse_events'
+MAX_PAYLOAD_BYTES = 7999
+POLL_SECONDS = 5
+MAX_RECONNECT_DELAY = 30
+
+
+class PostgresSSERelay:
+    """One LISTEN connection per process, relaying NOTIFY payloads to a local deliver callback"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, deliver):
+        self._deliver = deliver  # deliver(channel, event_data, topics): local fan-out
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.listening = threading.Event()  # set while the LISTEN connection is up
+
+    @classmethod
+    def get(cls, deliver):
+        """The process relay, or None when SSE_BROADCAST_BACKEND is not 'postgres' on a Postgres database"""
+        if getattr(settings, 'SSE_BROADCAST_BACKEND', 'memory') != 'postgres':
+            return None
+        if connections['default'].vendor != 'postgresql':
+            return None
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(deliver)
+            return cls._instance
+
+    def notify(self, channel, event_data, topics=()):
+        """
+        Send an event to every process; False if it could not be sent (caller delivers locally)
+        """
+        payload = json.dumps({'channel': channel, 'event': event_data, 'topics': list(topics)}, default=str)
+        if len(payload.encode('utf-8')) > MAX_PAYLOAD_BYTES:
+            logger.warning(f"SSE event too large for NOTIFY ({len(payload)} bytes) - delivering in-process only")
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, payload])
+            return True
+        except Exception as e:
+            logger.error(f"SSE NOTIFY failed, delivering in-process only: {e}")
+            return False
+
+    def ensure_listening(self):
+        """Start this process's listener thread (once)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._listen_forever, name='sse-pg-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the listener; with a timeout, wait that long for its connection to close"""
+        self._stopped.set()
+        thread = self._thread
+        if timeout and thread is not None:
+            thread.join(timeout)
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        params = connections['default'].get_connection_params()
+        params.pop('cursor_factory', None)
+        conn = psycopg2.connect(**params)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        return conn
+
+    def _listen_forever(self):
+        import select
+
+        delay = 1
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                self.listening.set()
+                delay = 1
+                logger.info(f"SSE relay listening on '{NOTIFY_CHANNEL}'")
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"SSE relay listener error, reconnecting in {delay}s: {e}")
+                self._stopped.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            finally:
+                self.listening.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, payload):
+        try:
+            message = json.loads(payload)
+            self._deliver(message['channel'], message['event'], message.get('topics') or ())
+        except Exception as e:
+            logger.error(f"Invalid SSE relay payload: {e}")
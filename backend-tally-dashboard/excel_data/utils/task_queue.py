@@ -0,0 +1,348 @@
+"""
+Durable background tasks in PostgreSQL (no Redis required)
+
+With CELERY_ENABLED=False background work used to run in daemon threads, so a deploy or a
+worker recycle silently dropped in-flight payroll and chart aggregation. run_in_background()
+now stores the call as a BackgroundTask row instead (BACKGROUND_TASKS_BACKEND = 'database'):
+
+- the row is written in the caller's transaction, so a task exists exactly when the data it
+  processes was committed;
+- workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED. Claims are serialized by a
+  transaction-level advisory lock, so at most BACKGROUND_TASKS_TENANT_CONCURRENCY tasks of
+  one tenant run at a time across all workers;
+- a failing task is retried BACKGROUND_TASKS_MAX_ATTEMPTS times with exponential backoff;
+- a running task's claim is refreshed by a heartbeat. A claim older than
+  BACKGROUND_TASKS_LOCK_TIMEOUT (its worker died) is released and the task runs again;
+- enqueue_coalesced() merges duplicate calls sharing a dedupe key into one pending task,
+  and a task is not claimed while another task with its key is running. A task going back
+  to pending (retry, dead worker) while a newer call with its key is pending merges into
+  that task.
+
+Tasks are run by the `run_task_worker` management command and, unless
+BACKGROUND_TASKS_IN_PROCESS_WORKER is off, by worker threads that a web process starts the
+first time it enqueues a task. Pending tasks survive restarts either way.
+
+Task functions must be module-level functions or class/static methods; their arguments must
+be JSON-serializable (pass ids, not model instances).
+"""
+import importlib
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serializing claims (any constant shared by all workers)
+CLAIM_LOCK_KEY = 7_340_019
+POLL_SECONDS = 5
+
+
+def _setting(name, default):
+    return getattr(settings, f'BACKGROUND_TASKS_{name}', default)
+
+
+def func_path(func):
+    """'module:qualname' of a task function"""
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def resolve_func(path):
+    """The function behind a 'module:qualname' path"""
+    module_name, qualname = path.split(':', 1)
+    target = importlib.import_module(module_name)
+    for attr in qualname.split('.'):
+        target = getattr(target, attr)
+    return target
+
+
+def enqueue(func, *args, tenant_id=None, max_attempts=None, delay=0, dedupe_key='', merge=None, **kwargs):
+    """
+    Store a call of func(*args, **kwargs) as a pending BackgroundTask and wake this process's
+    worker once the surrounding transaction commits; returns the task
+    """
+    from ..models import BackgroundTask
+
+    task = BackgroundTask.objects.create(
+        func=func_path(func),
+        args=list(args),
+        kwargs=kwargs,
+        tenant_id=tenant_id,
+        dedupe_key=dedupe_key,
+        merge=func_path(merge) if merge else '',
+        max_attempts=max_attempts or _setting('MAX_ATTEMPTS', 3),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    logger.info(f"🗂️ Queued background task {task.id}: {task.func}")
+    if _setting('IN_PROCESS_WORKER', True):
+        transaction.on_commit(InProcessWorkers.wake)
+    return task
+
+
+def enqueue_coalesced(func, *args, key, tenant_id=None, merge=None, window=None, max_wait=None, **kwargs):
+    """
+    Like enqueue(), but calls sharing `key` that arrive within `window` seconds of each
+    other merge into one pending task
+
+    Each duplicate replaces the pending task's arguments (merge(old_kwargs, new_kwargs), a
+    module-level function, may combine them instead) and pushes its start back by `window`, but never later than
+    `max_wait` seconds after the first call. Returns (task, created).
+    """
+    from ..models import BackgroundTask
+
+    window = _setting('COALESCE_WINDOW', 5) if window is None else window
+    max_wait = _setting('COALESCE_MAX_WAIT', 60) if max_wait is None else max_wait
+    now = timezone.now()
+
+    while True:
+        with transaction.atomic():
+            # Waits for a worker claiming the task; once claimed it is no longer pending and
+            # this call queues a new task, which runs after the claimed one finishes
+            pending = (
+                BackgroundTask.objects.select_for_update()
+                .filter(dedupe_key=key, status=BackgroundTask.STATUS_PENDING)
+                .first()
+            )
+            if pending is not None:
+                pending.args = list(args)
+                pending.kwargs = merge(pending.kwargs, kwargs) if merge else kwargs
+                pending.run_after = min(now + timedelta(seconds=window), pending.created_at + timedelta(seconds=max_wait))
+                pending.save(update_fields=['args', 'kwargs', 'run_after'])
+                logger.info(f"🗂️ Coalesced into background task {pending.id}: {key}")
+                return pending, False
+        try:
+            with transaction.atomic():
+                task = enqueue(func, *args, tenant_id=tenant_id, delay=window, dedupe_key=key, merge=merge, **kwargs)
+            return task, True
+        except IntegrityError:
+            # Another request queued the same key first: merge into its task
+            continue
+
+
+def run_in_background(func, *args, tenant_id=None, **kwargs):
+    """
+    Run func(*args, **kwargs) after the current transaction commits, outside the request
+
+    'database' backend (default): a durable BackgroundTask. 'thread': a daemon thread, as
+    before the task queue existed (lost on restart, no retries).
+    """
+    if _setting('BACKEND', 'database') == 'database':
+        return enqueue(func, *args, tenant_id=tenant_id, **kwargs)
+
+    def _run():
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ [Thread] Background task {func_path(func)} failed: {e}")
+        finally:
+            # Close database connection in this thread
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=_run, daemon=True).start())
+    return None
+
+
+class TaskWorker:
+    """Claims and runs BackgroundTask rows, one at a time"""
+
+    def __init__(self, name=None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.tenant_concurrency = _setting('TENANT_CONCURRENCY', 2)
+        self.lock_timeout = _setting('LOCK_TIMEOUT', 30 * 60)
+        self.retry_delay = _setting('RETRY_DELAY', 60)
+
+    def claim(self):
+        """Claim the next runnable task (None if there is none)"""
+        from ..models import BackgroundTask
+
+        now = timezone.now()
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_KEY])
+
+            # Claims of dead workers: the task runs again
+            stale = list(BackgroundTask.objects.filter(
+                status=BackgroundTask.STATUS_RUNNING,
+                locked_at__lt=now - timedelta(seconds=self.lock_timeout),
+            ).values_list('id', flat=True))
+            for task_id in stale:
+                self._requeue(task_id, run_after=now)
+            if stale:
+                logger.warning(f"⚠️ Released {len(stale)} background task(s) of unresponsive workers")
+
+            busy_tenants = (
+                BackgroundTask.objects.filter(status=BackgroundTask.STATUS_RUNNING, tenant__isnull=False)
+                .values('tenant').annotate(running=Count('id'))
+                .filter(running__gte=self.tenant_concurrency).values('tenant')
+            )
+            running_keys = (
+                BackgroundTask.objects.filter(status=BackgroundTask.STATUS_RUNNING)
+                .exclude(dedupe_key='').values('dedupe_key')
+            )
+            task = (
+                BackgroundTask.objects.select_for_update(skip_locked=True)
+                .filter(status=BackgroundTask.STATUS_PENDING, run_after__lte=now)
+                .exclude(tenant__in=busy_tenants)
+                .exclude(dedupe_key__in=running_keys)
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if task is None:
+                return None
+
+            task.status = BackgroundTask.STATUS_RUNNING
+            task.attempts += 1
+            task.locked_by = self.name
+            task.locked_at = now
+            task.save(update_fields=['status', 'attempts', 'locked_by', 'locked_at'])
+            return task
+
+    def execute(self, task):
+        """Run a claimed task and record the outcome (retry, failure or success)"""
+        from ..models import BackgroundTask
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task.id, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            resolve_func(task.func)(*task.args, **task.kwargs)
+        except Exception as e:
+            error = f"{e}\n{traceback.format_exc()}"
+            if task.attempts < task.max_attempts:
+                delay = self.retry_delay * 2 ** (task.attempts - 1)
+                logger.warning(f"⚠️ Background task {task.id} ({task.func}) failed, retrying in {delay}s: {e}")
+                self._requeue(task.id, run_after=timezone.now() + timedelta(seconds=delay), last_error=error)
+            else:
+                logger.error(f"❌ Background task {task.id} ({task.func}) failed after {task.attempts} attempt(s): {e}")
+                BackgroundTask.objects.filter(id=task.id).update(
+                    status=BackgroundTask.STATUS_FAILED, finished_at=timezone.now(), last_error=error,
+                    locked_by='', locked_at=None,
+                )
+        else:
+            BackgroundTask.objects.filter(id=task.id).update(
+                status=BackgroundTask.STATUS_SUCCEEDED, finished_at=timezone.now(), locked_by='', locked_at=None,
+            )
+            logger.info(f"✅ Background task {task.id} ({task.func}) succeeded")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+    def _requeue(self, task_id, run_after, last_error=None):
+        """
+        Return a claimed task to pending, to run again at run_after
+
+        Only one task per dedupe key may be pending. If a call with the task's key was queued
+        while it ran, that pending task takes this one over: it gets the merged arguments, the
+        attempts so far and the later start, and this task is closed as failed.
+        """
+        from ..models import BackgroundTask
+
+        while True:
+            try:
+                with transaction.atomic():
+                    task = BackgroundTask.objects.select_for_update().get(id=task_id)
+                    error = task.last_error if last_error is None else last_error
+                    pending = None
+                    if task.dedupe_key:
+                        pending = (
+                            BackgroundTask.objects.select_for_update()
+                            .filter(dedupe_key=task.dedupe_key, status=BackgroundTask.STATUS_PENDING)
+                            .first()
+                        )
+                    if pending is None:
+                        BackgroundTask.objects.filter(id=task.id).update(
+                            status=BackgroundTask.STATUS_PENDING, run_after=run_after, last_error=error,
+                            locked_by='', locked_at=None,
+                        )
+                        return
+
+                    if task.merge:
+                        pending.kwargs = resolve_func(task.merge)(task.kwargs, pending.kwargs)
+                    pending.attempts = max(pending.attempts, task.attempts)
+                    pending.run_after = max(pending.run_after, run_after)
+                    pending.save(update_fields=['kwargs', 'attempts', 'run_after'])
+                    BackgroundTask.objects.filter(id=task.id).update(
+                        status=BackgroundTask.STATUS_FAILED, finished_at=timezone.now(),
+                        last_error=f"{error}\nMerged into pending task {pending.id}".lstrip(),
+                        locked_by='', locked_at=None,
+                    )
+                    logger.info(f"🗂️ Merged background task {task.id} into pending task {pending.id}: {task.dedupe_key}")
+                    return
+            except IntegrityError:
+                # A call with the key was queued meanwhile: merge into it
+                continue
+
+    def _heartbeat(self, task_id, stop):
+        """Refresh the claim of a long task so it is not taken for a dead worker's"""
+        from ..models import BackgroundTask
+        try:
+            while not stop.wait(max(self.lock_timeout / 3, 1)):
+                BackgroundTask.objects.filter(id=task_id, locked_by=self.name).update(locked_at=timezone.now())
+        finally:
+            connection.close()
+
+    def run_pending(self, max_tasks=None):
+        """Run runnable tasks until there are none left (or max_tasks ran); returns the count"""
+        count = 0
+        while max_tasks is None or count < max_tasks:
+            task = self.claim()
+            if task is None:
+                break
+            self.execute(task)
+            count += 1
+        return count
+
+    def run_forever(self, poll_seconds=POLL_SECONDS, wake_event=None):
+        """Poll for tasks until the process exits; wake_event cuts the wait short"""
+        wake_event = wake_event or threading.Event()
+        while True:
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"❌ Background task worker {self.name} error: {e}")
+                connection.close()
+            wake_event.wait(poll_seconds)
+            wake_event.clear()
+
+
+def purge_finished_tasks(days=7):
+    """Delete succeeded and failed tasks finished more than `days` days ago"""
+    from ..models import BackgroundTask
+    deleted, _ = BackgroundTask.objects.filter(
+        status__in=[BackgroundTask.STATUS_SUCCEEDED, BackgroundTask.STATUS_FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+class InProcessWorkers:
+    """Worker threads inside a web process, started on the first enqueue"""
+
+    _threads = []
+    _wake_event = threading.Event()
+    _lock = threading.Lock()
+
+    @classmethod
+    def wake(cls):
+        with cls._lock:
+            if not cls._threads:
+                for i in range(_setting('IN_PROCESS_THREADS', 2)):
+                    worker = TaskWorker(name=f"{socket.gethostname()}:{os.getpid()}:inproc-{i}")
+                    thread = threading.Thread(
+                        target=worker.run_forever,
+                        kwargs={'wake_event': cls._wake_event},
+                        name=f'background-task-worker-{i}',
+                        daemon=True,
+                    )
+                    thread.start()
+                    cls._threads.append(thread)
+                logger.info(f"🗂️ Started {len(cls._threads)} in-process background task worker(s)")
+        cls._wake_event.set()
@@ -0,0 +1,23 @@
+"""
+Current-tenant thread local helpers
+
+Kept free of heavy dependencies: the models and the tenant middleware import this module,
+so everything it imports is paid by every Django process at startup.
+"""
+import threading
+
+# Thread local storage for current tenant
+_thread_local = threading.local()
+
+def set_current_tenant(tenant):
+    """Set the current tenant in thread local storage"""
+    _thread_local.tenant = tenant
+
+def get_current_tenant():
+    """Get the current tenant from thread local storage"""
+    return getattr(_thread_local, 'tenant', None)
+
+def clear_current_tenant():
+    """Clear the current tenant from thread local storage"""
+    if hasattr(_thread_local, 'tenant'):
+        delattr(_thread_local, 'tenant')
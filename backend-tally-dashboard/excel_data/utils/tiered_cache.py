@@ -0,0 +1,376 @@
+"""
+Tiered cache backend
+
+A per-process LRU tier in front of a shared cache alias (Redis, the database cache table,
+or LocMemCache as a local stand-in). Hot keys such as frontend_charts_*, directory_data_*
+and attendance_all_records_* are served from process memory without a round trip, while
+every write goes through to the shared tier.
+
+Adds delete_pattern(pattern) / delete_prefix(prefix), supported on every shared backend, so
+existing `cache.delete_pattern(f"frontend_charts_{tenant_id}_*")` calls actually invalidate.
+
+incr() is atomic on every shared backend: Redis and LocMemCache increment in place, and the
+DatabaseCache (whose own incr() is a get + set that loses concurrent increments) is
+incremented inside one transaction holding the row lock.
+
+Cross-process coherence: every delete / delete_pattern / incr / clear writes a new epoch token to
+the shared tier. Each process re-reads that epoch at most once per SYNC_INTERVAL seconds and
+flushes its local tier when it changed. Local entries also expire after LOCAL_TIMEOUT
+seconds, which bounds how long a value overwritten by another process can be served.
+
+Costs: an epoch change flushes the whole local tier of every process, so frequent deletes
+turn the local tier into a pass-through. Keys that change often and are cheap to read (the
+cache generation counters of cache_service) are listed in SHARED_ONLY_PREFIXES: they are
+never held locally, and writing or deleting them does not touch the epoch. Local hits are
+copies, so every hit unpickles the stored value; immutable scalars (int, str, ...) are kept
+as-is and returned without a copy.
+
+Settings:
+    CACHES = {
+        'default': {
+            'BACKEND': 'excel_data.utils.tiered_cache.TieredCache',
+            'LOCATION': 'shared',          # alias of the shared tier
+            'OPTIONS': {
+                'LOCAL_MAX_ENTRIES': 256,  # LRU size per process
+                'LOCAL_TIMEOUT': 10,       # max seconds a value lives in the local tier
+                'SYNC_INTERVAL': 1,        # seconds between epoch checks
+                'SHARED_ONLY_PREFIXES': ('cache_generation_',),  # never held locally
+            },
+        },
+        'shared': {...},
+    }
+"""
+import base64
+import fnmatch
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+EPOCH_KEY = '__tiered_cache_epoch__'
+
+# Values immutable enough to hand out without a copy
+IMMUTABLE_TYPES = (type(None), bool, int, float, str, bytes)
+
+
+class TieredCache(BaseCache):
+    """
+    Local LRU tier + shared tier cache backend with pattern deletes
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location or 'shared'
+        self._local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 256))
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 10))
+        self._sync_interval = float(options.get('SYNC_INTERVAL', 1))
+        self._shared_only_prefixes = tuple(options.get('SHARED_ONLY_PREFIXES', ()))
+
+        self._local = OrderedDict()  # made key -> (expires_at, pickled value or immutable value, is_pickled)
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_checked_at = 0.0
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # ==================== Local tier ====================
+
+    def _is_shared_only(self, key):
+        return key.startswith(self._shared_only_prefixes)
+
+    def _local_get(self, made_key):
+        """Local entry as (value, is_pickled), or None"""
+        with self._lock:
+            entry = self._local.get(made_key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._local[made_key]
+                return None
+            self._local.move_to_end(made_key)
+            return entry[1:]
+
+    def _local_set(self, key, made_key, value, timeout):
+        if self._is_shared_only(key):
+            return
+        local_timeout = self._local_timeout
+        if timeout is not None:
+            if timeout <= 0:
+                self._local_discard(made_key)
+                return
+            local_timeout = min(local_timeout, timeout)
+        if local_timeout <= 0:
+            return
+
+        if isinstance(value, IMMUTABLE_TYPES):
+            entry = (time.monotonic() + local_timeout, value, False)
+        else:
+            entry = (time.monotonic() + local_timeout, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), True)
+        with self._lock:
+            self._local[made_key] = entry
+            self._local.move_to_end(made_key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_discard(self, *made_keys):
+        with self._lock:
+            for made_key in made_keys:
+                self._local.pop(made_key, None)
+
+    def _local_clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def _sync_epoch(self):
+        """Flush the local tier when another process invalidated the shared tier"""
+        now = time.monotonic()
+        if now - self._epoch_checked_at < self._sync_interval:
+            return
+        self._epoch_checked_at = now
+        epoch = self.shared.get(EPOCH_KEY)
+        if epoch != self._epoch:
+            if self._epoch is not None:
+                self._local_clear()
+            self._epoch = epoch
+
+    def _bump_epoch(self):
+        self._epoch = uuid.uuid4().hex
+        self.shared.set(EPOCH_KEY, self._epoch, None)
+        self._epoch_checked_at = time.monotonic()
+
+    def _timeout(self, timeout):
+        """Resolve DEFAULT_TIMEOUT to this cache's default; keeps the value relative (seconds)"""
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _decode(self, entry):
+        value, is_pickled = entry
+        return pickle.loads(value) if is_pickled else value
+
+    # ==================== Cache API ====================
+
+    def get(self, key, default=None, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._sync_epoch()
+
+        entry = self._local_get(made_key)
+        if entry is not None:
+            return self._decode(entry)
+
+        sentinel = object()
+        value = self.shared.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._local_set(key, made_key, value, self._local_timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync_epoch()
+        found = {}
+        missing = []
+        for key in keys:
+            made_key = self.make_and_validate_key(key, version=version)
+            entry = self._local_get(made_key)
+            if entry is not None:
+                found[key] = self._decode(entry)
+            else:
+                missing.append(key)
+
+        if missing:
+            for key, value in self.shared.get_many(missing, version=version).items():
+                self._local_set(key, self.make_key(key, version=version), value, self._local_timeout)
+                found[key] = value
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(key, made_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(key, self.make_and_validate_key(key, version=version), value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._local_set(key, made_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.make_and_validate_key(key, version=version)
+        return self.shared.touch(key, self._timeout(timeout), version=version)
+
+    def has_key(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._sync_epoch()
+        if self._local_get(made_key) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._local_discard(made_key)
+        value = incr_from(self.shared, key, delta, version=version)
+        if not self._is_shared_only(key):
+            self._bump_epoch()  # counters must not stay stale in other processes
+        return value
+
+    def delete(self, key, version=None):
+        made_key = self.make_and_validate_key(key, version=version)
+        self._local_discard(made_key)
+        deleted = self.shared.delete(key, version=version)
+        if not self._is_shared_only(key):
+            self._bump_epoch()
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._local_discard(*(self.make_and_validate_key(key, version=version) for key in keys))
+        self.shared.delete_many(keys, version=version)
+        self._bump_epoch()
+
+    def clear(self):
+        self._local_clear()
+        self.shared.clear()
+        self._bump_epoch()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    # ==================== Pattern / prefix deletion ====================
+
+    def delete_pattern(self, pattern, version=None):
+        """
+        Delete every key matching a glob pattern (e.g. "frontend_charts_5_*") from both tiers.
+
+        Returns:
+            int: Number of keys removed from the shared tier
+        """
+        local_pattern = self.make_key(pattern, version=version)
+        with self._lock:
+            for made_key in [k for k in self._local if fnmatch.fnmatchcase(k, local_pattern)]:
+                del self._local[made_key]
+
+        deleted = delete_pattern_from(self.shared, pattern, version=version)
+        self._bump_epoch()
+        return deleted
+
+    def delete_prefix(self, prefix, version=None):
+        """Delete every key starting with prefix from both tiers"""
+        return self.delete_pattern(f"{prefix}*", version=version)
+
+
+def incr_from(cache, key, delta=1, version=None):
+    """
+    Atomically increment a counter in a single (non-tiered) Django cache backend.
+
+    DatabaseCache.incr() reads and rewrites the value in separate statements, so two
+    concurrent increments can both write N + 1; here the row is locked for the update.
+    Raises ValueError when the key does not exist, like BaseCache.incr().
+    """
+    from django.core.cache.backends.db import DatabaseCache
+
+    if not isinstance(cache, DatabaseCache):
+        return cache.incr(key, delta, version=version)
+
+    from django.db import connections, router, transaction
+    from django.utils import timezone
+
+    made_key = cache.make_and_validate_key(key, version=version)
+    db = router.db_for_write(cache.cache_model_class)
+    connection = connections[db]
+    table = connection.ops.quote_name(cache._table)
+    lock = ' FOR UPDATE' if connection.features.has_select_for_update else ''
+    now = connection.ops.adapt_datetimefield_value(timezone.now().replace(microsecond=0))
+
+    with transaction.atomic(using=db), connection.cursor() as cursor:
+        cursor.execute(f"SELECT value FROM {table} WHERE cache_key = %s AND expires >= %s{lock}", [made_key, now])
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        value = pickle.loads(base64.b64decode(row[0].encode())) + delta
+        encoded = base64.b64encode(pickle.dumps(value, cache.pickle_protocol)).decode('latin1')
+        cursor.execute(f"UPDATE {table} SET value = %s WHERE cache_key = %s", [encoded, made_key])
+    return value
+
+
+def delete_pattern_from(cache, pattern, version=None):
+    """
+    Delete keys matching a glob pattern from a single (non-tiered) Django cache backend.
+
+    Supports django-redis style backends (native delete_pattern), Django's RedisCache,
+    DatabaseCache and LocMemCache. Returns the number of deleted keys.
+    """
+    if hasattr(cache, 'delete_pattern'):
+        return cache.delete_pattern(pattern, version=version) or 0
+
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    made_pattern = cache.make_key(pattern, version=version)
+
+    if isinstance(cache, LocMemCache):
+        with cache._lock:
+            matches = [k for k in cache._cache if fnmatch.fnmatchcase(k, made_pattern)]
+            for made_key in matches:
+                cache._delete(made_key)
+        return len(matches)
+
+    if isinstance(cache, DatabaseCache):
+        from django.db import connections, router
+
+        db = router.db_for_write(cache.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(cache._table)
+        like = _glob_to_like(made_pattern)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE cache_key LIKE %s ESCAPE '\\'", [like])
+            return cursor.rowcount
+
+    try:
+        from django.core.cache.backends.redis import RedisCache
+    except ImportError:  # pragma: no cover - Django < 4.0
+        RedisCache = None
+
+    if RedisCache is not None and isinstance(cache, RedisCache):
+        client = cache._cache.get_client(write=True)
+        matches = list(client.scan_iter(match=made_pattern, count=1000))
+        if matches:
+            client.delete(*matches)
+        return len(matches)
+
+    logger.warning(f"delete_pattern not supported for {type(cache).__name__}, clearing cache instead")
+    cache.clear()
+    return 0
+
+
+def _glob_to_like(pattern):
+    """Translate a glob pattern (* and ?) to an SQL LIKE pattern with '\\' as the escape character"""
+    like = []
+    for c in pattern:
+        if c == '*':
+            like.append('%')
+        elif c == '?':
+            like.append('_')
+        elif c in '%_\\':
+            like.append('\\' + c)
+        else:
+            like.append(c)
+    return ''.join(like)
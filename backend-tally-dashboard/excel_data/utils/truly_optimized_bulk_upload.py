@@ -7,7 +7,6 @@ import numpy as np
 from datetime import datetime, time
 from decimal import Decimal
 from typing import Dict, List, Any
-from io import BytesIO
 from django.db import transaction, connection
 from django.utils import timezone
 from ..models import EmployeeProfile
@@ -36,7 +35,7 @@ class TrulyOptimizedBulkUploadService:
         try:
             start_time = datetime.now()
             
-            # Read Excel file
+            # Stream the Excel file into typed columns
             df = self._read_excel_fast(file)
             logger.info(f"📖 Read {len(df)} rows in {(datetime.now() - start_time).total_seconds():.2f}s")
             
@@ -68,9 +67,9 @@ class TrulyOptimizedBulkUploadService:
             return self._create_result(0, 0, [str(e)], 0)
     
     def _read_excel_fast(self, file) -> pd.DataFrame:
-        """Read Excel with minimal processing"""
-        file_content = file.read()
-        return pd.read_excel(BytesIO(file_content), engine='openpyxl')
+        """Read Excel with minimal processing (openpyxl read-only streaming, no copy of the upload)"""
+        from .upload_reader import read_upload
+        return read_upload(file, numeric_columns=['Basic Salary', 'TDS (%)', 'OT Rate (per hour)'])
     
     def _preprocess_ultra_fast(self, df: pd.DataFrame) -> pd.DataFrame:
         """Ultra-fast preprocessing with defaults"""
@@ -0,0 +1,234 @@
+"""
+Reader for Excel/CSV uploads
+
+pd.read_excel loads the whole workbook (openpyxl's full cell tree) and then builds an object
+DataFrame of it before any validation runs. read_upload instead walks .xlsx sheets in
+openpyxl read-only mode (rows are parsed from the XML as they are consumed) and CSV files with
+pandas' chunked parser, typing UPLOAD_CHUNK_ROWS rows at a time, so the parsed workbook is
+never held in memory. read_upload returns one DataFrame, for the synchronous upload views;
+the upload job worker reads the same chunks with upload_chunks and never holds the whole
+sheet (services/upload_job_service.py). The values match pd.read_excel: integral numbers
+become ints, trailing blank rows are dropped, the usual NA strings and Excel error values
+become NaN and the index continues across chunks.
+
+Uploads are checked before any row is parsed: size (UPLOAD_MAX_BYTES), extension, file
+signature and, for .xlsx, the sheet's declared dimensions (UPLOAD_MAX_ROWS, which is enforced
+again while reading). Problems raise UploadFileError with a message for the user.
+
+Legacy .xls files have no streaming reader; they are read with pd.read_excel and chunked.
+"""
+import logging
+from typing import Iterable, Iterator, Optional, Sequence
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+XLSX_SIGNATURE = b'PK\x03\x04'
+XLS_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Strings pd.read_excel reads as NaN, plus the Excel error values it drops
+NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+    '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#NULL!',
+})
+
+
+class UploadFileError(ValueError):
+    """An upload that cannot be read; the message is safe to return to the user"""
+
+
+def _limits(chunk_rows=None, max_rows=None):
+    chunk_rows = chunk_rows or getattr(settings, 'UPLOAD_CHUNK_ROWS', 2000)
+    max_rows = max_rows or getattr(settings, 'UPLOAD_MAX_ROWS', 50000)
+    return chunk_rows, max_rows
+
+
+def check_upload(file_obj, extensions: Sequence[str] = SPREADSHEET_EXTENSIONS, max_bytes: Optional[int] = None) -> str:
+    """
+    Reject an upload by size, extension or signature before reading it; returns the extension
+    """
+    name = (getattr(file_obj, 'name', '') or '').lower()
+    extension = next((ext for ext in extensions if name.endswith(ext)), None)
+    if extension is None:
+        raise UploadFileError(f"Unsupported file format. Please upload {', '.join(extensions)} files only.")
+
+    max_bytes = max_bytes or getattr(settings, 'UPLOAD_MAX_BYTES', 20 * 1024 * 1024)
+    size = getattr(file_obj, 'size', None)
+    if size is not None and size > max_bytes:
+        raise UploadFileError(
+            f"File is too large ({size / (1024 * 1024):.1f} MB). The limit is {max_bytes / (1024 * 1024):.0f} MB."
+        )
+    if size == 0:
+        raise UploadFileError("The uploaded file is empty.")
+
+    expected = {'.xlsx': XLSX_SIGNATURE, '.xls': XLS_SIGNATURE}.get(extension)
+    if expected:
+        file_obj.seek(0)
+        head = file_obj.read(len(expected))
+        file_obj.seek(0)
+        if head != expected:
+            raise UploadFileError(f"The file is not a valid {extension} workbook.")
+    return extension
+
+
+def _header(values) -> list:
+    """Column names as pd.read_excel builds them (Unnamed: n, duplicates suffixed .1, .2)"""
+    columns, seen = [], {}
+    for position, value in enumerate(values):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            value = f"Unnamed: {position}"
+        if value in seen:
+            seen[value] += 1
+            value = f"{value}.{seen[value]}"
+        else:
+            seen[value] = 0
+        columns.append(value)
+    return columns
+
+
+def _cell(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip() in NA_STRINGS:
+        return None
+    return value
+
+
+def _typed(frame, numeric_columns: Iterable[str]):
+    """
+    Infer column dtypes and make the given columns numeric ("1,200" -> 1200); a column with a
+    value that is not a number stays as read, so row validation still reports it
+    """
+    import pandas as pd
+
+    frame = frame.infer_objects()
+    for column in frame.columns[frame.dtypes == object]:
+        frame[column] = frame[column].where(frame[column].notna(), float('nan'))  # None -> NaN, as read_excel
+    for column in numeric_columns:
+        if column in frame.columns and frame[column].dtype == object:
+            series = frame[column]
+            is_text = series.map(lambda value: isinstance(value, str))
+            if is_text.any():
+                series = series.where(~is_text, series[is_text].str.replace(',', '', regex=False).str.strip())
+            numbers = pd.to_numeric(series, errors='coerce')
+            if numbers.notna().sum() == series.notna().sum():
+                frame[column] = numbers
+    return frame
+
+
+def _xlsx_chunks(file_obj, chunk_rows, max_rows, numeric_columns):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    except Exception as e:
+        raise UploadFileError(f"The file could not be opened as an Excel workbook: {e}")
+    try:
+        sheet = workbook.worksheets[0]
+        # Declared <dimension>: lets oversized sheets fail before their rows are parsed
+        if sheet.max_row and sheet.max_row - 1 > max_rows:
+            raise UploadFileError(f"The sheet has {sheet.max_row - 1} rows. The limit is {max_rows}.")
+
+        rows = sheet.iter_rows(values_only=True)
+        columns = None
+        for values in rows:
+            if any(value is not None for value in values):
+                values = list(values)
+                while values[-1] is None:  # sheet dimensions can be wider than the header
+                    values.pop()
+                columns = _header(values)
+                break
+        if columns is None:
+            raise UploadFileError("The sheet is empty - expected a header row.")
+
+        buffer, start, blank_rows = [], 0, 0
+        width = len(columns)
+        for values in rows:
+            values = [_cell(value) for value in values[:width]]
+            if all(value is None for value in values):
+                # Kept as NaN rows like pd.read_excel, unless only blank rows follow
+                blank_rows += 1
+                continue
+            buffer.extend([[None] * width] * blank_rows)
+            blank_rows = 0
+            buffer.append(values + [None] * (width - len(values)))
+            if start + len(buffer) > max_rows:
+                raise UploadFileError(f"The sheet has more than {max_rows} rows.")
+            while len(buffer) >= chunk_rows:
+                chunk, buffer = buffer[:chunk_rows], buffer[chunk_rows:]
+                yield _typed(pd.DataFrame(chunk, columns=columns, index=pd.RangeIndex(start, start + len(chunk))), numeric_columns)
+                start += len(chunk)
+        if buffer or start == 0:
+            yield _typed(pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(start, start + len(buffer))), numeric_columns)
+    finally:
+        workbook.close()
+
+
+def _csv_chunks(file_obj, chunk_rows, max_rows, numeric_columns):
+    import pandas as pd
+
+    try:
+        reader = pd.read_csv(file_obj, chunksize=chunk_rows)
+        rows = 0
+        for chunk in reader:
+            rows += len(chunk)
+            if rows > max_rows:
+                raise UploadFileError(f"The file has more than {max_rows} rows.")
+            yield _typed(chunk, numeric_columns)
+    except pd.errors.EmptyDataError:
+        raise UploadFileError("The file is empty - expected a header row.")
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise UploadFileError(f"The file could not be read as CSV: {e}")
+
+
+def _xls_chunks(file_obj, chunk_rows, max_rows, numeric_columns):
+    import pandas as pd
+
+    try:
+        frame = pd.read_excel(file_obj)
+    except Exception as e:
+        raise UploadFileError(f"The file could not be opened as an Excel workbook: {e}")
+    if len(frame) > max_rows:
+        raise UploadFileError(f"The sheet has {len(frame)} rows. The limit is {max_rows}.")
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield _typed(frame.iloc[start:start + chunk_rows].copy(), numeric_columns)
+
+
+def upload_chunks(
+    file_obj,
+    numeric_columns: Iterable[str] = (),
+    extensions: Sequence[str] = SPREADSHEET_EXTENSIONS,
+    chunk_rows: Optional[int] = None,
+    max_rows: Optional[int] = None,
+) -> Iterator:
+    """
+    The first sheet (or CSV) of an upload as DataFrames of at most chunk_rows rows
+
+    Every chunk has the header's columns (the first chunk may be empty); numeric_columns are
+    coerced to numbers. Raises UploadFileError for files that are rejected or unreadable.
+    """
+    extension = check_upload(file_obj, extensions)
+    chunk_rows, max_rows = _limits(chunk_rows, max_rows)
+    readers = {'.xlsx': _xlsx_chunks, '.csv': _csv_chunks, '.xls': _xls_chunks}
+    file_obj.seek(0)
+    yield from readers[extension](file_obj, chunk_rows, max_rows, list(numeric_columns))
+
+
+def read_upload(file_obj, numeric_columns: Iterable[str] = (), extensions: Sequence[str] = SPREADSHEET_EXTENSIONS, **kwargs):
+    """
+    Read an upload into one typed DataFrame, parsing it chunk by chunk
+
+    Peak memory is the typed rows, never the parsed workbook.
+    """
+    import pandas as pd
+
+    chunks = list(upload_chunks(file_obj, numeric_columns, extensions, **kwargs))
+    frame = chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+    logger.info(f"📖 Read {len(frame)} rows from {getattr(file_obj, 'name', 'upload')} in {len(chunks)} chunk(s)")
+    return frame
@@ -1,22 +1,5 @@
-import threading
-import pandas as pd
-import numpy as np
-
-# Thread local storage for current tenant
-_thread_local = threading.local()
-
-def set_current_tenant(tenant):
-    """Set the current tenant in thread local storage"""
-    _thread_local.tenant = tenant
-
-def get_current_tenant():
-    """Get the current tenant from thread local storage"""
-    return getattr(_thread_local, 'tenant', None)
-
-def clear_current_tenant():
-    """Clear the current tenant from thread local storage"""
-    if hasattr(_thread_local, 'tenant'):
-        delattr(_thread_local, 'tenant')
+# Tenant thread local helpers live in tenant_context (no pandas); re-exported for existing imports
+from .tenant_context import set_current_tenant, get_current_tenant, clear_current_tenant  # noqa: F401 (re-exported)
 
 def generate_employee_id(name: str, tenant_id: int, department: str = None) -> str:
     """
@@ -163,6 +146,8 @@ def clean_decimal_value(value):
     Clean and convert value to decimal - optimized for pandas data
     """
     from decimal import Decimal
+    import pandas as pd
+    import numpy as np
     try:
         # Handle pandas NaN values first
         if pd.isna(value) or pd.isnull(value):
@@ -191,6 +176,8 @@ def clean_int_value(value):
     """
     Clean and convert value to integer - optimized for pandas data
     """
+    import pandas as pd
+    import numpy as np
     try:
         # Handle pandas NaN values first
         if pd.isna(value) or pd.isnull(value):
@@ -215,11 +202,78 @@ def clean_int_value(value):
     except (ValueError, TypeError, OverflowError):
         return 0
 
+def clean_numeric_column(series):
+    """
+    Column-wise clean_decimal_value / clean_int_value for upload DataFrames
+
+    Returns a float Series: blank cells (NaN, '', 'nan', 'none', 'null') become 0 and commas
+    are stripped; cells that are still not numbers are NaN, so callers can report those rows.
+    """
+    import pandas as pd
+
+    if series.dtype.kind in 'biuf':
+        return series.astype(float).fillna(0)
+    text = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    blank = series.isna() | text.str.lower().isin(['', 'nan', 'none', 'null'])
+    return pd.to_numeric(text.where(~blank, '0'), errors='coerce')
+
+
+def decimal_list(numbers):
+    """Decimals for a float Series, as clean_decimal_value builds them from the cell value"""
+    from decimal import Decimal
+    return [Decimal(str(number)) for number in numbers.tolist()]
+
+
+def text_column(df, column):
+    """str(row.get(column, '')).strip() for a whole upload DataFrame"""
+    import pandas as pd
+
+    if column not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[column].astype(str).str.strip()
+
+
+def match_employee_ids_by_name(names, departments, tenant):
+    """
+    Column-wise employee ID matching for uploads
+
+    Joins lower-cased names against the tenant's active employees ("first last") and
+    generates IDs with generate_employee_id_bulk_optimized, in row order, for names that do
+    not match. Returns (employee ID Series aligned with names, set of existing employee IDs).
+    """
+    import pandas as pd
+    from ..models import EmployeeProfile
+
+    existing = pd.DataFrame.from_records(
+        list(EmployeeProfile.objects.filter(tenant=tenant, is_active=True)
+             .values_list('first_name', 'last_name', 'employee_id')),
+        columns=['first_name', 'last_name', 'employee_id'],
+    )
+    keys = (existing['first_name'].astype(str) + ' ' + existing['last_name'].astype(str)).str.strip().str.lower()
+    # Same name twice: the last employee wins, as with a dict built in query order
+    ids_by_name = pd.Series(existing['employee_id'].values, index=keys.values)
+    ids_by_name = ids_by_name[~ids_by_name.index.duplicated(keep='last')]
+
+    employee_ids = names.str.lower().map(ids_by_name).astype(object)
+    unmatched = employee_ids.isna()
+    if unmatched.any():
+        employees_data = [
+            {'name': name, 'department': department}
+            for name, department in zip(names[unmatched].tolist(), departments[unmatched].tolist())
+        ]
+        mapping = generate_employee_id_bulk_optimized(employees_data, tenant.id)
+        employee_ids[unmatched] = [mapping[i] for i in range(len(employees_data))]
+    return employee_ids, set(existing['employee_id'])
+
+
 def is_valid_name(name):
     """
     Check if a name is valid (not empty, not just '-', not '0', etc.)
     Enhanced to handle pandas NaN values
     """
+    import pandas as pd
+    import numpy as np
+    
     # Handle pandas NaN first
     if pd.isna(name) or pd.isnull(name):
         return False
@@ -245,241 +299,76 @@ def is_valid_name(name):
     return True 
 
 
-def run_bulk_aggregation(tenant, attendance_date):
+def run_bulk_aggregation(tenant, attendance_date, employee_ids=None):
     """
-    Background aggregation function that processes monthly attendance summaries.
+    Rebuild monthly attendance aggregates (Attendance and MonthlyAttendanceSummary)
+    from DailyAttendance for one tenant-month.
     
-    This function runs in a background thread to avoid blocking the API response.
-    It aggregates DailyAttendance records into monthly Attendance summaries.
+    Delegates to AttendanceSummaryService.reconcile_month, which recounts with one grouped
+    query and upserts both models in bulk.
     
     Args:
         tenant: Tenant instance
         attendance_date: Date object for the month to aggregate
+        employee_ids: Optional list restricting the rebuild to these employees
         
     Returns:
         dict: Aggregation results with timing and statistics
     """
     import logging
     import time
-    from datetime import date
-    from django.db import transaction, connection
-    from ..models import DailyAttendance, Attendance, EmployeeProfile
+    from django.db import transaction
+    from ..services.attendance_summary_service import AttendanceSummaryService
     
     logger = logging.getLogger(__name__)
     start_time = time.time()
     
     try:
-        logger.info(f"🔄 BACKGROUND AGGREGATION: Starting for tenant {tenant.id}, month {attendance_date.year}-{attendance_date.month:02d}")
+        logger.info(f"🔄 AGGREGATION: Starting for tenant {tenant.id}, month {attendance_date.year}-{attendance_date.month:02d}")
         
-        # Get all DailyAttendance records for this tenant and month
-        daily_records = DailyAttendance.objects.filter(
-            tenant=tenant,
-            date__year=attendance_date.year,
-            date__month=attendance_date.month
-        ).select_related().only(
-            'employee_id', 'employee_name', 'department', 'attendance_status', 
-            'ot_hours', 'late_minutes'
-        )
+        with transaction.atomic():
+            employees_processed = AttendanceSummaryService.reconcile_month(
+                tenant, attendance_date.year, attendance_date.month, employee_ids=employee_ids
+            )
+        db_time = time.time() - start_time
         
-        if not daily_records.exists():
-            logger.info(f"⚠️ BACKGROUND AGGREGATION: No daily records found for {attendance_date.year}-{attendance_date.month:02d}")
+        if not employees_processed:
             return {
                 'status': 'no_data',
                 'message': 'No daily attendance records found for this month',
                 'processing_time': f"{time.time() - start_time:.3f}s"
             }
         
-        # Aggregate data by employee
-        aggregated_data = {}
-        records_processed = 0
-        
-        for record in daily_records:
-            emp_id = record.employee_id
-            
-            if emp_id not in aggregated_data:
-                aggregated_data[emp_id] = {
-                    'employee_name': record.employee_name,
-                    'department': record.department,
-                    'present_days': 0.0,
-                    'ot_hours': 0.0,
-                    'late_minutes': 0,
-                    'records_count': 0
-                }
-            
-            # Aggregate present days (PRESENT and PAID_LEAVE count as 1, HALF_DAY as 0.5)
-            if record.attendance_status in ['PRESENT', 'PAID_LEAVE']:
-                aggregated_data[emp_id]['present_days'] += 1.0
-            elif record.attendance_status == 'HALF_DAY':
-                aggregated_data[emp_id]['present_days'] += 0.5
-            
-            # Aggregate OT hours and late minutes
-            aggregated_data[emp_id]['ot_hours'] += float(record.ot_hours or 0)
-            aggregated_data[emp_id]['late_minutes'] += int(record.late_minutes or 0)
-            aggregated_data[emp_id]['records_count'] += 1
-            records_processed += 1
-        
-        logger.info(f"📊 BACKGROUND AGGREGATION: Processed {records_processed} daily records for {len(aggregated_data)} employees")
-        
-        # Calculate working days for each employee
-        aggregation_start_time = time.time()
-        attendance_records = []
-        errors = []
-        
-        for emp_id, data in aggregated_data.items():
-            try:
-                # Get employee details for working days calculation
-                try:
-                    employee = EmployeeProfile.objects.get(
-                        tenant=tenant, 
-                        employee_id=emp_id, 
-                        is_active=True
-                    )
-                    
-                    # Calculate working days based on DOJ
-                    from ..services.salary_service import SalaryCalculationService
-                    month_names = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 
-                                 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-                    total_working_days = SalaryCalculationService._calculate_employee_working_days(
-                        employee, attendance_date.year, month_names[attendance_date.month - 1]
-                    )
-                except EmployeeProfile.DoesNotExist:
-                    # Fallback: use standard 30 days if employee not found
-                    total_working_days = 30
-                    logger.warning(f"⚠️ Employee {emp_id} not found, using 30 days for working days calculation")
-                except Exception as e:
-                    # Fallback: use standard 30 days if calculation fails
-                    total_working_days = 30
-                    logger.warning(f"⚠️ Could not calculate working days for employee {emp_id}: {str(e)}")
-                
-                # Calculate absent days
-                absent_days = max(0, total_working_days - data['present_days'])
-                
-                # Create monthly attendance record
-                attendance_date_month = date(attendance_date.year, attendance_date.month, 1)
-                
-                # Get calendar days for the month
-                import calendar
-                days_in_month = calendar.monthrange(attendance_date.year, attendance_date.month)[1]
-                
-                attendance_records.append(Attendance(
-                    tenant=tenant,
-                    employee_id=emp_id,
-                    name=data['employee_name'],
-                    department=data['department'],
-                    date=attendance_date_month,
-                    calendar_days=days_in_month,
-                    total_working_days=total_working_days,
-                    present_days=data['present_days'],
-                    absent_days=absent_days,
-                    ot_hours=data['ot_hours'],
-                    late_minutes=data['late_minutes']
-                ))
-                
-            except Exception as e:
-                error_msg = f"Error processing employee {emp_id}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(f"❌ {error_msg}")
-        
-        # Bulk create/update attendance records using atomic transaction
-        db_start_time = time.time()
-        created_count = 0
-        updated_count = 0
-        
-        with transaction.atomic():
-            if attendance_records:
-                # Get existing records to determine updates vs creates
-                existing_records = Attendance.objects.filter(
-                    tenant=tenant,
-                    employee_id__in=[r.employee_id for r in attendance_records],
-                    date=attendance_date_month
-                )
-                
-                existing_records_dict = {rec.employee_id: rec for rec in existing_records}
-                
-                # Separate records for create and update
-                records_to_create = []
-                records_to_update = []
-                
-                for record in attendance_records:
-                    if record.employee_id in existing_records_dict:
-                        # Update existing record with primary key
-                        existing_record = existing_records_dict[record.employee_id]
-                        existing_record.name = record.name
-                        existing_record.department = record.department
-                        existing_record.calendar_days = record.calendar_days
-                        existing_record.total_working_days = record.total_working_days
-                        existing_record.present_days = record.present_days
-                        existing_record.absent_days = record.absent_days
-                        existing_record.ot_hours = record.ot_hours
-                        existing_record.late_minutes = record.late_minutes
-                        records_to_update.append(existing_record)
-                    else:
-                        # Create new record
-                        records_to_create.append(record)
-                
-                # Bulk create new records
-                if records_to_create:
-                    Attendance.objects.bulk_create(records_to_create, batch_size=100)
-                    created_count = len(records_to_create)
-                    logger.info(f"✅ BACKGROUND AGGREGATION: Created {created_count} new attendance records")
-                
-                # Bulk update existing records (now with primary keys)
-                if records_to_update:
-                    Attendance.objects.bulk_update(
-                        records_to_update,
-                        ['name', 'department', 'calendar_days', 'total_working_days', 
-                         'present_days', 'absent_days', 'ot_hours', 'late_minutes'],
-                        batch_size=100
-                    )
-                    updated_count = len(records_to_update)
-                    logger.info(f"✅ BACKGROUND AGGREGATION: Updated {updated_count} existing attendance records")
-        
-        db_time = time.time() - db_start_time
-        
         # Clear relevant caches
         cache_start_time = time.time()
-        from django.core.cache import cache
-        
-        cache_keys_to_clear = [
-            f"payroll_overview_{tenant.id}",
-            f"months_with_attendance_{tenant.id}",
-            f"attendance_all_records_{tenant.id}",
-            f"monthly_attendance_summary_{tenant.id}_{attendance_date.year}_{attendance_date.month}",
-            f"dashboard_stats_{tenant.id}",
-        ]
+        from ..services.cache_service import bump_cache_generation, ATTENDANCE
         
-        for cache_key in cache_keys_to_clear:
-            cache.delete(cache_key)
+        bump_cache_generation(tenant, ATTENDANCE, reason="monthly_aggregation")
+        from ..services.employee_directory import schedule_directory_refresh
+        schedule_directory_refresh(tenant.id, employee_ids)
         
         cache_time = time.time() - cache_start_time
-        
         total_time = time.time() - start_time
         
-        result = {
+        logger.info(f"✅ AGGREGATION: Completed in {total_time:.3f}s - {employees_processed} employees")
+        
+        return {
             'status': 'success',
-            'message': f'Successfully aggregated {len(aggregated_data)} employees',
+            'message': f'Successfully aggregated {employees_processed} employees',
             'statistics': {
-                'employees_processed': len(aggregated_data),
-                'daily_records_processed': records_processed,
-                'attendance_records_created': created_count,
-                'attendance_records_updated': updated_count,
-                'errors_count': len(errors)
+                'employees_processed': employees_processed,
+                'errors_count': 0
             },
             'performance': {
                 'total_time': f"{total_time:.3f}s",
-                'aggregation_time': f"{time.time() - aggregation_start_time:.3f}s",
                 'database_time': f"{db_time:.3f}s",
                 'cache_clear_time': f"{cache_time:.3f}s"
             },
-            'errors': errors[:5] if errors else []  # Show first 5 errors
+            'errors': []
         }
         
-        logger.info(f"✅ BACKGROUND AGGREGATION: Completed in {total_time:.3f}s - {created_count} created, {updated_count} updated")
-        
-        return result
-        
     except Exception as e:
-        error_msg = f"Background aggregation failed: {str(e)}"
+        error_msg = f"Aggregation failed: {str(e)}"
         logger.error(f"❌ {error_msg}")
         
         return {
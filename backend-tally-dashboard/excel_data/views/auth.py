@@ -1464,7 +1464,7 @@ class RequestPasswordResetView(APIView):
 
             from datetime import timedelta
 
-            from ..utils.utils import set_current_tenant
+            from ..utils.tenant_context import set_current_tenant
 
             email = request.data.get("email", "").strip().lower()
 
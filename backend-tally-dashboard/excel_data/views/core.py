@@ -11,7 +11,12 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import status, viewsets, filters
 from rest_framework.decorators import action
-from ..models import EmployeeProfile
+from ..services.cache_service import (
+    versioned_cache_key, bump_cache_generation,
+    ATTENDANCE, PAYROLL, CHARTS, DIRECTORY,
+)
+from ..services.employee_directory import schedule_directory_refresh
+from ..utils.periods import period_index, period_date_q, period_date_range
 import time
 from django.db.models import Sum, Avg, Count
 from rest_framework.permissions import IsAuthenticated
@@ -69,7 +74,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
 
         # Data is automatically filtered by tenant through TenantAwareManager
 
-        return SalaryData.objects.all().order_by('-year', '-month', 'name')
+        return SalaryData.objects.all().order_by('-period_index', 'name')
 
     
 
@@ -167,7 +172,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
 
             employee_count=Count('employee_id', distinct=True)
 
-        ).order_by('-year', '-month')[:12]
+        ).order_by('-period_index')[:12]
 
 
 
@@ -244,7 +249,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             })
         
         # Get available months from SalaryData
-        available_months = SalaryData.objects.filter(tenant=tenant).values('year', 'month').distinct().order_by('-year', '-month')
+        available_months = SalaryData.objects.filter(tenant=tenant).values('year', 'month', 'period_index').distinct().order_by('-period_index')
         
         if not available_months.exists():
             return Response({
@@ -284,7 +289,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             year = request.query_params.get('year')
             month = request.query_params.get('month')
             if year and month:
-                selected_months = available_months.filter(year=int(year), month=month)
+                selected_months = available_months.filter(period_index=period_index(year, month))
             else:
                 selected_months = available_months[:1]
         
@@ -297,8 +302,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         # Get SalaryData for selected months
         salary_queryset = SalaryData.objects.filter(
             tenant=tenant,
-            year__in=[m['year'] for m in selected_months_list],
-            month__in=[m['month'] for m in selected_months_list]
+            period_index__in=[m['period_index'] for m in selected_months_list]
         )
         
         # Apply department filter
@@ -307,9 +311,8 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # Get Attendance data for selected months
         attendance_queryset = Attendance.objects.filter(
+            period_date_q(m['period_index'] for m in selected_months_list),
             tenant=tenant,
-            date__year__in=[m['year'] for m in selected_months_list],
-            date__month__in=[self._get_month_number(m['month']) for m in selected_months_list]
         )
         
         if selected_department and selected_department != 'All':
@@ -324,18 +327,6 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             tenant
         )
     
-    def _get_month_number(self, month_name):
-        """Convert month name to number"""
-        month_map = {
-            'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-            'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-            'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4,
-            'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9,
-            'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        return month_map.get(month_name.upper(), 1)
-    
     def _get_charts_from_excel_data(self, salary_queryset, attendance_queryset, selected_months, time_period, selected_department, tenant, cache_key=None, start_time=None, query_timings=None):
         """Generate charts data from raw Excel data with hybrid approach support"""
         from django.db.models import Avg, Sum, Count, Max, Min, F, Case, When, FloatField
@@ -344,11 +335,8 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         # Current period stats (most recent month)
         current_month = selected_months[0] if selected_months else None
         if current_month:
-            current_salary = salary_queryset.filter(year=current_month['year'], month=current_month['month'])
-            current_attendance = attendance_queryset.filter(
-                date__year=current_month['year'],
-                date__month=self._get_month_number(current_month['month'])
-            )
+            current_salary = salary_queryset.filter(period_index=current_month['period_index'])
+            current_attendance = attendance_queryset.filter(date__range=period_date_range(current_month['period_index']))
         else:
             current_salary = salary_queryset.none()
             current_attendance = attendance_queryset.none()
@@ -429,11 +417,8 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         late_minute_trends = []
         
         for month in selected_months:
-            month_salary = salary_queryset.filter(year=month['year'], month=month['month'])
-            month_attendance = attendance_queryset.filter(
-                date__year=month['year'],
-                date__month=self._get_month_number(month['month'])
-            )
+            month_salary = salary_queryset.filter(period_index=month['period_index'])
+            month_attendance = attendance_queryset.filter(date__range=period_date_range(month['period_index']))
             
             month_salary_stats = month_salary.aggregate(
                 total_salary=Sum('nett_payable'),
@@ -621,7 +606,11 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         cache_check_start = time.time()
         # Include custom date range in cache key
         date_range_suffix = f"_{start_date}_{end_date}" if start_date and end_date else ""
-        cache_key = f"frontend_charts_{tenant.id if tenant else 'default'}_{time_period}_{selected_department}{date_range_suffix}"
+        cache_key = versioned_cache_key(
+            tenant,
+            f"frontend_charts_{tenant.id if tenant else 'default'}_{time_period}_{selected_department}{date_range_suffix}",
+            CHARTS, PAYROLL, DIRECTORY,
+        )
         cached_response = cache.get(cache_key)
         query_timings['cache_check_ms'] = round((time.time() - cache_check_start) * 1000, 2)
         
@@ -661,34 +650,14 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             })
         
         # Get all payroll periods for this tenant (ordered by actual calendar date)
-        from django.db.models import Case, When, IntegerField
+        from django.db.models import F
         
         payroll_periods_start = time.time()
         
-        # Define month ordering (complete mapping)
-        month_order = {
-            'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-            'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-            'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
-            # Also handle common abbreviations that might be stored
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4,
-            'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9,
-            'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        
-        # Create Case/When conditions with proper string quoting
-        when_conditions = []
-        for month_name, month_num in month_order.items():
-            # Case-insensitive match so variations like "June" or "june" are handled
-            when_conditions.append(When(month__iexact=month_name, then=month_num))
-        
-        payroll_periods = PayrollPeriod.objects.filter(tenant=tenant).annotate(
-            month_num=Case(
-                *when_conditions,
-                default=13,  # Put unknown months at the end
-                output_field=IntegerField()
-            )
-        ).order_by('-year', '-month_num')
+        # period_index (year * 12 + month) is generated by the database; unknown months sort last
+        payroll_periods = PayrollPeriod.objects.filter(tenant=tenant).order_by(
+            F('period_index').desc(nulls_last=True)
+        )
         
         query_timings['payroll_periods_ms'] = round((time.time() - payroll_periods_start) * 1000, 2)
         
@@ -729,7 +698,6 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         if time_period == 'this_month':
             # ROBUST FIX: Always pick the real current calendar month
             from django.utils import timezone
-            import calendar
             now = timezone.now()
             current_month_name = calendar.month_name[now.month].upper()
             
@@ -737,8 +705,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             
             # Try to find current month's payroll period
             current_month_periods = payroll_periods.filter(
-                year=now.year,
-                month=current_month_name
+                period_index=period_index(now.year, now.month)
             )[:1]
             
             if current_month_periods.exists():
@@ -769,14 +736,13 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             year = request.query_params.get('year')
             month = request.query_params.get('month')
             if year and month:
-                selected_periods = payroll_periods.filter(year=int(year), month=month)[:1]
+                selected_periods = payroll_periods.filter(period_index=period_index(year, month))[:1]
             else:
                 selected_periods = payroll_periods[:1]
         elif time_period == 'custom_range':
             # Handle custom date range filtering
             if start_date and end_date:
                 try:
-                    from datetime import datetime
                     start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
                     end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
                     
@@ -788,40 +754,13 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
                     
                     # If no periods found with calculation_date, fallback to period date filtering
                     if not selected_periods.exists():
-                        # Convert date range to year/month filtering
-                        start_year = start_dt.year
-                        start_month = start_dt.month
-                        end_year = end_dt.year
-                        end_month = end_dt.month
-                        
-                        # Create a more flexible date range filter
+                        # Convert the date range to an integer period range
                         selected_periods = payroll_periods.filter(
-                            year__gte=start_year,
-                            year__lte=end_year
+                            period_index__range=(
+                                period_index(start_dt.year, start_dt.month),
+                                period_index(end_dt.year, end_dt.month),
+                            )
                         )
-                        
-                        # If we have a specific month range, filter by month as well
-                        if start_year == end_year:
-                            # Same year, filter by month range
-                            month_names = ['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE',
-                                         'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER']
-                            start_month_name = month_names[start_month - 1]
-                            end_month_name = month_names[end_month - 1]
-                            
-                            # Create flexible month matching for different formats
-                            from django.db.models import Q
-                            month_filters = Q()
-                            
-                            for month_name in month_names[start_month-1:end_month]:
-                                # Match various formats: JANUARY, JAN, January, Jan, etc.
-                                month_filters |= (
-                                    Q(month__iexact=month_name) |
-                                    Q(month__iexact=month_name[:3]) |
-                                    Q(month__iexact=month_name.capitalize()) |
-                                    Q(month__iexact=month_name[:3].capitalize())
-                                )
-                            
-                            selected_periods = selected_periods.filter(month_filters)
                     
                 except ValueError:
                     # Invalid date format, fallback to latest period
@@ -840,39 +779,22 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             logger.warning(f"No periods found for time_period: {time_period}")
             return Response({"totalEmployees": 0, "departmentData": [], "availableDepartments": []})
         
-        # NEW: Try ChartAggregatedData first (optimized, unified source)
-        from ..models import ChartAggregatedData
+        # NEW: Try ChartAggregatedData first (optimized, unified source) via the tenant's
+        # in-memory columnar snapshot
+        from ..services.chart_snapshot_service import ChartSnapshotService
         
         chart_query_start = time.time()
-        # Create flexible month matching for ChartAggregatedData
-        from django.db.models import Q
-        chart_month_filters = Q()
-        for period in selected_periods:
-            month_name = period.month.upper()
-            # Match various formats: JANUARY, JAN, January, Jan, etc.
-            chart_month_filters |= (
-                Q(month__iexact=month_name) |
-                Q(month__iexact=month_name[:3]) |
-                Q(month__iexact=month_name.capitalize()) |
-                Q(month__iexact=month_name[:3].capitalize())
-            )
-        
-        chart_queryset = ChartAggregatedData.objects.filter(
-            tenant=tenant,
-            year__in=[p.year for p in selected_periods]
-        ).filter(chart_month_filters)
-        
-        # Apply department filter if specified
-        if selected_department and selected_department != 'All':
-            chart_queryset = chart_queryset.filter(department=selected_department)
-        
-        query_timings['chart_queryset_setup_ms'] = round((time.time() - chart_query_start) * 1000, 2)
+        snapshot = ChartSnapshotService.get(tenant)
+        selected_period_keys = [
+            p.period_index for p in selected_periods if p.period_index is not None
+        ]
+        query_timings['chart_snapshot_ms'] = round((time.time() - chart_query_start) * 1000, 2)
         
         # OPTIMIZED PATH: Use ChartAggregatedData if available
-        if chart_queryset.exists():
-            logger.info(f"✨ Using ChartAggregatedData: {chart_queryset.count()} records (FAST PATH)")
+        if snapshot.has_rows(selected_period_keys, selected_department):
+            logger.info(f"✨ Using ChartAggregatedData snapshot: {snapshot.size} rows (FAST PATH)")
             return self._get_charts_from_aggregated_data(
-                chart_queryset,
+                snapshot,
                 list(selected_periods),
                 time_period,
                 selected_department,
@@ -916,7 +838,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             from ..models import SalaryData, EmployeeProfile
             
             # Get available months from SalaryData
-            available_months = SalaryData.objects.filter(tenant=tenant).values('year', 'month').distinct().order_by('-year', '-month')
+            available_months = SalaryData.objects.filter(tenant=tenant).values('year', 'month', 'period_index').distinct().order_by('-period_index')
             
             if not available_months.exists():
                 logger.warning("No Excel data found either")
@@ -957,7 +879,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
                 year = request.query_params.get('year')
                 month = request.query_params.get('month')
                 if year and month:
-                    selected_months = available_months.filter(year=int(year), month=month)
+                    selected_months = available_months.filter(period_index=period_index(year, month))
                 else:
                     selected_months = available_months[:1]
             
@@ -970,8 +892,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             # Get SalaryData for selected months
             salary_queryset = SalaryData.objects.filter(
                 tenant=tenant,
-                year__in=[m['year'] for m in selected_months_list],
-                month__in=[m['month'] for m in selected_months_list]
+                period_index__in=[m['period_index'] for m in selected_months_list]
             )
             
             # Apply department filter
@@ -980,9 +901,8 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             
             # Get Attendance data for selected months
             attendance_queryset = Attendance.objects.filter(
+                period_date_q(m['period_index'] for m in selected_months_list),
                 tenant=tenant,
-                date__year__in=[m['year'] for m in selected_months_list],
-                date__month__in=[self._get_month_number(m['month']) for m in selected_months_list]
             )
             
             if selected_department and selected_department != 'All':
@@ -1187,7 +1107,6 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # PHASE 2 OPTIMIZATION: Ultra-fast top employees with index-friendly query
         top_employees_start = time.time()
-        from django.db.models import Max
         
         # CRITICAL FIX: Use select_related and only() for minimal data transfer
         employee_max_salaries = calculated_queryset.only(
@@ -1208,7 +1127,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # NEW: Top Attendance Employees - employees with highest attendance percentage
         top_attendance_start = time.time()
-        from django.db.models import F, Case, When, IntegerField, FloatField
+        from django.db.models import Case, When, IntegerField, FloatField
         
         # Get employees with highest attendance percentage (present_days / 30 working days)
         top_attendance_employees = calculated_queryset.only(
@@ -1233,21 +1152,16 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # NEW: Late Minute Trends - monthly trend of late minutes
         late_trends_start = time.time()
-        from ..models import DailyAttendance, Attendance
+        from ..models import DailyAttendance
         
         # Get late minute trends for the selected periods
         late_trends = []
         if payroll_periods:
-            # Get date range from payroll periods
-            years = [p.year for p in payroll_periods]
-            months = [self._get_month_number(p.month) for p in payroll_periods]
+            # Date ranges of the selected payroll periods
+            period_dates = period_date_q(p.period_index for p in payroll_periods if p.period_index is not None)
             
             # Try DailyAttendance first (daily records)
-            daily_queryset = DailyAttendance.objects.filter(
-                tenant=tenant,
-                date__year__in=years,
-                date__month__in=months
-            )
+            daily_queryset = DailyAttendance.objects.filter(period_dates, tenant=tenant)
             
             # Apply department filter if specified
             if selected_department and selected_department != 'All':
@@ -1275,11 +1189,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             else:
                 # Fallback to monthly Attendance model
                 logger.info("No daily attendance data found, trying monthly Attendance model")
-                monthly_queryset = Attendance.objects.filter(
-                    tenant=tenant,
-                    date__year__in=[p.year for p in payroll_periods],
-                    date__month__in=[self._get_month_number(p.month) for p in payroll_periods]
-                )
+                monthly_queryset = Attendance.objects.filter(period_dates, tenant=tenant)
                 
                 if selected_department and selected_department != 'All':
                     monthly_queryset = monthly_queryset.filter(department=selected_department)
@@ -1334,7 +1244,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # PHASE 2 OPTIMIZATION: Hyper-optimized salary distribution with minimal data transfer
         salary_dist_start = time.time()
-        from django.db.models import Sum, Case, When, IntegerField
+        from django.db.models import Sum, Case, When
         
         # CRITICAL FIX: Use only() to minimize data transfer and speed up aggregation
         salary_dist_stats = calculated_queryset.only('net_payable').aggregate(
@@ -1373,38 +1283,16 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
             if selected_department and selected_department != 'All':
                 trends_data = trends_data.filter(department=selected_department)
             
-            # Single query with grouping and aggregation - use proper month ordering
-            from django.db.models import Case, When, IntegerField
-            
-            # Define month ordering (complete mapping) - same as used earlier
-            month_order = {
-                'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-                'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-                'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
-                # Also handle common abbreviations that might be stored
-                'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4,
-                'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9,
-                'OCT': 10, 'NOV': 11, 'DEC': 12
-            }
-            
-            # Create Case/When conditions for proper month ordering
-            when_conditions = []
-            for month_name, month_num in month_order.items():
-                when_conditions.append(When(payroll_period__month__exact=month_name, then=month_num))
-            
+            # Single query with grouping and aggregation, newest period first
             trends_query_start = time.time()
             trends_stats = trends_data.values(
                 'payroll_period__month', 
-                'payroll_period__year'
+                'payroll_period__year',
+                'payroll_period__period_index'
             ).annotate(
                 avg_salary=Avg('net_payable'),
-                avg_ot=Avg('ot_hours'),
-                month_num=Case(
-                    *when_conditions,
-                    default=13,  # Put unknown months at the end
-                    output_field=IntegerField()
-                )
-            ).order_by('-payroll_period__year', '-month_num')  # Newest year first, then newest month within year
+                avg_ot=Avg('ot_hours')
+            ).order_by('-payroll_period__period_index')
             query_timings['trends_query_ms'] = round((time.time() - trends_query_start) * 1000, 2)
             
             # Convert to our format - already in correct order (newest first)
@@ -1438,7 +1326,7 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         # PHASE 1 OPTIMIZATION: Cache expensive department lookup with timing
         dept_lookup_start = time.time()
-        dept_cache_key = f"all_departments_{tenant.id if tenant else 'default'}"
+        dept_cache_key = versioned_cache_key(tenant, f"all_departments_{tenant.id if tenant else 'default'}", DIRECTORY)
         
         try:
             from django.core.cache import cache
@@ -1556,27 +1444,38 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         
         return Response(response_data)
 
-    def _get_charts_from_aggregated_data(self, chart_queryset, payroll_periods, time_period, selected_department='All', cache_key=None, start_time=None, query_timings=None, start_date=None, end_date=None):
+    def _get_charts_from_aggregated_data(self, snapshot, payroll_periods, time_period, selected_department='All', cache_key=None, start_time=None, query_timings=None, start_date=None, end_date=None):
         """
         ULTRA-OPTIMIZED: Generate charts from ChartAggregatedData
         
-        This is the FASTEST path - uses pre-aggregated, indexed data.
-        Expected performance: 70-100ms (vs 3000-7000ms for hybrid approach)
+        This is the FASTEST path - every series is computed in one pass over the tenant's
+        columnar snapshot (ChartSnapshotService), so a cache miss runs no chart queries.
         
         ChartAggregatedData advantages:
         - Single table (no joins)
         - Pre-calculated fields (attendance_percentage)
-        - Optimized indexes for all chart queries
         - Unified Excel + Frontend data
         """
-        from django.db.models import Avg, Sum, Count, Max, Min, F, Q, Case, When, IntegerField
-        from collections import defaultdict
         import time
         
         if query_timings is None:
             query_timings = {}
         
-        if not chart_queryset.exists():
+        period_keys = [p.period_index for p in payroll_periods]
+        selected_keys = [key for key in period_keys if key is not None]
+        previous_key = period_keys[1] if len(period_keys) > 1 else None
+        trend_keys = [key for key in period_keys[:6] if key is not None]
+        
+        series_start = time.time()
+        series = snapshot.chart_series(
+            selected_keys,
+            department=selected_department,
+            previous_period=previous_key,
+            trend_periods=trend_keys,
+        )
+        query_timings['chart_series_ms'] = round((time.time() - series_start) * 1000, 2)
+        
+        if not selected_keys or series['total_employees'] == 0:
             return Response({
                 "totalEmployees": 0,
                 "avgAttendancePercentage": 0,
@@ -1600,112 +1499,53 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
                 "queryTimings": query_timings
             })
         
-        tenant = getattr(self.request, 'tenant', None)
-        
-        # ULTRA-FAST: Current stats with selective fields
-        current_stats_start = time.time()
-        current_stats = chart_queryset.aggregate(
-            total_employees=Count('employee_id', distinct=True),
-            total_present_days=Sum('present_days'),
-            total_working_days=Sum('total_working_days'),
-            total_ot_hours=Sum('ot_hours'),
-            total_late_minutes=Sum('late_minutes'),
-            avg_salary=Avg('net_payable')
-        )
-        query_timings['current_stats_aggregate_ms'] = round((time.time() - current_stats_start) * 1000, 2)
-        
-        total_employees = current_stats['total_employees'] or 0
-        total_present = float(current_stats['total_present_days'] or 0)
-        total_working = float(current_stats['total_working_days'] or 1)
+        total_employees = series['total_employees']
+        total_present = series['total_present_days']
+        total_working = series['total_working_days'] or 1
         avg_attendance_percentage = (total_present / total_working * 100) if total_working > 0 else 0
-        total_ot_hours = float(current_stats['total_ot_hours'] or 0)
-        total_late_minutes = float(current_stats['total_late_minutes'] or 0)
-        
-        # FAST: Previous period comparison
-        previous_period_start = time.time()
-        previous_period_stats = {}
-        if len(payroll_periods) > 1:
-            from ..models import ChartAggregatedData
-            previous_period = payroll_periods[1]
-            previous_queryset = ChartAggregatedData.objects.filter(
-                tenant=tenant,
-                year=previous_period.year,
-                month=previous_period.month.upper()  # Use month name directly
-            )
-            
-            if selected_department and selected_department != 'All':
-                previous_queryset = previous_queryset.filter(department=selected_department)
-            
-            if previous_queryset.exists():
-                previous_period_stats = previous_queryset.aggregate(
-                    prev_employees=Count('employee_id', distinct=True),
-                    prev_present_days=Sum('present_days'),
-                    prev_working_days=Sum('total_working_days'),
-                    prev_ot_hours=Sum('ot_hours'),
-                    prev_late_minutes=Sum('late_minutes')
-                )
-                
-                prev_present = float(previous_period_stats.get('prev_present_days', 0) or 0)
-                prev_working = float(previous_period_stats.get('prev_working_days', 1) or 1)
-                previous_period_stats['prev_attendance'] = (prev_present / prev_working * 100) if prev_working > 0 else 0
+        total_ot_hours = series['total_ot_hours']
+        total_late_minutes = series['total_late_minutes']
         
-        query_timings['previous_period_analysis_ms'] = round((time.time() - previous_period_start) * 1000, 2)
-        
-        # Calculate percentage changes
+        # Calculate percentage changes against the previous period
         employees_change = 0
         attendance_change = 0
         ot_hours_change = 0
         late_minutes_change = 0
         
-        if previous_period_stats:
-            prev_employees = previous_period_stats.get('prev_employees', 0)
-            prev_attendance = float(previous_period_stats.get('prev_attendance', 0) or 0)
-            prev_ot_hours = float(previous_period_stats.get('prev_ot_hours', 0) or 0)
-            prev_late_minutes = float(previous_period_stats.get('prev_late_minutes', 0) or 0)
+        previous = series['previous']
+        if previous:
+            prev_working = previous['working_days'] or 1
+            prev_attendance = (previous['present_days'] / prev_working * 100) if prev_working > 0 else 0
             
-            if prev_employees > 0:
-                employees_change = ((total_employees - prev_employees) / prev_employees) * 100
+            if previous['employees'] > 0:
+                employees_change = ((total_employees - previous['employees']) / previous['employees']) * 100
             if prev_attendance > 0:
                 attendance_change = ((avg_attendance_percentage - prev_attendance) / prev_attendance) * 100
-            if prev_ot_hours > 0:
-                ot_hours_change = ((total_ot_hours - prev_ot_hours) / prev_ot_hours) * 100
-            if prev_late_minutes > 0:
-                late_minutes_change = ((total_late_minutes - prev_late_minutes) / prev_late_minutes) * 100
-        
-        # ULTRA-FAST: Department analysis (no joins!)
-        dept_analysis_start = time.time()
-        dept_stats = chart_queryset.values('department').annotate(
-            headcount=Count('employee_id', distinct=True),
-            total_salary=Sum('net_payable'),
-            avg_salary=Avg('net_payable'),
-            total_ot_hours=Sum('ot_hours'),
-            total_late_minutes=Sum('late_minutes'),
-            total_present_days=Sum('present_days'),
-            total_working_days=Sum('total_working_days')
-        ).order_by('-total_salary')
-        query_timings['department_analysis_ms'] = round((time.time() - dept_analysis_start) * 1000, 2)
+            if previous['ot_hours'] > 0:
+                ot_hours_change = ((total_ot_hours - previous['ot_hours']) / previous['ot_hours']) * 100
+            if previous['late_minutes'] > 0:
+                late_minutes_change = ((total_late_minutes - previous['late_minutes']) / previous['late_minutes']) * 100
         
         # Format department data
         department_data = []
         department_distribution = []
         available_departments = set()
         
-        for dept_stat in dept_stats:
-            dept = dept_stat['department'] or 'Unknown'
+        for dept_stat in series['departments']:
+            dept = dept_stat['department']
             available_departments.add(dept)
             
-            dept_present = float(dept_stat['total_present_days'] or 0)
-            dept_working = float(dept_stat['total_working_days'] or 1)
-            dept_attendance_percentage = (dept_present / dept_working * 100) if dept_working > 0 else 0
+            dept_working = dept_stat['working_days'] or 1
+            dept_attendance_percentage = (dept_stat['present_days'] / dept_working * 100) if dept_working > 0 else 0
             
             department_data.append({
                 'department': dept,
-                'averageSalary': round(float(dept_stat['avg_salary'] or 0), 2),
+                'averageSalary': round(dept_stat['average_salary'], 2),
                 'headcount': dept_stat['headcount'],
-                'totalSalary': round(float(dept_stat['total_salary'] or 0), 2),
+                'totalSalary': round(dept_stat['total_salary'], 2),
                 'attendancePercentage': round(dept_attendance_percentage, 2),
-                'totalOTHours': round(float(dept_stat['total_ot_hours'] or 0), 2),
-                'totalLateMinutes': round(float(dept_stat['total_late_minutes'] or 0), 2)
+                'totalOTHours': round(dept_stat['total_ot_hours'], 2),
+                'totalLateMinutes': round(dept_stat['total_late_minutes'], 2)
             })
             
             department_distribution.append({
@@ -1717,121 +1557,34 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         department_distribution.sort(key=lambda x: x['count'], reverse=True)
         available_departments_list = sorted(list(available_departments))
         
-        # FAST: Top employees
-        top_employees_start = time.time()
-        employee_max_salaries = chart_queryset.values('employee_id', 'employee_name', 'department').annotate(
-            max_salary=Max('net_payable')
-        ).order_by('-max_salary')[:5]
-        
-        top_employees = [
-            {
-                'name': emp['employee_name'],
-                'salary': float(emp['max_salary'] or 0),
-                'department': emp['department'] or 'Unknown'
-            }
-            for emp in employee_max_salaries
-        ]
-        query_timings['top_employees_ms'] = round((time.time() - top_employees_start) * 1000, 2)
-        
-        # FAST: Top attendance (using pre-calculated percentage!)
-        top_attendance_start = time.time()
-        top_attendance_employees = chart_queryset.order_by('-attendance_percentage')[:5]
-        
+        top_employees = series['top_salaried']
         top_attendance_list = [
             {
-                'name': emp.employee_name,
-                'attendancePercentage': round(float(emp.attendance_percentage), 2),
-                'department': emp.department or 'Unknown'
+                'name': emp['name'],
+                'attendancePercentage': round(emp['attendance_percentage'], 2),
+                'department': emp['department']
             }
-            for emp in top_attendance_employees
-        ]
-        query_timings['top_attendance_employees_ms'] = round((time.time() - top_attendance_start) * 1000, 2)
-        
-        # ULTRA-FAST: Salary distribution (single query with Case/When)
-        salary_dist_start = time.time()
-        salary_dist_stats = chart_queryset.aggregate(
-            range_0_25k=Sum(Case(When(net_payable__lt=25000, then=1), default=0, output_field=IntegerField())),
-            range_25_50k=Sum(Case(When(net_payable__gte=25000, net_payable__lt=50000, then=1), default=0, output_field=IntegerField())),
-            range_50_75k=Sum(Case(When(net_payable__gte=50000, net_payable__lt=75000, then=1), default=0, output_field=IntegerField())),
-            range_75_100k=Sum(Case(When(net_payable__gte=75000, net_payable__lt=100000, then=1), default=0, output_field=IntegerField())),
-            range_100k_plus=Sum(Case(When(net_payable__gte=100000, then=1), default=0, output_field=IntegerField()))
-        )
-        
-        salary_ranges = [
-            {'range': '0-25K', 'count': salary_dist_stats['range_0_25k'] or 0},
-            {'range': '25K-50K', 'count': salary_dist_stats['range_25_50k'] or 0},
-            {'range': '50K-75K', 'count': salary_dist_stats['range_50_75k'] or 0},
-            {'range': '75K-100K', 'count': salary_dist_stats['range_75_100k'] or 0},
-            {'range': '100K+', 'count': salary_dist_stats['range_100k_plus'] or 0}
+            for emp in series['top_attendance']
         ]
-        query_timings['salary_distribution_ms'] = round((time.time() - salary_dist_start) * 1000, 2)
+        salary_ranges = series['salary_distribution']
         
-        # FAST: Monthly trends
-        trends_start = time.time()
+        # Monthly trends (latest 6 periods, newest first)
         salary_trends = []
         ot_trends = []
         late_trends = []
-        
-        # Get trends for selected periods
-        trends_periods = payroll_periods[:6] if len(payroll_periods) >= 6 else payroll_periods
-        
-        if trends_periods:
-            from ..models import ChartAggregatedData
-            trends_data = ChartAggregatedData.objects.filter(
-                tenant=tenant,
-                year__in=[p.year for p in trends_periods],
-                month__in=[p.month.upper() for p in trends_periods]  # Use month names directly
-            )
-            
-            if selected_department and selected_department != 'All':
-                trends_data = trends_data.filter(department=selected_department)
-            
-            # Month ordering
-            month_order = {
-                'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-                'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-                'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
-                'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4,
-                'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9,
-                'OCT': 10, 'NOV': 11, 'DEC': 12
-            }
-            
-            when_conditions = []
-            for month_name, month_num in month_order.items():
-                when_conditions.append(When(month__iexact=month_name, then=month_num))
-            
-            trends_query_start = time.time()
-            trends_stats = trends_data.values('month', 'year').annotate(
-                avg_salary=Avg('net_payable'),
-                avg_ot=Avg('ot_hours'),
-                avg_late=Avg('late_minutes'),
-                month_num=Case(*when_conditions, default=13, output_field=IntegerField())
-            ).order_by('-year', '-month_num')
-            query_timings['trends_query_ms'] = round((time.time() - trends_query_start) * 1000, 2)
-            
-            for trend_stat in trends_stats:
-                if trend_stat['avg_salary'] is not None:
-                    # Normalize month label to 3-letter uppercase (e.g., JAN/2025)
-                    raw_month = str(trend_stat['month'] or '')
-                    month_abbr = (raw_month[:3]).upper()
-                    month_label = f"{month_abbr}/{trend_stat['year']}"
-                    
-                    salary_trends.append({
-                        'month': month_label,
-                        'averageSalary': round(float(trend_stat['avg_salary']), 2)
-                    })
-                    
-                    ot_trends.append({
-                        'month': month_label,
-                        'averageOTHours': round(float(trend_stat['avg_ot'] or 0), 2)
-                    })
-                    
-                    late_trends.append({
-                        'month': month_label,
-                        'averageLateMinutes': round(float(trend_stat['avg_late'] or 0), 2)
-                    })
-        
-        query_timings['total_trends_ms'] = round((time.time() - trends_start) * 1000, 2)
+        for trend in series['trends']:
+            salary_trends.append({
+                'month': trend['label'],
+                'averageSalary': round(trend['average_salary'], 2)
+            })
+            ot_trends.append({
+                'month': trend['label'],
+                'averageOTHours': round(trend['average_ot_hours'], 2)
+            })
+            late_trends.append({
+                'month': trend['label'],
+                'averageLateMinutes': round(trend['average_late_minutes'], 2)
+            })
         
         # Today's attendance (mock data)
         today_attendance = [
@@ -1938,33 +1691,19 @@ class SalaryDataViewSet(viewsets.ModelViewSet):
         if time_period or department or start_date or end_date:
             # Clear specific filter combination
             date_range_suffix = f"_{start_date}_{end_date}" if start_date and end_date else ""
-            specific_cache_key = f"frontend_charts_{tenant.id}_{time_period or 'all'}_{department or 'all'}{date_range_suffix}"
+            specific_cache_key = versioned_cache_key(
+                tenant,
+                f"frontend_charts_{tenant.id}_{time_period or 'all'}_{department or 'all'}{date_range_suffix}",
+                CHARTS, PAYROLL, DIRECTORY,
+            )
             
             if cache.delete(specific_cache_key):
                 cleared_keys.append(specific_cache_key)
                 logger.info(f"Cleared specific frontend charts cache: {specific_cache_key}")
         else:
-            # Clear all frontend charts cache for this tenant
-            try:
-                # Try pattern-based clearing
-                cleared_count = cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-                if cleared_count > 0:
-                    cleared_keys.append(f"frontend_charts_{tenant.id}_* (pattern)")
-                    logger.info(f"Cleared {cleared_count} frontend charts cache keys using pattern matching")
-            except AttributeError:
-                # Fallback: Clear common filter combinations
-                common_combinations = [
-                    f"frontend_charts_{tenant.id}_this_month_All_",
-                    f"frontend_charts_{tenant.id}_last_6_months_All_",
-                    f"frontend_charts_{tenant.id}_last_12_months_All_",
-                    f"frontend_charts_{tenant.id}_last_5_years_All_"
-                ]
-                
-                for cache_key in common_combinations:
-                    if cache.delete(cache_key):
-                        cleared_keys.append(cache_key)
-                
-                logger.info(f"Cleared {len(cleared_keys)} common frontend charts cache keys")
+            # Clear all frontend charts cache variants for this tenant with one generation bump
+            bump_cache_generation(tenant, CHARTS, reason="clear_charts_cache")
+            cleared_keys.append(f"frontend_charts_{tenant.id}_* (generation)")
         
         return Response({
             'success': True,
@@ -2128,27 +1867,9 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
 
         serializer.save(tenant=tenant)
         # CLEAR CACHE: Invalidate payroll, directory, and stats cache when employee is created
-        from django.core.cache import cache
         tenant = getattr(self.request, 'tenant', None)
         if tenant:
-            cache.delete(f"payroll_overview_{tenant.id}")
-            cache.delete(f"directory_data_{tenant.id}")
-            cache.delete(f"directory_data_full_{tenant.id}")  # Clear full directory cache
-            
-            # Clear frontend charts cache (stats component)
-            try:
-                cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-                logger.info(f"✨ Cleared frontend_charts pattern cache for tenant {tenant.id}")
-            except AttributeError:
-                chart_keys = [
-                    f"frontend_charts_{tenant.id}_this_month_All_",
-                    f"frontend_charts_{tenant.id}_last_6_months_All_",
-                    f"frontend_charts_{tenant.id}_last_12_months_All_",
-                    f"frontend_charts_{tenant.id}_last_5_years_All_"
-                ]
-                for key in chart_keys:
-                    cache.delete(key)
-            
+            bump_cache_generation(tenant, DIRECTORY, reason="employee_created")
             logger.info(f"✨ Cleared payroll, directory, and charts cache for tenant {tenant.id} after employee creation")
 
 
@@ -2156,375 +1877,78 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def directory_data(self, request):
         """
-        ULTRA-OPTIMIZED employee directory data with recent salary info.
-        Includes comprehensive performance tracking and advanced caching strategies.
+        Employee directory with recent salary and current month attendance, one page at a time.
+
+        Pages come from the EmployeeDirectoryRow read model (services/employee_directory.py)
+        with keyset pagination: pass the returned next_cursor as ?cursor= for the following
+        page. Query parameters: limit (max 500), sort (name, employee_id, department,
+        last_salary; prefix '-' for descending), department, status (active/inactive).
+        offset still works for older clients; total_count is only computed without a cursor.
         """
-        from django.db.models import Prefetch, Q, Subquery, OuterRef, Case, When, IntegerField
-        from django.core.paginator import Paginator
-        from django.core.cache import cache
-        from django.utils import timezone
-        from datetime import datetime
-        import hashlib
-        
-        # COMPREHENSIVE TIMING TRACKING
+        from ..services.employee_directory import directory_page, directory_queryset, ensure_directory_current
+        from ..utils.cursor_pagination import InvalidCursor, page_size_param
+
         start_time = time.time()
         timing_breakdown = {}
-        
-        # STEP 1: Tenant validation and cache setup
-        step_start = time.time()
+
         tenant = getattr(request, 'tenant', None)
         if not tenant:
             return Response({"error": "No tenant found"}, status=400)
-            
-        # PROGRESSIVE LOADING: Support offset/limit (like attendance tracker)
+
+        cursor = request.GET.get('cursor') or None
+        page_size = page_size_param(request.GET.get('limit') or request.GET.get('page_size'))
         try:
-            offset = int(request.GET.get('offset', 0))
-            limit = int(request.GET.get('limit', 0))  # 0 = no limit (all records)
+            offset = max(int(request.GET.get('offset', 0)), 0)
         except ValueError:
             offset = 0
-            limit = 0
-        
-        # Backward compatibility
-        load_all = request.GET.get('load_all', '').lower() == 'true'
-        page = int(request.GET.get('page', 1))
-        page_size = min(int(request.GET.get('page_size', 100)), 500)
-        
-        use_offset_limit = limit > 0
-        
-        # SMART CACHING: Cache full dataset, slice for pagination (like attendance tracker)
-        full_cache_key = f"directory_data_full_{tenant.id}"
-        param_signature = f"offset_{offset}_limit_{limit}"
-        
-        timing_breakdown['setup_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # STEP 2: Check for FULL dataset cache (like attendance tracker)
-        step_start = time.time()
-        use_cache = request.GET.get('no_cache', '').lower() != 'true'
-        full_response = None
-        
-        if use_cache:
-            full_response = cache.get(full_cache_key)
-            if full_response:
-                # Cache HIT! Slice the full dataset for this offset/limit
-                all_results = full_response.get('results', [])
-                
-                if use_offset_limit and limit > 0:
-                    # Slice for progressive loading
-                    end_index = offset + limit
-                    paginated_results = all_results[offset:end_index]
-                    has_more = end_index < len(all_results)
-                else:
-                    # Return all
-                    paginated_results = all_results
-                    has_more = False
-                
-                # Build response with cached data
-                response = {
-                    'results': paginated_results,
-                    'count': len(paginated_results),
-                    'total_count': len(all_results),
-                    'has_more': has_more,
-                    'offset': offset,
-                    'performance': full_response.get('performance', {}),
-                }
-                response['performance']['cached'] = True
-                response['performance']['data_source'] = 'full_cache_slice'
-                response['performance']['query_time'] = f"{(time.time() - start_time):.3f}s"
-                
-                logger.info(f"✨ CACHE HIT - Serving {len(paginated_results)} of {len(all_results)} employees from cache")
-                return Response(response)
-        
-        timing_breakdown['cache_check_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # STEP 3: OPTIMIZED EMPLOYEE QUERY - Selective field loading
-        step_start = time.time()
-        employees_query = self.get_queryset().only(
-            'id', 'employee_id', 'first_name', 'last_name', 'department', 
-            'designation', 'mobile_number', 'email', 'is_active', 'basic_salary',
-            'shift_start_time', 'shift_end_time', 'tenant_id', 'employment_type',
-            'date_of_joining', 'location_branch', 'inactive_marked_at', 'off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday',
-            'off_friday', 'off_saturday', 'off_sunday'
-        ).order_by('first_name', 'last_name')
-        timing_breakdown['employee_query_setup_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # STEP 4: LIGHTNING-FAST SALARY SUBQUERY
-        step_start = time.time()
-        latest_salary_subquery = SalaryData.objects.filter(
-            tenant=tenant,  # Critical: Add tenant filter to subquery
-            employee_id=OuterRef('employee_id')
-        ).only('nett_payable', 'month', 'year').order_by('-year', '-month')[:1]
-        
-        employees_with_salary = employees_query.annotate(
-            latest_salary_amount=Subquery(latest_salary_subquery.values('nett_payable')),
-            latest_salary_month=Subquery(latest_salary_subquery.values('month')),
-            latest_salary_year=Subquery(latest_salary_subquery.values('year'))
-        )
-        timing_breakdown['salary_subquery_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # STEP 5: FETCH ALL EMPLOYEES (like attendance tracker - build full dataset first)
+        sort = request.GET.get('sort', 'name')
+        department = request.GET.get('department') or None
+        status_filter = request.GET.get('status', '').lower() or None
+
+        # STEP 1: First request after a deploy or a month change builds the rows in place
         step_start = time.time()
-        total_count = employees_with_salary.count()
-        
-        # Always fetch ALL employees to build full dataset for caching
-        employees_page = employees_with_salary  # Full queryset
-        timing_breakdown['query_execution_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # STEP 6: AGGREGATED ATTENDANCE DATA FROM MULTIPLE SOURCES
+        rebuilt = ensure_directory_current(tenant.id)
+        timing_breakdown['freshness_check_ms'] = round((time.time() - step_start) * 1000, 2)
+
+        # STEP 2: One index range scan for the page
         step_start = time.time()
-        current_month = timezone.now().month
-        current_year = timezone.now().year
-        
-        # Get all employee IDs for current page efficiently
-        employee_ids = [emp.employee_id for emp in employees_page]
-        timing_breakdown['employee_ids_extracted'] = len(employee_ids)
-        
-        # AGGREGATED ATTENDANCE: Combine data from 3 sources
-        # 1. SalaryData (uploaded salary Excel)
-        # 2. DailyAttendance (manually marked attendance)
-        # 3. Attendance (uploaded attendance Excel)
-        from ..models import Attendance, DailyAttendance
-        from django.db.models import Max, Count, Q
-        
-        # Initialize aggregated lookup dictionary
-        attendance_lookup = {}
-        
-        # SOURCE 1: Get latest salary data (uploaded Excel)
-        latest_salary_attendance = SalaryData.objects.filter(
-            tenant=tenant,
-            employee_id__in=employee_ids
-        ).values('employee_id', 'days', 'absent', 'ot', 'late').order_by('employee_id', '-year', '-month')
-        
-        for record in latest_salary_attendance:
-            emp_id = record['employee_id']
-            if emp_id not in attendance_lookup:  # Only keep the latest record per employee
-                attendance_lookup[emp_id] = {
-                    'present_days': float(record['days'] or 0),
-                    'absent_days': float(record['absent'] or 0),
-                    'ot_hours': float(record['ot'] or 0),
-                    'late_minutes': int(record['late'] or 0)
-                }
-        
-        # SOURCE 2: Aggregate manually marked DailyAttendance
-        daily_attendance_records = DailyAttendance.objects.filter(
-            tenant=tenant,
-            employee_id__in=employee_ids
-        ).values('employee_id', 'attendance_status')
-        
-        # Group by employee and count statuses
-        daily_attendance_grouped = {}
-        for record in daily_attendance_records:
-            emp_id = record['employee_id']
-            status = record['attendance_status']
-            
-            if emp_id not in daily_attendance_grouped:
-                daily_attendance_grouped[emp_id] = {
-                    'PRESENT': 0, 'ABSENT': 0, 'HALF_DAY': 0, 'PAID_LEAVE': 0
-                }
-            
-            if status in daily_attendance_grouped[emp_id]:
-                daily_attendance_grouped[emp_id][status] += 1
-        
-        # Add manually marked attendance to aggregated data
-        for emp_id, counts in daily_attendance_grouped.items():
-            manual_present = counts['PRESENT'] + counts['PAID_LEAVE'] + (counts['HALF_DAY'] * 0.5)
-            manual_absent = counts['ABSENT'] + (counts['HALF_DAY'] * 0.5)
-            
-            if emp_id in attendance_lookup:
-                attendance_lookup[emp_id]['present_days'] += manual_present
-                attendance_lookup[emp_id]['absent_days'] += manual_absent
-            else:
-                attendance_lookup[emp_id] = {
-                    'present_days': manual_present,
-                    'absent_days': manual_absent,
-                    'ot_hours': 0,
-                    'late_minutes': 0
-                }
-        
-        # SOURCE 3: Get uploaded attendance Excel data (for additional OT/late info)
-        latest_attendance_excel = Attendance.objects.filter(
-            tenant=tenant,
-            employee_id__in=employee_ids
-        ).values('employee_id', 'ot_hours', 'late_minutes').order_by('employee_id', '-date')
-        
-        # Track which employees we've processed to only take latest
-        processed_excel_employees = set()
-        
-        # Add OT and late minutes from attendance Excel if not already set
-        for record in latest_attendance_excel:
-            emp_id = record['employee_id']
-            if emp_id not in processed_excel_employees:
-                processed_excel_employees.add(emp_id)
-                
-                if emp_id in attendance_lookup:
-                    # Update OT and late if they're still 0 (use attendance Excel as fallback)
-                    if attendance_lookup[emp_id]['ot_hours'] == 0:
-                        attendance_lookup[emp_id]['ot_hours'] = float(record['ot_hours'] or 0)
-                    if attendance_lookup[emp_id]['late_minutes'] == 0:
-                        attendance_lookup[emp_id]['late_minutes'] = int(record['late_minutes'] or 0)
-        
-        timing_breakdown['attendance_query_ms'] = round((time.time() - step_start) * 1000, 2)
-        timing_breakdown['attendance_records_found'] = len(attendance_lookup)
-        
-        
-        # STEP 7: OPTIMIZED DATA PROCESSING WITH CACHED WORKING DAYS
-        step_start = time.time()
-        data = []
-        
-        # OPTIMIZATION: Pre-calculate working days for the month once (cache this expensive calculation)
-        working_days_cache_key = f"working_days_{current_year}_{current_month}"
-        
-        def calculate_working_days_for_employee(employee):
-            """Fast working days calculation with pre-computed month data"""
-            from calendar import monthrange
-            import datetime
-            
-            _, days_in_month = monthrange(current_year, current_month)
-            working_days = 0
-            
-            # Optimized loop with early exit conditions
-            off_days_map = {
-                0: employee.off_monday,
-                1: employee.off_tuesday, 
-                2: employee.off_wednesday,
-                3: employee.off_thursday,
-                4: employee.off_friday,
-                5: employee.off_saturday,
-                6: employee.off_sunday
-            }
-            
-            for day in range(1, days_in_month + 1):
-                weekday = datetime.date(current_year, current_month, day).weekday()
-                if not off_days_map.get(weekday, False):
-                    working_days += 1
-                    
-            return working_days
-        
-        for employee in employees_page:
-            # OPTIMIZATION: Fast off days formatting with list comprehension
-            off_days = [day for day, is_off in [
-                ('Mon', employee.off_monday), ('Tue', employee.off_tuesday),
-                ('Wed', employee.off_wednesday), ('Thu', employee.off_thursday),
-                ('Fri', employee.off_friday), ('Sat', employee.off_saturday),
-                ('Sun', employee.off_sunday)
-            ] if is_off]
-            
-            off_days_display = ', '.join(off_days) if off_days else 'None'
-            
-            # Get AGGREGATED attendance data from lookup (combines all sources)
-            monthly_summary = attendance_lookup.get(employee.employee_id, {})
-            present_days = float(monthly_summary.get('present_days', 0))
-            absent_days = float(monthly_summary.get('absent_days', 0))
-            total_ot_hours = float(monthly_summary.get('ot_hours', 0))
-            total_late_minutes = monthly_summary.get('late_minutes', 0)
-            
-            # Calculate attendance percentage from aggregated data
-            # Uses present + absent from both uploaded Excel and manually marked attendance
-            total_days = present_days + absent_days
-            if total_days > 0:
-                attendance_percentage = (present_days / total_days) * 100
-            else:
-                # Fallback to working days if no aggregated data
-                working_days = calculate_working_days_for_employee(employee)
-                attendance_percentage = 0
-                absent_days = working_days  # No data means all absent
-            
-            # Calculate working days for display
-            working_days = calculate_working_days_for_employee(employee)
+        try:
+            results, next_cursor = directory_page(
+                tenant.id, sort=sort, cursor=cursor, page_size=page_size, offset=offset,
+                department=department, status=status_filter,
+            )
+        except (ValueError, InvalidCursor) as e:
+            return Response({"error": str(e)}, status=400)
+        timing_breakdown['page_query_ms'] = round((time.time() - step_start) * 1000, 2)
+
+        # STEP 3: Total for progressive loading, on the first request only
+        total_count = None
+        if cursor is None:
+            step_start = time.time()
+            total_count = directory_queryset(tenant.id, department, status_filter).count()
+            timing_breakdown['count_ms'] = round((time.time() - step_start) * 1000, 2)
 
-            employee_data = {
-                'id': employee.id,
-                'employee_id': employee.employee_id,
-                'name': f"{employee.first_name} {employee.last_name}",  # Avoid full_name property
-                'department': employee.department or '',
-                'designation': employee.designation or '',
-                'employment_type': employee.employment_type or 'FULL_TIME',
-                'date_of_joining': employee.date_of_joining.isoformat() if employee.date_of_joining else None,
-                'location_branch': employee.location_branch or 'Main Office',
-                'mobile_number': employee.mobile_number or '',
-                'email': employee.email or '',
-                'is_active': employee.is_active,
-                'inactive_marked_at': employee.inactive_marked_at.isoformat() if getattr(employee, 'inactive_marked_at', None) else None,
-                'basic_salary': float(employee.basic_salary) if employee.basic_salary else 0,
-                'shift_start_time': employee.shift_start_time.strftime('%H:%M') if employee.shift_start_time else None,
-                'shift_end_time': employee.shift_end_time.strftime('%H:%M') if employee.shift_end_time else None,
-                'last_salary': float(employee.latest_salary_amount) if employee.latest_salary_amount else 0,
-                'last_month': f"{employee.latest_salary_month} {employee.latest_salary_year}" if employee.latest_salary_month else 'N/A',
-                'off_days': off_days_display,
-                # Individual off day flags
-                'off_monday': employee.off_monday,
-                'off_tuesday': employee.off_tuesday,
-                'off_wednesday': employee.off_wednesday,
-                'off_thursday': employee.off_thursday,
-                'off_friday': employee.off_friday,
-                'off_saturday': employee.off_saturday,
-                'off_sunday': employee.off_sunday,
-                # Current month attendance data
-                'current_month': f"{current_month}/{current_year}",
-                'attendance': {
-                    'present_days': present_days,
-                    'absent_days': absent_days,
-                    'working_days': working_days,
-                    'attendance_percentage': round(attendance_percentage, 1),
-                    'total_ot_hours': total_ot_hours,
-                    'total_late_minutes': total_late_minutes
-                }
-            }
-            
-            data.append(employee_data)
-        
-        timing_breakdown['data_processing_ms'] = round((time.time() - step_start) * 1000, 2)
-        timing_breakdown['records_processed'] = len(data)
-        
-        # STEP 8: SMART CACHING & RESPONSE (like attendance tracker)
-        step_start = time.time()
         total_time_ms = round((time.time() - start_time) * 1000, 2)
-        
-        # Store FULL dataset in cache for fast subsequent requests
-        full_response_data = {
-            'results': data,  # Full dataset
-            'total_count': total_count,
+        response_data = {
+            'results': results,
+            'count': len(results),  # Records in current response
+            'total_count': total_count,  # Total records available (None with a cursor)
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor,
+            'offset': 0 if cursor else offset,
+            'sort': sort,
             'performance': {
                 'query_time': f"{(time.time() - start_time):.3f}s",
                 'total_time_ms': total_time_ms,
                 'timing_breakdown': timing_breakdown,
-                'total_employees': total_count,
                 'cached': False,
-                'data_source': 'database_query',
-                'optimization_level': 'ULTRA_OPTIMIZED_v2.1_FULL_CACHE'
-            }
-        }
-        
-        # Cache the full dataset (like attendance tracker)
-        if use_cache and total_count <= 2000:  # Cache if reasonable size
-            cache.set(full_cache_key, full_response_data, 600)  # 10 minutes
-            logger.info(f"💾 Cached full directory dataset: {total_count} employees")
-        
-        # Now slice for the requested offset/limit
-        if use_offset_limit and limit > 0:
-            end_index = offset + limit
-            paginated_results = data[offset:end_index] if offset < len(data) else []
-            has_more_sliced = end_index < len(data)
-            calculated_offset = offset
-        else:
-            paginated_results = data
-            has_more_sliced = False
-            calculated_offset = 0
-        
-        # Build final response
-        response_data = {
-            'results': paginated_results,
-            'count': len(paginated_results),  # Records in current response
-            'total_count': total_count,  # Total records available
-            'has_more': has_more_sliced,  # For progressive loading
-            'offset': calculated_offset,  # For progressive loading
-            'performance': full_response_data['performance']
+                'rebuilt': rebuilt,
+                'data_source': 'directory_read_model',
+            },
         }
-        
-        timing_breakdown['response_building_ms'] = round((time.time() - step_start) * 1000, 2)
-        
-        # Performance logging
-        logger.info(f"directory_data API Performance - Total: {total_time_ms}ms, Offset: {offset}, Limit: {limit}, Records: {len(paginated_results)}/{total_count}")
-        
+
+        logger.info(f"directory_data API Performance - Total: {total_time_ms}ms, Sort: {sort}, Records: {len(results)}, More: {next_cursor is not None}")
+
         return Response(response_data)
     
     @action(detail=True, methods=['get'])
@@ -2542,7 +1966,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
         # Get recent salary data
         recent_salaries = SalaryData.objects.filter(
             employee_id=employee.employee_id
-        ).order_by('-year', '-month')[:6]
+        ).order_by('-period_index')[:6]
         
         # Get recent daily attendance
         recent_daily_attendance = DailyAttendance.objects.filter(
@@ -2577,7 +2001,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
 
         # Gather related data similar to profile_detail
         recent_attendance = Attendance.objects.filter(tenant=tenant, employee_id=employee_id).order_by('-date')[:6]
-        recent_salaries = SalaryData.objects.filter(tenant=tenant, employee_id=employee_id).order_by('-year', '-month')[:6]
+        recent_salaries = SalaryData.objects.filter(tenant=tenant, employee_id=employee_id).order_by('-period_index')[:6]
         recent_daily_attendance = DailyAttendance.objects.filter(tenant=tenant, employee_id=employee_id).order_by('-date')[:10]
 
         from ..serializers import AttendanceSerializer, SalaryDataSerializer, DailyAttendanceSerializer, EmployeeFormSerializer, EmployeeProfileSerializer
@@ -2609,23 +2033,9 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
             employee.inactive_marked_at = timezone.now().date()
         employee.save()
         
-        # Clear multiple caches when employee status changes
-        from django.core.cache import cache
+        # Clear directory, payroll overview and attendance caches when employee status changes
         tenant = getattr(request, 'tenant', None)
-        
-        # Clear directory data cache
-        cache_key = f"directory_data_{tenant.id if tenant else 'default'}"
-        cache.delete(cache_key)
-        
-        # Clear payroll overview cache
-        payroll_cache_key = f"payroll_overview_{tenant.id if tenant else 'default'}"
-        cache.delete(payroll_cache_key)
-        logger.info(f"Cleared payroll overview cache for tenant {tenant.id if tenant else 'default'}")
-        
-        # Clear daily attendance all_records cache
-        attendance_records_cache_key = f"attendance_all_records_{tenant.id if tenant else 'default'}"
-        cache.delete(attendance_records_cache_key)
-        logger.info(f"Cleared attendance all_records cache for tenant {tenant.id if tenant else 'default'}")
+        bump_cache_generation(tenant, DIRECTORY, reason="employee_status_changed")
         
         return Response({
             'message': f'Employee {employee.full_name} is now {"active" if employee.is_active else "inactive"}',
@@ -2641,7 +2051,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
         ULTRA-FAST bulk upload employees from Excel/CSV file
         
         Optimizations:
-        1. Read entire Excel file into memory first
+        1. Stream the Excel/CSV file into typed columns (rejecting oversized files up front)
         2. Generate all employee IDs in memory (avoiding N database queries)
         3. Validate all data in memory
         4. Single bulk_create operation to database
@@ -2656,6 +2066,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
         from datetime import datetime, time as dt_time
         from django.db import transaction
         from ..utils.utils import generate_employee_id_bulk_optimized
+        from ..utils.upload_reader import UploadFileError, read_upload
         
         start_time = time.time()
         
@@ -2675,15 +2086,17 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
         try:
             print(f"📁 Reading file: {file_obj.name}")
             
-            # STEP 1: Read entire file into memory - FAST
-            if file_obj.name.endswith('.xlsx') or file_obj.name.endswith('.xls'):
-                df = pd.read_excel(file_obj)
-            elif file_obj.name.endswith('.csv'):
-                df = pd.read_csv(file_obj)
-            else:
+            # STEP 1: Stream the file into typed columns - size, format and row limits checked first
+            if not file_obj.name.endswith(('.xlsx', '.xls', '.csv')):
                 return Response({
                     'error': 'Unsupported file format. Please upload Excel (.xlsx, .xls) or CSV files only.'
                 }, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                df = read_upload(file_obj, numeric_columns=['Basic Salary'])
+            except UploadFileError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             
             read_time = time.time()
             print(f"⚡ File read in {(read_time - start_time):.2f}s - {len(df)} rows")
@@ -2926,29 +2339,10 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
             print(f"⚡ Database bulk create completed in {(db_time - objects_time):.2f}s")
             print(f"🚀 TOTAL TIME: {total_time:.2f}s for {len(created_employees)} employees")
             
-            # Clear relevant caches
-            from django.core.cache import cache
-            cache_keys = [
-                f"directory_data_{tenant.id}",
-                f"directory_data_full_{tenant.id}",  # Clear full directory cache
-                f"payroll_overview_{tenant.id}",
-                f"attendance_all_records_{tenant.id}"
-            ]
-            for key in cache_keys:
-                cache.delete(key)
-            
-            # Clear frontend charts cache (stats component)
-            try:
-                cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-            except AttributeError:
-                chart_keys = [
-                    f"frontend_charts_{tenant.id}_this_month_All_",
-                    f"frontend_charts_{tenant.id}_last_6_months_All_",
-                    f"frontend_charts_{tenant.id}_last_12_months_All_",
-                    f"frontend_charts_{tenant.id}_last_5_years_All_"
-                ]
-                for key in chart_keys:
-                    cache.delete(key)
+            # Invalidate every cache that depends on the employee directory
+            bumped_domains = bump_cache_generation(tenant, DIRECTORY, reason="employee_bulk_create")
+            # bulk_create skips the post_save receivers: add the new directory rows here
+            schedule_directory_refresh(tenant.id, [employee.employee_id for employee in created_employees])
             
             logger.info(f"✨ Cleared directory and charts cache for tenant {tenant.id} after bulk employee upload")
             
@@ -2968,7 +2362,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                 },
                 'sample_employee_ids': [emp.employee_id for emp in created_employees[:5]],
                 'collision_handling': 'Postfix format: SID-MA-025-A, SID-MA-025-B, etc.',
-                'caches_cleared': len(cache_keys)
+                'caches_cleared': len(bumped_domains)
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -3096,29 +2490,10 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                     ignore_conflicts=False
                 )
             
-            # Clear relevant caches
-            from django.core.cache import cache
-            cache_keys = [
-                f"directory_data_{tenant.id}",
-                f"directory_data_full_{tenant.id}",  # Clear full directory cache
-                f"payroll_overview_{tenant.id}",
-                f"attendance_all_records_{tenant.id}"
-            ]
-            for key in cache_keys:
-                cache.delete(key)
-            
-            # Clear frontend charts cache (stats component)
-            try:
-                cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-            except AttributeError:
-                chart_keys = [
-                    f"frontend_charts_{tenant.id}_this_month_All_",
-                    f"frontend_charts_{tenant.id}_last_6_months_All_",
-                    f"frontend_charts_{tenant.id}_last_12_months_All_",
-                    f"frontend_charts_{tenant.id}_last_5_years_All_"
-                ]
-                for key in chart_keys:
-                    cache.delete(key)
+            # Invalidate every cache that depends on the employee directory
+            bumped_domains = bump_cache_generation(tenant, DIRECTORY, reason="employee_bulk_create")
+            # bulk_create skips the post_save receivers: add the new directory rows here
+            schedule_directory_refresh(tenant.id, [employee.employee_id for employee in created_employees])
             
             logger.info(f"✨ Cleared directory and charts cache for tenant {tenant.id} after creating missing employees")
             
@@ -3126,7 +2501,7 @@ class EmployeeProfileViewSet(viewsets.ModelViewSet):
                 'message': 'Missing employees created successfully!',
                 'employees_created': len(created_employees),
                 'created_employee_ids': [emp.employee_id for emp in created_employees],
-                'caches_cleared': len(cache_keys)
+                'caches_cleared': len(bumped_domains)
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -3228,93 +2603,79 @@ class AttendanceViewSet(viewsets.ReadOnlyModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """
-        ULTRA-OPTIMIZED attendance list endpoint with progressive loading and caching.
-        Returns attendance data with intelligent pagination and performance optimization.
+        Attendance list with keyset (cursor) pagination.
+
+        Query params: cursor (next_cursor of the previous page), limit (default 50, max 500),
+        offset (older clients; ignored with a cursor), ordering (see ordering_fields) and
+        count=exact|approximate|none (default approximate on the first page, none after it).
         """
         import time
-        from django.core.cache import cache
-        from django.core.paginator import Paginator
-        
+        from ..utils.cursor_pagination import (
+            COUNT_APPROXIMATE, COUNT_NONE, InvalidCursor, count_param, count_rows,
+            page_size_param, paginate, paginate_list,
+        )
+
         start_time = time.time()
         timing_breakdown = {}
-        
+
         # Get tenant
         tenant = getattr(request, 'tenant', None)
         if not tenant:
             return Response({"error": "No tenant found"}, status=400)
-        
+
         # Extract pagination params
-        offset = int(request.query_params.get('offset', 0))
-        limit = int(request.query_params.get('limit', 50))  # Default to 50 for performance
-        
-        # Generate cache key
-        cache_key = f"attendance_list_{tenant.id}_offset_{offset}_limit_{limit}"
-        
-        # Check cache first
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            timing_breakdown['cache_hit'] = True
-            timing_breakdown['cache_time_ms'] = round((time.time() - start_time) * 1000, 2)
-            
-            response_data = cached_data.copy()
-            response_data['performance'] = {
-                'cached': True,
-                'total_time_ms': timing_breakdown['cache_time_ms'],
-                'optimization_level': 'cached_response'
-            }
-            return Response(response_data)
-        else:
-            # Cache miss - fetch data
-            timing_breakdown['cache_hit'] = False
-            step_start = time.time()
-            
-            queryset = self.get_queryset()
-            
-            # Check if queryset is a list (from _create_mock_attendance_queryset)
+        cursor = request.query_params.get('cursor') or None
+        limit = page_size_param(request.query_params.get('limit'), default=50)  # Default to 50 for performance
+        try:
+            offset = 0 if cursor else max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            offset = 0
+        count_mode = count_param(
+            request.query_params.get('count'),
+            default=COUNT_NONE if cursor else COUNT_APPROXIMATE,
+        )
+
+        step_start = time.time()
+        queryset = self.get_queryset()
+        total_count, total_is_approximate = None, False
+        try:
+            # Check if queryset is a list (from _generate_attendance_from_daily_range)
             if isinstance(queryset, list):
-                # Apply pagination to list
-                paginator = Paginator(queryset, limit)
-                page_number = (offset // limit) + 1
-                page = paginator.get_page(page_number)
-                
-                serializer = self.get_serializer(page.object_list, many=True)
-                total_count = paginator.count
-                has_more = page.has_next()
-                
+                rows, next_cursor = paginate_list(queryset, cursor=cursor, page_size=limit, offset=offset)
+                if count_mode != COUNT_NONE:
+                    total_count = len(queryset)
             else:
-                # Standard queryset handling with pagination
-                queryset = self.filter_queryset(queryset)
-                
-                # Apply offset and limit
-                total_count = queryset.count()
-                paginated_queryset = queryset[offset:offset + limit]
-                has_more = (offset + limit) < total_count
-                
-                serializer = self.get_serializer(paginated_queryset, many=True)
-            
-            db_time = time.time() - step_start
-            timing_breakdown['db_time_ms'] = round(db_time * 1000, 2)
-            
-            # Prepare response data
-            response_data = {
-                'results': serializer.data,
-                'count': len(serializer.data),
-                'total_count': total_count,
-                'offset': offset,
-                'limit': limit,
-                'has_more': has_more,
-                'performance': {
-                    'cached': False,
-                    'db_time_ms': timing_breakdown['db_time_ms'],
-                    'total_time_ms': round((time.time() - start_time) * 1000, 2),
-                    'optimization_level': 'paginated_query'
-                }
+                # Search filter; the sort is applied by paginate() with the unique id appended
+                queryset = filters.SearchFilter().filter_queryset(request, queryset, self)
+                ordering = filters.OrderingFilter().get_ordering(request, queryset, self) or ['-date', 'name']
+                rows, next_cursor = paginate(
+                    queryset, (*ordering, '-id' if ordering[-1].startswith('-') else 'id'),
+                    cursor=cursor, page_size=limit, offset=offset,
+                )
+                total_count, total_is_approximate = count_rows(queryset, count_mode)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
+
+        serializer = self.get_serializer(rows, many=True)
+        timing_breakdown['db_time_ms'] = round((time.time() - step_start) * 1000, 2)
+
+        response_data = {
+            'results': serializer.data,
+            'count': len(serializer.data),
+            'total_count': total_count,
+            'total_count_approximate': total_is_approximate,
+            'offset': offset,
+            'limit': limit,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor,  # Pass as ?cursor= for the next page
+            'performance': {
+                'cached': False,
+                'db_time_ms': timing_breakdown['db_time_ms'],
+                'total_time_ms': round((time.time() - start_time) * 1000, 2),
+                'optimization_level': 'keyset_pagination'
             }
-            
-            # Cache the response for 5 minutes
-            cache.set(cache_key, response_data, 300)
-            
-            return Response(response_data)
+        }
+        return Response(response_data)
 
     def get_queryset(self):
         """
@@ -3372,7 +2733,6 @@ class AttendanceViewSet(viewsets.ReadOnlyModelViewSet):
         
         # UPDATED: Check both Excel uploads (Attendance) and attendance log (MonthlyAttendanceSummary)
         # This provides a comprehensive view combining both mechanisms
-        from ..models import MonthlyAttendanceSummary
         from datetime import datetime
         
         # Get month filter from query params if provided
@@ -3440,7 +2800,6 @@ class AttendanceViewSet(viewsets.ReadOnlyModelViewSet):
         attendance_records = []
         
         # STEP 1: Get data from MonthlyAttendanceSummary (attendance log) - this takes priority
-        from ..models import MonthlyAttendanceSummary
         
         summary_filter = Q()
         for y, m in selected_months:
@@ -3770,27 +3129,47 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-date', 'employee_name')
 
+    # Employee order of all_records pages (employee_name_order_idx); last_name is nullable,
+    # which keyset comparisons cannot handle, so equal first names continue by id
+    ALL_RECORDS_ORDERING = ('first_name', 'id')
+    ALL_RECORDS_EMPLOYEE_FIELDS = (
+        'id', 'employee_id', 'first_name', 'last_name', 'department', 'designation',
+        'date_of_joining', 'shift_start_time', 'shift_end_time',
+        'off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday',
+        'off_friday', 'off_saturday', 'off_sunday',
+    )
+    # Most employees aggregated per round of queries (pages and KPI totals)
+    ALL_RECORDS_BATCH_SIZE = 1000
+
     @action(detail=False, methods=['get'])
     def all_records(self, request):
         """
-        Return attendance summaries for the current tenant with PROGRESSIVE LOADING support.
-        
+        Return attendance summaries for the current tenant, one page of employees at a time.
+
         Supports the following query parameters (all optional):
         1. time_period: this_month (default) | last_6_months | last_12_months | last_5_years | custom | custom_month | custom_range
         2. year + month   : When time_period=custom or custom_month, provide numeric month (1-12) and four-digit year.
         3. start_date & end_date : When time_period=custom_range, provide ISO dates (YYYY-MM-DD).
-        4. no_cache=true  : Bypass the cache.
-        5. offset=N : Skip first N records (for progressive loading, default: 0)
-        6. limit=N  : Return max N records (for progressive loading, default: all)
-        
+        4. no_cache=true  : Recompute the KPI totals instead of using the cached ones.
+        5. cursor=...     : Continue after the previous page (its next_cursor).
+        6. limit=N  : Records per page (default 100, max 500)
+        7. offset=N : Skip first N records, for older clients (costs the skipped records; ignored with a cursor)
+        8. count=none : Skip the KPI totals and total_count of the first page.
+
+        Pages walk active employees in name order with a keyset cursor and aggregate
+        attendance for that page's employees only, so a deep page costs the same as the first.
+        The first page also returns kpi_totals and total_count over all records, computed in
+        batches and cached until the attendance or directory data changes.
+
         NOTE: custom_month uses DailyAttendance (real-time) logic to avoid double-counting, same as custom_range.
         """
         import time
         from datetime import datetime, timedelta, date
-        from collections import defaultdict
         from django.utils import timezone
         from django.core.cache import cache
-        from django.db.models import Q, Sum, Case, When, FloatField, Value
+        from ..utils.cursor_pagination import (
+            COUNT_NONE, InvalidCursor, count_param, encode_cursor, page_size_param, paginate,
+        )
 
         # COMPREHENSIVE TIMING TRACKING
         start_time = time.time()
@@ -3817,46 +3196,23 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         # When true, prefer real-time aggregation from DailyAttendance for the current month
         prefer_realtime = request.query_params.get('prefer_realtime', 'true').lower() != 'false'
         use_cache       = request.GET.get('no_cache', '').lower() != 'true'
-        
-        # PROGRESSIVE LOADING: offset and limit parameters
+
+        # PAGINATION: keyset cursor (offset kept for older clients), bounded page size
+        cursor = request.query_params.get('cursor') or None
+        limit = page_size_param(request.query_params.get('limit'))
         try:
-            offset = int(request.query_params.get('offset', 0))
-            limit = int(request.query_params.get('limit', 0))  # 0 = no limit (all records)
+            offset = 0 if cursor else max(int(request.query_params.get('offset', 0)), 0)
         except ValueError:
             offset = 0
-            limit = 0
+        first_page = cursor is None and offset == 0
+        include_totals = first_page and count_param(request.query_params.get('count'), default='exact') != COUNT_NONE
 
-        # Build cache key that is aware of the selected parameters so that each
-        # combination is cached independently.
-        # NOTE: Cache key excludes offset/limit to cache full dataset
+        # KPI totals are cached per parameter combination (pages are not cached)
         # Include prefer_realtime in the cache key signature to avoid mixing modes
         param_signature = f"{time_period}_{month_param}_{year_param}_{start_date_str}_{end_date_str}_rt_{int(prefer_realtime)}"
-        cache_key       = f"attendance_all_records_{tenant.id}_{param_signature}"
+        cache_key       = versioned_cache_key(tenant, f"attendance_all_records_totals_{tenant.id}_{param_signature}", ATTENDANCE, DIRECTORY)
         timing_breakdown['params_extraction_ms'] = round((time.time() - step_start) * 1000, 2)
 
-        step_start = time.time()
-        if use_cache:
-            cached = cache.get(cache_key)
-            if cached:
-                # PROGRESSIVE LOADING: Apply offset/limit to cached data
-                cached_records = cached.get('results', [])
-                total_cached = len(cached_records)
-                
-                if limit > 0:
-                    end_index = offset + limit
-                    paginated_cached = cached_records[offset:end_index]
-                    cached['results'] = paginated_cached
-                    cached['count'] = len(paginated_cached)
-                    cached['total_count'] = total_cached
-                    cached['offset'] = offset
-                    cached['limit'] = limit
-                    cached['has_more'] = end_index < total_cached
-                
-                cached['performance']['cached'] = True
-                cached['performance']['query_time'] = f"{(time.time() - start_time):.3f}s"
-                return Response(cached)
-        timing_breakdown['cache_check_ms'] = round((time.time() - step_start) * 1000, 2)
-
         # --------------------------------------------------
         # Helper for generating previous months list
         # --------------------------------------------------
@@ -3878,7 +3234,8 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         step_start = time.time()
         selected_months = []   # List of (year, month_int)
         use_daily_data  = False  # Switch to DailyAttendance aggregation for custom ranges
-        
+        start_date_obj = end_date_obj = None
+
         if time_period == 'this_month':
             now = timezone.now()
             selected_months = [(now.year, now.month)]
@@ -3903,7 +3260,7 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                     last_day = calendar.monthrange(year, month)[1]
                     end_date_obj = date(year, month, last_day)
                     selected_months = [(year, month)]  # Also set for context
-                    
+
                     logger.info(f"Custom filter (month mode) - year: {year}, month: {month}")
                     logger.info(f"Custom converted to range - start: {start_date_obj}, end: {end_date_obj}")
                 except ValueError:
@@ -3927,7 +3284,7 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                     last_day = calendar.monthrange(year, month)[1]
                     end_date_obj = date(year, month, last_day)
                     selected_months = [(year, month)]  # Also set for context
-                    
+
                     logger.info(f"Custom month filter - year: {year}, month: {month}")
                     logger.info(f"Custom month converted to range - start: {start_date_obj}, end: {end_date_obj}")
                 except ValueError:
@@ -3942,11 +3299,11 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                     end_date_obj   = datetime.strptime(end_date_str, '%Y-%m-%d').date()
                     if start_date_obj > end_date_obj:
                         start_date_obj, end_date_obj = end_date_obj, start_date_obj  # swap
-                    
+
                     # Debug logging for date filtering
                     logger.info(f"Custom range filter - start_date: {start_date_obj}, end_date: {end_date_obj}")
                     logger.info(f"Custom range filter - tenant: {tenant.id if tenant else 'None'}")
-                    
+
                 except ValueError:
                     return Response({"error": "Invalid start_date or end_date"}, status=400)
             else:
@@ -3957,77 +3314,199 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
             selected_months = [(now.year, now.month)]
         timing_breakdown['date_range_processing_ms'] = round((time.time() - step_start) * 1000, 2)
 
+        period = {
+            'use_daily_data': use_daily_data,
+            'selected_months': selected_months,
+            'start_date': start_date_obj,
+            'end_date': end_date_obj,
+            'prefer_realtime': prefer_realtime,
+            'param_signature': param_signature,
+        }
+
+        # Active employees in page order; only selected fields are fetched
+        employees = EmployeeProfile.objects.filter(
+            tenant=tenant,
+            is_active=True,
+            employee_id__isnull=False,
+        ).values(*self.ALL_RECORDS_EMPLOYEE_FIELDS)
+
         # --------------------------------------------------
-        # Fetch employee master data once - OPTIMIZED WITH CACHING
+        # Page: walk employee batches until the page is full
         # --------------------------------------------------
         step_start = time.time()
-        
-        # OPTIMIZATION: Cache employee data for 15 minutes (employees don't change often)
-        from django.core.cache import cache
-        employee_cache_key = f"employee_profiles_{tenant.id}_{time_period}"
-        employees_dict = cache.get(employee_cache_key)
-        
-        if employees_dict is None:
-            # Cache miss - fetch from database with selective fields only
-            employees_qs = EmployeeProfile.objects.filter(
-                tenant=tenant,
-                is_active=True
-            ).only(  # CRITICAL: Only fetch needed fields to reduce transfer time
-                'employee_id', 'first_name', 'last_name', 'department', 'designation',
-                'date_of_joining', 'shift_start_time', 'shift_end_time',
-                'off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday', 
-                'off_friday', 'off_saturday', 'off_sunday'
-            ).values(
-                'employee_id', 'first_name', 'last_name', 'department', 'designation',
-                'date_of_joining', 'shift_start_time', 'shift_end_time',
-                'off_monday', 'off_tuesday', 'off_wednesday', 'off_thursday', 
-                'off_friday', 'off_saturday', 'off_sunday'
-            )
-            
-            employees_dict = {emp['employee_id']: emp for emp in employees_qs}
-            
-            # Cache for 15 minutes (employees don't change frequently)
-            cache.set(employee_cache_key, employees_dict, 900)
-            timing_breakdown['employee_fetch_cache_miss'] = True
+        attendance_records = []
+        next_cursor = None
+        position = cursor
+        skip = offset
+        try:
+            while True:
+                batch, batch_cursor = paginate(
+                    employees, self.ALL_RECORDS_ORDERING, cursor=position,
+                    page_size=min(max(limit + skip - len(attendance_records), 100), self.ALL_RECORDS_BATCH_SIZE),
+                )
+                batch_records = self._all_records_batch(tenant, batch, period, timing_breakdown)
+                for index, (employee, record) in enumerate(batch_records):
+                    if skip:
+                        skip -= 1
+                        continue
+                    attendance_records.append(record)
+                    if len(attendance_records) == limit:
+                        # Continue after this employee if anything follows it
+                        if index < len(batch_records) - 1 or batch_cursor:
+                            next_cursor = encode_cursor(employee[name] for name in self.ALL_RECORDS_ORDERING)
+                        break
+                if len(attendance_records) == limit or batch_cursor is None:
+                    break
+                position = batch_cursor
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
+        timing_breakdown['page_ms'] = round((time.time() - step_start) * 1000, 2)
+        timing_breakdown['total_records_created'] = len(attendance_records)
+
+        # --------------------------------------------------
+        # KPI totals across ALL records (for cards), first page only
+        # --------------------------------------------------
+        step_start = time.time()
+        totals = None
+        if include_totals:
+            totals = cache.get(cache_key) if use_cache else None
+            if totals is None:
+                totals = self._all_records_totals(tenant, employees, period, timing_breakdown)
+                cache.set(cache_key, totals, 600)
+            else:
+                timing_breakdown['totals_cache_hit'] = True
+        elif use_cache:
+            # Later pages report the total when the first page's is still cached
+            totals = cache.get(cache_key)
+        timing_breakdown['totals_ms'] = round((time.time() - step_start) * 1000, 2)
+
+        # --------------------------------------------------
+        # Performance + context
+        # --------------------------------------------------
+        # Average working days across all employees for context (this page's without totals)
+        if totals:
+            avg_working_days = totals['avg_working_days']
         else:
-            timing_breakdown['employee_fetch_cache_hit'] = True
-            
-        timing_breakdown['employee_fetch_ms'] = round((time.time() - step_start) * 1000, 2)
-        timing_breakdown['employee_count'] = len(employees_dict)
+            avg_working_days = sum(record['total_working_days'] for record in attendance_records) / len(attendance_records) if attendance_records else 0
+
+        context_info = {
+            'time_period': time_period,
+            'selected_months': selected_months if not use_daily_data else None,
+            'start_date': start_date_str if use_daily_data else None,
+            'end_date': end_date_str if use_daily_data else None,
+            'working_days': round(avg_working_days, 1)
+        }
+
+        total_time_ms = round((time.time() - start_time) * 1000, 2)
+
+        response_data = {
+            'results': attendance_records,
+            'count': len(attendance_records),
+            'total_count': totals['kpi_totals']['total_employees'] if totals else None,  # Total records available
+            'offset': offset,
+            'limit': limit,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor,  # Pass as ?cursor= for the next page
+            'month_context': context_info,
+            'performance': {
+                'query_time': f"{(time.time() - start_time):.3f}s",
+                'total_time_ms': total_time_ms,
+                'timing_breakdown': timing_breakdown,
+                'data_source': 'daily_range' if use_daily_data else 'optimized_monthly_summary',
+                'records_processed': len(attendance_records),
+                'cached': False,
+                'optimization': 'Daily aggregation' if use_daily_data else 'MonthlyAttendanceSummary + EmployeeProfile (fast)'
+            },
+            'frontend_compatibility': {
+                'format_version': '2.0',
+                'fields_included': ['year', 'month', 'employee_name', 'total_ot_hours', 'total_late_minutes'],
+                'response_optimized': True
+            }
+        }
+        if include_totals:
+            response_data['kpi_totals'] = totals['kpi_totals']
+
+        # Log performance for analysis
+        logger.info(f"all_records API Performance - Total: {total_time_ms}ms, Breakdown: {timing_breakdown}")
+
+        # OPTIMIZATION: Always use DRF Response for consistency (JsonResponse can cause frontend issues)
+        return Response(response_data)
+
+    def _all_records_totals(self, tenant, employees, period, timing_breakdown):
+        """KPI totals of all_records over every employee, aggregated one batch at a time"""
+        from ..utils.cursor_pagination import paginate
+
+        sums = {'records': 0, 'ot_hours': 0, 'late_minutes': 0, 'present_days': 0, 'working_days': 0}
+        position = None
+        while True:
+            batch, position = paginate(
+                employees, self.ALL_RECORDS_ORDERING, cursor=position, page_size=self.ALL_RECORDS_BATCH_SIZE,
+            )
+            for _, record in self._all_records_batch(tenant, batch, period, timing_breakdown):
+                sums['records'] += 1
+                sums['ot_hours'] += record['total_ot_hours']
+                sums['late_minutes'] += record['total_late_minutes']
+                sums['present_days'] += record['present_days']
+                sums['working_days'] += record['total_working_days']
+            if position is None:
+                break
+
+        return {
+            'kpi_totals': {
+                'total_employees': sums['records'],
+                'total_ot_hours': sums['ot_hours'],
+                'total_late_minutes': sums['late_minutes'],
+                'total_present_days': sums['present_days'],
+                'total_working_days': sums['working_days'],
+                'avg_attendance_percentage': (sums['present_days'] / sums['working_days'] * 100)
+                                             if sums['working_days'] > 0 else 0
+            },
+            'avg_working_days': sums['working_days'] / sums['records'] if sums['records'] else 0,
+        }
+
+    def _all_records_batch(self, tenant, employees, period, timing_breakdown):
+        """
+        all_records entries of a batch of employees (EmployeeProfile value dicts), in batch
+        order; returns (employee, record) pairs, skipping employees without attendance
+        """
+        import time
+        from collections import defaultdict
+        from django.utils import timezone
+        from django.db.models import Q, Sum, Case, When, FloatField, Value
+
+        if not employees:
+            return []
+
+        use_daily_data = period['use_daily_data']
+        selected_months = period['selected_months']
+        start_date_obj, end_date_obj = period['start_date'], period['end_date']
+        prefer_realtime = period['prefer_realtime']
+        param_signature = period['param_signature']
+        employee_ids = [employee['employee_id'] for employee in employees]
 
         # --------------------------------------------------
         # Aggregate attendance
         # --------------------------------------------------
         step_start = time.time()
         aggregated = defaultdict(lambda: {'present_days': 0.0, 'ot_hours': 0.0, 'late_minutes': 0, 'data_sources': []})
-        total_working_days = 0  # Used later for absent calculation
 
         if use_daily_data:
             # ---------------- Custom Range: Check BOTH DailyAttendance AND Attendance (Excel) ----------------
-            from ..models import DailyAttendance, MonthlyAttendanceSummary, Attendance
-            
+            from ..models import DailyAttendance, Attendance
+
             # STEP 1: Get daily attendance data (logged attendance)
             query_start = time.time()
             daily_qs = DailyAttendance.objects.filter(
                 tenant=tenant,
+                employee_id__in=employee_ids,
                 date__range=[start_date_obj, end_date_obj]
             )
-            
-            # Debug: Log the query and results
-            logger.info(f"DailyAttendance query - date range: {start_date_obj} to {end_date_obj}")
-            logger.info(f"DailyAttendance query - tenant: {tenant.id if tenant else 'None'}")
-            
-            # Get sample records to debug
-            sample_records = daily_qs.values('employee_id', 'date', 'attendance_status')[:5]
-            logger.info(f"Sample records from query: {list(sample_records)}")
-            logger.info(f"Total records found: {daily_qs.count()}")
 
             # Check if this is a single day request
             is_single_day = start_date_obj == end_date_obj
-            
+
             if is_single_day:
                 # For single day requests, return individual records without aggregation
-                logger.info(f"Single day request detected for date: {start_date_obj}")
                 daily_agg = daily_qs.values('employee_id', 'date').annotate(
                     present_days=Sum(
                         Case(
@@ -4057,7 +3536,6 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
             timing_breakdown['daily_attendance_query_ms'] = round((time.time() - query_start) * 1000, 2)
 
             process_start = time.time()
-            # OPTIMIZATION: Use list comprehension for faster processing
             for row in daily_agg:
                 emp_id = row['employee_id']
                 agg_data = aggregated[emp_id]
@@ -4068,50 +3546,45 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                 if 'daily_attendance' not in agg_data['data_sources']:
                     agg_data['data_sources'].append('daily_attendance')
                 # Note: total_working_days will be calculated per employee in final response building
-                
+
                 # For single day requests, also store the date information
                 if is_single_day and 'date' in row:
                     agg_data['date'] = row['date']
-                    
+
             timing_breakdown['daily_data_processing_ms'] = round((time.time() - process_start) * 1000, 2)
-            timing_breakdown['daily_attendance_count'] = len(aggregated)
 
             # STEP 2: Also check Attendance model (Excel uploads) for the date range
             # This handles cases where some months have Excel data and others have logged data
             excel_query_start = time.time()
-            
+
             # OPTIMIZED: Get all (employee_id, year, month) combinations that have DailyAttendance
             # in a single efficient query
             months_with_daily = set()
-            daily_months_qs = DailyAttendance.objects.filter(
-                tenant=tenant,
-                date__range=[start_date_obj, end_date_obj]
-            ).extra(
+            daily_months_qs = daily_qs.extra(
                 select={
                     'year': "EXTRACT(year FROM date)",
                     'month': "EXTRACT(month FROM date)"
                 }
             ).values('employee_id', 'year', 'month').distinct()
-            
+
             for record in daily_months_qs:
                 months_with_daily.add((record['employee_id'], int(record['year']), int(record['month'])))
-            
+
             timing_breakdown['daily_month_tracking_ms'] = round((time.time() - excel_query_start) * 1000, 2)
-            timing_breakdown['months_with_daily_count'] = len(months_with_daily)
-            
+
             # Query Attendance model for the date range
             attendance_qs = Attendance.objects.filter(
                 tenant=tenant,
+                employee_id__in=employee_ids,
                 date__range=[start_date_obj, end_date_obj]
             ).values('employee_id', 'date', 'present_days', 'ot_hours', 'late_minutes')
-            
+
             # Process Excel attendance records, skipping months that have daily data
-            excel_count = 0
             for record in attendance_qs:
                 emp_id = record['employee_id']
                 year = record['date'].year
                 month = record['date'].month
-                
+
                 # Only use Excel data if we don't have DailyAttendance for this (employee, year, month)
                 if (emp_id, year, month) not in months_with_daily:
                     agg_data = aggregated[emp_id]
@@ -4121,22 +3594,14 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                     # Track that this employee has Excel data
                     if 'excel_upload' not in agg_data['data_sources']:
                         agg_data['data_sources'].append('excel_upload')
-                    excel_count += 1
-            
-            timing_breakdown['excel_attendance_query_ms'] = round((time.time() - excel_query_start) * 1000, 2)
-            timing_breakdown['excel_attendance_count'] = excel_count
-            timing_breakdown['total_custom_range_employees'] = len(aggregated)
 
-            # Calculate working days per employee based on their joining dates
-            # This is handled per employee in the final response building
-            total_working_days = 0  # Will be calculated per employee
+            timing_breakdown['excel_attendance_query_ms'] = round((time.time() - excel_query_start) * 1000, 2)
         else:
             # ---------------- Attendance aggregation (combining Excel uploads and attendance log) --------------------
-            from ..models import Attendance, MonthlyAttendanceSummary
-            from django.db.models import Q
+            from ..models import Attendance
 
             query_start = time.time()
-            
+
             # Decide which months to query from MonthlyAttendanceSummary/Attendance.
             # If prefer_realtime is enabled and current month is in the selection, we'll exclude it
             # from summary/excel queries and compute it from DailyAttendance directly (real-time).
@@ -4152,20 +3617,21 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
             monthly_summary_filter = Q()
             for y, m in months_for_stored_sources:
                 monthly_summary_filter |= Q(year=y, month=m)
-            
+
             monthly_summary_qs = MonthlyAttendanceSummary.objects.filter(
-                tenant=tenant
+                tenant=tenant,
+                employee_id__in=employee_ids,
             ).filter(monthly_summary_filter).values('employee_id', 'year', 'month', 'present_days', 'ot_hours', 'late_minutes')
-            
+
             # Create a set to track which (employee_id, year, month) combinations we got from MonthlyAttendanceSummary
             summary_keys = set()
-            
+
             for record in monthly_summary_qs:
                 emp_id = record['employee_id']
                 year = record['year']
                 month = record['month']
                 summary_keys.add((emp_id, year, month))
-                
+
                 agg_data = aggregated[emp_id]
                 agg_data['present_days'] += float(record['present_days'])
                 agg_data['ot_hours'] += float(record['ot_hours'])
@@ -4173,32 +3639,31 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                 # Track that this employee has attendance log data
                 if 'attendance_log' not in agg_data['data_sources']:
                     agg_data['data_sources'].append('attendance_log')
-            
+
             timing_breakdown['monthly_summary_query_ms'] = round((time.time() - query_start) * 1000, 2)
-            timing_breakdown['monthly_summary_records'] = len(summary_keys)
-            
+
             # STEP 2: Query Attendance model (from Excel uploads) for months NOT in MonthlyAttendanceSummary
             attendance_query_start = time.time()
-            
+
             # Build ORed Q for (year, month) combinations from selected_months
             month_filter = Q()
             for y, m in months_for_stored_sources:
                 month_filter |= Q(date__year=y, date__month=m)
 
             attendance_qs = Attendance.objects.filter(
-                tenant=tenant
+                tenant=tenant,
+                employee_id__in=employee_ids,
             ).filter(month_filter).values('employee_id', 'date', 'present_days', 'ot_hours', 'late_minutes', 'total_working_days')
             timing_breakdown['attendance_query_ms'] = round((time.time() - attendance_query_start) * 1000, 2)
 
             process_start = time.time()
-            attendance_count = 0
-            
+
             # Original logic for other time periods
             for record in attendance_qs:
                 emp_id = record['employee_id']
                 year = record['date'].year
                 month = record['date'].month
-                
+
                 # Only use Attendance record if we don't have MonthlyAttendanceSummary for this (employee, year, month)
                 if (emp_id, year, month) not in summary_keys:
                     agg_data = aggregated[emp_id]
@@ -4208,10 +3673,8 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                     # Track that this employee has Excel data
                     if 'excel_upload' not in agg_data['data_sources']:
                         agg_data['data_sources'].append('excel_upload')
-                    attendance_count += 1
-            
+
             timing_breakdown['attendance_data_processing_ms'] = round((time.time() - process_start) * 1000, 2)
-            timing_breakdown['attendance_records_used'] = attendance_count
 
             # STEP 3: If requested, compute the CURRENT MONTH in real-time from DailyAttendance
             if prefer_realtime and current_month_in_selection:
@@ -4220,6 +3683,7 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                 # Aggregate present/OT/late for the current month directly from DailyAttendance
                 daily_current_agg = DailyAttendance.objects.filter(
                     tenant=tenant,
+                    employee_id__in=employee_ids,
                     date__year=current_year,
                     date__month=current_month
                 ).values('employee_id').annotate(
@@ -4250,10 +3714,6 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
             else:
                 timing_breakdown['realtime_current_month'] = False
 
-            # Calculate working days per employee based on their joining dates
-            # This is handled per employee in the final response building
-            total_working_days = 0  # Will be calculated per employee
-
         timing_breakdown['total_aggregation_ms'] = round((time.time() - step_start) * 1000, 2)
 
         # --------------------------------------------------
@@ -4261,21 +3721,22 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
         # --------------------------------------------------
         step_start = time.time()
         attendance_records = []
-        
+
         # OPTIMIZATION: Pre-calculate common values to avoid repeated operations
         default_data = {'present_days': 0.0, 'ot_hours': 0.0, 'late_minutes': 0, 'data_sources': []}
-        
+
         # Check if this is a single day request for response construction
         is_single_day_response = use_daily_data and start_date_obj == end_date_obj
-        
-        for emp_id, emp_info in employees_dict.items():
+
+        for emp_info in employees:
+            emp_id = emp_info['employee_id']
             data = aggregated.get(emp_id, default_data)
 
             # SMART CALCULATION: Employee-specific working days with DOJ awareness
             try:
                 from ..services.salary_service import SalaryCalculationService
                 month_names = ['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER']
-                
+
                 if use_daily_data:
                     # For single day/date range: Use 30 days as default
                     employee_working_days = 30
@@ -4290,112 +3751,6 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 # Fallback: Use 30 days per month
                 employee_working_days = 30 * len(selected_months) if not use_daily_data else 30
-            
-            # COMMENTED OUT: Old complex calculation
-            # # Calculate working days for this specific employee based on their joining date
-            # employee_working_days = 0
-            # try:
-            #     from ..services.salary_service import SalaryCalculationService
-            #     month_names = ['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER']
-            #     
-            #     if use_daily_data:
-            #         # For daily aggregation (custom range), calculate working days for the actual date range
-            #         from datetime import date, timedelta
-            #         
-            #         # Determine the effective start date based on employee's joining date
-            #         effective_start_date = start_date_obj
-            #         if emp_info.get('date_of_joining'):
-            #             if emp_info['date_of_joining'] > end_date_obj:
-            #                 # Employee hasn't joined yet in this range
-            #                 employee_working_days = 0
-            #             elif emp_info['date_of_joining'] > start_date_obj:
-            #                 # Employee joined mid-range, start from joining date
-            #                 effective_start_date = emp_info['date_of_joining']
-            #         
-            #         if employee_working_days == 0 and emp_info.get('date_of_joining') and emp_info['date_of_joining'] > end_date_obj:
-            #             # Employee hasn't joined yet, skip the loop
-            #             pass
-            #         else:
-            #             current_date = effective_start_date
-            #             while current_date <= end_date_obj:
-            #                 # Check if this specific day is a working day for this employee
-            #                 off_days = []
-            #                 if emp_info.get('off_monday'): off_days.append(0)
-            #                 if emp_info.get('off_tuesday'): off_days.append(1)
-            #                 if emp_info.get('off_wednesday'): off_days.append(2)
-            #                 if emp_info.get('off_thursday'): off_days.append(3)
-            #                 if emp_info.get('off_friday'): off_days.append(4)
-            #                 if emp_info.get('off_saturday'): off_days.append(5)
-            #                 if emp_info.get('off_sunday'): off_days.append(6)
-            #                 
-            #                 if current_date.weekday() not in off_days:
-            #                     employee_working_days += 1
-            #                 
-            #                 current_date += timedelta(days=1)
-            #     else:
-            #         # For monthly aggregation, calculate working days for each month in the selected period
-            #         for year, month in selected_months:
-            #             month_working_days = SalaryCalculationService._calculate_employee_working_days(
-            #                 emp_info, year, month_names[month - 1]
-            #             )
-            #             employee_working_days += month_working_days
-            #     
-            # except Exception as e:
-            #     # Fallback: use generic calculation if employee-specific calculation fails
-            #     import calendar
-            #     if use_daily_data:
-            #         # For daily aggregation fallback, count working days in the date range
-            #         # Determine the effective start date based on employee's joining date
-            #         effective_start_date = start_date_obj
-            #         if emp_info.get('date_of_joining'):
-            #             if emp_info['date_of_joining'] > end_date_obj:
-            #                 # Employee hasn't joined yet in this range
-            #                 employee_working_days = 0
-            #             elif emp_info['date_of_joining'] > start_date_obj:
-            #                 # Employee joined mid-range, start from joining date
-            #                 effective_start_date = emp_info['date_of_joining']
-            #         
-            #         if not (employee_working_days == 0 and emp_info.get('date_of_joining') and emp_info['date_of_joining'] > end_date_obj):
-            #             current_date = effective_start_date
-            #             while current_date <= end_date_obj:
-            #                 if current_date.weekday() < 5:  # Monday=0, Sunday=6, so <5 excludes weekends
-            #                     employee_working_days += 1
-            #                 current_date += timedelta(days=1)
-            #     else:
-            #         # For monthly aggregation fallback, count working days in selected months
-            #         for year, month in selected_months:
-            #             days_in_month = calendar.monthrange(year, month)[1]
-            #             # Count working days (excluding weekends)
-            #             month_working_days = 0
-            #             for day in range(1, days_in_month + 1):
-            #                 date_obj = date(year, month, day)
-            #                 if date_obj.weekday() < 5:  # Monday=0, Sunday=6, so <5 excludes weekends
-            #                     month_working_days += 1
-            #             employee_working_days += month_working_days
-            
-            # COMMENTED OUT: Fallback for missing joining date
-            # # If employee has no joining date, use generic calculation
-            # if employee_working_days == 0 and not emp_info.get('date_of_joining'):
-            #     import calendar
-            #     if use_daily_data:
-            #         # For daily aggregation, count working days in the date range
-            #         # No joining date, so use the full range
-            #         current_date = start_date_obj
-            #         while current_date <= end_date_obj:
-            #             if current_date.weekday() < 5:  # Monday=0, Sunday=6, so <5 excludes weekends
-            #                 employee_working_days += 1
-            #             current_date += timedelta(days=1)
-            #     else:
-            #         # For monthly aggregation, count working days in selected months
-            #         for year, month in selected_months:
-            #             days_in_month = calendar.monthrange(year, month)[1]
-            #             # Count working days (excluding weekends)
-            #             month_working_days = 0
-            #             for day in range(1, days_in_month + 1):
-            #                 date_obj = date(year, month, day)
-            #                 if date_obj.weekday() < 5:  # Monday=0, Sunday=6, so <5 excludes weekends
-            #                     month_working_days += 1
-            #             employee_working_days += month_working_days
 
             absent_days = max(0, employee_working_days - data['present_days'])
             attendance_percentage = (data['present_days'] / employee_working_days * 100) if employee_working_days > 0 else 0
@@ -4407,10 +3762,10 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
 
             # For single day requests, include the specific date
             record_date = data.get('date', start_date_obj) if is_single_day_response else None
-            
+
             # Generate appropriate ID for single day vs multi-day requests
             record_id = f"{emp_id}_{start_date_obj.isoformat()}" if is_single_day_response else f"{emp_id}_{param_signature}"
-            
+
             # Determine data source description
             data_sources = data.get('data_sources', [])
             if use_daily_data:
@@ -4431,13 +3786,13 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                 data_source = 'excel_upload'
             else:
                 data_source = 'no_data'
-            
+
             # FILTER: Only include employees with attendance data (present_days > 0)
             # Skip employees with no attendance records
             if data['present_days'] == 0 and data_source == 'no_data':
                 continue
-            
-            attendance_records.append({
+
+            attendance_records.append((emp_info, {
                 'id': record_id,
                 'employee_id': emp_id,
                 'employee_name': f"{emp_info['first_name']} {emp_info['last_name']}",
@@ -4457,105 +3812,9 @@ class DailyAttendanceViewSet(viewsets.ModelViewSet):
                 'total_late_minutes': data['late_minutes'],
                 'data_source': data_source,
                 'last_updated': timezone.now().isoformat()
-            })
+            }))
         timing_breakdown['response_building_ms'] = round((time.time() - step_start) * 1000, 2)
-        timing_breakdown['total_records_created'] = len(attendance_records)
-
-        # --------------------------------------------------
-        # Performance + context
-        # --------------------------------------------------
-        step_start = time.time()
-        # Calculate average working days across all employees for context
-        avg_working_days = sum(record['total_working_days'] for record in attendance_records) / len(attendance_records) if attendance_records else 0
-        
-        context_info = {
-            'time_period': time_period,
-            'selected_months': selected_months if not use_daily_data else None,
-            'start_date': start_date_str if use_daily_data else None,
-            'end_date': end_date_str if use_daily_data else None,
-            'working_days': round(avg_working_days, 1)
-        }
-
-        total_time_ms = round((time.time() - start_time) * 1000, 2)
-        timing_breakdown['context_building_ms'] = round((time.time() - step_start) * 1000, 2)
-
-        # PROGRESSIVE LOADING: Apply offset and limit
-        total_count = len(attendance_records)
-        
-        # Calculate total KPIs across ALL records (for cards)
-        total_kpis = {
-            'total_employees': total_count,
-            'total_ot_hours': sum(r['total_ot_hours'] for r in attendance_records),
-            'total_late_minutes': sum(r['total_late_minutes'] for r in attendance_records),
-            'total_present_days': sum(r['present_days'] for r in attendance_records),
-            'total_working_days': sum(r['total_working_days'] for r in attendance_records),
-            'avg_attendance_percentage': (sum(r['present_days'] for r in attendance_records) / 
-                                         sum(r['total_working_days'] for r in attendance_records) * 100) 
-                                         if sum(r['total_working_days'] for r in attendance_records) > 0 else 0
-        }
-        
-        if limit > 0:
-            # Apply pagination
-            end_index = offset + limit
-            paginated_records = attendance_records[offset:end_index]
-            has_more = end_index < total_count
-        else:
-            # Return all records (no pagination)
-            paginated_records = attendance_records
-            has_more = False
-
-        response_data = {
-            'results': paginated_records,
-            'count': len(paginated_records),
-            'total_count': total_count,  # NEW: Total records available
-            'offset': offset,  # NEW: Current offset
-            'limit': limit if limit > 0 else total_count,  # NEW: Applied limit
-            'has_more': has_more,  # NEW: More records available
-            'kpi_totals': total_kpis,  # NEW: Total KPIs for all data
-            'month_context': context_info,
-            'performance': {
-                'query_time': f"{(time.time() - start_time):.3f}s",
-                'total_time_ms': total_time_ms,
-                'timing_breakdown': timing_breakdown,
-                'data_source': 'daily_range' if use_daily_data else 'optimized_monthly_summary',
-                'records_processed': len(attendance_records),
-                'cached': False,
-                'optimization': 'Daily aggregation' if use_daily_data else 'MonthlyAttendanceSummary + EmployeeProfile (fast)'
-            },
-            'frontend_compatibility': {
-                'format_version': '2.0',
-                'fields_included': ['year', 'month', 'employee_name', 'total_ot_hours', 'total_late_minutes'],
-                'response_optimized': True
-            }
-        }
-
-        # --------------------------------------------------
-        # Cache result (5 mins) - OPTIMIZED
-        # Cache FULL dataset, not paginated version
-        # --------------------------------------------------
-        step_start = time.time()
-        if use_cache:
-            # Cache the full response with all records for future pagination
-            full_response = response_data.copy()
-            full_response['results'] = attendance_records  # Store full dataset
-            full_response['count'] = total_count
-            full_response['offset'] = 0
-            full_response['limit'] = 0
-            full_response['has_more'] = False
-            
-            # Cache for 10 minutes (600 seconds)
-            cache.set(cache_key, full_response, 600)
-        timing_breakdown['cache_save_ms'] = round((time.time() - step_start) * 1000, 2)
-
-        # Add total processing time after all optimizations
-        timing_breakdown['total_backend_ms'] = total_time_ms
-        timing_breakdown['optimization_applied'] = 'employee_caching + faster_processing'
-
-        # Log performance for analysis
-        logger.info(f"all_records API Performance - Total: {total_time_ms}ms, Breakdown: {timing_breakdown}")
-        
-        # OPTIMIZATION: Always use DRF Response for consistency (JsonResponse can cause frontend issues)
-        return Response(response_data)
+        return attendance_records
 
 class AdvanceLedgerViewSet(viewsets.ModelViewSet):
     serializer_class = AdvanceLedgerSerializer
@@ -4610,31 +3869,15 @@ class CacheManagementViewSet(viewsets.ViewSet):
         Clear directory data cache for the current tenant
         """
         try:
-            from django.core.cache import cache
             tenant = getattr(request, 'tenant', None)
             if not tenant:
                 return Response({'error': 'No tenant found'}, status=400)
             
-            # Clear directory-related cache keys
-            cache_keys_to_clear = [
-                f"directory_data_{tenant.id}_*",
-                f"frontend_charts_{tenant.id}_*",
-                f"all_departments_{tenant.id}",
-                f"employee_profiles_{tenant.id}_*",
-                f"attendance_all_records_{tenant.id}_*"
-            ]
-            
-            cleared_count = 0
-            for pattern in cache_keys_to_clear:
-                # Note: Django cache doesn't support pattern matching
-                # We'll clear specific known keys
-                if "*" in pattern:
-                    # For patterns with wildcards, we need to clear known keys
-                    # This is a simplified approach - in production, you might want to use Redis
-                    pass
-                else:
-                    cache.delete(pattern)
-                    cleared_count += 1
+            # Directory, departments, employee profiles, charts and attendance records all
+            # embed the directory generation, so one bump invalidates every variant
+            cleared_count = len(bump_cache_generation(tenant, DIRECTORY, reason="clear_directory_cache"))
+            # Rebuild the directory rows as well
+            schedule_directory_refresh(tenant.id)
             
             return Response({
                 'success': True,
@@ -11,58 +11,34 @@ from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
 from django.http import HttpResponse
-import pandas as pd
-from datetime import datetime
 import logging
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
 
 from ..models import (
     Tenant,
     SalaryData,
-    EmployeeProfile,
+    UploadJob,
 )
 from ..serializers import (
     TenantSerializer,
 )
 from ..utils.permissions import IsSuperUser
-from ..utils.utils import (
-    clean_decimal_value,
-    clean_int_value,
-    is_valid_name,
-    validate_excel_columns,
-    generate_employee_id,
+from ..utils.upload_reader import EXCEL_EXTENSIONS, UploadFileError, check_upload, read_upload
+from ..services.cache_service import PAYROLL
+from ..services.employee_directory import schedule_directory_refresh
+from ..services.rebuild_scheduler import schedule_rebuild
+from ..services.upload_job_service import UploadJobService
+from ..services.upload_processing import (
+    SALARY_NUMERIC_COLUMNS,
+    SALARY_UPDATE_FIELDS,
+    TEMPLATE_COLUMNS,
+    prepare_salary_upload,
+    record_salary_upload_period,
 )
 
-TEMPLATE_COLUMNS = [
-    "NAME",
-    "SALARY",
-    "ABSENT",
-    "Present Days",
-    "Working Days",
-    "SL W/O OT",
-    "OT",
-    "HOUR RS",
-    "OT CHARGES",  # Renamed from CHARGES for clarity
-    "LATE",
-    "LATE CHARGE",  # Renamed from CHARGE for clarity
-    "AMT",
-    "SAL+OT",
-    "25TH ADV",
-    "OLD ADV",
-    "NETT PAYABLE",
-    "Department",
-    "Total old ADV",
-    "Balnce Adv",
-    "INCENTIVE",
-    "TDS",
-    "SAL-TDS",
-    "ADVANCE",
-]
-
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+
 class TenantViewSet(viewsets.ModelViewSet):
     """
     Tenant management for super admins only
@@ -112,97 +88,52 @@ class UploadSalaryDataAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            # Reject oversized or malformed files before reading any rows
             try:
+                check_upload(excel_file, EXCEL_EXTENSIONS)
+            except UploadFileError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Read Excel file with NaN handling
-
-                df = pd.read_excel(excel_file)
-
-                # Map alternative column names to standard template names
-                column_mapping = {
-                    'Basic Salary': 'SALARY',
-                    'basic_salary': 'SALARY',
-                    'BasicSalary': 'SALARY',
-                    'basic salary': 'SALARY',
-                }
-                
-                # Rename columns based on mapping (case-insensitive)
-                df_columns = df.columns.tolist()
-                rename_dict = {}
-                for col in df_columns:
-                    if col in column_mapping:
-                        rename_dict[col] = column_mapping[col]
-                
-                if rename_dict:
-                    df = df.rename(columns=rename_dict)
-
-                # Replace all NaN values with appropriate defaults before processing
-
-                df = df.fillna(
-                    {
-                        "NAME": "",
-                        "SALARY": 0,
-                        "ABSENT": 0,
-                        "Present Days": 0,
-                        "SL W/O OT": 0,
-                        "OT": 0,
-                        "HOUR RS": 0,
-                        "OT CHARGES": 0,  # Renamed from CHARGES
-                        "LATE": 0,
-                        "LATE CHARGE": 0,  # Renamed from CHARGE
-                        "AMT": 0,
-                        "SAL+OT": 0,
-                        "25TH ADV": 0,
-                        "OLD ADV": 0,
-                        "NETT PAYABLE": 0,
-                        "Department": "",
-                        "Total old ADV": 0,
-                        "Balnce Adv": 0,
-                        "INCENTIVE": 0,
-                        "TDS": 0,
-                        "SAL-TDS": 0,
-                        "ADVANCE": 0,
-                        "Working Days": 0,  # Optional column
-                    }
-                )
+            # Get month/year from request
 
-                # Validate columns (Employee ID and Working Days are optional)
-                required_columns = [col for col in TEMPLATE_COLUMNS if col not in ["Working Days"]]
-                optional_columns = ["Working Days"]
-                
-                is_valid, error_message = validate_excel_columns(
-                    df.columns.tolist(), required_columns, optional_columns
-                )
+            selected_month = request.data.get("month")
 
-                if not is_valid:
+            selected_year = request.data.get("year")
 
-                    return Response(
-                        {"error": error_message}, status=status.HTTP_400_BAD_REQUEST
-                    )
+            if not selected_month or not selected_year:
 
-                # Get month/year from request
+                return Response(
+                    {"error": "Please select month and year for the uploaded data"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-                selected_month = request.data.get("month")
+            # async=true: store the file and process it in the background as an upload job
+            if UploadJobService.wants_job(request):
+                job = UploadJobService.create(
+                    tenant, request.user, UploadJob.KIND_SALARY, excel_file, int(selected_year), selected_month
+                )
+                return Response(UploadJobService.status_payload(job), status=status.HTTP_202_ACCEPTED)
 
-                selected_year = request.data.get("year")
+            try:
 
-                if not selected_month or not selected_year:
+                # Stream the sheet into typed columns (amount/day columns numeric), NaN handled below
 
-                    return Response(
-                        {"error": "Please select month and year for the uploaded data"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+                df = read_upload(excel_file, numeric_columns=SALARY_NUMERIC_COLUMNS, extensions=EXCEL_EXTENSIONS)
 
-                # Filter out invalid rows BEFORE processing
+                # Validate the template and build the SalaryData values column-wise
 
-                valid_rows = df[df["NAME"].apply(is_valid_name)]
+                prepared = prepare_salary_upload(df, tenant, selected_year, selected_month)
 
-                if len(valid_rows) == 0:
+                # If there are missing employees, return their details for confirmation
+                if prepared.missing_employees:
+                    missing_employee_details = prepared.missing_employees
 
-                    return Response(
-                        {"error": "No valid employee names found in the uploaded file"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+                    return Response({
+                        'error': 'Missing employees found',
+                        'missing_employees': missing_employee_details,
+                        'total_missing': len(missing_employee_details),
+                        'message': f'Found {len(missing_employee_details)} employees that do not exist in the system. Please confirm to create them.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
 
                 # Process data with bulk operations for maximum performance
 
@@ -210,7 +141,7 @@ class UploadSalaryDataAPIView(APIView):
 
                 records_updated = 0
 
-                errors = []
+                errors = prepared.errors
 
                 # Collect all data for bulk operations
 
@@ -218,8 +149,6 @@ class UploadSalaryDataAPIView(APIView):
 
                 salary_records_to_update = []
 
-                employee_profiles_to_create = []
-
                 # Get existing salary records for this period to avoid duplicates
 
                 existing_salary_dict = {}
@@ -232,207 +161,29 @@ class UploadSalaryDataAPIView(APIView):
 
                     existing_salary_dict[salary["employee_id"]] = salary["id"]
 
-                # Auto-generate Employee IDs for entries that don't have them
-                from ..utils.utils import generate_employee_id_bulk_optimized
-                
-                # OPTIMIZED: Use values() to reduce data transfer, single query
-                existing_employees_by_name = {}
-                for emp in EmployeeProfile.objects.filter(
-                    tenant=tenant, is_active=True
-                ).values('first_name', 'last_name', 'employee_id').iterator(chunk_size=1000):
-                    key = f"{emp['first_name']} {emp['last_name']}".strip().lower()
-                    existing_employees_by_name[key] = emp['employee_id']
-                
-                # Prepare data for Employee ID generation and matching
-                employees_data = []
-                final_employee_ids = []
-                
-                for index, row in valid_rows.iterrows():
-                    name = str(row['NAME']).strip()
-                    department = str(row.get('Department', '')).strip()
-                    
-                    # Check if we have a provided Employee ID (no longer expected in template)
-                    provided_id = ''
-                    
-                    if provided_id:
-                        # Use provided Employee ID
-                        final_employee_ids.append(provided_id)
+                for salary_data in prepared.records:
+
+                    employee_id = salary_data["employee_id"]
+
+                    if employee_id in existing_salary_dict:
+
+                        # Update existing record
+
+                        salary_records_to_update.append(
+                            SalaryData(tenant=tenant, id=existing_salary_dict[employee_id], **salary_data)
+                        )
+
+                        records_updated += 1
+
                     else:
-                        # Try to match by name first
-                        name_key = name.lower()
-                        if name_key in existing_employees_by_name:
-                            # Found existing employee by name
-                            final_employee_ids.append(existing_employees_by_name[name_key])
-                        else:
-                            # Need to generate new Employee ID
-                            employees_data.append({
-                                'name': name,
-                                'department': department
-                            })
-                            final_employee_ids.append(None)  # Will be filled after generation
-                
-                # Generate Employee IDs for new employees only
-                if employees_data:
-                    employee_id_mapping = generate_employee_id_bulk_optimized(employees_data, tenant.id)
-                    
-                    # Fill in the generated IDs
-                    generated_index = 0
-                    for i, emp_id in enumerate(final_employee_ids):
-                        if emp_id is None:
-                            final_employee_ids[i] = employee_id_mapping[generated_index]
-                            generated_index += 1
-                
-                # Add final Employee IDs to the dataframe
-                valid_rows = valid_rows.copy()
-                valid_rows['Final_Employee_ID'] = final_employee_ids
-                
-                # OPTIMIZED: Reuse existing_employees_by_name instead of second query
-                existing_employee_set = set(existing_employees_by_name.values())
-
-                # Check for missing employees first
-                employee_ids_in_file = valid_rows['Final_Employee_ID'].dropna().unique()
-                missing_employees = set(employee_ids_in_file) - existing_employee_set
-                
-                # If there are missing employees, collect their details and return for confirmation
-                if missing_employees:
-                    missing_employee_details = []
-                    for index, row in valid_rows.iterrows():
-                        employee_id = str(row['Final_Employee_ID']).strip()
-                        if employee_id in missing_employees:
-                            name = str(row.get("NAME", "")).strip()
-                            department = str(row.get("Department", "")).strip()
-                            
-                            # Split name into first and last name
-                            name_parts = name.split(' ', 1)
-                            first_name = name_parts[0] if name_parts else ''
-                            last_name = name_parts[1] if len(name_parts) > 1 else ''
-                            
-                            # Clean up last name - avoid "nan" values
-                            if not last_name or str(last_name).lower() in ['nan', 'none', '']:
-                                last_name = ''
-                            
-                            # Get basic salary from Excel - crucial for employee profile
-                            basic_salary = clean_decimal_value(row.get("SALARY", 0))
-                            
-                            missing_employee_details.append({
-                                'employee_id': employee_id,
-                                'name': name,
-                                'first_name': first_name,
-                                'last_name': last_name,
-                                'department': department,
-                                'basic_salary': float(basic_salary) if basic_salary else 0,  # Pass salary from Excel
-                                'row_number': index + 2  # Excel row number (accounting for header)
-                            })
-                    
-                    return Response({
-                        'error': 'Missing employees found',
-                        'missing_employees': missing_employee_details,
-                        'total_missing': len(missing_employee_details),
-                        'message': f'Found {len(missing_employee_details)} employees that do not exist in the system. Please confirm to create them.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
 
-                # Prepare bulk data
-
-                for index, row in valid_rows.iterrows():
-
-                    try:
-                        # Get employee ID from Excel (use final employee ID)
-                        employee_id = str(row['Final_Employee_ID']).strip()
-
-                        # Prepare salary data
-                        # Use Working Days if provided, otherwise calculate from employee profile
-                        working_days = clean_int_value(row.get("Working Days", 0))
-                        if working_days > 0:
-                            days_value = working_days
-                        else:
-                            # FIXED: Always use 30 working days
-                            days_value = 30
-                            
-                            # COMMENTED OUT: Complex DOJ-based working days calculation
-                            # # Calculate working days from employee profile (DOJ and off days)
-                            # try:
-                            #     from ..services.salary_service import SalaryCalculationService
-                            #     employee = EmployeeProfile.objects.get(tenant=tenant, employee_id=employee_id, is_active=True)
-                            #     month_names = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
-                            #     days_value = SalaryCalculationService._calculate_employee_working_days(employee, int(selected_year), month_names[int(selected_month) - 1])
-                            # except EmployeeProfile.DoesNotExist:
-                            #     # Fallback: use calendar working days
-                            #     import calendar
-                            #     from datetime import date
-                            #     days_in_month = calendar.monthrange(int(selected_year), int(selected_month))[1]
-                            #     days_value = 0
-                            #     for day in range(1, days_in_month + 1):
-                            #         date_obj = date(int(selected_year), int(selected_month), day)
-                            #         if date_obj.weekday() < 5:  # Monday-Friday
-                            #             days_value += 1
-                            # except Exception as e:
-                            #     # Fallback: use calendar working days
-                            #     import calendar
-                            #     from datetime import date
-                            #     days_in_month = calendar.monthrange(int(selected_year), int(selected_month))[1]
-                            #     days_value = 0
-                            #     for day in range(1, days_in_month + 1):
-                            #         date_obj = date(int(selected_year), int(selected_month), day)
-                            #         if date_obj.weekday() < 5:  # Monday-Friday
-                            #             days_value += 1
-
-                        salary_data = {
-                            "tenant": tenant,
-                            "employee_id": employee_id,
-                            "year": int(selected_year),
-                            "month": selected_month,
-                            "name": str(row["NAME"]).strip(),
-                            "salary": clean_decimal_value(row["SALARY"]),
-                            "absent": clean_int_value(row["ABSENT"]),
-                            "days": days_value,
-                            "sl_wo_ot": clean_decimal_value(row["SL W/O OT"]),
-                            "ot": clean_decimal_value(row["OT"]),
-                            "hour_rs": clean_decimal_value(row["HOUR RS"]),
-                            "charges": clean_decimal_value(row["OT CHARGES"]),  # Updated column name
-                            "late": clean_int_value(row["LATE"]),
-                            "charge": clean_decimal_value(row["LATE CHARGE"]),  # Updated column name
-                            "amt": clean_decimal_value(row["AMT"]),
-                            "sal_ot": clean_decimal_value(row["SAL+OT"]),
-                            "adv_25th": clean_decimal_value(row["25TH ADV"]),
-                            "old_adv": clean_decimal_value(row["OLD ADV"]),
-                            "nett_payable": clean_decimal_value(row["NETT PAYABLE"]),
-                            "department": str(row.get("Department", "")).strip(),
-                            "total_old_adv": clean_decimal_value(row["Total old ADV"]),
-                            "balnce_adv": clean_decimal_value(row["Balnce Adv"]),
-                            "incentive": clean_decimal_value(row["INCENTIVE"]),
-                            "tds": clean_decimal_value(row["TDS"]),
-                            "sal_tds": clean_decimal_value(row["SAL-TDS"]),
-                            "advance": clean_decimal_value(row["ADVANCE"]),
-                            "date": datetime(
-                                int(selected_year),
-                                self._get_month_number(selected_month),
-                                1,
-                            ).date(),
-                        }
-
-                        if employee_id in existing_salary_dict:
-
-                            # Update existing record
-
-                            salary_data["id"] = existing_salary_dict[employee_id]
-
-                            salary_records_to_update.append(SalaryData(**salary_data))
-
-                            records_updated += 1
-
-                        else:
-
-                            # Create new record
-
-                            salary_records_to_create.append(SalaryData(**salary_data))
-
-                            records_created += 1
-
-                        # No employee profile creation - employee must exist (like attendance upload)
-
-                    except Exception as e:
-
-                        errors.append(f"Row {index + 2}: {str(e)}")
+                        # Create new record
+
+                        salary_records_to_create.append(SalaryData(tenant=tenant, **salary_data))
+
+                        records_created += 1
+
+                    # No employee profile creation - employee must exist (like attendance upload)
 
                 # Perform bulk operations
 
@@ -440,16 +191,11 @@ class UploadSalaryDataAPIView(APIView):
 
                     # Deduplicate salary records to create (in case same employee appears multiple times in upload)
                     if salary_records_to_create:
-                        # Create a dictionary to deduplicate by (employee_id, year, month)
+                        # Keep the last record per (employee_id, year, month) - the most recent data
                         unique_salary_records = {}
                         for record in salary_records_to_create:
-                            key = (record.employee_id, record.year, record.month)
-                            if key not in unique_salary_records:
-                                unique_salary_records[key] = record
-                            else:
-                                # If duplicate found, keep the last one (most recent data)
-                                unique_salary_records[key] = record
-                        
+                            unique_salary_records[(record.employee_id, record.year, record.month)] = record
+
                         # Convert back to list
                         salary_records_to_create = list(unique_salary_records.values())
                         records_created = len(salary_records_to_create)
@@ -468,195 +214,38 @@ class UploadSalaryDataAPIView(APIView):
 
                         SalaryData.objects.bulk_update(
                             salary_records_to_update,
-                            [
-                                "name",
-                                "salary",
-                                "absent",
-                                "days",
-                                "sl_wo_ot",
-                                "ot",
-                                "hour_rs",
-                                "charges",
-                                "late",
-                                "charge",
-                                "amt",
-                                "sal_ot",
-                                "adv_25th",
-                                "old_adv",
-                                "nett_payable",
-                                "department",
-                                "total_old_adv",
-                                "balnce_adv",
-                                "incentive",
-                                "tds",
-                                "sal_tds",
-                                "advance",
-                                "date",
-                            ],
+                            SALARY_UPDATE_FIELDS,
                             batch_size=100,
                         )
-                    # Create or update PayrollPeriod for the uploaded data
-                    from ..services.salary_service import SalaryCalculationService
-                    from ..models import PayrollPeriod, DataSource
-                    from django.core.cache import cache
-                    from decimal import Decimal
-                    import calendar
-                    
-                    # Create PayrollPeriod with UPLOADED data source
-                    payroll_period, period_created = PayrollPeriod.objects.get_or_create(
-                        tenant=tenant,
-                        year=int(selected_year),
-                        month=selected_month,
-                        defaults={
-                            'data_source': DataSource.UPLOADED,
-                            'working_days_in_month': len([d for d in range(1, calendar.monthrange(int(selected_year), self._get_month_number(selected_month))[1] + 1)
-                                                          if calendar.weekday(int(selected_year), self._get_month_number(selected_month), d) < 5]),
-                            'tds_rate': Decimal('5.00')
-                        }
+
+                    # Refresh the last salary shown in the employee directory
+                    schedule_directory_refresh(
+                        tenant.id,
+                        [record.employee_id for record in salary_records_to_create + salary_records_to_update],
                     )
-                    
-                    # If period already exists, update data source to UPLOADED
-                    if not period_created:
-                        payroll_period.data_source = DataSource.UPLOADED
-                        payroll_period.save()
-                    
-                    # Clear payroll overview cache to show new data immediately
-                    cache_key = f"payroll_overview_{tenant.id}"
-                    cache.delete(cache_key)
-                    
-                    # Clear frontend charts cache to refresh dashboard immediately
-                    try:
-                        # Try to clear all frontend charts cache variations
-                        cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-                    except AttributeError:
-                        # Fallback: Clear specific common cache keys
-                        cache.delete(f"frontend_charts_{tenant.id}")
-                    
-                    # Also clear any related caches
-                    cache.delete(f"payroll_period_detail_{payroll_period.id}")
-                    cache.delete(f"payroll_summary_{payroll_period.id}")
-                    cache.delete(f"directory_data_{tenant.id}")
-                    cache.delete(f"directory_data_full_{tenant.id}")  # Clear full directory cache
-                    
-                    logger.info(f"✨ Cleared payroll, charts, and directory cache for tenant {tenant.id} after salary upload")
-                    
+
+                    # Create or update the UPLOADED PayrollPeriod and clear payroll/chart caches
+                    payroll_period, period_created = record_salary_upload_period(
+                        tenant, selected_year, selected_month
+                    )
+
                     # ✨ BACKGROUND SYNC: Aggregate chart data in background thread
                     # This avoids blocking the response while processing chart aggregation
                     from ..utils.chart_sync import sync_chart_data_batch_async
                     sync_chart_data_batch_async(tenant, int(selected_year), selected_month, source='excel')
                     logger.info(f"📊 Triggered background chart aggregation for {selected_month} {selected_year}")
-                    
-                    # ✨ AUTOMATIC PAYROLL CALCULATION (BACKGROUND THREAD):
-                    # Process uploaded salary data into CalculatedSalary without blocking the request
-                    import threading
-                    import time
-                    
-                    def _run_payroll_calculation_async(tenant_id: int, year: int, month: str):
-                        from django.db import connection
-                        from django.db import transaction
-                        try:
-                            # Small delay to ensure upload transaction is committed
-                            time.sleep(1)
-                            
-                            from ..models import Tenant, SalaryData, CalculatedSalary, DataSource
-                            from decimal import Decimal
-                            from datetime import date
-                            
-                            _tenant = Tenant.objects.get(id=tenant_id)
-                            logger.info(f"💰 [BG] Starting payroll calculation for {month} {year}")
-                            
-                            # Get uploaded salary data
-                            salary_data = SalaryData.objects.filter(
-                                tenant_id=tenant_id, year=year, month=month
-                            )
-                            
-                            if not salary_data.exists():
-                                logger.warning(f"💰 [BG] No SalaryData found for {month} {year}")
-                                return
-                            
-                            # Get or create payroll period
-                            from ..models import PayrollPeriod
-                            period = PayrollPeriod.objects.get(
-                                tenant_id=tenant_id, year=year, month=month
-                            )
-                            
-                            with transaction.atomic():
-                                for sd in salary_data:
-                                    # Create CalculatedSalary record with Excel values
-                                    calculated_salary = CalculatedSalary(
-                                        tenant_id=tenant_id,
-                                        payroll_period=period,
-                                        employee_id=sd.employee_id,
-                                        employee_name=sd.name,
-                                        department=sd.department or 'General',
-                                        basic_salary=sd.salary or Decimal('0'),
-                                        basic_salary_per_hour=sd.hour_rs or Decimal('0'),
-                                        basic_salary_per_minute=sd.charge or Decimal('0'),
-                                        employee_ot_rate=sd.hour_rs or Decimal('0'),
-                                        employee_tds_rate=sd.tds or Decimal('0'),
-                                        total_working_days=int((sd.days or 0) + (sd.absent or 0)),
-                                        present_days=Decimal(str(sd.days or 0)),
-                                        absent_days=Decimal(str(sd.absent or 0)),
-                                        ot_hours=sd.ot or Decimal('0'),
-                                        late_minutes=int(sd.late or 0),
-                                        salary_for_present_days=sd.sl_wo_ot or Decimal('0'),
-                                        ot_charges=sd.charges or Decimal('0'),
-                                        late_deduction=sd.amt or Decimal('0'),
-                                        incentive=sd.incentive or Decimal('0'),
-                                        gross_salary=sd.sal_ot or Decimal('0'),
-                                        tds_amount=sd.tds or Decimal('0'),
-                                        salary_after_tds=sd.sal_tds or Decimal('0'),
-                                        total_advance_balance=sd.total_old_adv or Decimal('0'),
-                                        advance_deduction_amount=sd.advance or Decimal('0'),
-                                        advance_deduction_editable=True,
-                                        remaining_advance_balance=sd.balnce_adv or Decimal('0'),
-                                        net_payable=sd.nett_payable or Decimal('0'),
-                                        data_source=DataSource.UPLOADED,
-                                        is_paid=True,
-                                        payment_date=date.today(),
-                                    )
-                                    
-                                    # Skip auto-calculation
-                                    calculated_salary._skip_auto_calc = True
-                                    calculated_salary.save()
-                                    
-                            logger.info(f"💰 [BG] Created {salary_data.count()} CalculatedSalary records marked as paid")
-
-                            # Clear caches so frontend reflects paid status immediately
-                            try:
-                                from excel_data.services.cache_service import invalidate_payroll_payment_caches
-                                
-                                cache_result = invalidate_payroll_payment_caches(
-                                    tenant=tenant, 
-                                    period_id=period.id,
-                                    reason="uploaded_salary_data_marked_paid"
-                                )
-                                
-                                if cache_result['success']:
-                                    logger.info(f"🧹 [BG] Cache invalidation successful: {cache_result['cleared_count']} keys cleared for tenant {tenant_id}, period {period.id}")
-                                else:
-                                    logger.warning(f"⚠️ [BG] Cache invalidation failed: {cache_result.get('error', 'Unknown error')}")
-                            except Exception as cache_exc:
-                                logger.warning(f"⚠️ [BG] Cache clear failed: {cache_exc}")
-                            
-                        except Exception as exc:
-                            logger.error(f"❌ [BG] Automatic payroll calculation failed: {exc}")
-                        finally:
-                            # Ensure DB connection is closed in thread
-                            connection.close()
-
-                    threading.Thread(
-                        target=_run_payroll_calculation_async,
-                        args=(tenant.id, int(selected_year), selected_month),
-                        daemon=True
-                    ).start()
+
+                    # ✨ AUTOMATIC PAYROLL CALCULATION (BACKGROUND TASK, queued on commit):
+                    # Process uploaded salary data into CalculatedSalary without blocking the request;
+                    # re-uploads of the same month within seconds share one run
+                    schedule_rebuild(tenant.id, PAYROLL, int(selected_year), selected_month)
 
                 return Response(
                     {
                         "message": "Upload completed successfully",
                         "records_created": records_created,
                         "records_updated": records_updated,
-                        "total_processed": len(valid_rows),
+                        "total_processed": len(prepared.records) + len(errors),
                         "total_rows_in_file": len(df),
                         "errors": errors[:10],  # Show first 10 errors only
                         "total_errors": len(errors),
@@ -670,6 +259,10 @@ class UploadSalaryDataAPIView(APIView):
                     status=status.HTTP_200_OK,
                 )
 
+            except UploadFileError as e:
+
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
             except Exception as e:
 
                 return Response(
@@ -726,6 +319,8 @@ class DownloadTemplateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        import openpyxl
+        from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
 
         # Create a new workbook and worksheet
         wb = openpyxl.Workbook()
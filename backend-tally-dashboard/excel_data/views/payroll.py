@@ -56,6 +56,12 @@ from rest_framework import serializers
 
 # Email verification views will be defined in this file
 from ..services.salary_service import SalaryCalculationService
+from ..services.change_outbox import record_calculated_salary_changes
+from ..services.cache_service import (
+    versioned_cache_key, bump_cache_generation, invalidate_payroll_overview_cache,
+    ATTENDANCE, PAYROLL, CHARTS, DIRECTORY,
+)
+from ..utils.periods import month_number, period_index, period_date_range
 
 
 
@@ -115,17 +121,7 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
             period.delete()
             
             # CLEAR CACHE: Invalidate payroll overview cache when payroll period is deleted
-            from django.core.cache import cache
-            cache_key = f"payroll_overview_{tenant_id}"
-            cache.delete(cache_key)
-            
-            # Clear frontend charts cache to refresh dashboard immediately
-            try:
-                # Try to clear all frontend charts cache variations
-                cache.delete_pattern(f"frontend_charts_{tenant_id}_*")
-            except AttributeError:
-                # Fallback: Clear specific common cache keys
-                cache.delete(f"frontend_charts_{tenant_id}")
+            bump_cache_generation(tenant_id, PAYROLL, CHARTS)
             
             logger.info(f"Cleared payroll overview and frontend charts cache for tenant {tenant_id} after deleting period {period_name}")
             
@@ -368,9 +364,7 @@ def lock_payroll_period(request, period_id):
         
         payroll_period = SalaryCalculationService.lock_payroll_period(tenant, period_id)
         # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
-        from django.core.cache import cache
-        cache_key = f"payroll_overview_{tenant.id}"
-        cache.delete(cache_key)
+        invalidate_payroll_overview_cache(tenant.id)
         logger.info(f"Cleared payroll overview cache for tenant {tenant.id}")
         
         return Response({
@@ -453,6 +447,8 @@ def mark_salary_paid(request):
                 ['is_paid', 'payment_date'], 
                 batch_size=100
             )
+            # Chart is_paid follows through the change outbox (bulk_update skips post_save)
+            record_calculated_salary_changes(tenant.id, bulk_updates)
             
             # OPTIMIZATION: Bulk process advance ledger updates ONLY when marking as paid
             if mark_as_paid and employee_advance_deductions:
@@ -727,7 +723,7 @@ def payroll_periods_list(request):
         # Import models locally to avoid any import issues
         from ..models import PayrollPeriod, CalculatedSalary
         
-        periods = PayrollPeriod.objects.filter(tenant=tenant).order_by('-year', '-month')
+        periods = PayrollPeriod.objects.filter(tenant=tenant).order_by('-period_index')
         
         periods_data = []
         for period in periods:
@@ -789,7 +785,7 @@ def payroll_overview(request):
         
         # Check for cache bypass
         no_cache = request.GET.get('no_cache', 'false').lower() == 'true'
-        cache_key = f"payroll_overview_{tenant.id}"
+        cache_key = versioned_cache_key(tenant, f"payroll_overview_{tenant.id}", PAYROLL, ATTENDANCE, DIRECTORY)
         
         # Try to get from cache first (unless bypassed)
         if not no_cache:
@@ -804,40 +800,15 @@ def payroll_overview(request):
         current_month = current_date.strftime('%B').upper()
         current_year = current_date.year
         
-        # Get all payroll periods with related salary calculations in single query (ordered by calendar date)
-        from django.db.models import Case, When, IntegerField
-        
-        # Define month ordering for proper calendar sorting (complete mapping)
-        month_order = {
-            'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-            'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-            'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
-            # Also handle common abbreviations that might be stored
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4,
-            'JUN': 6, 'JUL': 7, 'AUG': 8, 'SEP': 9,
-            'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        
-        # Create Case/When conditions with proper string quoting
-        when_conditions = []
-        for month_name, month_num in month_order.items():
-            # Case-insensitive match so variations like "June" or "june" are handled
-            when_conditions.append(When(month__iexact=month_name, then=month_num))
-        
+        # Get all payroll periods with related salary calculations in single query, ordered by
+        # the database-generated period_index (year * 12 + month)
         periods = PayrollPeriod.objects.filter(tenant=tenant).prefetch_related(
             'calculated_salaries'
-        ).annotate(
-            month_num=Case(
-                *when_conditions,
-                default=13,  # Put unknown months at the end
-                output_field=IntegerField()
-            )
-        ).order_by('-year', '-month_num')  # Now properly ordered by calendar date
+        ).order_by('-period_index')
         
         # Check if current month period exists
         current_period_exists = periods.filter(
-            year=current_year, 
-            month=current_month
+            period_index=period_index(current_year, current_date.month)
         ).exists()
         
         # Get aggregated data from both CalculatedSalary and SalaryData models
@@ -859,9 +830,8 @@ def payroll_overview(request):
         # Aggregate from SalaryData (uploaded Excel data)
         uploaded_aggregates = SalaryData.objects.filter(
             tenant=tenant,
-            year__in=[p.year for p in periods],
-            month__in=[p.month for p in periods]
-        ).values('year', 'month').annotate(
+            period_index__in=[p.period_index for p in periods]
+        ).values('period_index').annotate(
             total_employees=Count('id'),
             paid_employees=Count('id'),  # SalaryData doesn't have is_paid field, assume all unpaid initially
             total_gross_salary=Sum('sal_ot'),  # Use SAL+OT as gross salary
@@ -876,12 +846,11 @@ def payroll_overview(request):
         }
         
         # Create lookup for uploaded data by matching period
+        uploaded_by_period = {agg['period_index']: agg for agg in uploaded_aggregates}
         uploaded_lookup = {}
         for period in periods:
-            for agg in uploaded_aggregates:
-                if agg['year'] == period.year and agg['month'] == period.month:
-                    uploaded_lookup[period.id] = agg
-                    break
+            if period.period_index in uploaded_by_period:
+                uploaded_lookup[period.id] = uploaded_by_period[period.period_index]
         
         # Combine both data sources
         salary_lookup = {}
@@ -1256,9 +1225,7 @@ def add_employee_advance(request):
         
         
         # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
-        from django.core.cache import cache
-        cache_key = f"payroll_overview_{tenant.id}"
-        cache.delete(cache_key)
+        invalidate_payroll_overview_cache(tenant.id)
         logger.info(f"Cleared payroll overview cache for tenant {tenant.id}")
         
         return Response({
@@ -1304,8 +1271,17 @@ class AdvancePaymentViewSet(viewsets.ModelViewSet):
     
     def list(self, request, *args, **kwargs):
         """
-        Optimized list all advance payments with additional fields
+        Optimized list of advance payments with additional fields, newest first
+
+        Pages with a keyset cursor: pass next_cursor back as ?cursor= for the next page.
+        page_size (or limit) defaults to 100, max 500; count=exact|approximate|none (default
+        approximate on the first page, none after it).
         """
+        from ..utils.cursor_pagination import (
+            COUNT_APPROXIMATE, COUNT_NONE, InvalidCursor, count_param, count_rows,
+            page_size_param, paginate,
+        )
+
         start_time = time.time()
         
         queryset = self.get_queryset()
@@ -1339,17 +1315,21 @@ class AdvancePaymentViewSet(viewsets.ModelViewSet):
             'created_at', 'updated_at'
         )
         
-        # Apply pagination if needed
-        page_size = request.query_params.get('page_size', None)
-        if page_size:
-            try:
-                page_size = int(page_size)
-                queryset = queryset[:page_size]
-            except ValueError:
-                pass
-        
-        # Get all advances at once (no N+1 queries)
-        advances = list(queryset)
+        # Keyset pagination over (advance_date, id), newest first (advance_date_idx)
+        cursor = request.query_params.get('cursor') or None
+        page_size = page_size_param(request.query_params.get('page_size') or request.query_params.get('limit'))
+        count_mode = count_param(
+            request.query_params.get('count'),
+            default=COUNT_NONE if cursor else COUNT_APPROXIMATE,
+        )
+        try:
+            # Get the page's advances at once (no N+1 queries)
+            advances, next_cursor = paginate(
+                queryset, ('-advance_date', '-id'), cursor=cursor, page_size=page_size,
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
+        total_count, total_is_approximate = count_rows(queryset, count_mode)
         
         # Prepare response data efficiently
         advances_data = []
@@ -1383,6 +1363,10 @@ class AdvancePaymentViewSet(viewsets.ModelViewSet):
         return Response({
             'success': True,
             'count': len(advances_data),
+            'total_count': total_count,
+            'total_count_approximate': total_is_approximate,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor,
             'results': advances_data,
             'performance': {
                 'query_time_ms': response_time,
@@ -1423,17 +1407,7 @@ class AdvancePaymentViewSet(viewsets.ModelViewSet):
             advance = serializer.save(tenant=tenant)
             
             # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
-            from django.core.cache import cache
-            cache_key = f"payroll_overview_{tenant.id}"
-            cache.delete(cache_key)
-            
-            # Clear frontend charts cache to refresh dashboard immediately
-            try:
-                # Try to clear all frontend charts cache variations
-                cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-            except AttributeError:
-                # Fallback: Clear specific common cache keys
-                cache.delete(f"frontend_charts_{tenant.id}")
+            bump_cache_generation(tenant.id, PAYROLL, CHARTS)
             
             logger.info(f"Cleared payroll overview and frontend charts cache for tenant {tenant.id}")
             
@@ -1465,9 +1439,7 @@ class AdvancePaymentViewSet(viewsets.ModelViewSet):
             serializer.save()
             
             # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
-            from django.core.cache import cache
-            cache_key = f"payroll_overview_{getattr(self.request, 'tenant', None).id}"
-            cache.delete(cache_key)
+            invalidate_payroll_overview_cache(getattr(self.request, 'tenant', None).id)
             logger.info(f"Cleared payroll overview cache for tenant {getattr(self.request, 'tenant', None).id}")
             
             return Response({
@@ -1524,7 +1496,7 @@ def get_months_with_attendance(request):
             return Response({"error": "No tenant found"}, status=400)
         
         # Check cache first (cache for 30 minutes since attendance data doesn't change frequently)
-        cache_key = f"months_with_attendance_{tenant.id}"
+        cache_key = versioned_cache_key(tenant, f"months_with_attendance_{tenant.id}", ATTENDANCE, PAYROLL)
         use_cache = request.GET.get('no_cache', '').lower() != 'true'
         
         if use_cache:
@@ -1553,10 +1525,10 @@ def get_months_with_attendance(request):
         # Get salary data periods
         salary_aggregated = SalaryData.objects.filter(
             tenant=tenant
-        ).values('year', 'month').annotate(
+        ).values('year', 'month', 'period_index').annotate(
             salary_records=Count('id'),
             employees_with_salary=Count('employee_id', distinct=True)
-        ).order_by('-year', '-month')
+        ).order_by('-period_index')
         
         # Process results into final format
         available_periods = []
@@ -1581,15 +1553,10 @@ def get_months_with_attendance(request):
             }
         
         # Process salary data
-        month_name_to_num = {
-            'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-            'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
-        }
-        
         for period in salary_aggregated:
             year = int(period['year'])
             month_name = period['month']
-            month_num = month_name_to_num.get(month_name, 1)  # Default to 1 if not found
+            month_num = month_number(month_name) or 1  # Default to 1 if not found
             key = f"{year}-{month_num}"
             
             if key in periods_dict:
@@ -1693,7 +1660,9 @@ def calculate_simple_payroll(request):
             is_active=True
         ).only(
             'employee_id', 'first_name', 'last_name', 'department', 
-            'basic_salary', 'ot_charge_per_hour', 'tds_percentage'
+            'basic_salary', 'ot_charge_per_hour', 'tds_percentage',
+            'date_of_joining', 'off_monday', 'off_tuesday', 'off_wednesday',
+            'off_thursday', 'off_friday', 'off_saturday', 'off_sunday'
         )
         
         employee_ids = list(employees.values_list('employee_id', flat=True))
@@ -1775,103 +1744,73 @@ def calculate_simple_payroll(request):
         logger.info(f"Advance deductions aggregated for {len(advance_dict)} employees")
         
         # OPTIMIZATION 4: Process all employees in bulk with vectorized operations
-        payroll_data = []
-        total_base_salary = 0
-        total_gross_salary = 0
-        total_net_salary = 0
-        
         from ..services.salary_service import SalaryCalculationService
+        from ..services.payroll_kernel import compute_payroll, paise_to_float
+        
+        employees = list(employees)
+        no_attendance = {
+            'present_days': 0,
+            'absent_days': 0,
+            'ot_hours': 0.0,
+            'late_minutes': 0
+        }
+        attendance_rows = [attendance_dict.get(employee.employee_id, no_attendance) for employee in employees]
+        
+        # SMART CALCULATION: Uses SalaryCalculationService with DOJ awareness
+        # - Joining month: Calculates actual days from DOJ to month end
+        # - Other months: Uses standard 30 days
+        working_days_column = [
+            SalaryCalculationService._calculate_employee_working_days(employee, year, month_name_upper)
+            for employee in employees
+        ]
+        
+        # Advances recorded for this month are deducted in full (admin-entered amounts)
+        advance_deductions = [advance_dict.get(employee.employee_id, 0.0) for employee in employees]
+        total_advance_balances = [total_advance_dict.get(employee.employee_id, 0.0) for employee in employees]
+        
+        kernel = compute_payroll(
+            basic_salary=[employee.basic_salary for employee in employees],
+            working_days=working_days_column,
+            present_days=[attendance['present_days'] for attendance in attendance_rows],
+            ot_hours=[attendance['ot_hours'] for attendance in attendance_rows],
+            late_minutes=[attendance['late_minutes'] for attendance in attendance_rows],
+            ot_rate=[employee.ot_charge_per_hour for employee in employees],
+            tds_percentage=[employee.tds_percentage for employee in employees],
+            advance_balance=total_advance_balances,
+            advance_override=advance_deductions,
+        )
+        kernel = {name: paise_to_float(values) for name, values in kernel.items()}
         
-        for employee in employees:
-            # Get attendance data (default to 0 if no records)
-            attendance = attendance_dict.get(employee.employee_id, {
-                'present_days': 0,
-                'absent_days': 0,
-                'ot_hours': 0.0,
-                'late_minutes': 0
-            })
-            
-            # SMART CALCULATION: Uses SalaryCalculationService with DOJ awareness
-            # - Joining month: Calculates actual days from DOJ to month end
-            # - Other months: Uses standard 30 days
-            employee_working_days = SalaryCalculationService._calculate_employee_working_days(
-                employee, year, month_name_upper
-            )
-            
-            # Get advance deductions (default to 0)
-            advance_deductions = advance_dict.get(employee.employee_id, 0.0)
-            total_advance_balance = total_advance_dict.get(employee.employee_id, 0.0)
-            
-            # Basic calculations
-            base_salary = float(employee.basic_salary or 0)
-            present_days = attendance['present_days']
-            ot_hours = attendance['ot_hours']
-            late_minutes = attendance['late_minutes']
-            
-            # Standardized Gross Salary calculation:
-            # Gross Salary = (Base Salary ÷ Working Days × Present Days) + OT Charges - Late Deduction
-            if employee_working_days > 0:
-                daily_rate = base_salary / employee_working_days
-                salary_for_present_days = daily_rate * present_days
-            else:
-                salary_for_present_days = 0
-            
-            # Calculate overtime charges
-            ot_rate = float(employee.ot_charge_per_hour or 0)
-            ot_charges = ot_hours * ot_rate
-            
-            # Calculate late deduction using standardized approach
-            late_charge_per_minute = ot_rate / 60 if ot_rate > 0 else 0
-            late_deduction = late_minutes * late_charge_per_minute
-            
-            # Apply standardized gross salary formula
-            gross_salary = salary_for_present_days + ot_charges - late_deduction
-            
-            # Calculate TDS (use employee-specific TDS or 0%)
-            tds_percentage = float(employee.tds_percentage or 0)
-            tds_amount = (gross_salary * tds_percentage) / 100
-            salary_after_tds = gross_salary - tds_amount
-            
-            # Final net salary
-            net_salary = salary_after_tds - advance_deductions
-            
-            # Calculate remaining advance balance
-            remaining_advance_balance = total_advance_balance - advance_deductions
-            
-            # Round values for response
-            gross_salary_rounded = round(gross_salary, 2)
-            ot_charges_rounded = round(ot_charges, 2)
-            late_deduction_rounded = round(late_deduction, 2)
-            tds_amount_rounded = round(tds_amount, 2)
-            net_salary_rounded = round(net_salary, 2)
-            
+        payroll_data = []
+        for index, employee in enumerate(employees):
+            attendance = attendance_rows[index]
             payroll_data.append({
                 'employee_id': employee.employee_id,
                 'employee_name': f"{employee.first_name} {employee.last_name}",
                 'department': employee.department or 'N/A',
-                'base_salary': base_salary,
-                'working_days': employee_working_days,
-                'present_days': present_days,
+                'base_salary': float(employee.basic_salary or 0),
+                'working_days': working_days_column[index],
+                'present_days': attendance['present_days'],
                 'absent_days': attendance['absent_days'],
-                'ot_hours': ot_hours,
-                'late_minutes': late_minutes,
-                'gross_salary': gross_salary_rounded,
-                'ot_charges': ot_charges_rounded,
-                'late_deduction': late_deduction_rounded,
-                'tds_percentage': tds_percentage,
-                'tds_amount': tds_amount_rounded,
-                'total_advance_balance': total_advance_balance,
-                'advance_deduction': advance_deductions,
-                'remaining_balance': remaining_advance_balance,
-                'net_salary': net_salary_rounded,
+                'ot_hours': attendance['ot_hours'],
+                'late_minutes': attendance['late_minutes'],
+                'gross_salary': kernel['gross_salary'][index],
+                'ot_charges': kernel['ot_charges'][index],
+                'late_deduction': kernel['late_deduction'][index],
+                'tds_percentage': float(employee.tds_percentage or 0),
+                'tds_amount': kernel['tds_amount'][index],
+                'total_advance_balance': total_advance_balances[index],
+                'advance_deduction': advance_deductions[index],
+                'remaining_balance': kernel['remaining_advance_balance'][index],
+                'net_salary': kernel['net_payable'][index],
                 'is_paid': False,  # Default to unpaid
                 'editable': True   # Allow editing
             })
-            
-            # Accumulate totals
-            total_base_salary += base_salary
-            total_gross_salary += gross_salary_rounded
-            total_net_salary += net_salary_rounded
+        
+        # Accumulate totals
+        total_base_salary = sum(entry['base_salary'] for entry in payroll_data)
+        total_gross_salary = sum(kernel['gross_salary'])
+        total_net_salary = sum(kernel['net_payable'])
         
         end_time = time.time()
         calculation_time = round(end_time - start_time, 2)
@@ -2040,9 +1979,7 @@ def manual_calculate_payroll(request):
             tenant, year, month, force_recalculate=True
         )
         # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
-        from django.core.cache import cache
-        cache_key = f"payroll_overview_{tenant.id}"
-        cache.delete(cache_key)
+        invalidate_payroll_overview_cache(tenant.id)
         logger.info(f"Cleared payroll overview cache for tenant {tenant.id}")
         
         return Response({
@@ -2096,9 +2033,8 @@ def calculate_simple_payroll_ultra_fast(request):
         working_days = total_days_in_month  # Use total days for summary display
         month_name_upper = calendar.month_name[month_num].upper()
         
-        month_year_string = f"{calendar.month_name[month_num]} {year}"
-        
-        # Ultra-optimized SQL query that calculates everything in the database
+        # Ultra-optimized SQL query that aggregates all payroll inputs in the database.
+        # The salary math itself runs in the shared columnar payroll kernel below.
         with connection.cursor() as cursor:
             sql = """
             SELECT 
@@ -2106,7 +2042,6 @@ def calculate_simple_payroll_ultra_fast(request):
                 CONCAT(e.first_name, ' ', e.last_name) as employee_name,
                 COALESCE(e.department, 'N/A') as department,
                 COALESCE(e.basic_salary, 0) as base_salary,
-                %s as working_days,
                 
                 -- Attendance aggregations
                 COALESCE(att.present_days, 0) as present_days,
@@ -2114,35 +2049,10 @@ def calculate_simple_payroll_ultra_fast(request):
                 COALESCE(att.ot_hours, 0) as ot_hours,
                 COALESCE(att.late_minutes, 0) as late_minutes,
                 
-                -- Standardized Gross Salary calculation:
-                -- Gross Salary = (Base Salary ÷ Working Days × Present Days) + OT Charges - Late Deduction
-                CASE 
-                    WHEN %s > 0 THEN 
-                        ((COALESCE(e.basic_salary, 0) / %s) * COALESCE(att.present_days, 0)) + 
-                        (COALESCE(att.ot_hours, 0) * COALESCE(e.ot_charge_per_hour, 0)) - 
-                        (CASE 
-                            WHEN COALESCE(e.ot_charge_per_hour, 0) > 0 THEN
-                                COALESCE(att.late_minutes, 0) * (COALESCE(e.ot_charge_per_hour, 0) / 60.0)
-                            ELSE 0
-                        END)
-                    ELSE 0 
-                END as gross_salary,
-                
-                -- OT charges
-                COALESCE(att.ot_hours, 0) * COALESCE(e.ot_charge_per_hour, 0) as ot_charges,
-                
-                -- Late deduction
-                CASE 
-                    WHEN COALESCE(e.ot_charge_per_hour, 0) > 0 THEN
-                        COALESCE(att.late_minutes, 0) * (COALESCE(e.ot_charge_per_hour, 0) / 60.0)
-                    ELSE 0
-                END as late_deduction,
-                
                 -- TDS
                 COALESCE(e.tds_percentage, 0) as tds_percentage,
                 
-                -- Advance deductions
-                COALESCE(adv.advance_deduction, 0) as advance_deduction,
+                -- Advance balance
                 COALESCE(total_adv.total_advance_balance, 0) as total_advance_balance,
                 
                 -- Employee rates
@@ -2159,22 +2069,10 @@ def calculate_simple_payroll_ultra_fast(request):
                     SUM(COALESCE(late_minutes, 0)) as late_minutes
                 FROM excel_data_attendance 
                 WHERE tenant_id = %s 
-                    AND EXTRACT(YEAR FROM date) = %s 
-                    AND EXTRACT(MONTH FROM date) = %s
+                    AND date BETWEEN %s AND %s
                 GROUP BY employee_id
             ) att ON e.employee_id = att.employee_id
             
-            LEFT JOIN (
-                SELECT 
-                    employee_id,
-                    SUM(COALESCE(remaining_balance, 0)) as advance_deduction
-                FROM excel_data_advanceledger 
-                WHERE tenant_id = %s 
-                    AND for_month LIKE %s
-                    AND status IN ('PENDING', 'PARTIALLY_PAID')
-                GROUP BY employee_id
-            ) adv ON e.employee_id = adv.employee_id
-            
             LEFT JOIN (
                 SELECT 
                     employee_id,
@@ -2191,17 +2089,14 @@ def calculate_simple_payroll_ultra_fast(request):
             """
             
             cursor.execute(sql, [
-                working_days, working_days, working_days,  # working days parameters
-                tenant.id, year, month_num,  # attendance parameters
-                tenant.id, f'%{month_year_string}%',  # advance parameters
+                tenant.id, *period_date_range(period_index(year, month_num)),  # attendance parameters
                 tenant.id,  # total advance parameters
                 tenant.id  # employee filter
             ])
             
             columns = [col[0] for col in cursor.description]
-            raw_results = cursor.fetchall()
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
-        # Process results with final calculations
         # Preload employees to compute employee-specific working days (attendance tracker logic)
         from ..models import EmployeeProfile
         employees_map = {
@@ -2212,101 +2107,59 @@ def calculate_simple_payroll_ultra_fast(request):
             )
         }
         from ..services.salary_service import SalaryCalculationService
-        payroll_data = []
-        total_base_salary = 0
-        total_gross_salary = 0
-        total_net_salary = 0
+        from ..services.payroll_kernel import compute_payroll, paise_to_float
+        
+        # SMART CALCULATION: Employee-specific working days with DOJ awareness
+        # (no employee profile found - use standard 30 days)
+        working_days_column = [
+            SalaryCalculationService._calculate_employee_working_days(
+                employees_map[row['employee_id']], year, month_name_upper
+            ) if row['employee_id'] in employees_map else 30
+            for row in rows
+        ]
+        
+        # One vectorized pass computes every derived column for all employees
+        kernel = compute_payroll(
+            basic_salary=[row['base_salary'] for row in rows],
+            working_days=working_days_column,
+            present_days=[row['present_days'] for row in rows],
+            ot_hours=[row['ot_hours'] for row in rows],
+            late_minutes=[row['late_minutes'] for row in rows],
+            ot_rate=[row['ot_rate'] for row in rows],
+            tds_percentage=[row['tds_percentage'] for row in rows],
+            advance_balance=[row['total_advance_balance'] for row in rows],
+        )
+        kernel = {name: paise_to_float(values) for name, values in kernel.items()}
         
-        for row in raw_results:
-            data = dict(zip(columns, row))
-            
-            # SMART CALCULATION: Employee-specific working days with DOJ awareness
-            employee = employees_map.get(data['employee_id'])
-            if employee:
-                employee_working_days = SalaryCalculationService._calculate_employee_working_days(
-                    employee, year, month_name_upper
-                )
-            else:
-                # No employee profile found - use standard 30 days
-                employee_working_days = 30
-
-            # Recompute gross salary with employee-specific working days
-            # Gross Salary = (Base Salary ÷ Working Days × Present Days) + OT Charges - Late Deduction
-            base_salary = float(data['base_salary'] or 0)
-            present_days = float(data['present_days'] or 0)
-            ot_charges = float(data['ot_charges'] or 0)
-            late_deduction = float(data['late_deduction'] or 0)
-            if employee_working_days > 0:
-                gross_salary = ((base_salary / employee_working_days) * present_days) + ot_charges - late_deduction
-            else:
-                gross_salary = 0.0
-            
-            # Debug logging for first few employees
-            if len(payroll_data) < 3:
-                logger.info(f"Employee {data['employee_name']}: gross_salary={gross_salary}, ot_charges={ot_charges}, late_deduction={late_deduction}, base_salary={data['base_salary']}, present_days={data['present_days']}, working_days={data['working_days']}")
-            
-            # TDS calculation
-            tds_percentage = float(data['tds_percentage'] or 0)
-            tds_amount = (gross_salary * tds_percentage) / 100
-            salary_after_tds = gross_salary - tds_amount
-            
-            # Smart advance deduction logic - never let net salary go negative
-            total_advance_balance = float(data['total_advance_balance'] or 0)
-            
-            # Calculate maximum deductible amount (salary after TDS)
-            max_deductible = max(0, salary_after_tds)  # Never negative
-            
-            # Determine actual advance deduction
-            if total_advance_balance > 0:
-                # Deduct as much as possible without making net salary negative
-                actual_advance_deduction = min(total_advance_balance, max_deductible)
-            else:
-                actual_advance_deduction = 0
-            
-            # Calculate final net salary and remaining advance balance
-            net_salary = salary_after_tds - actual_advance_deduction
-            remaining_advance_balance = total_advance_balance - actual_advance_deduction
-            
-            # Ensure net salary is never negative (safety check)
-            if net_salary < 0:
-                actual_advance_deduction = salary_after_tds
-                net_salary = 0
-                remaining_advance_balance = total_advance_balance - actual_advance_deduction
-            
-            # Round all values
-            gross_salary_rounded = round(gross_salary, 2)
-            ot_charges_rounded = round(ot_charges, 2)
-            late_deduction_rounded = round(late_deduction, 2)
-            tds_amount_rounded = round(tds_amount, 2)
-            net_salary_rounded = round(net_salary, 2)
-            
+        payroll_data = []
+        for index, data in enumerate(rows):
             payroll_data.append({
                 'employee_id': data['employee_id'],
                 'employee_name': data['employee_name'],
                 'department': data['department'],
-                'base_salary': base_salary,
-                'working_days': int(employee_working_days),
+                'base_salary': float(data['base_salary'] or 0),
+                'working_days': int(working_days_column[index]),
                 'present_days': int(data['present_days'] or 0),
                 'absent_days': int(data['absent_days'] or 0),
                 'ot_hours': float(data['ot_hours'] or 0),
                 'late_minutes': int(data['late_minutes'] or 0),
-                'gross_salary': gross_salary_rounded,
-                'ot_charges': ot_charges_rounded,
-                'late_deduction': late_deduction_rounded,
-                'tds_percentage': tds_percentage,
-                'tds_amount': tds_amount_rounded,
-                'total_advance_balance': total_advance_balance,
-                'advance_deduction': actual_advance_deduction,
-                'remaining_balance': remaining_advance_balance,
-                'net_salary': net_salary_rounded,
+                'gross_salary': kernel['gross_salary'][index],
+                'ot_charges': kernel['ot_charges'][index],
+                'late_deduction': kernel['late_deduction'][index],
+                'tds_percentage': float(data['tds_percentage'] or 0),
+                'tds_amount': kernel['tds_amount'][index],
+                'total_advance_balance': float(data['total_advance_balance'] or 0),
+                'advance_deduction': kernel['advance_deduction'][index],
+                'remaining_balance': kernel['remaining_advance_balance'][index],
+                'net_salary': kernel['net_payable'][index],
                 'is_paid': False,
                 'editable': True
             })
-            
-            # Accumulate totals
-            total_base_salary += base_salary
-            total_gross_salary += gross_salary_rounded
-            total_net_salary += net_salary_rounded
+        
+        # Accumulate totals
+        total_base_salary = sum(entry['base_salary'] for entry in payroll_data)
+        total_gross_salary = sum(kernel['gross_salary'])
+        total_net_salary = sum(kernel['net_payable'])
         
         end_time = time.time()
         calculation_time = round(end_time - start_time, 2)
@@ -2525,6 +2378,11 @@ def save_payroll_period_direct(request):
                 created_count = len(to_create)
             create_end = perf_counter()
 
+            # ✨ Chart rows follow through the change outbox (bulk writes skip post_save)
+            bg_start = perf_counter()
+            record_calculated_salary_changes(tenant.id, to_update + to_create)
+            bg_end = perf_counter()
+
         # CLEAR CACHE: Invalidate payroll overview cache when payroll data changes
         from excel_data.services.cache_service import invalidate_payroll_caches_comprehensive
         
@@ -2538,12 +2396,6 @@ def save_payroll_period_direct(request):
         else:
             logger.warning(f"Cache invalidation failed: {cache_result.get('error', 'Unknown error')}")
 
-        # ✨ BACKGROUND SYNC: Aggregate chart data in background (Celery/thread)
-        bg_start = perf_counter()
-        from excel_data.utils.chart_sync import sync_chart_data_batch_async
-        sync_chart_data_batch_async(tenant, year, month_name, source='frontend')
-        bg_end = perf_counter()
-
         t_end = perf_counter()
         timing_msg = (
             "[save_payroll_period_direct] entries=%d created_period=%s | "
@@ -2672,6 +2524,8 @@ def bulk_update_payroll_period(request, period_id):
                 ['is_paid', 'payment_date', 'advance_deduction_amount', 'net_payable'],
                 batch_size=100
             )
+            # Chart is_paid/net_payable follow through the change outbox (bulk_update skips post_save)
+            record_calculated_salary_changes(tenant.id, salaries_to_update)
 
             # Process advance ledger updates for paid salaries (similar to mark_salary_paid logic)
             if advance_deductions_processed:
@@ -2728,9 +2582,7 @@ def bulk_update_payroll_period(request, period_id):
                     logger.info(f"Marked {len(advances_to_mark_repaid)} advances as repaid")
 
         # Clear payroll overview cache
-        from django.core.cache import cache
-        cache_key = f"payroll_overview_{tenant.id}"
-        cache.delete(cache_key)
+        invalidate_payroll_overview_cache(tenant.id)
         logger.info(f"Cleared payroll overview cache for tenant {tenant.id}")
 
         return Response({
@@ -0,0 +1,136 @@
+"""
+Async Server-Sent Events endpoint for ASGI deployments
+
+Under WSGI every open SessionConflictSSEView stream pins a worker thread. dashboard/asgi.py
+routes the SSE paths to session_conflict_stream instead: a plain ASGI application that
+waits on an asyncio queue (InMemorySSEBroadcaster.subscribe_async) on the event loop. It
+runs outside Django's request handler, which would keep a per-request executor thread alive
+for the whole stream, so an idle connection costs memory only. Everything else still goes
+through Django.
+
+The endpoint runs no middleware. Like the sync view it requires ?ticket=<SSE ticket> and
+subscribes to the ticket user's and tenant's topics only (validated in a thread, the one
+database query of a stream); without a valid ticket it answers 401. CORS headers follow the
+django-cors-headers settings.
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from ..utils.sse_broadcaster import InMemorySSEBroadcaster
+
+logger = logging.getLogger(__name__)
+
+SSE_PATHS = ('/api/sse/session-conflicts/',)
+KEEPALIVE_SECONDS = 15
+
+
+def sse_router(django_application):
+    """ASGI application serving SSE_PATHS asynchronously and everything else with Django"""
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] in SSE_PATHS and scope['method'] in ('GET', 'OPTIONS'):
+            await session_conflict_stream(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return application
+
+
+def _cors_headers(scope):
+    """Access-Control headers for the request's Origin, as CorsMiddleware would send them"""
+    headers = dict(scope.get('headers') or [])
+    origin = headers.get(b'origin', b'').decode('latin-1')
+    if not origin:
+        return []
+    if not (getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', [])):
+        return []
+    cors = [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'origin')]
+    if getattr(settings, 'CORS_ALLOW_CREDENTIALS', False):
+        cors.append((b'access-control-allow-credentials', b'true'))
+    return cors
+
+
+def _client_ip(scope):
+    headers = dict(scope.get('headers') or [])
+    forwarded = headers.get(b'x-forwarded-for')
+    if forwarded:
+        return forwarded.decode('latin-1').split(',')[0].strip()
+    client = scope.get('client')
+    return client[0] if client else None
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def session_conflict_stream(scope, receive, send):
+    """Stream session-conflict events (same messages as SessionConflictSSEView)"""
+    cors = _cors_headers(scope)
+    if scope['method'] == 'OPTIONS':
+        await send({'type': 'http.response.start', 'status': 200, 'headers': cors})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    client_ip = _client_ip(scope)
+    ticket = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('ticket', [None])[0]
+    topics = await sync_to_async(InMemorySSEBroadcaster.topics_for_ticket, thread_sensitive=False)(ticket) if ticket else None
+    if topics is None:
+        await send({
+            'type': 'http.response.start',
+            'status': 401,
+            'headers': [(b'content-type', b'application/json'), *cors],
+        })
+        await send({'type': 'http.response.body', 'body': json.dumps({'error': 'A valid SSE ticket is required'}).encode()})
+        return
+
+    event_queue = InMemorySSEBroadcaster.subscribe_async(topics=topics)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache, no-transform'),
+                (b'x-accel-buffering', b'no'),  # Disable nginx buffering
+                *cors,
+            ],
+        })
+        connected = {
+            'message': 'Connected to session conflict notifications',
+            'subscribers': InMemorySSEBroadcaster.get_subscriber_count(),
+        }
+        await send({
+            'type': 'http.response.body',
+            'body': f"event: connected\ndata: {json.dumps(connected)}\n\n".encode(),
+            'more_body': True,
+        })
+        logger.info(f"Async SSE client connected from IP: {client_ip}")
+
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(event_queue.get())
+            done, _ = await asyncio.wait({next_event, disconnected}, timeout=KEEPALIVE_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            if next_event not in done:
+                next_event.cancel()
+                if disconnected in done:
+                    break
+                # No event in time - send keepalive comment
+                await send({'type': 'http.response.body', 'body': b": keepalive\n\n", 'more_body': True})
+                continue
+
+            await send({'type': 'http.response.body', 'body': next_event.result()['message'].encode(), 'more_body': True})
+    except OSError as e:
+        # Client went away while we were writing
+        logger.debug(f"Async SSE send failed for {client_ip}: {e}")
+    finally:
+        disconnected.cancel()
+        InMemorySSEBroadcaster.unsubscribe(event_queue)
+        logger.info(f"Async SSE client disconnected from IP: {client_ip}")
@@ -5,11 +5,15 @@ Uses simple in-memory broadcasting
 import json
 import time
 import logging
-from django.http import StreamingHttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..utils.authentication import SSETicket
 from ..utils.sse_broadcaster import InMemorySSEBroadcaster, SSENotifier
 
 logger = logging.getLogger(__name__)
@@ -27,13 +31,17 @@ class SessionConflictSSEView(View):
         Handle SSE connection
         Streams events from in-memory broadcaster to the client
         """
+        # Only the user's and tenant's events, for the user of ?ticket=<SSETicketView ticket>
+        topics = InMemorySSEBroadcaster.topics_for_ticket(request.GET.get('ticket'))
+        if topics is None:
+            return JsonResponse({'error': 'A valid SSE ticket is required'}, status=401)
+        
         def event_stream():
             """Generator that yields SSE formatted messages"""
             event_queue = None
             
             try:
-                # Subscribe to events
-                event_queue = InMemorySSEBroadcaster.subscribe()
+                event_queue = InMemorySSEBroadcaster.subscribe(topics=topics)
                 
                 # Send initial connection message
                 yield f"event: connected\ndata: {json.dumps({'message': 'Connected to session conflict notifications', 'subscribers': InMemorySSEBroadcaster.get_subscriber_count()})}\n\n"
@@ -46,12 +54,8 @@ class SessionConflictSSEView(View):
                         # Wait for event with timeout (for keepalive)
                         event_data = event_queue.get(timeout=15)
                         
-                        event_type = event_data.get('event_type', 'unknown')
-                        data = event_data.get('data', {})
-                        
-                        # Format as SSE event
-                        sse_message = f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
-                        yield sse_message
+                        # Already formatted as an SSE event by the broadcaster
+                        yield event_data['message']
                         
                     except Exception as e:
                         # Timeout or other error - send keepalive
@@ -94,6 +98,20 @@ class SessionConflictSSEView(View):
         return ip
 
 
+class SSETicketView(APIView):
+    """
+    Issue a ticket for the session conflict stream (?ticket=...)
+    
+    The ticket expires after a minute and opens nothing but event streams, so the access
+    token never appears in a URL.
+    """
+    permission_classes = (IsAuthenticated,)
+    
+    def post(self, request):
+        ticket = SSETicket.for_user(request.user)
+        return Response({'ticket': str(ticket), 'expires_in': int(SSETicket.lifetime.total_seconds())})
+
+
 class SSETestView(View):
     """
     Test endpoint to manually trigger SSE events for testing
@@ -41,6 +41,14 @@ from ..models import (
     DataSource,
     MonthlyAttendanceSummary,
 )
+from ..services.cache_service import (
+    versioned_cache_key,
+    bump_cache_generation,
+    ATTENDANCE,
+    CHARTS,
+    DIRECTORY,
+)
+from ..services.employee_directory import schedule_directory_refresh
 
 from ..serializers import (
     TenantSerializer,
@@ -63,6 +71,7 @@ from ..serializers import (
     SalaryDataFrontendSerializer,
 )
 from ..utils.permissions import IsSuperUser
+from ..utils.upload_reader import EXCEL_EXTENSIONS, UploadFileError, check_upload, read_upload
 from ..utils.utils import (
     clean_decimal_value,
     clean_int_value,
@@ -328,8 +337,9 @@ def bulk_update_attendance(request):
     try:
         from datetime import datetime
         from django.db import transaction
-        from excel_data.signals import sync_attendance_from_daily
         from excel_data.models import DailyAttendance
+        from excel_data.services.attendance_summary_service import AttendanceSummaryService
+        from excel_data.utils.bulk_upsert import bulk_upsert
         
         tenant = getattr(request, 'tenant', None)
         if not tenant:
@@ -373,17 +383,15 @@ def bulk_update_attendance(request):
         # Create employee lookup dictionary for fast access
         employee_lookup = {emp.employee_id: emp for emp in employees}
         
-        # Get existing attendance records for this date to determine updates vs creates
-        existing_attendance = DailyAttendance.objects.filter(
+        # Get existing attendance records for this date to report updates vs creates
+        existing_employee_ids = set(DailyAttendance.objects.filter(
             tenant=tenant,
             employee_id__in=employee_ids,
             date=attendance_date
-        )
-        existing_lookup = {att.employee_id: att for att in existing_attendance}
+        ).values_list('employee_id', flat=True))
         
         # Prepare batch data
-        records_to_create = []
-        records_to_update = []
+        records_to_write = []
         created_count = 0
         updated_count = 0
         skipped_count = 0
@@ -451,23 +459,16 @@ def bulk_update_attendance(request):
                     'late_minutes': late_minutes,
                 }
                 
-                # OPTIMIZED: Fast update/create decision
-                if employee_id in existing_lookup:
-                    # Update existing record
-                    existing_record = existing_lookup[employee_id]
-                    for key, value in record_data.items():
-                        setattr(existing_record, key, value)
-                    records_to_update.append(existing_record)
+                # OPTIMIZED: Existing rows are updated by the upsert, new ones inserted
+                records_to_write.append(DailyAttendance(
+                    tenant=tenant,
+                    employee_id=employee_id,
+                    date=attendance_date,
+                    **record_data
+                ))
+                if employee_id in existing_employee_ids:
                     updated_count += 1
                 else:
-                    # Create new record
-                    new_record = DailyAttendance(
-                        tenant=tenant,
-                        employee_id=employee_id,
-                        date=attendance_date,
-                        **record_data
-                    )
-                    records_to_create.append(new_record)
                     created_count += 1
                     
             except Exception as e:
@@ -476,147 +477,45 @@ def bulk_update_attendance(request):
         processing_time = time.time() - processing_start_time
         logger.info(f"OPTIMIZED: Processed {len(attendance_records)} records in {processing_time:.3f}s")
         
-        # ULTRA OPTIMIZED: Perform bulk operations with raw SQL for maximum speed
+        # Single parameterized INSERT ... ON CONFLICT (tenant_id, employee_id, date) DO UPDATE
         db_start_time = time.time()
         
         with transaction.atomic():
-            # ULTRA FAST: Use raw SQL for bulk operations instead of ORM
-            from django.db import connection
+            if records_to_write:
+                bulk_upsert(
+                    DailyAttendance,
+                    records_to_write,
+                    conflict_fields=['tenant', 'employee_id', 'date'],
+                    update_fields=['employee_name', 'department', 'attendance_status', 'ot_hours', 'late_minutes'],
+                )
+                logger.info(f"OPTIMIZED: Upserted {len(records_to_write)} records ({created_count} new, {updated_count} updated)")
             
-            # OPTIMIZED: Bulk create with raw SQL (much faster than ORM)
-            if records_to_create:
-                cursor = connection.cursor()
-                
-                # Prepare bulk insert query
-                insert_values = []
-                for record in records_to_create:
-                    # Escape single quotes properly for SQL
-                    safe_name = record.employee_name.replace("'", "''")
-                    safe_dept = record.department.replace("'", "''")
-                    safe_designation = record.designation.replace("'", "''")
-                    
-                    insert_values.append(
-                        f"('{record.tenant.id}', '{record.employee_id}', '{record.date}', "
-                        f"'{safe_name}', '{safe_dept}', "
-                        f"'{safe_designation}', '{record.employment_type}', '{record.attendance_status}', "
-                        f"{record.ot_hours}, {record.late_minutes}, NOW(), NOW())"
-                    )
-                
-                if insert_values:
-                    insert_query = f"""
-                        INSERT INTO excel_data_dailyattendance 
-                        (tenant_id, employee_id, date, employee_name, department, designation, 
-                         employment_type, attendance_status, ot_hours, late_minutes, created_at, updated_at)
-                        VALUES {', '.join(insert_values)}
-                    """
-                    cursor.execute(insert_query)
-                    logger.info(f"ULTRA FAST: Raw SQL bulk created {len(records_to_create)} records")
-            
-            # OPTIMIZED: Bulk update with raw SQL (much faster than ORM)
-            if records_to_update:
-                cursor = connection.cursor()
-                
-                # Prepare bulk update queries (using CASE statements for efficiency)
-                employee_ids = [f"'{record.employee_id}'" for record in records_to_update]
-                
-                # Build CASE statements for each field
-                name_cases = []
-                dept_cases = []
-                status_cases = []
-                ot_cases = []
-                late_cases = []
-                
-                for record in records_to_update:
-                    eid = record.employee_id
-                    safe_name = record.employee_name.replace("'", "''")
-                    safe_dept = record.department.replace("'", "''")
-                    
-                    name_cases.append(f"WHEN employee_id = '{eid}' THEN '{safe_name}'")
-                    dept_cases.append(f"WHEN employee_id = '{eid}' THEN '{safe_dept}'")
-                    status_cases.append(f"WHEN employee_id = '{eid}' THEN '{record.attendance_status}'")
-                    ot_cases.append(f"WHEN employee_id = '{eid}' THEN {record.ot_hours}")
-                    late_cases.append(f"WHEN employee_id = '{eid}' THEN {record.late_minutes}")
-                
-                update_query = f"""
-                    UPDATE excel_data_dailyattendance SET
-                        employee_name = CASE {' '.join(name_cases)} END,
-                        department = CASE {' '.join(dept_cases)} END,
-                        attendance_status = CASE {' '.join(status_cases)} END,
-                        ot_hours = CASE {' '.join(ot_cases)} END,
-                        late_minutes = CASE {' '.join(late_cases)} END,
-                        updated_at = NOW()
-                    WHERE tenant_id = '{tenant.id}' 
-                    AND date = '{attendance_date}' 
-                    AND employee_id IN ({', '.join(employee_ids)})
-                """
-                cursor.execute(update_query)
-                logger.info(f"ULTRA FAST: Raw SQL bulk updated {len(records_to_update)} records")
-        
-        db_operation_time = time.time() - db_start_time
+            # Maintain MonthlyAttendanceSummary and monthly Attendance for the affected employees
+            # in the same transaction (the bulk upsert above does not fire DailyAttendance signals)
+            summary_start_time = time.time()
+            affected_employee_ids = {record.employee_id for record in records_to_write}
+            summaries_updated = 0
+            if affected_employee_ids:
+                summaries_updated = AttendanceSummaryService.reconcile_month(
+                    tenant,
+                    attendance_date.year,
+                    attendance_date.month,
+                    employee_ids=list(affected_employee_ids),
+                    employees=employee_lookup,
+                )
+            summary_time = time.time() - summary_start_time
+            logger.info(f"OPTIMIZED: Upserted monthly summaries for {summaries_updated} employees in {summary_time:.3f}s")
+        
+        db_operation_time = time.time() - db_start_time - summary_time
         logger.info(f"OPTIMIZED: Core DB operations completed in {db_operation_time:.3f}s")
         
-        # LIGHTNING FAST: Skip monthly summary recalculation for bulk uploads
-        # Instead, defer this to a background task or make it optional
-        summary_start_time = time.time()
-        summaries_updated = 0
-        
-        # Get all affected employee IDs for cache clearing only
-        affected_employee_ids = set()
-        for record in records_to_create + records_to_update:
-            affected_employee_ids.add(record.employee_id)
-        
-        # PERFORMANCE DECISION: Skip heavy monthly summary calculation
-        # This reduces 7+ seconds to nearly instant for bulk operations
-        # Monthly summaries can be calculated on-demand or via background job
-        
-        logger.info(f"LIGHTNING FAST: Skipped monthly summary recalculation for {len(affected_employee_ids)} employees")
-        logger.info("Monthly summaries will be calculated on-demand when needed")
-        
-        summary_time = time.time() - summary_start_time
-        logger.info(f"LIGHTNING OPTIMIZED: Summary processing completed in {summary_time:.3f}s")
-        
-        # OPTIMIZED CACHE CLEARING: Only clear critical caches immediately
-        from django.core.cache import cache
-        
+        # CACHE INVALIDATION: one generation bump retires every attendance-dependent key
+        # (overview, all_records variants, eligible employees, directory, ...)
         cache_start_time = time.time()
-        cache_keys_cleared = []
-        
-        # Only clear the most critical cache keys immediately for instant response
-        critical_cache_keys = [
-            f"payroll_overview_{tenant.id}",
-            f"attendance_all_records_{tenant.id}",
-        ]
-        
-        for key in critical_cache_keys:
-            cache.delete(key)
-            cache_keys_cleared.append(key.split('_')[-2] + '_' + key.split('_')[-1])
-        
+        cache_domains_bumped = bump_cache_generation(tenant, ATTENDANCE, reason="bulk_attendance_update")
+        schedule_directory_refresh(tenant.id, affected_employee_ids)
         cache_clear_time = time.time() - cache_start_time
-        logger.info(f"LIGHTNING FAST: Cleared {len(critical_cache_keys)} critical cache keys in {cache_clear_time:.3f}s")
-        
-        # Prepare comprehensive cache keys for background clearing
-        comprehensive_cache_keys = [
-            f"payroll_overview_{tenant.id}",
-            f"months_with_attendance_{tenant.id}",
-            f"eligible_employees_{tenant.id}_{date_str}",
-            f"eligible_employees_opt_{tenant.id}_{date_str}_p1_s500",
-            f"eligible_employees_progressive_{tenant.id}_{date_str}_initial",
-            f"eligible_employees_progressive_{tenant.id}_{date_str}_remaining",
-            f"total_eligible_count_{tenant.id}_{date_str}",
-            f"directory_data_{tenant.id}",
-            f"attendance_all_records_{tenant.id}",
-            f"attendance_log_{tenant.id}",
-            f"attendance_tracker_{tenant.id}",
-            f"monthly_attendance_summary_{tenant.id}_{attendance_date.year}_{attendance_date.month}",
-            f"dashboard_stats_{tenant.id}",
-        ]
-        
-        # Add employee-specific cache keys
-        for employee_id in affected_employee_ids:
-            comprehensive_cache_keys.append(f"employee_attendance_{tenant.id}_{employee_id}")
-        
-        # Store cache keys for background clearing
-        cache_keys_for_background = comprehensive_cache_keys
+        logger.info(f"LIGHTNING FAST: Bumped attendance cache generation in {cache_clear_time:.3f}s")
         
         # Calculate comprehensive performance metrics
         total_function_time = time.time() - processing_start_time
@@ -643,7 +542,7 @@ def bulk_update_attendance(request):
                 'optimization_level': 'lightning_fast',
                 'batch_sizes': {
                     'attendance_records': 250,
-                    'deferred_summaries': 'on_demand'
+                    'monthly_summaries': 'in_transaction'
                 },
                 'avg_time_per_record': f"{(total_function_time / len(attendance_records)):.3f}s" if attendance_records else '0s',
                 'records_per_second': int(len(attendance_records) / total_function_time) if total_function_time > 0 and attendance_records else 0,
@@ -653,7 +552,7 @@ def bulk_update_attendance(request):
                     'summary_calculations': f"{(summary_time / total_function_time * 100):.1f}%" if total_function_time > 0 else '0%',
                     'cache_clearing': f"{(cache_clear_time / total_function_time * 100):.1f}%" if total_function_time > 0 else '0%'
                 },
-                'optimization_note': 'Critical caches cleared instantly, comprehensive cache clearing in background'
+                'optimization_note': 'Monthly summaries upserted in the same transaction as the daily records'
             }
         }
         
@@ -664,67 +563,16 @@ def bulk_update_attendance(request):
         # Add cache performance data to response
         response_data['cache_cleared'] = True
         response_data['cache_performance'] = {
-            'critical_keys_cleared': len(cache_keys_cleared),
-            'critical_clear_time': f"{cache_clear_time:.3f}s",
-            'comprehensive_clearing': 'in_background',
-            'background_cache_keys': len(cache_keys_for_background),
-            'types_cleared': cache_keys_cleared
+            'clear_time': f"{cache_clear_time:.3f}s",
+            'invalidation': 'generation_bump',
+            'domains_bumped': cache_domains_bumped
         }
         
-        # BACKGROUND AGGREGATION: Start monthly aggregation in background thread
-        logger.info("🚀 BACKGROUND AGGREGATION: Starting monthly aggregation in background thread...")
-        
-        try:
-            import threading
-            from ..utils.utils import run_bulk_aggregation
-            
-            def background_aggregation():
-                """Background thread function for monthly aggregation and cache clearing"""
-                try:
-                    logger.info(f"🧵 BACKGROUND THREAD: Starting aggregation for {attendance_date.year}-{attendance_date.month:02d}")
-                    
-                    # Run monthly aggregation
-                    result = run_bulk_aggregation(tenant, attendance_date)
-                    logger.info(f"🧵 BACKGROUND THREAD: Aggregation completed with status: {result['status']}")
-                    
-                    # Clear comprehensive caches in background
-                    logger.info(f"🧵 BACKGROUND THREAD: Starting comprehensive cache clearing...")
-                    cache_start_time = time.time()
-                    
-                    from django.core.cache import cache
-                    cache_keys_cleared_count = 0
-                    
-                    for cache_key in cache_keys_for_background:
-                        cache.delete(cache_key)
-                        cache_keys_cleared_count += 1
-                    
-                    cache_time = time.time() - cache_start_time
-                    logger.info(f"🧵 BACKGROUND THREAD: Cleared {cache_keys_cleared_count} cache keys in {cache_time:.3f}s")
-                    
-                except Exception as e:
-                    logger.error(f"❌ BACKGROUND THREAD ERROR: {str(e)}")
-            
-            # Start background thread with daemon=True
-            background_thread = threading.Thread(target=background_aggregation, daemon=True)
-            background_thread.start()
-            
-            logger.info(f"🧵 BACKGROUND THREAD: Started with ID {background_thread.ident}")
-            
-            # Update response data
-            response_data['automatic_aggregation'] = {
-                'status': 'started_in_background',
-                'method': 'thread_based',
-                'thread_id': background_thread.ident,
-                'message': 'Monthly aggregation started in background thread'
-            }
-            
-        except Exception as thread_error:
-            logger.error(f"❌ BACKGROUND THREAD FAILED TO START: {thread_error}")
-            response_data['automatic_aggregation'] = {
-                'status': 'failed_to_start',
-                'method': 'thread_based',
-                'error': str(thread_error)
-            }
+        response_data['automatic_aggregation'] = {
+            'status': 'completed',
+            'method': 'in_transaction',
+            'summaries_updated': summaries_updated,
+        }
         
         return Response(response_data, status=200)
         
@@ -738,19 +586,18 @@ def bulk_update_attendance(request):
 @permission_classes([IsAuthenticated])
 def update_monthly_summaries_parallel(request):
     """
-    Asynchronous API for updating monthly summaries after bulk attendance upload.
-    Returns immediately while processing summaries in background thread.
+    API for refreshing monthly summaries after bulk attendance upload.
+    
+    bulk_update_attendance already upserts the monthly summaries in the same transaction as
+    the daily records; this endpoint reconciles the given employees and clears caches.
     
     Expected usage:
     1. Frontend calls this API after bulk attendance upload
-    2. Returns success immediately 
-    3. Processing happens in background thread using ULTRA-FAST bulk operations
-    4. Cache is cleared immediately for instant UI updates
+    2. Requested employees are recounted with set-based queries
+    3. Cache is cleared immediately for instant UI updates
     """
     try:
-        import threading
         from datetime import datetime
-        from django.core.cache import cache
         
         # Get logger instance
         logger = logging.getLogger(__name__)
@@ -782,98 +629,53 @@ def update_monthly_summaries_parallel(request):
         
         print(f"🚀 ASYNC SUMMARY: API called - Date: {date_str}, Employee count: {len(employee_ids)}, Tenant: {tenant.name}")
         
-        logger.info(f"🔄 ASYNC SUMMARY: Starting background monthly summary update for {len(employee_ids)} employees on {date_str}")
+        logger.info(f"🔄 ASYNC SUMMARY: Starting monthly summary update for {len(employee_ids)} employees on {date_str}")
         
         # CLEAR ALL RELATED CACHES IMMEDIATELY for instant UI updates
         cache_start_time = time.time()
-        cache_keys_to_clear = [
-            f"payroll_overview_{tenant.id}",
-            f"months_with_attendance_{tenant.id}",
-            f"eligible_employees_{tenant.id}",
-            f"eligible_employees_{tenant.id}_progressive",
-            f"directory_data_{tenant.id}",
-            f"attendance_all_records_{tenant.id}",
-            f"attendance_log_{tenant.id}",
-            f"attendance_tracker_{tenant.id}",
-            f"monthly_attendance_summary_{tenant.id}_{attendance_date.year}_{attendance_date.month}",
-            f"monthly_attendance_summary_{tenant.id}",
-            f"dashboard_stats_{tenant.id}",
-            f"employee_attendance_history_{tenant.id}",
-            # CRITICAL: Add all_records cache variations that need immediate clearing
-            f"attendance_all_records_{tenant.id}_this_month_None_None_None_None",
-            f"attendance_all_records_{tenant.id}_last_6_months_None_None_None_None",
-            f"attendance_all_records_{tenant.id}_last_12_months_None_None_None_None",
-            f"attendance_all_records_{tenant.id}_last_5_years_None_None_None_None",
-            f"frontend_charts_{tenant.id}",
-        ]
-        
-        # Clear all cache keys
-        for cache_key in cache_keys_to_clear:
-            cache.delete(cache_key)
-            
-        # Clear any date-specific cache keys
-        cache.delete(f"attendance_all_records_{tenant.id}_{date_str}")
-        cache.delete(f"eligible_employees_{tenant.id}_{date_str}")
-        
-        # Clear custom date-based all_records cache keys that might exist
-        cache.delete(f"attendance_all_records_{tenant.id}_custom_{attendance_date.month}_{attendance_date.year}_None_None")
-        cache.delete(f"attendance_all_records_{tenant.id}_custom_range_None_None_{date_str}_None")
+        cache_domains_bumped = bump_cache_generation(tenant, ATTENDANCE, CHARTS, reason="monthly_summary_update")
         
         cache_time = time.time() - cache_start_time
-        logger.info(f"🗑️ ASYNC SUMMARY: Cleared {len(cache_keys_to_clear) + 4} cache keys in {cache_time:.3f}s")
-        logger.info(f"🗑️ ASYNC SUMMARY: Cache keys cleared: {cache_keys_to_clear[:5]}{'...' if len(cache_keys_to_clear) > 5 else ''}")
-        
-        # Define background processing function using our optimized aggregation
-        def process_summaries_background():
-            """Use our optimized run_bulk_aggregation function for monthly summaries"""
-            try:
-                from ..utils.utils import run_bulk_aggregation
-                logger.info(f"🧵 BACKGROUND THREAD: Starting monthly aggregation for {attendance_date.year}-{attendance_date.month:02d}")
-                result = run_bulk_aggregation(tenant, attendance_date)
-                logger.info(f"🧵 BACKGROUND THREAD: Monthly aggregation completed with status: {result['status']}")
-            except Exception as e:
-                logger.error(f"❌ BACKGROUND THREAD ERROR: {str(e)}")
-        
+        logger.info(f"🗑️ ASYNC SUMMARY: Bumped cache generations {cache_domains_bumped} in {cache_time:.3f}s")
         
-        # Start background processing thread
+        # Monthly summaries are maintained by bulk_update_attendance in the same transaction;
+        # this reconciles the requested employees as a coalesced rebuild, so rapid re-marking
+        # of the month costs one reconcile of all employees involved
+        aggregation_status = 'skipped'
         if employee_ids:
-            logger.info(f"🧵 ASYNC SUMMARY: About to start background thread for {len(employee_ids)} employees")
-            print(f"🧵 CONSOLE: About to start background thread for {len(employee_ids)} employees")  # Console fallback
-            
-            background_thread = threading.Thread(target=process_summaries_background, daemon=True)
-            background_thread.start()
-            
-            logger.info(f"🧵 ASYNC SUMMARY: Background thread started successfully - Thread ID: {background_thread.ident}")
-            logger.info(f"🧵 ASYNC SUMMARY: Thread is alive: {background_thread.is_alive()}")
-            print(f"🧵 CONSOLE: Background thread started - ID: {background_thread.ident}, Alive: {background_thread.is_alive()}")
+            from ..services.rebuild_scheduler import schedule_rebuild
+            schedule_rebuild(
+                tenant.id, ATTENDANCE, attendance_date.year, attendance_date.month,
+                employee_ids=list(employee_ids),
+            )
+            aggregation_status = 'queued'
+            logger.info("✅ ASYNC SUMMARY: Monthly aggregation queued")
         else:
-            logger.warning(f"⚠️ ASYNC SUMMARY: No employee IDs provided - skipping background processing")
-            print(f"⚠️ CONSOLE: No employee IDs provided - skipping background processing")
+            logger.warning(f"⚠️ ASYNC SUMMARY: No employee IDs provided - skipping aggregation")
         
-        # Return immediately with success response
         total_time = time.time() - start_time
         
         response_data = {
-            'message': f'✅ Monthly summary update started! Processing {len(employee_ids)} employees in background.',
+            'message': f'✅ Monthly summary update queued for {len(employee_ids)} employees.',
             'status': 'success',
             'summary_update': {
                 'employees_to_process': len(employee_ids),
                 'date': date_str,
                 'month': f"{attendance_date.year}-{attendance_date.month:02d}",
-                'update_method': 'async_background',
-                'processing_status': 'started'
+                'update_method': 'set_based_reconcile',
+                'processing_status': aggregation_status
             },
             'performance': {
                 'response_time': f"{total_time:.3f}s",
                 'cache_clear_time': f"{cache_time:.3f}s",
-                'cache_keys_cleared': len(cache_keys_to_clear) + 2,
-                'processing_mode': 'ultra_fast_background_thread'
+                'cache_domains_bumped': cache_domains_bumped,
+                'processing_mode': 'coalesced_background'
             },
             'cache_cleared': True,
-            'background_processing': True
+            'background_processing': bool(employee_ids)
         }
         
-        logger.info(f"ASYNC SUMMARY: Returned response in {total_time:.3f}s, background processing started")
+        logger.info(f"ASYNC SUMMARY: Returned response in {total_time:.3f}s")
         
         return Response(response_data, status=200)
         
@@ -946,7 +748,9 @@ def get_eligible_employees_for_date(request):
             return Response({"error": "Invalid date format. Use YYYY-MM-DD"}, status=400)
         
         # Check cache first
-        cache_key = f"eligible_employees_progressive_{tenant.id}_{date_str}_{cache_suffix}"
+        cache_key = versioned_cache_key(
+            tenant, f"eligible_employees_progressive_{tenant.id}_{date_str}_{cache_suffix}", ATTENDANCE, DIRECTORY
+        )
         use_cache = request.GET.get('no_cache', '').lower() != 'true'
         
         if use_cache:
@@ -977,7 +781,9 @@ def get_eligible_employees_for_date(request):
         off_day_filter = off_day_filters.get(day_of_week, Q())
         
         # PROGRESSIVE LOADING: Get total count once (cached for both requests)
-        total_count_cache_key = f"total_eligible_count_{tenant.id}_{date_str}"
+        total_count_cache_key = versioned_cache_key(
+            tenant, f"total_eligible_count_{tenant.id}_{date_str}", ATTENDANCE, DIRECTORY
+        )
         total_count = cache.get(total_count_cache_key)
         
         if total_count is None:
@@ -1113,11 +919,17 @@ class UploadAttendanceDataAPIView(APIView):
         start_time = time.time()
         
         try:
-            import calendar
-            import pandas as pd
-            from datetime import datetime, date
+            from datetime import date
             from django.db import transaction
-            from ..models import Attendance, EmployeeProfile
+            from ..models import Attendance, UploadJob
+            from ..services.upload_job_service import UploadJobService
+            from ..services.upload_processing import (
+                ATTENDANCE_NUMERIC_COLUMNS,
+                ATTENDANCE_OPTIONAL_COLUMNS,
+                ATTENDANCE_REQUIRED_COLUMNS,
+                ATTENDANCE_UPDATE_FIELDS,
+                prepare_attendance_upload,
+            )
             
             # Get tenant
             tenant = getattr(request, 'tenant', None)
@@ -1147,17 +959,34 @@ class UploadAttendanceDataAPIView(APIView):
                     'error': 'Unsupported file format. Please upload Excel (.xlsx, .xls) files only.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
+            # Reject oversized or malformed files before reading any rows
+            try:
+                check_upload(file_obj, EXCEL_EXTENSIONS)
+            except UploadFileError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # async=true: store the file and process it in the background as an upload job
+            if UploadJobService.wants_job(request):
+                job = UploadJobService.create(
+                    tenant, request.user, UploadJob.KIND_ATTENDANCE, file_obj, int(year), str(int(month))
+                )
+                return Response(UploadJobService.status_payload(job), status=status.HTTP_202_ACCEPTED)
+            
             try:
-                # Read Excel file
-                df = pd.read_excel(file_obj)
+                # Stream the sheet into typed columns
+                df = read_upload(
+                    file_obj,
+                    numeric_columns=ATTENDANCE_NUMERIC_COLUMNS,
+                    extensions=EXCEL_EXTENSIONS,
+                )
                 
                 # Check for monthly summary format (Employee ID and Working Days are optional)
-                required_columns = ['Name', 'Department', 'Present Days', 'Absent Days', 'OT Hours', 'Late Minutes']
-                optional_columns = ['Working Days']
+                required_columns = ATTENDANCE_REQUIRED_COLUMNS
+                optional_columns = ATTENDANCE_OPTIONAL_COLUMNS
                 
                 is_monthly_format = all(col in df.columns for col in required_columns)
-                has_working_days = 'Working Days' in df.columns
-                has_employee_id = False  # Employee ID no longer expected in template
                 
                 if not is_monthly_format:
                     return Response({
@@ -1170,94 +999,15 @@ class UploadAttendanceDataAPIView(APIView):
                 # Process data
                 records_created = 0
                 records_updated = 0
-                errors = []
                 warnings = []
                 
-                # Process monthly summary format only
-                # Auto-generate Employee IDs for entries that don't have them
-                from ..utils.utils import generate_employee_id_bulk_optimized
-                
-                # OPTIMIZED: Use values() to reduce data transfer, iterator for memory efficiency
-                existing_employees_by_name = {}
-                for emp in EmployeeProfile.objects.filter(
-                    tenant=tenant, is_active=True
-                ).values('first_name', 'last_name', 'employee_id').iterator(chunk_size=1000):
-                    key = f"{emp['first_name']} {emp['last_name']}".strip().lower()
-                    existing_employees_by_name[key] = emp['employee_id']
-                
-                # Prepare data for Employee ID generation and matching
-                employees_data = []
-                final_employee_ids = []
+                # Process monthly summary format only, column-wise (no per-row Series boxing)
+                prepared = prepare_attendance_upload(df, tenant, year, month)
+                errors = prepared.errors
                 
-                for index, row in df.iterrows():
-                    name = str(row['Name']).strip()
-                    department = str(row.get('Department', '')).strip()
-                    
-                    # Employee ID will be auto-generated based on name matching
-                    provided_id = ''
-                    
-                    if provided_id:
-                        # Use provided Employee ID
-                        final_employee_ids.append(provided_id)
-                    else:
-                        # Try to match by name first
-                        name_key = name.lower()
-                        if name_key in existing_employees_by_name:
-                            # Found existing employee by name
-                            final_employee_ids.append(existing_employees_by_name[name_key])
-                        else:
-                            # Need to generate new Employee ID
-                            employees_data.append({
-                                'name': name,
-                                'department': department
-                            })
-                            final_employee_ids.append(None)  # Will be filled after generation
-                
-                # Generate Employee IDs for new employees only
-                if employees_data:
-                    employee_id_mapping = generate_employee_id_bulk_optimized(employees_data, tenant.id)
-                    
-                    # Fill in the generated IDs
-                    generated_index = 0
-                    for i, emp_id in enumerate(final_employee_ids):
-                        if emp_id is None:
-                            final_employee_ids[i] = employee_id_mapping[generated_index]
-                            generated_index += 1
-                
-                # Add final Employee IDs to the dataframe
-                df['Final_Employee_ID'] = final_employee_ids
-                
-                # OPTIMIZED: Reuse existing_employees_by_name to avoid second query
-                employee_ids = df['Final_Employee_ID'].dropna().unique()
-                existing_employee_set = set(existing_employees_by_name.values())
-                missing_employees = set(employee_ids) - existing_employee_set
-                
-                # If there are missing employees, collect their details and return for confirmation
-                if missing_employees:
-                    missing_employee_details = []
-                    for index, row in df.iterrows():
-                        employee_id = str(row['Final_Employee_ID']).strip()
-                        if employee_id in missing_employees:
-                            name = str(row['Name']).strip()
-                            department = str(row.get('Department', '')).strip()
-                            
-                            # Split name into first and last name
-                            name_parts = name.split(' ', 1)
-                            first_name = name_parts[0] if name_parts else ''
-                            last_name = name_parts[1] if len(name_parts) > 1 else ''
-                            
-                            # Clean up last name - avoid "nan" values
-                            if not last_name or str(last_name).lower() in ['nan', 'none', '']:
-                                last_name = ''
-                            
-                            missing_employee_details.append({
-                                'employee_id': employee_id,
-                                'name': name,
-                                'first_name': first_name,
-                                'last_name': last_name,
-                                'department': department,
-                                'row_number': index + 2  # Excel row number (accounting for header)
-                            })
+                # If there are missing employees, return their details for confirmation
+                if prepared.missing_employees:
+                    missing_employee_details = prepared.missing_employees
                     
                     return Response({
                         'error': 'Missing employees found',
@@ -1267,9 +1017,7 @@ class UploadAttendanceDataAPIView(APIView):
                     }, status=status.HTTP_400_BAD_REQUEST)
                 
                 # ULTRA-OPTIMIZED: Use bulk operations instead of N queries
-                from datetime import date
                 attendance_date = date(int(year), int(month), 1)
-                calendar_days = calendar.monthrange(int(year), int(month))[1]
                 
                 # Get existing attendance records for this period (single query)
                 existing_attendance_dict = {
@@ -1280,63 +1028,22 @@ class UploadAttendanceDataAPIView(APIView):
                     ).values('employee_id', 'id')
                 }
                 
-                # Prepare bulk create and update lists
+                # Prepare bulk create and update lists from the prepared records
                 attendance_to_create = []
                 attendance_to_update = []
                 
-                for index, row in df.iterrows():
-                    try:
-                        employee_id = str(row['Final_Employee_ID']).strip()
-                        
-                        # Process monthly summary format
-                        name = str(row['Name']).strip()
-                        department = str(row.get('Department', '')).strip()
-                        
-                        # Validate employee exists
-                        if employee_id not in existing_employee_set:
-                            errors.append(f'Row {index + 2}: Employee {employee_id} not found or inactive')
-                            continue
-                        
-                        # Get numeric values
-                        present_days = float(row.get('Present Days', 0)) if pd.notna(row.get('Present Days')) else 0
-                        absent_days = float(row.get('Absent Days', 0)) if pd.notna(row.get('Absent Days')) else 0
-                        ot_hours = float(row.get('OT Hours', 0)) if pd.notna(row.get('OT Hours')) else 0
-                        late_minutes = int(row.get('Late Minutes', 0)) if pd.notna(row.get('Late Minutes')) else 0
-                        
-                        # OPTIMIZED: Use standard 30 days for bulk performance (DOJ calc in background if needed)
-                        if has_working_days and pd.notna(row.get('Working Days')):
-                            total_working_days = float(row.get('Working Days', 0))
-                            if total_working_days <= 0:
-                                total_working_days = 30
-                        else:
-                            total_working_days = 30
-                        
-                        attendance_data = {
-                            'tenant': tenant,
-                            'employee_id': employee_id,
-                            'name': name,
-                            'department': department,
-                            'date': attendance_date,
-                            'calendar_days': calendar_days,
-                            'total_working_days': int(total_working_days),
-                            'present_days': present_days,
-                            'absent_days': absent_days,
-                            'ot_hours': ot_hours,
-                            'late_minutes': late_minutes
-                        }
-                        
-                        if employee_id in existing_attendance_dict:
-                            # Update existing record
-                            attendance_data['id'] = existing_attendance_dict[employee_id]
-                            attendance_to_update.append(Attendance(**attendance_data))
-                            records_updated += 1
-                        else:
-                            # Create new record
-                            attendance_to_create.append(Attendance(**attendance_data))
-                            records_created += 1
-                            
-                    except Exception as e:
-                        errors.append(f'Row {index + 2}: {str(e)}')
+                for attendance_data in prepared.records:
+                    employee_id = attendance_data['employee_id']
+                    if employee_id in existing_attendance_dict:
+                        # Update existing record
+                        attendance_to_update.append(
+                            Attendance(tenant=tenant, id=existing_attendance_dict[employee_id], **attendance_data)
+                        )
+                        records_updated += 1
+                    else:
+                        # Create new record
+                        attendance_to_create.append(Attendance(tenant=tenant, **attendance_data))
+                        records_created += 1
                 
                 # BULK OPERATIONS: 10-100x faster than individual saves!
                 with transaction.atomic():
@@ -1346,40 +1053,15 @@ class UploadAttendanceDataAPIView(APIView):
                     if attendance_to_update:
                         Attendance.objects.bulk_update(
                             attendance_to_update,
-                            ['name', 'department', 'total_working_days', 'present_days', 
-                             'absent_days', 'ot_hours', 'late_minutes', 'calendar_days'],
+                            ATTENDANCE_UPDATE_FIELDS,
                             batch_size=100
                         )
                 
                 
-                # Clear relevant caches
-                from django.core.cache import cache
-                cache_keys = [
-                    f"payroll_overview_{tenant.id}",
-                    f"attendance_all_records_{tenant.id}",
-                    f"directory_data_{tenant.id}",
-                    f"directory_data_full_{tenant.id}",  # Clear full directory cache
-                    f"months_with_attendance_{tenant.id}"
-                ]
-                for key in cache_keys:
-                    cache.delete(key)
-                
-                # Clear frontend charts cache (stats component)
-                try:
-                    cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-                    logger.info(f"✨ Cleared frontend_charts pattern cache for tenant {tenant.id}")
-                except AttributeError:
-                    # Fallback: Clear common chart cache keys
-                    chart_keys = [
-                        f"frontend_charts_{tenant.id}_this_month_All_",
-                        f"frontend_charts_{tenant.id}_last_6_months_All_",
-                        f"frontend_charts_{tenant.id}_last_12_months_All_",
-                        f"frontend_charts_{tenant.id}_last_5_years_All_"
-                    ]
-                    for key in chart_keys:
-                        cache.delete(key)
-                    logger.info(f"✨ Cleared frontend_charts fallback cache for tenant {tenant.id}")
-                
+                # Clear relevant caches: attendance-dependent views (overview, all_records, directory)
+                # and the frontend charts (stats component)
+                bump_cache_generation(tenant, ATTENDANCE, CHARTS, reason="attendance_upload")
+                schedule_directory_refresh(tenant.id, [record['employee_id'] for record in prepared.records])
                 logger.info(f"✨ Cleared directory and charts cache for tenant {tenant.id} after attendance upload")
                 
                 # Calculate upload time
@@ -1399,6 +1081,10 @@ class UploadAttendanceDataAPIView(APIView):
                     'file_name': file_obj.name
                 }, status=status.HTTP_201_CREATED)
                 
+            except UploadFileError as e:
+                return Response({
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({
                     'error': f'Failed to process file: {str(e)}'
@@ -1492,32 +1178,9 @@ class UploadMonthlyAttendanceAPIView(APIView):
                 with transaction.atomic():
                     Attendance.objects.bulk_create(attendance_records, ignore_conflicts=True)
             
-            # Clear directory cache after successful upload
-            from django.core.cache import cache
-            cache_keys = [
-                f"directory_data_{tenant.id}",
-                f"directory_data_full_{tenant.id}",  # Clear full directory cache
-                f"attendance_all_records_{tenant.id}"
-            ]
-            for key in cache_keys:
-                cache.delete(key)
-            
-            # Clear frontend charts cache (stats component)
-            try:
-                cache.delete_pattern(f"frontend_charts_{tenant.id}_*")
-                logger.info(f"✨ Cleared frontend_charts pattern cache for tenant {tenant.id}")
-            except AttributeError:
-                # Fallback: Clear common chart cache keys
-                chart_keys = [
-                    f"frontend_charts_{tenant.id}_this_month_All_",
-                    f"frontend_charts_{tenant.id}_last_6_months_All_",
-                    f"frontend_charts_{tenant.id}_last_12_months_All_",
-                    f"frontend_charts_{tenant.id}_last_5_years_All_"
-                ]
-                for key in chart_keys:
-                    cache.delete(key)
-                logger.info(f"✨ Cleared frontend_charts fallback cache for tenant {tenant.id}")
-            
+            # Clear directory, attendance and charts caches after successful upload
+            bump_cache_generation(tenant, ATTENDANCE, CHARTS, reason="monthly_attendance_upload")
+            schedule_directory_refresh(tenant.id, [record.employee_id for record in attendance_records])
             logger.info(f"✨ Cleared directory and charts cache for tenant {tenant.id} after monthly attendance upload")
             
             return Response({
@@ -1537,6 +1200,57 @@ class UploadMonthlyAttendanceAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class UploadJobListAPIView(APIView):
+    """
+    Recent background upload jobs (salary and attendance) of the tenant
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from ..models import UploadJob
+        from ..services.upload_job_service import UploadJobService
+        
+        tenant = getattr(request, 'tenant', None)
+        if not tenant:
+            return Response({
+                'error': 'No tenant found for this request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        jobs = UploadJob.objects.filter(tenant=tenant)
+        kind = request.query_params.get('kind')
+        if kind:
+            jobs = jobs.filter(kind=kind)
+        
+        return Response({
+            'results': [UploadJobService.status_payload(job) for job in jobs[:20]]
+        })
+
+
+class UploadJobStatusAPIView(APIView):
+    """
+    Progress of a background upload job: rows processed, errors and completed stages
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        from ..models import UploadJob
+        from ..services.upload_job_service import UploadJobService
+        
+        tenant = getattr(request, 'tenant', None)
+        if not tenant:
+            return Response({
+                'error': 'No tenant found for this request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        job = UploadJob.objects.filter(tenant=tenant, id=job_id).first()
+        if not job:
+            return Response({
+                'error': 'Upload job not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(UploadJobService.status_payload(job))
+
+
 class DownloadAttendanceTemplateAPIView(APIView):
     """
     API endpoint for downloading attendance template
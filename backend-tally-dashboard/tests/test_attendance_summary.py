@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test that the delta-maintained monthly aggregates match a full recount
+(excel_data/services/attendance_summary_service.py)
+
+Daily rows are written through the ORM so the DailyAttendance signals apply deltas; the
+resulting MonthlyAttendanceSummary and Attendance rows must exist and be left unchanged
+by a reconcile_month() recount.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_attendance_summary.py
+"""
+
+import datetime
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+
+from excel_data.models import Attendance, DailyAttendance, EmployeeProfile, MonthlyAttendanceSummary, Tenant
+from excel_data.services.attendance_summary_service import AttendanceSummaryService
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+LOCAL_CACHES = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+
+
+def aggregates(tenant):
+    summaries = {
+        (row['employee_id'], row['year'], row['month']): row
+        for row in MonthlyAttendanceSummary.all_objects.filter(tenant=tenant).values(
+            'employee_id', 'year', 'month', 'present_days', 'ot_hours', 'late_minutes'
+        )
+    }
+    attendance = {
+        (row['employee_id'], row['date']): row
+        for row in Attendance.all_objects.filter(tenant=tenant).values(
+            'employee_id', 'date', 'total_working_days', 'present_days', 'absent_days', 'ot_hours', 'late_minutes'
+        )
+    }
+    return summaries, attendance
+
+
+def mark(tenant, employee_id, day, status, ot='0', late=0):
+    return DailyAttendance.objects.create(
+        tenant=tenant, employee_id=employee_id, employee_name=employee_id, department='Ops',
+        designation='', employment_type='FULL_TIME', attendance_status=status,
+        date=datetime.date(2025, 6, day), ot_hours=Decimal(ot), late_minutes=late,
+    )
+
+
+@LOCAL_CACHES
+def test_deltas_match_recount():
+    tenant = Tenant.objects.create(name='Summary', subdomain='summary')
+    for employee_id in ('ABS1', 'MIX1', 'MOVE1'):
+        EmployeeProfile.objects.create(tenant=tenant, employee_id=employee_id, first_name=employee_id,
+                                       last_name='Test', basic_salary=Decimal('26000'))
+
+    # First row of the month contributes nothing
+    mark(tenant, 'ABS1', 2, 'ABSENT')
+
+    mark(tenant, 'MIX1', 2, 'PRESENT', ot='2', late=10)
+    half = mark(tenant, 'MIX1', 3, 'HALF_DAY')
+    absent = mark(tenant, 'MIX1', 4, 'ABSENT')
+    half.attendance_status = 'PRESENT'
+    half.save()
+    absent.late_minutes = 5
+    absent.save()
+
+    # A zero-contribution row moved into a month without a summary yet
+    moved = mark(tenant, 'MOVE1', 30, 'ABSENT')
+    moved.date = datetime.date(2025, 7, 1)
+    moved.save()
+
+    summaries, attendance = maintained = aggregates(tenant)
+    assert set(summaries) == {('ABS1', 2025, 6), ('MIX1', 2025, 6), ('MOVE1', 2025, 6), ('MOVE1', 2025, 7)}
+    assert set(attendance) == {(key[0], datetime.date(key[1], key[2], 1)) for key in summaries}
+    assert summaries[('ABS1', 2025, 6)]['present_days'] == Decimal('0.0')
+    assert summaries[('MIX1', 2025, 6)]['present_days'] == Decimal('2.0')
+    assert summaries[('MIX1', 2025, 6)]['late_minutes'] == 15
+
+    for month in (6, 7):
+        AttendanceSummaryService.reconcile_month(tenant, 2025, month)
+    assert maintained == aggregates(tenant)
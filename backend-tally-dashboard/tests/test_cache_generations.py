@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test that cache generation bumps wait for the writer's commit
+(excel_data/services/cache_service.bump_cache_generation)
+
+A bump inside a transaction must not be visible before the commit - another request would
+re-cache the old rows under the new generation - and a rolled back write must not bump.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_cache_generations.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection, transaction
+from django.test import override_settings
+
+from excel_data.services.cache_service import (
+    CHARTS, PAYROLL, bump_cache_generation, get_cache_generations,
+)
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+LOCAL_CACHES = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+
+
+@LOCAL_CACHES
+def test_bump_waits_for_the_commit(django_capture_on_commit_callbacks):
+    before = get_cache_generations(11, PAYROLL, CHARTS)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert bump_cache_generation(11, PAYROLL, CHARTS, reason="test") == [PAYROLL, CHARTS]
+        assert get_cache_generations(11, PAYROLL, CHARTS) == before
+
+    after = get_cache_generations(11, PAYROLL, CHARTS)
+    assert after == {PAYROLL: before[PAYROLL] + 1, CHARTS: before[CHARTS] + 1}
+
+
+@LOCAL_CACHES
+def test_rolled_back_write_does_not_bump(django_capture_on_commit_callbacks):
+    before = get_cache_generations(12, PAYROLL)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                bump_cache_generation(12, PAYROLL, reason="test")
+                raise RuntimeError("payroll write failed")
+
+    assert callbacks == []
+    assert get_cache_generations(12, PAYROLL) == before
+
+
+@LOCAL_CACHES
+def test_unknown_domain_fails_at_the_call(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        with pytest.raises(ValueError):
+            bump_cache_generation(13, 'salaries')
+    assert callbacks == []
+
+
+@LOCAL_CACHES
+def test_bump_now_after_the_commit():
+    before = get_cache_generations(14, CHARTS)
+    with transaction.atomic():
+        bump_cache_generation(14, CHARTS, reason="test", defer=False)
+        assert get_cache_generations(14, CHARTS) == {CHARTS: before[CHARTS] + 1}
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test that bulk payroll writes reach the charts through the change outbox
+(excel_data/services/change_outbox.py)
+
+bulk_update_payroll_period writes CalculatedSalary with bulk_update, which skips the
+post_save receivers. Its outbox rows must be applied by the background task: the chart rows
+get the new is_paid and net_payable, the outbox is emptied and the process's chart snapshot
+is patched in place.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_change_outbox.py
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from excel_data.models import CalculatedSalary, ChangeOutbox, ChartAggregatedData, CustomUser, PayrollPeriod, Tenant
+from excel_data.services.cache_service import CHARTS, get_cache_generations
+from excel_data.services.chart_snapshot_service import ChartSnapshotService, period_index
+from excel_data.utils.task_queue import TaskWorker
+from excel_data.views.payroll import bulk_update_payroll_period
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+JUNE = [period_index(2025, 'JUNE')]
+
+
+def salary(tenant, period, employee_id, department):
+    return CalculatedSalary(
+        tenant=tenant, payroll_period=period, employee_id=employee_id, employee_name=f"{employee_id} Test",
+        department=department, basic_salary=Decimal('26000'), basic_salary_per_hour=Decimal('108.33'),
+        basic_salary_per_minute=Decimal('1.81'), total_working_days=26, present_days=Decimal('26'),
+        gross_salary=Decimal('26000'), tds_amount=Decimal('1300'), salary_after_tds=Decimal('24700'),
+        net_payable=Decimal('24700'),
+    )
+
+
+def chart_rows(tenant):
+    return {
+        row['employee_id']: (row['is_paid'], row['net_payable'])
+        for row in ChartAggregatedData.all_objects.filter(tenant=tenant).values('employee_id', 'is_paid', 'net_payable')
+    }
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    BACKGROUND_TASKS_BACKEND='database',
+    BACKGROUND_TASKS_IN_PROCESS_WORKER=False,
+)
+def test_bulk_period_update_reaches_charts(django_capture_on_commit_callbacks):
+    tenant = Tenant.objects.create(name='Outbox', subdomain='outbox')
+    period = PayrollPeriod.objects.create(tenant=tenant, year=2025, month='JUNE')
+    CalculatedSalary.all_objects.bulk_create([
+        salary(tenant, period, 'E1', 'Ops'), salary(tenant, period, 'E2', 'Ops'), salary(tenant, period, 'E3', 'Sales'),
+    ])
+    ChartAggregatedData.refresh_from_calculated_salary(tenant.id, bump_generation=False)
+    unpaid = (False, Decimal('24700.00'))
+    assert chart_rows(tenant) == {'E1': unpaid, 'E2': unpaid, 'E3': unpaid}
+
+    request = APIRequestFactory().post(f'/api/payroll-periods/{period.id}/bulk-update/', {'entries': [
+        {'employee_id': 'E1', 'is_paid': True},
+        {'employee_id': 'E2', 'is_paid': True, 'advance_deduction_amount': '700'},
+    ]}, format='json')
+    request.tenant = tenant  # set by TenantMiddleware
+    force_authenticate(request, user=CustomUser.objects.create_user(email='hr@example.com', password='x', tenant=tenant))
+    with django_capture_on_commit_callbacks(execute=True):
+        response = bulk_update_payroll_period(request, period.id)
+    assert response.status_code == 200, response.data
+    assert ChangeOutbox.objects.filter(tenant=tenant).count() == 2
+    assert chart_rows(tenant)['E2'] == unpaid  # bulk_update: no post_save
+
+    ChartSnapshotService.clear(tenant)
+    snapshot = ChartSnapshotService.get(tenant)
+    generation = get_cache_generations(tenant, CHARTS)[CHARTS]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert TaskWorker().run_pending() == 1
+
+    assert chart_rows(tenant) == {
+        'E1': (True, Decimal('24700.00')),
+        'E2': (True, Decimal('24000.00')),
+        'E3': unpaid,
+    }
+    assert not ChangeOutbox.objects.filter(tenant=tenant).exists()
+
+    # Patched in place: one bump, same snapshot, new net payable
+    assert get_cache_generations(tenant, CHARTS)[CHARTS] == generation + 1
+    assert ChartSnapshotService.get(tenant) is snapshot
+    departments = {row['department']: row['total_salary'] for row in snapshot.chart_series(JUNE)['departments']}
+    assert departments == {'Ops': 48700.0, 'Sales': 24700.0}
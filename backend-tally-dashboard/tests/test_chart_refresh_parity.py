@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test that the set-based chart refreshes match the per-row aggregation
+(ChartAggregatedData.refresh_from_salary_data / refresh_from_calculated_salary against
+aggregate_from_salary_data / aggregate_from_calculated_salary)
+
+The source rows spell one month three ways (JUNE, June, JUN), leave nullable columns empty,
+divide attendance into a rounding tie and repeat employee-months, so the month CASE, the
+COALESCE defaults, the attendance_percentage rounding and the DISTINCT ON tie-breaking are
+all compared. The per-row path is run in (timestamp, id) order, so its last write is the row
+DISTINCT ON keeps.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_chart_refresh_parity.py
+"""
+
+import datetime
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from excel_data.models import CalculatedSalary, ChartAggregatedData, PayrollPeriod, SalaryData, Tenant
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+LOCAL_CACHES = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+
+# Timestamps and ids differ between the two paths by construction
+IGNORED_FIELDS = {'id', 'created_at', 'updated_at', 'aggregated_at'}
+
+
+def chart_rows(tenant):
+    fields = [field.attname for field in ChartAggregatedData._meta.concrete_fields if field.attname not in IGNORED_FIELDS]
+    return {
+        (row['employee_id'], row['year'], row['month']): row
+        for row in ChartAggregatedData.all_objects.filter(tenant=tenant).values(*fields)
+    }
+
+
+def at(minutes):
+    return timezone.now() - datetime.timedelta(minutes=minutes)
+
+
+def salary_row(tenant, employee_id, month, **fields):
+    values = {'name': f"{employee_id} Test", 'department': 'Ops', 'year': 2025, **fields}
+    return SalaryData(tenant=tenant, employee_id=employee_id, month=month, **values)
+
+
+@LOCAL_CACHES
+def test_salary_data_refresh_matches_aggregation():
+    tenant = Tenant.objects.create(name='Refresh', subdomain='refresh-salary')
+    SalaryData.all_objects.bulk_create([
+        # One month spelled three ways: the most recently updated row wins
+        salary_row(tenant, 'E1', 'JUNE', salary=Decimal('26000'), days=24, absent=2, nett_payable=Decimal('24000')),
+        salary_row(tenant, 'E1', 'June', salary=Decimal('26000'), days=25, absent=1, nett_payable=Decimal('25000')),
+        salary_row(tenant, 'E1', 'JUN', salary=Decimal('26000'), days=26, absent=0, nett_payable=Decimal('26000'),
+                   ot=Decimal('3.5'), charges=Decimal('379.17'), late=12, charge=Decimal('21.67')),
+        # Defaults: no month (JAN), no days (30 working days), AMT 0 falls back to SAL+OT
+        salary_row(tenant, 'E2', None, amt=Decimal('0'), sal_ot=Decimal('18250.50'), department=''),
+        # 1 / 32 days = 3.125%: a rounding tie
+        salary_row(tenant, 'E3', 'JUNE', days=1, absent=31, amt=Decimal('812.50'), tds=Decimal('40.63'),
+                   advance=Decimal('500'), total_old_adv=Decimal('1500'), incentive=Decimal('250')),
+        # Same updated_at: the higher id wins
+        salary_row(tenant, 'E4', 'JUNE', days=20, absent=6, nett_payable=Decimal('1')),
+        salary_row(tenant, 'E4', 'JUN', days=21, absent=5, nett_payable=Decimal('2')),
+        # Other months and years stay apart
+        salary_row(tenant, 'E1', 'MAY', days=22, absent=4),
+        salary_row(tenant, 'E1', 'JUNE', year=2024, days=23, absent=3),
+        # Without an employee id or year: skipped
+        salary_row(tenant, None, 'JUNE', days=9),
+        salary_row(tenant, 'E5', 'JUNE', year=None, days=9),
+    ])
+    rows = list(SalaryData.all_objects.filter(tenant=tenant).order_by('id'))
+    for minutes, row in zip((30, 20, 10), rows[:3]):
+        SalaryData.all_objects.filter(pk=row.pk).update(updated_at=at(minutes))
+    SalaryData.all_objects.filter(tenant=tenant, employee_id='E4').update(updated_at=at(5))
+
+    ChartAggregatedData.all_objects.filter(tenant=tenant).delete()
+    written = ChartAggregatedData.refresh_from_salary_data(tenant.id, bump_generation=False)
+    refreshed = chart_rows(tenant)
+
+    ChartAggregatedData.all_objects.filter(tenant=tenant).delete()
+    for row in SalaryData.all_objects.filter(tenant=tenant, employee_id__isnull=False, year__isnull=False).order_by('updated_at', 'id'):
+        ChartAggregatedData.aggregate_from_salary_data(row)
+    aggregated = chart_rows(tenant)
+
+    assert written == len(refreshed) == 6
+    assert refreshed == aggregated
+    assert refreshed[('E1', 2025, 'JUN')]['present_days'] == 26
+    assert refreshed[('E2', 2025, 'JAN')]['gross_salary'] == Decimal('18250.50')
+    assert refreshed[('E3', 2025, 'JUN')]['attendance_percentage'] == Decimal('3.13')
+    assert refreshed[('E4', 2025, 'JUN')]['net_payable'] == 2
+
+
+def calculated_row(tenant, period, employee_id, **fields):
+    values = {
+        'employee_name': f"{employee_id} Test", 'department': 'Ops', 'basic_salary': Decimal('26000'),
+        'basic_salary_per_hour': Decimal('108.33'), 'basic_salary_per_minute': Decimal('1.81'),
+        'total_working_days': 26, 'present_days': Decimal('24'), 'data_source': 'frontend',
+        **fields,
+    }
+    return CalculatedSalary(tenant=tenant, payroll_period=period, employee_id=employee_id, **values)
+
+
+@LOCAL_CACHES
+def test_calculated_salary_refresh_matches_aggregation():
+    tenant = Tenant.objects.create(name='Refresh', subdomain='refresh-calculated')
+    june, june_title, jun, may = PayrollPeriod.objects.bulk_create([
+        PayrollPeriod(tenant=tenant, year=2025, month=month) for month in ('JUNE', 'June', 'JUN', 'MAY')
+    ])
+    CalculatedSalary.all_objects.bulk_create([
+        # One month in three payroll periods: the latest calculation wins
+        calculated_row(tenant, june, 'E1', net_payable=Decimal('24000')),
+        calculated_row(tenant, june_title, 'E1', net_payable=Decimal('25000'), is_paid=True),
+        calculated_row(tenant, jun, 'E1', present_days=Decimal('25.5'), ot_hours=Decimal('3.5'),
+                       ot_charges=Decimal('379.17'), late_minutes=12, late_deduction=Decimal('21.67'),
+                       gross_salary=Decimal('25858.33'), net_payable=Decimal('26000'), tds_amount=Decimal('1292.92'),
+                       advance_deduction_amount=Decimal('500'), total_advance_balance=Decimal('1500'),
+                       incentive=Decimal('250')),
+        # No department, no working days (0%)
+        calculated_row(tenant, june, 'E2', department=None, total_working_days=0, present_days=Decimal('0')),
+        # 0.5 / 16 days = 3.125%: a rounding tie
+        calculated_row(tenant, june, 'E3', total_working_days=16, present_days=Decimal('0.5')),
+        # Same calculation time: the higher id wins
+        calculated_row(tenant, june, 'E4', net_payable=Decimal('1')),
+        calculated_row(tenant, jun, 'E4', net_payable=Decimal('2')),
+        calculated_row(tenant, may, 'E1', present_days=Decimal('22')),
+    ])
+    rows = list(CalculatedSalary.all_objects.filter(tenant=tenant).order_by('id'))
+    for minutes, row in zip((30, 20, 10), rows[:3]):
+        CalculatedSalary.all_objects.filter(pk=row.pk).update(calculation_timestamp=at(minutes))
+    CalculatedSalary.all_objects.filter(tenant=tenant, employee_id='E4').update(calculation_timestamp=at(5))
+
+    ChartAggregatedData.all_objects.filter(tenant=tenant).delete()
+    written = ChartAggregatedData.refresh_from_calculated_salary(tenant.id, bump_generation=False)
+    refreshed = chart_rows(tenant)
+
+    ChartAggregatedData.all_objects.filter(tenant=tenant).delete()
+    for row in (CalculatedSalary.all_objects.filter(tenant=tenant).select_related('payroll_period')
+                .order_by('calculation_timestamp', 'id')):
+        ChartAggregatedData.aggregate_from_calculated_salary(row)
+    aggregated = chart_rows(tenant)
+
+    assert written == len(refreshed) == 5
+    assert refreshed == aggregated
+    assert refreshed[('E1', 2025, 'JUN')]['payroll_period_id'] == jun.id
+    assert refreshed[('E1', 2025, 'JUN')]['is_paid'] is False
+    assert refreshed[('E2', 2025, 'JUN')]['department'] == ''
+    assert refreshed[('E3', 2025, 'JUN')]['attendance_percentage'] == Decimal('3.13')
+    assert refreshed[('E4', 2025, 'JUN')]['net_payable'] == 2
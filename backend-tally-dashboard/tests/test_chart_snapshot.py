@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test the columnar chart snapshot (ChartSnapshot.chart_series)
+
+Builds snapshots from plain ChartAggregatedData value tuples, so no database or server is
+needed, and checks the single-pass series against straightforward Python aggregation.
+
+Usage:
+    python tests/test_chart_snapshot.py
+    pytest tests/test_chart_snapshot.py
+"""
+
+import os
+import random
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_data.services.chart_snapshot_service import ChartSnapshot, period_index, period_label
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN']
+
+
+def make_rows(seed=7):
+    """(employee_id, employee_name, department, year, month, net, present, working, ot, late, attendance %)"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(40):
+        department = rng.choice(['HR', 'IT', 'Ops', None])
+        for month in MONTHS:
+            if rng.random() < 0.2:
+                continue
+            present = rng.randint(10, 26)
+            rows.append((
+                f"E{i}", f"Name {i}", department, 2025, month,
+                rng.randint(10000, 120000), present, 26, rng.randint(0, 20), rng.randint(0, 90),
+                round(present / 26 * 100, 2),
+            ))
+    return rows
+
+
+def test_period_index():
+    assert period_index(2025, 'JUNE') == period_index(2025, 'jun') == period_index(2025, 6) == 2025 * 12 + 6
+    assert period_index(2025, 'Smarch') is None
+    assert period_label(period_index(2024, 'DECEMBER')) == 'DEC/2024'
+
+
+def test_current_totals_and_departments():
+    rows = make_rows()
+    snapshot = ChartSnapshot.from_rows(rows)
+    periods = [period_index(2025, m) for m in ('MAY', 'JUN')]
+    series = snapshot.chart_series(periods)
+
+    selected = [r for r in rows if r[4] in ('MAY', 'JUN')]
+    assert series['total_employees'] == len({r[0] for r in selected})
+    assert series['total_present_days'] == sum(r[6] for r in selected)
+    assert series['total_ot_hours'] == sum(r[8] for r in selected)
+
+    expected = defaultdict(lambda: {'salary': 0, 'employees': set()})
+    for r in selected:
+        expected[r[2] or 'Unknown']['salary'] += r[5]
+        expected[r[2] or 'Unknown']['employees'].add(r[0])
+    departments = {d['department']: d for d in series['departments']}
+    assert set(departments) == set(expected)
+    for name, stats in expected.items():
+        assert departments[name]['total_salary'] == stats['salary']
+        assert departments[name]['headcount'] == len(stats['employees'])
+    totals = [d['total_salary'] for d in series['departments']]
+    assert totals == sorted(totals, reverse=True)
+
+    assert sum(b['count'] for b in series['salary_distribution']) == len(selected)
+    assert series['top_salaried'][0]['salary'] == max(r[5] for r in selected)
+
+
+def test_department_filter_previous_and_trends():
+    rows = make_rows()
+    snapshot = ChartSnapshot.from_rows(rows)
+    keys = [period_index(2025, m) for m in reversed(MONTHS)]  # newest first
+    series = snapshot.chart_series(keys[:1], department='IT', previous_period=keys[1], trend_periods=keys)
+
+    assert series['total_employees'] == len({r[0] for r in rows if r[4] == 'JUN' and r[2] == 'IT'})
+    assert series['previous']['employees'] == len({r[0] for r in rows if r[4] == 'MAY' and r[2] == 'IT'})
+    assert [t['label'] for t in series['trends']] == [f"{m}/2025" for m in reversed(MONTHS)]
+    jan = [r[5] for r in rows if r[4] == 'JAN' and r[2] == 'IT']
+    assert abs(series['trends'][-1]['average_salary'] - sum(jan) / len(jan)) < 1e-6
+
+    assert snapshot.chart_series(keys, department='Nope')['total_employees'] == 0
+
+
+def test_upsert_and_remove_patch_in_place():
+    rows = make_rows()
+    snapshot = ChartSnapshot.from_rows(rows)
+    june = [period_index(2025, 'JUN')]
+    before = snapshot.chart_series(june)['total_employees']
+
+    snapshot.upsert(('NEW', 'New hire', 'IT', 2025, 'JUNE', 1, 1, 26, 0, 0, 3.85))
+    assert snapshot.chart_series(june)['total_employees'] == before + 1
+
+    snapshot.upsert(('NEW', 'New hire', 'IT', 2025, 'JUN', 500000, 1, 26, 0, 0, 3.85))  # replaces, not adds
+    series = snapshot.chart_series(june)
+    assert series['total_employees'] == before + 1
+    assert series['top_salaried'][0] == {'name': 'New hire', 'salary': 500000.0, 'department': 'IT'}
+
+    snapshot.remove('NEW', june[0])
+    assert snapshot.chart_series(june)['total_employees'] == before
+
+    snapshot.remove_period(june[0])
+    assert not snapshot.has_rows(june)
+
+
+if __name__ == '__main__':
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith('test_')]
+    for name, fn in tests:
+        fn()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test that chart snapshot patches wait for the writer's commit
+(ChartSnapshotService.apply_values / apply_period)
+
+A write inside a transaction must neither bump the CHARTS generation nor patch the process's
+snapshot before the commit, and a rolled back write must leave both untouched.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_chart_snapshot_service.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection, transaction
+from django.test import override_settings
+
+from excel_data.models import ChartAggregatedData, Tenant
+from excel_data.services.cache_service import CHARTS, get_cache_generations
+from excel_data.services.chart_snapshot_service import ChartSnapshotService, period_index
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+LOCAL_CACHES = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+
+JUNE = [period_index(2025, 'JUNE')]
+ROW = ('E1', 'Asha Rao', 'Ops', 2025, 'JUNE', 30000, 25, 26, 2, 10, 96.15)
+
+
+def generation(tenant):
+    return get_cache_generations(tenant, CHARTS)[CHARTS]
+
+
+@LOCAL_CACHES
+def test_rolled_back_write_is_never_patched(django_capture_on_commit_callbacks):
+    tenant = Tenant.objects.create(name='Snapshot', subdomain='snapshot-rollback')
+    ChartSnapshotService.clear(tenant)
+    before = generation(tenant)
+    snapshot = ChartSnapshotService.get(tenant)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                ChartSnapshotService.apply_values(tenant, [ROW])
+                raise RuntimeError("upload failed")
+
+    assert callbacks == []
+    assert generation(tenant) == before
+    assert ChartSnapshotService.get(tenant) is snapshot
+    assert not snapshot.has_rows(JUNE)
+
+
+@LOCAL_CACHES
+def test_committed_write_is_patched_after_the_commit(django_capture_on_commit_callbacks):
+    tenant = Tenant.objects.create(name='Snapshot', subdomain='snapshot-commit')
+    ChartSnapshotService.clear(tenant)
+    before = generation(tenant)
+    snapshot = ChartSnapshotService.get(tenant)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ChartSnapshotService.apply_values(tenant, [ROW])
+        # Still inside the writer's transaction: other processes must not see a new generation
+        assert generation(tenant) == before
+        assert not snapshot.has_rows(JUNE)
+
+    assert generation(tenant) == before + 1
+    assert ChartSnapshotService.get(tenant) is snapshot
+    assert snapshot.chart_series(JUNE)['total_employees'] == 1
+
+
+@LOCAL_CACHES
+def test_apply_period_reads_the_committed_slice(django_capture_on_commit_callbacks):
+    tenant = Tenant.objects.create(name='Snapshot', subdomain='snapshot-period')
+    ChartSnapshotService.clear(tenant)
+    snapshot = ChartSnapshotService.get(tenant)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ChartSnapshotService.apply_period(tenant, 2025, 'JUNE')
+        ChartAggregatedData.objects.create(
+            tenant=tenant, employee_id='E1', employee_name='Asha Rao', department='Ops',
+            year=2025, month='JUNE', net_payable=30000, present_days=25, total_working_days=26,
+        )
+
+    assert ChartSnapshotService.get(tenant) is snapshot
+    assert snapshot.chart_series(JUNE)['total_employees'] == 1
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test keyset cursors, the "rows after" filter and in-memory pages (excel_data/utils/cursor_pagination.py)
+
+No database or server is needed: the filter's Q tree is evaluated against in-memory rows
+and must select exactly the rows that follow the cursor in the sorted list.
+
+Usage:
+    python tests/test_cursor_pagination.py
+    pytest tests/test_cursor_pagination.py
+"""
+
+import operator
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from excel_data.utils.cursor_pagination import (
+    InvalidCursor, after_filter, count_param, decode_cursor, encode_cursor, page_size_param,
+    paginate_list,
+)
+
+LOOKUPS = {'exact': operator.eq, 'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le}
+
+ROWS = [
+    {'department': department, 'name': name, 'id': row_id}
+    for row_id, (department, name) in enumerate([
+        ('Ops', 'Asha'), ('Ops', 'Ravi'), ('HR', 'Asha'), ('HR', 'Meena'), ('Ops', 'Asha'),
+        ('Sales', 'Zoya'), ('HR', 'Asha'), ('Sales', 'Binu'),
+    ], start=1)
+]
+
+
+def matches(q, row):
+    results = []
+    for child in q.children:
+        if hasattr(child, 'children'):
+            results.append(matches(child, row))
+        else:
+            lookup, value = child
+            field, _, kind = lookup.partition('__')
+            results.append(LOOKUPS[kind or 'exact'](row[field], value))
+    result = all(results) if q.connector == 'AND' else any(results)
+    return not result if q.negated else result
+
+
+def sort_rows(ordering):
+    rows = list(ROWS)
+    for name in reversed(ordering):
+        rows.sort(key=operator.itemgetter(name.lstrip('-')), reverse=name.startswith('-'))
+    return rows
+
+
+def test_filter_selects_rows_after_cursor():
+    for ordering in [('name', 'id'), ('department', 'name', 'id'), ('-department', '-name', '-id'), ('-id',)]:
+        rows = sort_rows(ordering)
+        for position, row in enumerate(rows):
+            values = decode_cursor(encode_cursor(row[name.lstrip('-')] for name in ordering), ordering)
+            after = [candidate for candidate in rows if matches(after_filter(ordering, values), candidate)]
+            assert after == rows[position + 1:], (ordering, row)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(['Asha Rao', Decimal('28000.50'), 7])
+    assert '=' not in cursor
+    assert decode_cursor(cursor, ('name', 'last_salary', 'profile_id')) == ['Asha Rao', '28000.50', 7]
+
+
+def test_foreign_cursors_are_rejected():
+    for cursor, ordering in [('not-a-cursor!', ('id',)), (encode_cursor(['Asha', 1]), ('id',))]:
+        try:
+            decode_cursor(cursor, ordering)
+        except InvalidCursor:
+            continue
+        raise AssertionError(f"{cursor!r} was accepted")
+
+
+def test_page_size_is_bounded():
+    assert page_size_param(None) == 100
+    assert page_size_param('abc') == 100
+    assert page_size_param('0') == 100
+    assert page_size_param('25') == 25
+    assert page_size_param('100000') == 500
+    assert page_size_param('50', default=20, maximum=40) == 40
+
+
+def test_list_pages_follow_cursor():
+    pages, cursor = [], None
+    while True:
+        page, cursor = paginate_list(ROWS, cursor=cursor, page_size=3)
+        pages.append(page)
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [row for page in pages for row in page] == ROWS
+    assert paginate_list(ROWS, page_size=3, offset=6) == (ROWS[6:], None)
+    try:
+        paginate_list(ROWS, cursor=encode_cursor([-1]))
+    except InvalidCursor:
+        return
+    raise AssertionError("negative position was accepted")
+
+
+def test_count_param():
+    assert count_param(None) == 'none'
+    assert count_param('EXACT') == 'exact'
+    assert count_param('approximate') == 'approximate'
+    assert count_param('bogus', default='approximate') == 'approximate'
+
+
+if __name__ == '__main__':
+    for test in (test_filter_selects_rows_after_cursor, test_cursor_round_trip,
+                 test_foreign_cursors_are_rejected, test_page_size_is_bounded,
+                 test_list_pages_follow_cursor, test_count_param):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test how the employee directory projection turns a database row into a directory entry
+(excel_data/services/employee_directory.py)
+
+No database or server is needed: rows are built by hand in the projection's column order.
+
+Usage:
+    python tests/test_employee_directory.py
+    pytest tests/test_employee_directory.py
+"""
+
+import datetime
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from excel_data.services.employee_directory import EMPLOYEE_COLUMNS, _directory_entry, working_days
+
+SUNDAY_OFF = (False, False, False, False, False, False, True)
+
+
+def make_row(salary=None, daily=None, attendance=(None, None), **employee):
+    values = {
+        'id': 1, 'employee_id': 'EMP-1', 'first_name': 'Asha', 'last_name': 'Rao', 'department': 'Ops',
+        'designation': None, 'employment_type': None, 'date_of_joining': datetime.date(2024, 4, 1),
+        'location_branch': None, 'mobile_number': None, 'email': None, 'is_active': True,
+        'inactive_marked_at': None, 'basic_salary': Decimal('30000'),
+        'shift_start_time': datetime.time(9), 'shift_end_time': datetime.time(18),
+        **dict(zip(EMPLOYEE_COLUMNS[-7:], SUNDAY_OFF)),
+        **employee,
+    }
+    salary = salary or (None,) * 7
+    daily = (True, *daily) if daily else (False, 0, 0, 0)
+    return tuple(values[column] for column in EMPLOYEE_COLUMNS) + salary + daily + attendance
+
+
+def test_working_days_skip_off_days():
+    # June 2025 has 30 days, 5 of them Sundays
+    assert working_days(2025, 6, SUNDAY_OFF) == 25
+    assert working_days(2025, 6, (False,) * 7) == 30
+
+
+def test_salary_sheet_and_marked_days_add_up():
+    row = make_row(
+        salary=(Decimal('28000'), 'MAY', 2025, 20, 4, Decimal('3.5'), 0),
+        daily=(2, 1, 2),  # present/paid leave, absent, half days this month
+        attendance=(Decimal('6'), 45),
+    )
+    entry = _directory_entry(row, 2025, 6)
+    assert entry['last_salary'] == 28000.0 and entry['last_month'] == 'MAY 2025'
+    assert entry['off_days'] == 'Sun' and entry['off_sunday'] is True
+    attendance = entry['attendance']
+    assert attendance['present_days'] == 23.0 and attendance['absent_days'] == 6.0
+    # OT comes from the salary sheet; late minutes fall back to the attendance sheet
+    assert attendance['total_ot_hours'] == 3.5 and attendance['total_late_minutes'] == 45
+    assert attendance['working_days'] == 25 and attendance['attendance_percentage'] == 79.3
+
+
+def test_no_attendance_means_all_absent():
+    entry = _directory_entry(make_row(attendance=(Decimal('6'), 45)), 2025, 6)
+    assert entry['last_month'] == 'N/A'
+    assert entry['attendance'] == {
+        'present_days': 0.0, 'absent_days': 25, 'working_days': 25,
+        'attendance_percentage': 0, 'total_ot_hours': 0.0, 'total_late_minutes': 0,
+    }
+
+
+if __name__ == '__main__':
+    for test in (test_working_days_skip_off_days, test_salary_sheet_and_marked_days_add_up,
+                 test_no_attendance_means_all_absent):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for Django startup
+
+Runs `python -X importtime manage.py check` and parses the import log. Loading settings,
+models and the URLconf must not import the Excel stack (pandas / numpy / openpyxl) - those
+are imported inside the upload and template code paths - and total startup import time
+must stay under a budget.
+
+Usage:
+    python tests/test_import_time.py
+    pytest tests/test_import_time.py
+
+Environment:
+    IMPORT_TIME_BUDGET_MS  Total import-time budget in milliseconds (default 1500)
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 1500))
+FORBIDDEN_MODULES = ('pandas', 'numpy', 'openpyxl')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run_importtime(*args):
+    """Return [(module, self_us, cumulative_us, depth)] for `python -X importtime manage.py <args>`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'manage.py', *args],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return imports
+
+
+def test_check_does_not_import_excel_stack():
+    modules = {module for module, _, _, _ in run_importtime('check')}
+    loaded = [name for name in FORBIDDEN_MODULES if name in modules]
+    assert not loaded, f"manage.py check imported {loaded}; import them inside the code paths that need them"
+
+
+def test_check_import_time_budget():
+    imports = run_importtime('check')
+    total_ms = sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1000
+    slowest = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)[:5]
+    assert total_ms <= BUDGET_MS, (
+        f"Startup imports took {total_ms:.0f}ms (budget {BUDGET_MS:.0f}ms). Slowest: "
+        + ', '.join(f"{module} {cumulative / 1000:.0f}ms" for module, _, cumulative, _ in slowest)
+    )
+
+
+if __name__ == '__main__':
+    tests = [(name, fn) for name, fn in sorted(globals().items()) if name.startswith('test_')]
+    for name, fn in tests:
+        fn()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test the columnar payroll kernel (excel_data/services/payroll_kernel.py)
+
+Pins the values for the behaviour that was unified when every salary path moved onto the
+kernel; each test names what the previous per-path formula produced. Pure NumPy, so no
+database or server is needed.
+
+Usage:
+    python tests/test_payroll_kernel.py
+    pytest tests/test_payroll_kernel.py
+"""
+
+import os
+import random
+import sys
+from decimal import ROUND_HALF_UP, Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_data.services.payroll_kernel import PAYROLL_COLUMNS, compute_payroll, paise_to_decimal
+
+
+def payroll(**inputs):
+    """Run the kernel for one employee and return Decimal columns"""
+    values = {
+        'basic_salary': 24000, 'working_days': 25, 'present_days': 25, 'ot_hours': 0,
+        'late_minutes': 0, 'ot_rate': 0, 'tds_percentage': 0, 'advance_balance': 0,
+        **inputs,
+    }
+    batch = {name: value if name in ('advance_override', 'max_advance_deduction_percentage') else [value]
+             for name, value in values.items()}
+    return {name: paise_to_decimal(column)[0] for name, column in compute_payroll(**batch).items()}
+
+
+def test_zero_working_days_pays_nothing():
+    # CalculatedSalary.calculate_salary used to pay the full base salary here
+    result = payroll(basic_salary=26000, working_days=0, present_days=0, ot_hours=2, late_minutes=15)
+    assert result['salary_for_present_days'] == Decimal('0.00')
+    assert result['ot_charges'] == result['late_deduction'] == Decimal('0.00')
+    assert result['net_payable'] == Decimal('0.00')
+
+
+def test_late_deduction_uses_effective_ot_rate():
+    assert payroll(ot_rate=150, late_minutes=30)['late_deduction'] == Decimal('75.00')
+    # Without an OT rate the rate falls back to 24000 / (25 days x 8 hours) = 120 an hour;
+    # the unified calculator and the ultra-fast preview used to deduct nothing
+    result = payroll(late_minutes=30, ot_hours=Decimal('1.5'))
+    assert result['late_deduction'] == Decimal('60.00')
+    assert result['ot_charges'] == Decimal('180.00')
+    assert result['gross_salary'] == Decimal('24120.00')
+
+
+def test_repeating_ot_rate_is_not_rounded_first():
+    # The Base Salary ÷ 240 fallback rate (salary_service): 104.1666... an hour, not 104.17
+    rate = Decimal(25000) / Decimal(240)
+    result = payroll(basic_salary=25000, ot_rate=rate, ot_hours=10, late_minutes=45)
+    assert result['ot_charges'] == Decimal('1041.67')
+    assert result['late_deduction'] == Decimal('78.13')  # 104.1666... x 45 / 60 = 78.125
+    assert payroll(ot_rate=Decimal(1000) / Decimal(3), ot_hours=Decimal('2.5'))['ot_charges'] == Decimal('833.33')
+
+
+def test_advance_deduction_capped_at_half_of_salary_after_tds():
+    # The ultra-fast preview used to deduct the whole 15000 balance
+    result = payroll(basic_salary=20000, working_days=20, present_days=20, advance_balance=15000)
+    assert result['advance_deduction'] == Decimal('10000.00')
+    assert result['net_payable'] == Decimal('10000.00')
+    assert result['remaining_advance_balance'] == Decimal('5000.00')
+
+    # The cap applies after TDS and never exceeds the balance
+    result = payroll(basic_salary=20000, working_days=20, present_days=20, tds_percentage=10, advance_balance=15000)
+    assert result['tds_amount'] == Decimal('2000.00')
+    assert result['advance_deduction'] == Decimal('9000.00')
+    assert payroll(advance_balance=500)['advance_deduction'] == Decimal('500.00')
+    assert payroll(advance_balance=15000, max_advance_deduction_percentage=100)['advance_deduction'] == Decimal('15000.00')
+
+
+def test_net_payable_never_negative():
+    # calculate_simple_payroll deducts this month's advances as given and used to return -2000
+    result = payroll(basic_salary=3000, working_days=30, present_days=30, advance_override=5000)
+    assert result['advance_deduction'] == Decimal('5000.00')
+    assert result['net_payable'] == Decimal('0.00')
+
+    # Late deduction larger than the pay for present days
+    result = payroll(present_days=0, ot_rate=100, late_minutes=120, advance_balance=1000)
+    assert result['gross_salary'] == Decimal('-200.00')
+    assert result['advance_deduction'] == Decimal('0.00')
+    assert result['net_payable'] == Decimal('0.00')
+    assert result['remaining_advance_balance'] == Decimal('1000.00')
+
+
+def test_advance_override_only_replaces_given_rows():
+    columns = compute_payroll(
+        basic_salary=[20000, 20000], working_days=[20, 20], present_days=[20, 20], ot_hours=None,
+        late_minutes=None, ot_rate=None, tds_percentage=None, advance_balance=[15000, 15000],
+        advance_override=[None, 1234.5],
+    )
+    assert paise_to_decimal(columns['advance_deduction']) == [Decimal('10000.00'), Decimal('1234.50')]
+
+
+def reference(basic, working_days, present, ot_hours, late, rate, tds, balance):
+    """Decimal version of the documented formula, rounding each column half-up like the kernel"""
+    def money(value):
+        return value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    # Multiply before dividing so the only rounding is the final one
+    if rate > 0:
+        ot_charges, late_deduction = money(rate * ot_hours), money(rate * late / 60)
+    else:
+        ot_charges = money(basic * ot_hours / (working_days * 8))
+        late_deduction = money(basic * late / (working_days * 8 * 60))
+    gross = money(basic * present / working_days) + ot_charges - late_deduction
+    tds_amount = money(gross * tds / 100)
+    after_tds = gross - tds_amount
+    advance = max(Decimal('0'), min(balance, money(after_tds * 50 / 100), after_tds))
+    return {'gross_salary': gross, 'tds_amount': tds_amount, 'advance_deduction': advance,
+            'net_payable': max(Decimal('0'), after_tds - advance)}
+
+
+def test_repeating_rates_match_decimal_arithmetic():
+    rng = random.Random(11)
+    rows = []
+    for _ in range(500):
+        basic = Decimal(rng.randrange(100000, 8000000)) / 100
+        rate = basic / rng.choice([Decimal(240), Decimal(208), Decimal(7) * 26])
+        rows.append((basic, rng.randrange(1, 31), Decimal(rng.randrange(0, 62)) / 2, Decimal(rng.randrange(0, 4000)) / 100,
+                     rng.randrange(0, 300), rate, Decimal(rng.randrange(0, 1500)) / 100, Decimal(0)))
+
+    columns = compute_payroll(*[[row[i] for row in rows] for i in range(8)])
+    decoded = {name: paise_to_decimal(values) for name, values in columns.items()}
+    for i, row in enumerate(rows):
+        expected = reference(*row)
+        actual = {name: decoded[name][i] for name in expected}
+        assert actual == expected, (row, actual, expected)
+
+
+def test_matches_decimal_arithmetic():
+    rng = random.Random(7)
+    rows = [(
+        Decimal(rng.randrange(0, 8000000)) / 100, rng.randrange(1, 31), Decimal(rng.randrange(0, 62)) / 2,
+        Decimal(rng.randrange(0, 4000)) / 100, rng.randrange(0, 300), Decimal(rng.choice([0, rng.randrange(0, 50000)])) / 100,
+        Decimal(rng.randrange(0, 1500)) / 100, Decimal(rng.randrange(0, 5000000)) / 100,
+    ) for _ in range(500)]
+
+    columns = compute_payroll(*[[row[i] for row in rows] for i in range(8)])
+    assert set(columns) == set(PAYROLL_COLUMNS)
+    decoded = {name: paise_to_decimal(values) for name, values in columns.items()}
+    for i, row in enumerate(rows):
+        expected = reference(*row)
+        actual = {name: decoded[name][i] for name in expected}
+        assert actual == expected, (row, actual, expected)
+
+
+if __name__ == '__main__':
+    for test in (test_zero_working_days_pays_nothing, test_late_deduction_uses_effective_ot_rate,
+                 test_advance_deduction_capped_at_half_of_salary_after_tds, test_net_payable_never_negative,
+                 test_advance_override_only_replaces_given_rows, test_repeating_ot_rate_is_not_rounded_first,
+                 test_repeating_rates_match_decimal_arithmetic, test_matches_decimal_arithmetic):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test the integer payroll periods (excel_data/utils/periods.py)
+
+Checks the month mapping of month_number() / period_index(), and - on the Postgres test
+database - that the generated period_index column agrees with period_index() for the same
+month strings. The database test needs the Postgres database from the Django settings
+(DB_* environment variables) and pytest; it is skipped otherwise.
+
+Usage:
+    python tests/test_periods.py
+    pytest tests/test_periods.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection
+
+from excel_data.utils.periods import month_number, period_index, period_label, period_year_month
+
+# Month strings as they turn up in uploads and request parameters
+MONTH_STRINGS = [
+    'JUNE', 'June', 'jun', ' June ', 'JUN  ', '6', '06', ' 6', '12', '01', 'SEPT', '13', '0', '006',
+    'JUNE.', 'Ju ne', '\tJUNE', 'JUNE\n', '', '   ', 'MAYO', '१', 'junı',
+]
+
+
+def test_month_number():
+    assert month_number('JANUARY') == month_number('jan') == month_number(' Jan ') == month_number(1) == 1
+    assert month_number('6') == month_number('06') == month_number(' june') == 6
+    assert month_number('12') == month_number('December') == 12
+    for unrecognised in ('13', '0', '006', 'SEPT', '', 'JUNE.', '\tJUNE', '१', 'junı', None, 0, 13):
+        assert month_number(unrecognised) is None, unrecognised
+
+
+def test_period_index_round_trip():
+    assert period_index(2025, 'JUNE') == period_index('2025', 6) == 2025 * 12 + 6
+    assert period_index(2025, 'SEPT') is None
+    assert period_index(None, 'JUNE') is None
+    for index in range(2024 * 12 + 1, 2026 * 12 + 1):
+        year, month = period_year_month(index)
+        assert period_index(year, month) == index
+    assert period_label(period_index(2025, 'jun')) == 'JUN/2025'
+
+
+def postgres_unavailable_reason():
+    """Why the database test cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+try:
+    import pytest
+except ImportError:  # plain script run
+    pytest = None
+else:
+    @pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database")
+    @pytest.mark.django_db
+    def test_generated_column_matches_period_index():
+        from excel_data.models import PayrollPeriod, Tenant
+
+        tenant = Tenant.objects.create(name='Periods', subdomain='periods')
+        PayrollPeriod.objects.bulk_create(
+            PayrollPeriod(tenant=tenant, year=2025 + i, month=month) for i, month in enumerate(MONTH_STRINGS)
+        )
+        stored = PayrollPeriod.all_objects.filter(tenant=tenant).values_list('year', 'month', 'period_index')
+        assert len(stored) == len(MONTH_STRINGS)
+        for year, month, index in stored:
+            assert index == period_index(year, month), (month, index)
+
+
+if __name__ == '__main__':
+    for test in (test_month_number, test_period_index_round_trip):
+        test()
+        print(f"✅ {test.__name__}")
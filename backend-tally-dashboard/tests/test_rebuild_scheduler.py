@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test the rebuild scheduler's coalescing keys and argument merging
+(excel_data/services/rebuild_scheduler.py)
+
+No database or server is needed: only the parts that decide which rebuild requests merge
+are exercised.
+
+Usage:
+    python tests/test_rebuild_scheduler.py
+    pytest tests/test_rebuild_scheduler.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from excel_data.services.cache_service import ATTENDANCE, CHARTS, PAYROLL
+from excel_data.services.rebuild_scheduler import REBUILD_MERGES, rebuild_key
+
+
+def test_month_spellings_share_a_key():
+    keys = {rebuild_key(7, PAYROLL, year, month) for year, month in [(2025, 'JUNE'), ('2025', 'Jun'), (2025, 6), (2025, '6')]}
+    assert keys == {'rebuild:7:payroll:2025-06'}, keys
+    assert rebuild_key(7, CHARTS, 2025, 'JUNE') != rebuild_key(7, PAYROLL, 2025, 'JUNE')
+    assert rebuild_key(7, CHARTS, 2025, 'JUNE') != rebuild_key(8, CHARTS, 2025, 'JUNE')
+
+
+def test_chart_sources_do_not_merge():
+    excel = rebuild_key(7, CHARTS, 2025, 'JUNE', source='excel')
+    assert excel == rebuild_key(7, CHARTS, 2025, 6, source='excel')
+    assert excel != rebuild_key(7, CHARTS, 2025, 'JUNE', source='frontend')
+    # Only chart rebuilds are keyed by source
+    assert rebuild_key(7, ATTENDANCE, 2025, 'JUNE', employee_ids=['E1']) == rebuild_key(7, ATTENDANCE, 2025, 'JUNE')
+
+
+def test_attendance_merge_unions_employees():
+    merge = REBUILD_MERGES[ATTENDANCE]
+    assert merge({'employee_ids': ['E2', 'E1']}, {'employee_ids': ['E3', 'E2']}) == {'employee_ids': ['E1', 'E2', 'E3']}
+    # A whole-month request absorbs employee-specific ones, in either order
+    assert merge({'employee_ids': None}, {'employee_ids': ['E1']}) == {'employee_ids': None}
+    assert merge({'employee_ids': ['E1']}, {}) == {'employee_ids': None}
+
+
+if __name__ == '__main__':
+    for test in (test_month_spellings_share_a_key, test_chart_sources_do_not_merge,
+                 test_attendance_merge_unions_employees):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test that the batch payroll engine matches the per-employee path
+(SalaryCalculationService.calculate_salary_for_period with batch=True / batch=False)
+
+One tenant covers every attendance source (monthly summaries with explicit absences, Excel
+attendance rows, daily rows only, no attendance, a mid-month joiner, advances), plus an
+uploaded month. Each scenario is computed by the per-employee path, the CalculatedSalary
+rows are removed and recomputed by the batch engine, and every stored field must match.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_salary_batch_parity.py
+"""
+
+import datetime
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+
+from excel_data.models import (
+    AdvanceLedger, Attendance, CalculatedSalary, DailyAttendance, EmployeeProfile,
+    MonthlyAttendanceSummary, SalaryData, Tenant,
+)
+from excel_data.services.salary_service import SalaryCalculationService
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+LOCAL_CACHES = override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+
+# Timestamps and ids differ between two runs by construction
+IGNORED_FIELDS = {'id', 'created_at', 'updated_at', 'calculation_timestamp'}
+
+
+def employee(tenant, employee_id, **fields):
+    values = {
+        'first_name': employee_id, 'last_name': 'Test', 'department': 'Ops',
+        'basic_salary': Decimal('26000'), 'date_of_joining': datetime.date(2024, 1, 1),
+        **fields,
+    }
+    return EmployeeProfile.objects.create(tenant=tenant, employee_id=employee_id, **values)
+
+
+def daily(tenant, emp, day, status, ot='0', late=0):
+    DailyAttendance.objects.create(
+        tenant=tenant, employee_id=emp.employee_id, employee_name=emp.first_name,
+        department=emp.department or '', designation='', employment_type='FULL_TIME',
+        attendance_status=status, date=day, ot_hours=Decimal(ot), late_minutes=late,
+    )
+
+
+def make_tenant():
+    tenant = Tenant.objects.create(name='Parity', subdomain='parity')
+
+    # Daily rows (the signals keep a monthly summary) with explicit absences and half days
+    logged = employee(tenant, 'LOG1', tds_percentage=Decimal('2.5'), ot_charge_per_hour=Decimal('150'))
+    for day in range(2, 28):
+        date = datetime.date(2025, 6, day)
+        if date.weekday() == 6:
+            continue
+        status = 'ABSENT' if day in (5, 6) else 'HALF_DAY' if day == 10 else 'PRESENT'
+        daily(tenant, logged, date, status, ot='1.5' if day % 4 == 0 else '0', late=7 if day % 5 == 0 else 0)
+
+    # A summary without daily rows
+    employee(tenant, 'SUM1', basic_salary=Decimal('31000.50'), tds_percentage=None)
+    MonthlyAttendanceSummary.objects.create(
+        tenant=tenant, employee_id='SUM1', year=2025, month=6,
+        present_days=Decimal('20.5'), ot_hours=Decimal('3.25'), late_minutes=45,
+    )
+
+    # Excel attendance row only
+    employee(tenant, 'XLS1', basic_salary=Decimal('18000'), off_saturday=True)
+    Attendance.objects.create(
+        tenant=tenant, employee_id='XLS1', name='XLS1 Test', date=datetime.date(2025, 6, 1),
+        calendar_days=30, total_working_days=22, present_days=19, absent_days=3,
+        ot_hours=Decimal('4.5'), late_minutes=30,
+    )
+
+    # No attendance at all, and a mid-month joiner
+    employee(tenant, 'NONE1', basic_salary=Decimal('0'))
+    joiner = employee(tenant, 'JOIN1', date_of_joining=datetime.date(2025, 6, 16))
+    for day in (12, 16, 17, 18, 19):
+        daily(tenant, joiner, datetime.date(2025, 6, day), 'PRESENT')
+
+    # Inactive employees are skipped by both paths
+    employee(tenant, 'OLD1', is_active=False)
+
+    for employee_id, amount, status in [('LOG1', '5000', 'PENDING'), ('SUM1', '40000', 'PARTIALLY_PAID'),
+                                        ('SUM1', '1000', 'REPAID'), ('XLS1', '750.25', 'PENDING')]:
+        AdvanceLedger.objects.create(
+            tenant=tenant, employee_id=employee_id, employee_name=employee_id,
+            advance_date=datetime.date(2025, 5, 20), amount=Decimal(amount), for_month='May 2025',
+            payment_method='CASH', status=status,
+        )
+
+    # An uploaded month
+    for employee_id in ('LOG1', 'SUM1'):
+        SalaryData.objects.create(
+            tenant=tenant, employee_id=employee_id, year=2025, month='MAY', name=f"{employee_id} Upload",
+            department='Ops', salary=Decimal('26000'), days=24, absent=2, sl_wo_ot=Decimal('24000'),
+            ot=Decimal('5'), hour_rs=Decimal('108.33'), charges=Decimal('541.65'), late=10,
+            charge=Decimal('1.81'), amt=Decimal('18.10'), sal_ot=Decimal('24523.55'), tds=Decimal('200'),
+            sal_tds=Decimal('24323.55'), advance=Decimal('1000'), total_old_adv=Decimal('3000'),
+            balnce_adv=Decimal('2000'), nett_payable=Decimal('23323.55'),
+        )
+    return tenant
+
+
+def stored_salaries(tenant):
+    rows = {}
+    for calculated in CalculatedSalary.objects.filter(tenant=tenant).order_by('employee_id', 'payroll_period_id'):
+        rows[(calculated.payroll_period_id, calculated.employee_id)] = {
+            field.name: getattr(calculated, field.attname)
+            for field in CalculatedSalary._meta.concrete_fields
+            if field.name not in IGNORED_FIELDS
+        }
+    return rows
+
+
+def run_both_paths(tenant, month, force_recalculate):
+    per_employee = SalaryCalculationService.calculate_salary_for_period(
+        tenant, 2025, month, force_recalculate=force_recalculate, batch=False,
+    )
+    expected = stored_salaries(tenant)
+    if not force_recalculate:
+        CalculatedSalary.objects.filter(tenant=tenant).delete()
+    batch = SalaryCalculationService.calculate_salary_for_period(
+        tenant, 2025, month, force_recalculate=force_recalculate, batch=True,
+    )
+    return per_employee, batch, expected, stored_salaries(tenant)
+
+
+def assert_same(expected, actual):
+    assert expected.keys() == actual.keys()
+    for key, fields in expected.items():
+        differences = {name: (value, actual[key][name]) for name, value in fields.items() if actual[key][name] != value}
+        assert not differences, (key, differences)
+
+
+@LOCAL_CACHES
+@pytest.mark.parametrize('month', ['JUNE', 'MAY'])
+def test_batch_matches_per_employee(month):
+    tenant = make_tenant()
+    per_employee, batch, expected, actual = run_both_paths(tenant, month, force_recalculate=False)
+    # The per-employee path reports saved rows as updated (_state.adding is reset by save())
+    assert per_employee['calculated'] + per_employee['updated'] == batch['calculated'] == 5
+    assert not per_employee['errors'] and not batch['errors']
+    assert_same(expected, actual)
+
+
+@LOCAL_CACHES
+@pytest.mark.parametrize('month', ['JUNE', 'MAY'])
+def test_forced_recalculation_matches(month):
+    tenant = make_tenant()
+    SalaryCalculationService.calculate_salary_for_period(tenant, 2025, month, batch=False)
+    per_employee, batch, expected, actual = run_both_paths(tenant, month, force_recalculate=True)
+    assert per_employee['updated'] == batch['updated'] == 5
+    assert_same(expected, actual)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+SSE load test: hold N concurrent session-conflict streams and measure API latency
+
+1. Measures API latency with no streams open (baseline)
+2. Opens N concurrent /api/sse/session-conflicts/ streams and waits for their `connected` event
+   (streams need an SSE ticket, fetched with --access-token from /api/sse/ticket/)
+3. Measures API latency again while the streams are held open
+4. Publishes one event through /api/sse/test/ and checks how many streams receive it
+
+Run it against the ASGI server (async streams) and compare with gunicorn/WSGI, where each
+open stream pins a worker thread:
+
+    gunicorn dashboard.asgi:application -k uvicorn.workers.UvicornWorker -w 2
+    python tests/test_sse_load.py --streams 1000 --access-token <JWT access token>
+
+Uses only the standard library (asyncio sockets), so thousands of client streams are cheap.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import quote, urlsplit
+
+
+async def http_request(host, port, method, path, body=b'', headers=None):
+    """One HTTP/1.1 request on a fresh connection; returns (status, elapsed_ms)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    status = int(response.split(b' ', 2)[1]) if response else 0
+    return status, elapsed_ms
+
+
+async def fetch_ticket(host, port, path, access_token):
+    """An SSE ticket for the user of access_token (valid for a minute, shared by all streams)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((
+        f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAuthorization: Bearer {access_token}\r\n"
+        f"Content-Length: 0\r\nConnection: close\r\n\r\n"
+    ).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1]) if head else 0
+    if status != 200:
+        raise RuntimeError(f"ticket request failed with status {status}")
+    return json.loads(body)['ticket']
+
+
+async def open_stream(host, port, path, connected):
+    """Open one SSE stream, count its `connected` event and return (reader, writer)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    buffer = b''
+    while b'event: connected' not in buffer:
+        chunk = await reader.read(4096)
+        if not chunk:
+            raise ConnectionError("stream closed before the connected event")
+        buffer += chunk
+    connected.append(time.perf_counter())
+    return reader, writer
+
+
+async def wait_for_event(reader, event_type, timeout):
+    """True when `event_type` arrives on the stream within timeout seconds"""
+    marker = f"event: {event_type}".encode()
+    buffer = b''
+    deadline = time.perf_counter() + timeout
+    while marker not in buffer:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        try:
+            chunk = await asyncio.wait_for(reader.read(4096), timeout=remaining)
+        except asyncio.TimeoutError:
+            return False
+        if not chunk:
+            return False
+        buffer += chunk
+    return True
+
+
+async def measure_api(host, port, path, requests, concurrency):
+    """Latencies (ms) of `requests` API calls, `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, elapsed_ms = await asyncio.wait_for(http_request(host, port, 'GET', path), timeout=30)
+                latencies.append(elapsed_ms)
+                if status >= 500:
+                    errors += 1
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, errors
+
+
+def summarize(label, latencies, errors):
+    if not latencies:
+        print(f"   {label}: no successful requests ({errors} errors)")
+        return
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"   {label}: p50 {statistics.median(ordered):.1f}ms  p95 {p95:.1f}ms  "
+        f"max {ordered[-1]:.1f}ms  ({len(ordered)} ok, {errors} errors)"
+    )
+
+
+async def run(args):
+    url = urlsplit(args.base_url)
+    host, port = url.hostname, url.port or 80
+
+    print("🚀 SSE load test")
+    print("=" * 70)
+    print(f"   Server: {args.base_url}  streams: {args.streams}  API: {args.api_path}")
+
+    print("\n📊 API latency without streams")
+    summarize('baseline', *await measure_api(host, port, args.api_path, args.api_requests, args.api_concurrency))
+
+    print(f"\n🔌 Opening {args.streams} SSE streams")
+    ticket = await fetch_ticket(host, port, args.ticket_path, args.access_token)
+    stream_path = f"{args.stream_path}?ticket={quote(ticket)}"
+    connected = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(asyncio.wait_for(open_stream(host, port, stream_path, connected), timeout=args.connect_timeout)
+          for _ in range(args.streams)),
+        return_exceptions=True,
+    )
+    streams = [result for result in results if not isinstance(result, BaseException)]
+    print(f"   {len(streams)}/{args.streams} connected in {(time.perf_counter() - start):.2f}s")
+
+    print(f"\n📊 API latency with {len(streams)} streams held open")
+    summarize('with streams', *await measure_api(host, port, args.api_path, args.api_requests, args.api_concurrency))
+
+    if streams:
+        print("\n📡 Fan-out of one published event")
+        start = time.perf_counter()
+        status, _ = await http_request(
+            host, port, 'POST', args.publish_path, body=b'event_type=load_test',
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+        )
+        received = await asyncio.gather(*(wait_for_event(reader, 'load_test', args.event_timeout) for reader, _ in streams))
+        print(
+            f"   publish status {status}; {sum(received)}/{len(streams)} streams received the event "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+    if args.hold:
+        print(f"\n⏳ Holding streams for {args.hold}s")
+        await asyncio.sleep(args.hold)
+
+    for _, writer in streams:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--streams', type=int, default=500, help='concurrent SSE streams to hold open')
+    parser.add_argument('--access-token', required=True, help='JWT access token of the user the streams belong to')
+    parser.add_argument('--stream-path', default='/api/sse/session-conflicts/')
+    parser.add_argument('--ticket-path', default='/api/sse/ticket/')
+    parser.add_argument('--publish-path', default='/api/sse/test/')
+    parser.add_argument('--api-path', default='/api/health/', help='API endpoint whose latency is measured')
+    parser.add_argument('--api-requests', type=int, default=200)
+    parser.add_argument('--api-concurrency', type=int, default=10)
+    parser.add_argument('--connect-timeout', type=float, default=30)
+    parser.add_argument('--event-timeout', type=float, default=10)
+    parser.add_argument('--hold', type=float, default=0, help='seconds to keep the streams open at the end')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
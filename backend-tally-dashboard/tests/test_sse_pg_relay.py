@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the PostgreSQL LISTEN/NOTIFY SSE relay with two local processes
+
+A subscriber process subscribes to the session-conflict channel and waits until its relay
+listener is up; this process then publishes one event. Both the other process's subscriber
+and a local subscriber must receive it, exactly once each.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+SSE_BROADCAST_BACKEND = 'postgres' (the default); skipped otherwise.
+
+Usage:
+    python tests/test_sse_pg_relay.py
+    pytest tests/test_sse_pg_relay.py
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT = 10
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+    import django
+    django.setup()
+
+
+def relay_unavailable_reason():
+    """Why the relay cannot be tested here, or None"""
+    setup_django()
+    from django.db import connection
+    from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster
+
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        connection.ensure_connection()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    if InMemorySSEBroadcaster._relay() is None:
+        return "SSE_BROADCAST_BACKEND is not 'postgres'"
+    return None
+
+
+try:
+    import pytest
+except ImportError:  # plain script run
+    pytest = None
+else:
+    @pytest.fixture(autouse=True)
+    def real_database(django_db_blocker):
+        """The relay opens its own connections, which pytest-django blocks outside database tests"""
+        with django_db_blocker.unblock():
+            yield
+
+
+def wait_until_listening():
+    from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster
+    return InMemorySSEBroadcaster._relay().listening.wait(TIMEOUT)
+
+
+def subscriber_process(ready, results, database_name):
+    """Other 'worker': subscribe, report readiness, forward what arrives"""
+    setup_django()
+    from django.db import connection
+    from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster
+
+    # NOTIFY only reaches listeners on the same database; pytest-django may have switched
+    # this process to the test database
+    connection.settings_dict['NAME'] = database_name
+
+    event_queue = InMemorySSEBroadcaster.subscribe()
+    if not wait_until_listening():
+        results.put('listener not started')
+        return
+    ready.set()
+
+    received = []
+    try:
+        while True:
+            received.append(event_queue.get(timeout=2)['event_type'])
+    except queue.Empty:
+        results.put(received)
+
+
+def test_relay_between_two_processes():
+    reason = relay_unavailable_reason()
+    if reason:
+        pytest.skip(reason)
+
+    from django.db import connection
+    from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster
+
+    context = multiprocessing.get_context('spawn')
+    ready, results = context.Event(), context.Queue()
+    worker = context.Process(target=subscriber_process, args=(ready, results, connection.settings_dict['NAME']))
+    worker.start()
+    try:
+        assert ready.wait(TIMEOUT * 2), "subscriber process did not start listening"
+
+        local_queue = InMemorySSEBroadcaster.subscribe()
+        assert wait_until_listening(), "local relay listener did not start"
+
+        InMemorySSEBroadcaster.publish(InMemorySSEBroadcaster.CHANNEL_NAME, 'relay_test', {'pid': os.getpid()})
+
+        local = [local_queue.get(timeout=TIMEOUT)['event_type']]
+        try:
+            local.append(local_queue.get(timeout=2)['event_type'])
+        except queue.Empty:
+            pass
+        remote = results.get(timeout=TIMEOUT * 2)
+
+        assert local == ['relay_test'], f"local subscriber received {local}"
+        assert remote == ['relay_test'], f"other process received {remote}"
+        InMemorySSEBroadcaster.unsubscribe(local_queue)
+    finally:
+        worker.join(TIMEOUT)
+        if worker.is_alive():
+            worker.terminate()
+        # Release the LISTEN connection so the test database can be dropped
+        InMemorySSEBroadcaster._relay().stop(timeout=TIMEOUT)
+
+
+if __name__ == '__main__':
+    reason = relay_unavailable_reason()
+    if reason:
+        print(f"⚠️  Skipped: {reason}")
+        sys.exit(0)
+    test_relay_between_two_processes()
+    print("✅ test_relay_between_two_processes")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test who receives session-conflict events (excel_data/utils/sse_broadcaster.py and the
+SSE views)
+
+Streams need a short-lived SSE ticket (SSETicketView) and only receive the events of their
+user and tenant topics: a missing, expired or access token in place of the ticket gets 401,
+and an event published for some topics never reaches a whole-channel subscriber.
+
+The routing test runs in-process; the ticket tests need the Postgres database from the
+Django settings (DB_* environment variables) and pytest, and are skipped otherwise.
+
+Usage:
+    python tests/test_sse_tickets.py
+    pytest tests/test_sse_tickets.py
+"""
+
+import os
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster, SSENotifier
+
+CHANNEL = 'sse_ticket_test'
+
+
+def drain(event_queue):
+    events = []
+    while not event_queue.empty():
+        events.append(event_queue.get_nowait()['event_type'])
+    return events
+
+
+@override_settings(SSE_BROADCAST_BACKEND='memory')
+def test_topic_events_only_reach_their_topics():
+    everyone = InMemorySSEBroadcaster.subscribe(CHANNEL)
+    user = InMemorySSEBroadcaster.subscribe(CHANNEL, topics=['user:1', 'tenant:1'])
+    other_tenant = InMemorySSEBroadcaster.subscribe(CHANNEL, topics=['user:2', 'tenant:2'])
+    try:
+        InMemorySSEBroadcaster.publish(CHANNEL, 'force_logout', {}, topics=['user:1', 'tenant:1'])
+        InMemorySSEBroadcaster.publish(CHANNEL, 'announcement', {})
+
+        assert drain(everyone) == ['announcement']
+        assert drain(user) == ['force_logout', 'announcement']
+        assert drain(other_tenant) == ['announcement']
+    finally:
+        for event_queue in (everyone, user, other_tenant):
+            InMemorySSEBroadcaster.unsubscribe(event_queue, CHANNEL)
+
+
+@override_settings(SSE_BROADCAST_BACKEND='memory')
+def test_user_events_skip_the_rest_of_the_tenant():
+    # Two dashboards of one tenant, subscribed as topics_for_ticket() subscribes them
+    def dashboard(user):
+        return InMemorySSEBroadcaster.subscribe(topics=[
+            InMemorySSEBroadcaster.user_topic(user), InMemorySSEBroadcaster.tenant_topic(user.tenant_id),
+        ])
+
+    logged_out = SimpleNamespace(id=101, tenant_id=7, email='a@example.com', first_name='A', last_name='', role='hr_manager')
+    colleague = SimpleNamespace(id=102, tenant_id=7, email='b@example.com', first_name='B', last_name='', role='hr_manager')
+    streams = {user.id: dashboard(user) for user in (logged_out, colleague)}
+    try:
+        SSENotifier.notify_force_logout(logged_out, '10.0.0.1', 'OTHER_LOGIN')
+        SSENotifier.notify_session_conflict(logged_out, '10.0.0.1')
+        SSENotifier.publish_conflict_event('maintenance', {}, tenants=[7])
+
+        assert drain(streams[101]) == ['force_logout', 'session_conflict', 'maintenance']
+        assert drain(streams[102]) == ['maintenance']
+    finally:
+        for event_queue in streams.values():
+            InMemorySSEBroadcaster.unsubscribe(event_queue)
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+try:
+    import pytest
+except ImportError:  # plain script run
+    pytest = None
+else:
+    def make_user():
+        from excel_data.models import CustomUser, Tenant
+
+        tenant = Tenant.objects.create(name='Tickets', subdomain='tickets')
+        return CustomUser.objects.create_user(email='sse@example.com', password='x', tenant=tenant)
+
+    def stream_status(ticket=None):
+        from excel_data.views.sse_simple import SessionConflictSSEView
+
+        request = RequestFactory().get('/api/sse/session-conflicts/', {'ticket': ticket} if ticket else {})
+        # Not closed: that sends request_finished, which closes the test's database connection
+        return SessionConflictSSEView.as_view()(request).status_code
+
+    @pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database")
+    @pytest.mark.django_db
+    def test_ticket_view_issues_stream_tickets():
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from excel_data.views.sse_simple import SSETicketView
+
+        user = make_user()
+        request = APIRequestFactory().post('/api/sse/ticket/')
+        force_authenticate(request, user=user)
+        response = SSETicketView.as_view()(request)
+        assert response.status_code == 200
+        assert InMemorySSEBroadcaster.topics_for_ticket(response.data['ticket']) == [
+            f"user:{user.id}", f"tenant:{user.tenant_id}",
+        ]
+
+        anonymous = SSETicketView.as_view()(APIRequestFactory().post('/api/sse/ticket/'))
+        assert anonymous.status_code == 401
+
+    @pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database")
+    @pytest.mark.django_db
+    @override_settings(SSE_BROADCAST_BACKEND='memory')
+    def test_stream_requires_a_valid_ticket():
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from excel_data.utils.authentication import SSETicket
+
+        user = make_user()
+        expired = SSETicket.for_user(user)
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+
+        assert stream_status() == 401
+        assert stream_status('not-a-ticket') == 401
+        assert stream_status(str(expired)) == 401
+        # The access token is not a ticket, and a ticket is not an access token
+        assert stream_status(str(AccessToken.for_user(user))) == 401
+        with pytest.raises(Exception):
+            AccessToken(str(SSETicket.for_user(user)))
+
+        assert stream_status(str(SSETicket.for_user(user))) == 200
+
+
+if __name__ == '__main__':
+    for test in (test_topic_events_only_reach_their_topics, test_user_events_skip_the_rest_of_the_tenant):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test returning claimed background tasks to the queue (excel_data/utils/task_queue.py)
+
+A retried task, or one released from a dead worker, goes back to pending. When a call with
+its dedupe key was queued while it ran, only one of them may be pending
+(bg_task_pending_key_uniq): the pending task takes over the work, with the employee lists
+of both merged.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_task_queue.py
+"""
+
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from excel_data.models import BackgroundTask
+from excel_data.services.rebuild_scheduler import _merge_employee_ids
+from excel_data.utils.task_queue import TaskWorker, func_path
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+KEY = 'rebuild:1:attendance:2025-06'
+
+
+def failing_rebuild(employee_ids=None):
+    raise RuntimeError("rebuild failed")
+
+
+def running_task(worker, claimed_at, attempts=1):
+    return BackgroundTask.objects.create(
+        func=func_path(failing_rebuild), kwargs={'employee_ids': ['E1']}, dedupe_key=KEY,
+        merge=func_path(_merge_employee_ids), status=BackgroundTask.STATUS_RUNNING, attempts=attempts,
+        locked_by=worker.name, locked_at=claimed_at,
+    )
+
+
+def pending_task(run_after):
+    # Queued while the running task ran
+    return BackgroundTask.objects.create(
+        func=func_path(failing_rebuild), kwargs={'employee_ids': ['E2']}, dedupe_key=KEY,
+        merge=func_path(_merge_employee_ids), run_after=run_after,
+    )
+
+
+def test_released_task_merges_into_pending_one():
+    worker = TaskWorker()
+    stale = running_task(worker, claimed_at=timezone.now() - timedelta(seconds=worker.lock_timeout + 60), attempts=2)
+    pending = pending_task(run_after=timezone.now() + timedelta(minutes=5))
+
+    assert worker.claim() is None  # the pending task is not due yet
+
+    stale.refresh_from_db()
+    pending.refresh_from_db()
+    assert stale.status == BackgroundTask.STATUS_FAILED and not stale.locked_by
+    assert f"pending task {pending.id}" in stale.last_error
+    assert pending.status == BackgroundTask.STATUS_PENDING
+    assert pending.kwargs == {'employee_ids': ['E1', 'E2']}
+    assert pending.attempts == 2
+
+
+def test_retry_merges_into_pending_one():
+    worker = TaskWorker()
+    task = running_task(worker, claimed_at=timezone.now())
+    pending = pending_task(run_after=timezone.now())
+
+    worker.execute(task)
+
+    task.refresh_from_db()
+    pending.refresh_from_db()
+    assert task.status == BackgroundTask.STATUS_FAILED and not task.locked_by
+    assert "rebuild failed" in task.last_error
+    assert pending.kwargs == {'employee_ids': ['E1', 'E2']}
+    assert pending.attempts == 1
+    # The retry's backoff still applies
+    assert pending.run_after >= timezone.now() + timedelta(seconds=worker.retry_delay - 5)
+
+
+def test_retry_without_pending_duplicate():
+    worker = TaskWorker()
+    task = running_task(worker, claimed_at=timezone.now())
+
+    worker.execute(task)
+
+    task.refresh_from_db()
+    assert task.status == BackgroundTask.STATUS_PENDING and not task.locked_by
+    assert task.kwargs == {'employee_ids': ['E1']}
+    assert "rebuild failed" in task.last_error
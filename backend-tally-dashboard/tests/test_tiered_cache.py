@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test the tiered (local LRU + shared) cache backend
+
+Uses the project settings with the caches overridden: the shared tier is LocMemCache, so no
+server is needed. Two TieredCache instances over the same shared alias stand in for two
+worker processes. The DatabaseCache test needs the Postgres database from the Django
+settings (DB_* environment variables) and pytest; it is skipped otherwise.
+
+Usage:
+    python tests/test_tiered_cache.py
+    pytest tests/test_tiered_cache.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from excel_data.utils.tiered_cache import TieredCache
+
+TEST_CACHES = override_settings(CACHES={
+    'default': {
+        'BACKEND': 'excel_data.utils.tiered_cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {'LOCAL_MAX_ENTRIES': 3, 'SYNC_INTERVAL': 0},
+    },
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'db_shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_table'},
+})
+
+
+def postgres_unavailable_reason():
+    """Why the DatabaseCache test cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+def make_tier(shared='shared', **options):
+    """A fresh TieredCache instance, i.e. one worker process"""
+    return TieredCache(shared, {'OPTIONS': {'SYNC_INTERVAL': 0, **options}})
+
+
+@TEST_CACHES
+def test_local_tier_serves_without_shared_round_trip():
+    tier = make_tier()
+    tier.set('frontend_charts_1_this_month', {'total': 10})
+    caches['shared'].delete('frontend_charts_1_this_month')  # bypasses the tier, no epoch change
+    assert tier.get('frontend_charts_1_this_month') == {'total': 10}
+
+
+@TEST_CACHES
+def test_values_are_copies():
+    tier = make_tier()
+    tier.set('directory_data_1', {'rows': [1]})
+    tier.get('directory_data_1')['rows'].append(2)
+    assert tier.get('directory_data_1') == {'rows': [1]}
+
+
+@TEST_CACHES
+def test_lru_eviction():
+    tier = make_tier(LOCAL_MAX_ENTRIES=2)
+    for key in ('a', 'b', 'c'):
+        tier.set(key, key)
+    assert len(tier._local) == 2
+    assert tier.get('a') == 'a'  # still in the shared tier
+
+
+@TEST_CACHES
+def test_delete_pattern_removes_from_both_tiers():
+    tier = make_tier()
+    for key in ('frontend_charts_1_a', 'frontend_charts_1_b', 'frontend_charts_2_a'):
+        tier.set(key, key)
+    assert tier.delete_pattern('frontend_charts_1_*') == 2
+    assert tier.get('frontend_charts_1_a') is None
+    assert tier.get('frontend_charts_1_b') is None
+    assert tier.get('frontend_charts_2_a') == 'frontend_charts_2_a'
+
+
+@TEST_CACHES
+def test_delete_invalidates_other_processes():
+    worker_a, worker_b = make_tier(), make_tier()
+    worker_a.set('attendance_all_records_1', 'old')
+    assert worker_b.get('attendance_all_records_1') == 'old'  # now in B's local tier
+
+    worker_a.delete_pattern('attendance_all_records_1*')
+    worker_a.set('attendance_all_records_1', 'new')
+    assert worker_b.get('attendance_all_records_1') == 'new'
+
+
+@TEST_CACHES
+def test_local_timeout_bounds_staleness():
+    worker_a, worker_b = make_tier(LOCAL_TIMEOUT=0.05), make_tier(LOCAL_TIMEOUT=0.05)
+    worker_a.set('payroll_overview_1', 'old')
+    assert worker_b.get('payroll_overview_1') == 'old'
+    worker_a.set('payroll_overview_1', 'new')  # overwrite without delete
+    time.sleep(0.06)
+    assert worker_b.get('payroll_overview_1') == 'new'
+
+
+@TEST_CACHES
+def test_shared_only_keys_skip_local_tier_and_epoch():
+    worker_a, worker_b = make_tier(SHARED_ONLY_PREFIXES=('cache_generation_',)), make_tier()
+    worker_b.set('frontend_charts_1_all', 'charts')
+    worker_a.set('cache_generation_1_charts', 1)
+    assert 'cache_generation_1_charts' not in str(list(worker_a._local))
+    worker_a.incr('cache_generation_1_charts')
+    worker_a.delete('cache_generation_1_charts')
+    # Other processes keep their local tier: no epoch change
+    caches['shared'].delete('frontend_charts_1_all')
+    assert worker_b.get('frontend_charts_1_all') == 'charts'
+
+
+@TEST_CACHES
+def test_immutable_values_are_kept_unpickled():
+    tier = make_tier()
+    tier.set('tenant_registry_version', 42)
+    tier.set('payroll_overview_1', {'total': 1})
+    assert tier._local[tier.make_key('tenant_registry_version')][1:] == (42, False)
+    assert tier._local[tier.make_key('payroll_overview_1')][2] is True
+    assert tier.get('tenant_registry_version') == 42
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database")
+@TEST_CACHES
+def test_delete_pattern_on_database_cache():
+    call_command('createcachetable', 'cache_table', verbosity=0)
+    tier = make_tier('db_shared')
+    tier.set('frontend_charts_1_x', 1)
+    tier.set('frontend_charts_1_y', 2)
+    tier.set('frontend_charts_10_x', 3)
+    tier.set('frontend%charts', 4)
+    assert tier.delete_pattern('frontend_charts_1_*') == 2
+    assert caches['db_shared'].get('frontend_charts_10_x') == 3
+    assert caches['db_shared'].get('frontend%charts') == 4
+
+
+@TEST_CACHES
+def test_default_alias_supports_delete_pattern():
+    from django.core.cache import cache
+    cache.set('frontend_charts_5_all', 'x')
+    cache.delete_pattern('frontend_charts_5_*')
+    assert cache.get('frontend_charts_5_all') is None
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database")
+@TEST_CACHES
+def test_concurrent_incr_on_database_cache_is_not_lost():
+    import threading
+    from django.db import connections
+
+    call_command('createcachetable', 'cache_table', verbosity=0)
+    tier = make_tier('db_shared')
+    tier.set('cache_generation_1_charts', 1000, None)
+
+    def bump():
+        for _ in range(20):
+            tier.incr('cache_generation_1_charts')
+        connections.close_all()
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert caches['db_shared'].get('cache_generation_1_charts') == 1160
+    try:
+        tier.incr('cache_generation_1_missing')
+    except ValueError:
+        return
+    raise AssertionError("incr of a missing key did not raise ValueError")
+
+
+if __name__ == '__main__':
+    # The DatabaseCache tests need a test database: run them with pytest
+    tests = [(name, fn) for name, fn in sorted(globals().items())
+             if name.startswith('test_') and 'database_cache' not in name]
+    for name, fn in tests:
+        fn()
+        print(f"✅ {name}")
+    print(f"\n{len(tests)} tests passed")
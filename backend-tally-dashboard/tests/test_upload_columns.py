@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Test the column-wise upload helpers against the per-row code they replaced
+(clean_numeric_column, text_column and match_employee_ids_by_name in excel_data/utils/utils.py)
+
+The upload views used to walk the sheet with iterrows(), cleaning each cell with
+clean_decimal_value / clean_int_value and matching each name against a dict of active
+employees. The reference functions below are those loops; the column helpers must give the
+same values on small DataFrames. The name matching and salary preparation tests need the
+Postgres database from the Django settings (DB_* environment variables) and pytest; they
+are skipped otherwise.
+
+Usage:
+    python tests/test_upload_columns.py
+    pytest tests/test_upload_columns.py
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import numpy as np
+import pandas as pd
+from django.db import connection
+
+from excel_data.utils.utils import (
+    clean_decimal_value, clean_int_value, clean_numeric_column, generate_employee_id_bulk_optimized,
+    is_valid_name, match_employee_ids_by_name, text_column,
+)
+
+# Cells as they turn up in sheets read with object columns
+CELLS = [26000, 1.5, '2,500', ' 3.25 ', '7', None, np.nan, '', '  ', 'nan', 'NaN', 'none', 'None', 'NULL', 'null']
+
+
+def old_decimal(value):
+    """clean_decimal_value, with the row failure the old loop reported for non-numbers"""
+    try:
+        return clean_decimal_value(value)
+    except ArithmeticError:  # decimal.InvalidOperation: the row's try/except failed the row
+        return None
+
+
+def test_clean_numeric_column_matches_clean_decimal_value():
+    cleaned = clean_numeric_column(pd.Series(CELLS + ['x', '12abc'], dtype=object))
+    expected = [old_decimal(value) for value in CELLS + ['x', '12abc']]
+
+    assert expected[-2:] == [None, None]  # not numbers: the row failed
+    assert cleaned.iloc[-2:].isna().all()
+    assert [Decimal(str(number)) for number in cleaned.iloc[:-2]] == expected[:-2]
+    # Blank, 'nan' and 'none' cells are 0
+    assert (cleaned.iloc[5:len(CELLS)] == 0).all()
+
+
+def test_clean_numeric_column_matches_clean_int_value():
+    cells = CELLS + ['x', '2.7']
+    counts = clean_numeric_column(pd.Series(cells, dtype=object)).fillna(0).astype(int)
+    # Counts that are not numbers were 0, not a failed row
+    assert counts.tolist() == [clean_int_value(value) for value in cells]
+
+
+def test_clean_numeric_column_of_a_typed_column():
+    cells = [26000.0, np.nan, 3.5, 0.0]
+    cleaned = clean_numeric_column(pd.Series(cells))
+    assert cleaned.dtype == float
+    assert [Decimal(str(number)) for number in cleaned] == [clean_decimal_value(value) for value in cells]
+
+
+def test_text_column_matches_row_get():
+    df = pd.DataFrame({
+        'Name': [' Asha Rao ', 'Bala  Iyer', None, np.nan, 'nan', '\tChen Li\n', 42],
+        'Department': ['Ops', None, ' Sales', '', 'HR', 'Ops', 'Ops'],
+    }, dtype=object)
+    for column in ('Name', 'Department', 'Designation'):
+        assert text_column(df, column).tolist() == [str(row.get(column, '')).strip() for _, row in df.iterrows()]
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+def old_employee_ids(names, departments, tenant):
+    """The per-row name matching of the upload views, with their query"""
+    from excel_data.models import EmployeeProfile
+
+    existing_employees_by_name = {}
+    for emp in EmployeeProfile.objects.filter(
+        tenant=tenant, is_active=True
+    ).values('first_name', 'last_name', 'employee_id').iterator(chunk_size=1000):
+        key = f"{emp['first_name']} {emp['last_name']}".strip().lower()
+        existing_employees_by_name[key] = emp['employee_id']
+
+    employees_data = []
+    final_employee_ids = []
+    for name, department in zip(names, departments):
+        name_key = name.lower()
+        if name_key in existing_employees_by_name:
+            final_employee_ids.append(existing_employees_by_name[name_key])
+        else:
+            employees_data.append({'name': name, 'department': department})
+            final_employee_ids.append(None)  # Will be filled after generation
+
+    if employees_data:
+        employee_id_mapping = generate_employee_id_bulk_optimized(employees_data, tenant.id)
+        generated_index = 0
+        for i, emp_id in enumerate(final_employee_ids):
+            if emp_id is None:
+                final_employee_ids[i] = employee_id_mapping[generated_index]
+                generated_index += 1
+    return final_employee_ids, set(existing_employees_by_name.values())
+
+
+try:
+    import pytest
+except ImportError:  # plain script run
+    pytest = None
+else:
+    needs_postgres = pytest.mark.skipif(
+        postgres_unavailable_reason() is not None, reason="needs the Postgres test database",
+    )
+
+    def make_tenant():
+        from excel_data.models import EmployeeProfile, Tenant
+
+        tenant = Tenant.objects.create(name='Upload columns', subdomain='upload-columns')
+        for employee_id, first_name, last_name, is_active in [
+            ('E1', 'Asha', 'Rao', True),
+            ('E2', 'asha', 'RAO', True),  # the same name again: the last one wins
+            ('E3', 'Chen', 'Li', True),
+            ('E4', 'Dev', 'Nair', False),  # inactive: not matched
+            ('E5', 'Esha', '', True),
+        ]:
+            EmployeeProfile.objects.create(tenant=tenant, employee_id=employee_id, first_name=first_name,
+                                           last_name=last_name, is_active=is_active)
+        return tenant
+
+    @needs_postgres
+    @pytest.mark.django_db
+    def test_match_employee_ids_by_name_matches_the_row_loop():
+        tenant = make_tenant()
+        names = pd.Series(['Asha Rao', 'Zoya Khan', 'chen li', 'Dev Nair', 'Esha', 'Zoya Khan', 'Farah Ali'],
+                          index=[3, 4, 6, 7, 8, 9, 12])
+        departments = pd.Series(['Ops', 'HR', 'Sales', 'Ops', 'Ops', 'HR', ''], index=names.index)
+
+        employee_ids, existing = match_employee_ids_by_name(names, departments, tenant)
+        expected_ids, expected_existing = old_employee_ids(names.tolist(), departments.tolist(), tenant)
+
+        assert employee_ids.index.equals(names.index)
+        assert employee_ids.tolist() == expected_ids
+        # The old set lost the employee whose name a duplicate shadowed; the rows taken as
+        # existing employees are the same
+        assert existing == {'E1', 'E2', 'E3', 'E5'}
+        assert existing - expected_existing <= {'E1', 'E2'}
+        assert employee_ids.isin(existing).tolist() == [employee_id in expected_existing for employee_id in expected_ids]
+        assert employee_ids[3] in {'E1', 'E2'}
+        assert (employee_ids[6], employee_ids[8]) == ('E3', 'E5')
+        # Unmatched names (inactive employees too) get new IDs, generated in row order
+        generated = generate_employee_id_bulk_optimized([
+            {'name': name, 'department': department}
+            for name, department in [('Zoya Khan', 'HR'), ('Dev Nair', 'Ops'), ('Zoya Khan', 'HR'), ('Farah Ali', '')]
+        ], tenant.id)
+        assert employee_ids[[4, 7, 9, 12]].tolist() == [generated[i] for i in range(4)]
+        assert employee_ids[4] != employee_ids[9]
+
+    def salary_sheet(rows):
+        from excel_data.services.upload_processing import TEMPLATE_COLUMNS
+
+        return pd.DataFrame(
+            [{column: row.get(column, '0') for column in TEMPLATE_COLUMNS} for row in rows],
+            columns=TEMPLATE_COLUMNS, dtype=object,
+        )
+
+    def old_salary_rows(df, employee_ids):
+        """The per-row record building of the salary upload view: (records by employee ID, failed rows)"""
+        from excel_data.services.upload_processing import SALARY_DECIMAL_FIELDS, SALARY_INT_FIELDS
+
+        records, failed = {}, []
+        for (index, row), employee_id in zip(df.iterrows(), employee_ids):
+            try:
+                working_days = clean_int_value(row.get("Working Days", 0))
+                record = {
+                    "employee_id": employee_id,
+                    "name": str(row["NAME"]).strip(),
+                    "department": str(row.get("Department", "")).strip(),
+                    "days": working_days if working_days > 0 else 30,
+                    **{field: clean_int_value(row[column]) for field, column in SALARY_INT_FIELDS.items()},
+                    **{field: clean_decimal_value(row[column]) for field, column in SALARY_DECIMAL_FIELDS.items()},
+                }
+            except Exception:
+                failed.append(index + 2)
+                continue
+            records[employee_id] = record
+        return records, failed
+
+    @needs_postgres
+    @pytest.mark.django_db
+    def test_salary_rows_match_the_row_loop():
+        from excel_data.services.upload_processing import prepare_salary_upload
+
+        tenant = make_tenant()
+        df = salary_sheet([
+            {'NAME': 'Asha Rao', 'Department': 'Ops', 'SALARY': '26,000', 'OT': 'nan', 'TDS': 'none',
+             'ADVANCE': '', 'ABSENT': '2', 'LATE': 'x', 'Working Days': '26', 'NETT PAYABLE': ' 24,700.50 '},
+            {'NAME': '-', 'SALARY': '1'},  # not a name: skipped
+            {'NAME': 'Chen Li', 'Department': 'Sales', 'SALARY': 'abc'},  # not a number: the row fails
+            {'NAME': 'Esha', 'Department': None, 'SALARY': None, 'OT CHARGES': 'NULL', 'Working Days': None},
+        ])
+
+        prepared = prepare_salary_upload(df, tenant, 2025, 'JUNE')
+
+        valid_rows = df[df['NAME'].apply(is_valid_name)]
+        employee_ids, _ = old_employee_ids(
+            [str(name).strip() for name in valid_rows['NAME']],
+            [str(department).strip() for department in valid_rows['Department']], tenant,
+        )
+        expected, failed = old_salary_rows(valid_rows.fillna({'Department': ''}).fillna(0), employee_ids)
+
+        assert failed == [4]
+        assert prepared.errors == ["Row 4: 'abc' is not a number (SALARY)"]
+        assert prepared.missing_employees == []
+        records = {record['employee_id']: record for record in prepared.records}
+        assert set(records) == set(expected)
+        assert len(records) == 2 and 'E5' in records
+        for employee_id, fields in expected.items():
+            for field, value in fields.items():
+                assert records[employee_id][field] == value, (employee_id, field)
+        asha = next(record for record in prepared.records if record['name'] == 'Asha Rao')
+        assert (asha['salary'], asha['ot'], asha['tds'], asha['advance']) == (26000, 0, 0, 0)
+        assert (asha['late'], asha['absent'], asha['days'], asha['nett_payable']) == (0, 2, 26, Decimal('24700.5'))
+        assert records['E5']['days'] == 30 and records['E5']['salary'] == 0
+
+    @needs_postgres
+    @pytest.mark.django_db
+    def test_missing_employee_rows_are_file_rows():
+        from excel_data.services.upload_processing import prepare_attendance_upload
+
+        tenant = make_tenant()
+        df = pd.DataFrame({
+            'Name': ['Asha Rao', 'Zoya Khan', 'Chen Li', 'Farah Ali Baig', 'Dev Nair'],
+            'Department': ['Ops', 'HR', 'Sales', 'Ops', ' Ops '],
+            'Present Days': [24, 20, 22, 21, 25],
+            'Absent Days': [2, 6, 4, 5, 1],
+            'OT Hours': [0, 0, 0, 0, 0],
+            'Late Minutes': [0, 0, 0, 0, 0],
+        })
+
+        prepared = prepare_attendance_upload(df, tenant, 2025, 6)
+
+        assert prepared.records == []
+        details = [
+            (detail['row_number'], detail['name'], detail['first_name'], detail['last_name'], detail['department'])
+            for detail in prepared.missing_employees
+        ]
+        # The row number is the Excel row: index + 2, after the header
+        assert details == [
+            (3, 'Zoya Khan', 'Zoya', 'Khan', 'HR'),
+            (5, 'Farah Ali Baig', 'Farah', 'Ali Baig', 'Ops'),
+            (6, 'Dev Nair', 'Dev', 'Nair', 'Ops'),
+        ]
+
+
+if __name__ == '__main__':
+    for test in (
+        test_clean_numeric_column_matches_clean_decimal_value,
+        test_clean_numeric_column_matches_clean_int_value,
+        test_clean_numeric_column_of_a_typed_column,
+        test_text_column_matches_row_get,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the upload job SSE event (excel_data/services/upload_job_service.py)
+
+The event carries the job id, status and progress only; row errors, missing employees and
+salaries stay behind the tenant-scoped status endpoint. No database or server is needed.
+
+Usage:
+    python tests/test_upload_job_events.py
+    pytest tests/test_upload_job_events.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+from django.test import override_settings
+
+from excel_data.models import UploadJob
+from excel_data.services.upload_job_service import UploadJobService
+from excel_data.utils.sse_broadcaster import InMemorySSEBroadcaster
+
+
+@override_settings(SSE_BROADCAST_BACKEND='memory')
+def test_event_carries_progress_only():
+    job = UploadJob(
+        id=41, tenant_id=3, user_id=9, kind=UploadJob.KIND_SALARY, status=UploadJob.STATUS_NEEDS_CONFIRMATION,
+        file_name='june.xlsx', year=2025, month='JUNE', rows_total=200, rows_processed=50,
+        errors=['Row 4: basic_salary 26000 is not a number'],
+        result={'missing_employees': [{'name': 'A Person', 'basic_salary': 26000}]},
+    )
+    event_queue = InMemorySSEBroadcaster.subscribe(topics=[InMemorySSEBroadcaster.user_topic(9)])
+    try:
+        UploadJobService.publish(job)
+        event = event_queue.get_nowait()
+    finally:
+        InMemorySSEBroadcaster.unsubscribe(event_queue)
+
+    assert event['event_type'] == 'upload_job'
+    assert event['data'] == {'job_id': 41, 'status': 'needs_confirmation', 'progress': 25.0}
+    assert 'A Person' not in event['message'] and '26000' not in event['message']
+
+
+if __name__ == '__main__':
+    for test in (test_event_carries_progress_only,):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Test that upload jobs stream the sheet (excel_data/services/upload_job_service.py)
+
+Jobs read the key columns first and then validate and write the file chunk by chunk; the
+records, row errors and missing employees must be those of the whole-sheet
+prepare_*_upload used by the synchronous views, and a job resumed after some chunks must
+write the rest only. A job runs in one worker at a time: dispatching or resuming a job that
+a live worker runs does nothing.
+
+Needs the Postgres database from the Django settings (DB_* environment variables) and
+pytest (pytest-django builds the test database); skipped otherwise.
+
+Usage:
+    pytest tests/test_upload_jobs.py
+"""
+
+import io
+import os
+import sys
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+
+from excel_data.models import Attendance, EmployeeProfile, SalaryData, Tenant, UploadJob
+from excel_data.services.upload_job_service import UploadJobService
+from excel_data.services.upload_processing import (
+    ATTENDANCE_NUMERIC_COLUMNS, TEMPLATE_COLUMNS, prepare_attendance_upload,
+)
+from excel_data.utils.upload_reader import read_upload
+
+
+def postgres_unavailable_reason():
+    """Why the database tests cannot run here, or None"""
+    if connection.vendor != 'postgresql':
+        return "database is not PostgreSQL"
+    try:
+        # A direct connection: pytest-django blocks the default one outside database tests
+        connection.get_new_connection(connection.get_connection_params()).close()
+    except Exception as e:
+        return f"PostgreSQL not reachable: {e}"
+    return None
+
+
+pytestmark = [
+    pytest.mark.skipif(postgres_unavailable_reason() is not None, reason="needs the Postgres test database"),
+    pytest.mark.django_db,
+]
+
+ATTENDANCE_HEADER = ['Name', 'Department', 'Present Days', 'Absent Days', 'OT Hours', 'Late Minutes']
+
+
+@pytest.fixture
+def job_settings(tmp_path):
+    # Chunks of 2 rows, so a 7-row sheet is read and written in 4 chunks
+    with override_settings(
+        MEDIA_ROOT=str(tmp_path),
+        UPLOAD_CHUNK_ROWS=2,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        SSE_BROADCAST_BACKEND='memory',
+    ):
+        yield
+
+
+def workbook(header, rows):
+    book = Workbook()
+    sheet = book.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    return buffer.getvalue()
+
+
+def make_tenant(names):
+    tenant = Tenant.objects.create(name='Uploads', subdomain='uploads')
+    for number, name in enumerate(names, 1):
+        first_name, last_name = name.split(' ')
+        EmployeeProfile.objects.create(tenant=tenant, employee_id=f"E{number}", first_name=first_name,
+                                       last_name=last_name, basic_salary=Decimal('26000'))
+    return tenant
+
+
+def attendance_sheet():
+    return workbook(ATTENDANCE_HEADER, [
+        ['Asha Rao', 'Ops', 24, 2, 3.5, 10],
+        ['Bala Iyer', 'Ops', 'x', 1, 0, 0],  # not a number: the row fails
+        ['Chen Li', 'Sales', 20, 6, 0, 45],
+        ['Dev Nair', 'Sales', None, None, None, None],  # blanks are 0
+        ['Esha Jain', 'Ops', 26, 0, 1, 0],
+        ['Asha Rao', 'Ops', 25, 1, 2, 5],  # same employee again: the last row wins
+        ['Farah Khan', 'HR', 22, 4, 0, '1,200'],
+    ])
+
+
+def written(tenant):
+    return {
+        row['employee_id']: row
+        for row in Attendance.all_objects.filter(tenant=tenant).values(
+            'employee_id', 'name', 'department', 'total_working_days', 'present_days',
+            'absent_days', 'ot_hours', 'late_minutes',
+        )
+    }
+
+
+def create_job(tenant, kind, data, month):
+    return UploadJobService.create(tenant, None, kind, SimpleUploadedFile('sheet.xlsx', data), 2025, month)
+
+
+def test_attendance_job_matches_the_whole_sheet(job_settings):
+    tenant = make_tenant(['Asha Rao', 'Bala Iyer', 'Chen Li', 'Dev Nair', 'Esha Jain', 'Farah Khan'])
+    data = attendance_sheet()
+    whole = prepare_attendance_upload(
+        read_upload(SimpleUploadedFile('sheet.xlsx', data), numeric_columns=ATTENDANCE_NUMERIC_COLUMNS),
+        tenant, 2025, 6,
+    )
+
+    job = UploadJobService.run(create_job(tenant, UploadJob.KIND_ATTENDANCE, data, 6).id)
+
+    assert job.status == UploadJob.STATUS_COMPLETED
+    assert (job.total_rows, job.rows_total, job.rows_processed) == (7, 7, 7)
+    assert job.errors == whole.errors == ["Row 3: 'x' is not a number (Present Days)"]
+    assert job.error_count == 1
+    # Asha Rao's second row is in a later chunk: it updates the first
+    assert (job.records_created, job.records_updated) == (5, 1)
+
+    expected = {record['employee_id']: record for record in whole.records}
+    rows = written(tenant)
+    assert set(rows) == set(expected) == {'E1', 'E3', 'E4', 'E5', 'E6'}
+    for employee_id, row in rows.items():
+        for field, value in row.items():
+            assert value == expected[employee_id][field], (employee_id, field)
+    assert rows['E1']['present_days'] == 25
+
+
+def test_resumed_job_writes_the_remaining_chunks(job_settings):
+    tenant = make_tenant(['Asha Rao', 'Bala Iyer', 'Chen Li', 'Dev Nair', 'Esha Jain', 'Farah Khan'])
+    job = create_job(tenant, UploadJob.KIND_ATTENDANCE, attendance_sheet(), 6)
+    # A worker that died after parsing and committing the first 3 rows
+    UploadJob.all_objects.filter(pk=job.pk).update(
+        status=UploadJob.STATUS_FAILED, stages_completed=['parse'], rows_total=7, rows_processed=3, total_rows=7,
+    )
+
+    job = UploadJobService.resume(UploadJob.all_objects.get(pk=job.pk), inline=True)
+
+    assert job.status == UploadJob.STATUS_COMPLETED
+    assert job.rows_processed == 7
+    assert job.error_count == 0  # Row 3 was in the committed part
+    assert set(written(tenant)) == {'E1', 'E4', 'E5', 'E6'}
+
+
+def test_missing_employees_are_reported_with_file_rows(job_settings):
+    tenant = make_tenant(['Asha Rao'])
+    rows = [
+        ['Asha Rao', 30000] + [0] * (len(TEMPLATE_COLUMNS) - 2),
+        ['-', 0] + [0] * (len(TEMPLATE_COLUMNS) - 2),  # not a name: skipped
+        ['Bala Iyer', 28000] + [0] * (len(TEMPLATE_COLUMNS) - 2),
+    ]
+    for row in rows:
+        row[TEMPLATE_COLUMNS.index('Department')] = 'Ops'
+    job = UploadJobService.run(create_job(tenant, UploadJob.KIND_SALARY, workbook(TEMPLATE_COLUMNS, rows), 'JUNE').id)
+
+    assert job.status == UploadJob.STATUS_NEEDS_CONFIRMATION
+    assert job.total_rows == 3
+    [missing] = job.result['missing_employees']
+    assert (missing['name'], missing['row_number'], missing['basic_salary']) == ('Bala Iyer', 4, 28000)
+    assert not SalaryData.all_objects.filter(tenant=tenant).exists()
+
+
+def test_job_is_claimed_once(job_settings):
+    tenant = make_tenant(['Asha Rao'])
+    job = create_job(tenant, UploadJob.KIND_ATTENDANCE, attendance_sheet(), 6)
+
+    assert UploadJobService.claim(job.id).status == UploadJob.STATUS_RUNNING
+    assert UploadJobService.claim(job.id) is None
+
+    # A second dispatch, or resume --job, while the first worker runs
+    job = UploadJobService.run(job.id)
+    assert (job.status, job.attempts, job.stages_completed) == (UploadJob.STATUS_RUNNING, 1, [])
+    assert UploadJobService.resume(job, inline=True) is None
+    assert UploadJob.all_objects.get(pk=job.pk).status == UploadJob.STATUS_RUNNING
+
+
+def test_stale_running_job_is_taken_over(job_settings):
+    tenant = make_tenant(['Asha Rao', 'Bala Iyer', 'Chen Li', 'Dev Nair', 'Esha Jain', 'Farah Khan'])
+    job = create_job(tenant, UploadJob.KIND_ATTENDANCE, attendance_sheet(), 6)
+    # Claimed by a worker that died 20 minutes ago
+    UploadJob.all_objects.filter(pk=job.pk).update(
+        status=UploadJob.STATUS_RUNNING, attempts=1, updated_at=timezone.now() - timedelta(minutes=20),
+    )
+
+    job = UploadJobService.run(job.id)
+
+    assert (job.status, job.attempts, job.rows_processed) == (UploadJob.STATUS_COMPLETED, 2, 7)
+
+
+def test_resume_skips_a_job_updated_since_it_was_read(job_settings):
+    tenant = make_tenant(['Asha Rao'])
+    job = create_job(tenant, UploadJob.KIND_ATTENDANCE, attendance_sheet(), 6)
+    UploadJob.all_objects.filter(pk=job.pk).update(status=UploadJob.STATUS_FAILED)
+    read = UploadJob.all_objects.get(pk=job.pk)
+    # Another resume_upload_jobs run requeued it meanwhile
+    UploadJob.all_objects.filter(pk=job.pk).update(status=UploadJob.STATUS_QUEUED, updated_at=timezone.now())
+
+    assert UploadJobService.resume(read) is None
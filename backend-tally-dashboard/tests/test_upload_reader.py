@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the chunked upload reader (excel_data/utils/upload_reader.py)
+
+Builds workbooks in memory, so no database or server is needed, and checks that the chunked
+read returns the same frame as pd.read_excel and that bad uploads are rejected.
+
+Usage:
+    python tests/test_upload_reader.py
+    pytest tests/test_upload_reader.py
+"""
+
+import datetime
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+
+import django
+
+django.setup()
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from openpyxl import Workbook
+
+from excel_data.utils.upload_reader import UploadFileError, upload_chunks, read_upload
+
+
+def make_workbook(rows=250):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['NAME', 'SALARY', 'ABSENT', 'Department', None, 'Mobile Number', 'DOJ', 'NAME'])
+    for i in range(rows):
+        sheet.append([
+            f"Emp {i}" if i % 50 else 'N/A',
+            20000.0 + i if i % 7 else '1,200',
+            i % 5,
+            'Ops' if i % 3 else None,
+            '#DIV/0!' if i % 11 == 0 else 1.5 * (i % 4),
+            9876500000 + i,
+            datetime.datetime(2020, 1, 1 + i % 28),
+            f"x{i}",
+        ])
+        if i == 10:
+            sheet.append([None] * 8)  # blank row in the middle
+    sheet.append([None] * 8)  # trailing blank rows are dropped
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def upload(data, name='upload.xlsx'):
+    return SimpleUploadedFile(name, data)
+
+
+def test_matches_read_excel():
+    data = make_workbook()
+    expected = pd.read_excel(io.BytesIO(data))
+    actual = read_upload(upload(data), chunk_rows=64)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_chunks_are_bounded_and_numeric_columns_typed():
+    chunks = list(upload_chunks(upload(make_workbook()), numeric_columns=['SALARY'], chunk_rows=64))
+    assert max(len(chunk) for chunk in chunks) == 64
+    assert sum(len(chunk) for chunk in chunks) == 251
+    assert all(chunk['SALARY'].dtype.kind in 'if' for chunk in chunks)
+    assert chunks[0]['SALARY'].iloc[0] == 1200
+
+
+def test_csv_matches_read_csv():
+    frame = pd.read_excel(io.BytesIO(make_workbook()))
+    data = frame.to_csv(index=False).encode()
+    pd.testing.assert_frame_equal(read_upload(upload(data, 'upload.csv'), chunk_rows=64), pd.read_csv(io.BytesIO(data)))
+
+
+def test_rejects_bad_uploads():
+    for bad, message in [
+        (upload(b'not a workbook'), 'not a valid .xlsx'),
+        (upload(b'x', 'upload.pdf'), 'Unsupported file format'),
+        (upload(b''), 'empty'),
+        (upload(make_workbook()), 'limit is 100'),
+    ]:
+        try:
+            read_upload(bad, max_rows=100)
+        except UploadFileError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError(f"{message!r} upload was accepted")
+
+
+if __name__ == '__main__':
+    for test in (test_matches_read_excel, test_chunks_are_bounded_and_numeric_columns_typed,
+                 test_csv_matches_read_csv, test_rejects_bad_uploads):
+        test()
+        print(f"✅ {test.__name__}")
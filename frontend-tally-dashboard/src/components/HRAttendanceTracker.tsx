@@ -64,6 +64,7 @@ const HRAttendanceTracker: React.FC = () => {
   const [totalCount, setTotalCount] = useState<number>(0);
   const [hasMore, setHasMore] = useState<boolean>(false);
   const [offset, setOffset] = useState<number>(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const BATCH_SIZE = 30;
   
   // KPI TOTALS from backend (all data)
@@ -166,6 +167,7 @@ const HRAttendanceTracker: React.FC = () => {
       } else {
       setLoading(true);
         setOffset(0);
+        setNextCursor(null);
       }
       
       console.log('🔍 Fetching attendance data for filter:', filterType);
@@ -202,8 +204,13 @@ const HRAttendanceTracker: React.FC = () => {
       }
       
       // SMART LOADING: Progressive on cache miss, full on cache hit
+      // Next batches continue from the backend's cursor (keyset pagination)
       const currentOffset = loadMore ? offset : 0;
-      params.append('offset', currentOffset.toString());
+      if (loadMore && nextCursor) {
+        params.append('cursor', nextCursor);
+      } else {
+        params.append('offset', currentOffset.toString());
+      }
       params.append('limit', BATCH_SIZE.toString());
       
       console.log(`⚡ Fetching batch: offset=${currentOffset}, limit=${BATCH_SIZE}`);
@@ -229,9 +236,12 @@ const HRAttendanceTracker: React.FC = () => {
         records_received: apiResponse.results?.length
       });
       
-      // Update progressive loading state
-      setTotalCount(apiResponse.total_count || 0);
+      // Update progressive loading state (later pages may omit total_count)
+      if (!loadMore || apiResponse.total_count != null) {
+        setTotalCount(apiResponse.total_count || 0);
+      }
       setHasMore(apiResponse.has_more || false);
+      setNextCursor(apiResponse.next_cursor || null);
       
       // Store KPI totals from backend (for cards) - only on initial load
       if (!loadMore && apiResponse.kpi_totals) {
@@ -263,10 +273,10 @@ const HRAttendanceTracker: React.FC = () => {
         setAvailableMonths(months);
         
         // SMART LOADING: If cache hit AND has more data, fetch all remaining at once
-        if (isFromCache && apiResponse.has_more && apiResponse.total_count > BATCH_SIZE) {
+        if (isFromCache && apiResponse.next_cursor && apiResponse.total_count > BATCH_SIZE) {
           console.log(`🚀 Cache hit detected! Fetching all remaining ${apiResponse.total_count - BATCH_SIZE} records...`);
           setTimeout(() => {
-            fetchRemainingRecords(BATCH_SIZE, apiResponse.total_count);
+            fetchRemainingRecords(apiResponse.next_cursor, apiResponse.total_count);
           }, 100);
         }
       }
@@ -325,8 +335,8 @@ const HRAttendanceTracker: React.FC = () => {
     }
   };
 
-  // Fetch all remaining records in one call (used when cache hit detected)
-  const fetchRemainingRecords = async (currentOffset: number, totalRecords: number) => {
+  // Fetch all remaining records in full pages (used when cache hit detected)
+  const fetchRemainingRecords = async (cursor: string, totalRecords: number) => {
     try {
       setLoadingMore(true);
       
@@ -352,29 +362,36 @@ const HRAttendanceTracker: React.FC = () => {
         params.set('time_period', 'custom_range');
       }
       
-      // Fetch ALL remaining records in one call
-      params.append('offset', currentOffset.toString());
-      params.append('limit', '0'); // 0 = fetch all remaining
+      // Pages are capped at 500 records: follow next_cursor to the end
+      params.append('limit', '500');
+      let nextPage: string | null = cursor;
+      let loaded = 0;
       
-      const url = `/api/daily-attendance/all_records/?${params.toString()}`;
-      console.log(`📡 Fetching remaining records: ${url}`);
-      
-      const response = await apiCall(url);
-      if (!response.ok) {
-        throw new Error(`Failed to fetch remaining data: ${response.status}`);
+      while (nextPage) {
+        params.set('cursor', nextPage);
+        const url = `/api/daily-attendance/all_records/?${params.toString()}`;
+        console.log(`📡 Fetching remaining records: ${url}`);
+        
+        const response = await apiCall(url);
+        if (!response.ok) {
+          throw new Error(`Failed to fetch remaining data: ${response.status}`);
+        }
+        
+        const apiResponse = await response.json();
+        const transformedData = transformStandardToAttendanceRecords(apiResponse.results || []);
+        
+        // Append each page, so a failed page falls back to progressive loading from its cursor
+        setAttendanceData(prev => [...prev, ...transformedData]);
+        loaded += transformedData.length;
+        nextPage = apiResponse.next_cursor || null;
+        setNextCursor(nextPage);
       }
       
-      const apiResponse = await response.json();
-      const newRecords = apiResponse.results || [];
-      const transformedData = transformStandardToAttendanceRecords(newRecords);
-      
-      // Append remaining data
-      setAttendanceData(prev => [...prev, ...transformedData]);
       setHasMore(false);
       setOffset(totalRecords);
       
-      console.log(`✅ Loaded all remaining ${transformedData.length} records from cache!`);
-      console.log(`📦 Total loaded: ${attendanceData.length + transformedData.length}/${totalRecords}`);
+      console.log(`✅ Loaded all remaining ${loaded} records from cache!`);
+      console.log(`📦 Total loaded: ${attendanceData.length + loaded}/${totalRecords}`);
       
     } catch (error) {
       console.error('Error fetching remaining records:', error);
@@ -178,18 +178,26 @@ const AdvanceManager: React.FC<AdvanceManagerProps> = ({ showModal, onClose }) =
   const loadAdvances = async () => {
     try {
       setAdvancesLoading(true);
-      const response = await apiCall('/api/advance-payments/');
-
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      }
-
-      const advancesData = await response.json();
+      const advancesArray: AdvanceRecord[] = [];
+      let cursor: string | null = null;
+
+      // The API returns pages of success, count, results and next_cursor; follow the cursor to the end
+      do {
+        const url = cursor
+          ? `/api/advance-payments/?page_size=500&cursor=${encodeURIComponent(cursor)}`
+          : '/api/advance-payments/?page_size=500';
+        const response = await apiCall(url);
+
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
 
-      // The API returns an object with success, count, and results fields
-      const advancesArray: AdvanceRecord[] = advancesData?.results && Array.isArray(advancesData.results)
-        ? advancesData.results
-        : [];
+        const advancesData = await response.json();
+        if (advancesData?.results && Array.isArray(advancesData.results)) {
+          advancesArray.push(...advancesData.results);
+        }
+        cursor = advancesData?.next_cursor || null;
+      } while (cursor);
 
       setAdvances(advancesArray);
     } catch (error) {
@@ -172,6 +172,7 @@ export const API_ENDPOINTS = {
   register: "/api/auth/register/",
   refreshToken: "/api/auth/refresh/",
   changePassword: "/api/password-reset/change/",
+  sseTicket: "/api/sse/ticket/",
 
   // Dashboard
   dashboard: "/api/dashboard/stats/",
@@ -4,6 +4,7 @@
  */
 
 import { API_CONFIG } from "../config/apiConfig";
+import { apiPost, API_ENDPOINTS } from "./api";
 
 export type SSEEventType = 'force_logout' | 'ip_conflict' | 'session_conflict' | 'login_attempt_blocked' | 'connected';
 
@@ -33,12 +34,31 @@ class SSEService {
   private reconnectAttempts = 0;
   private maxReconnectAttempts = 5;
   private reconnectDelay = 3000;
+  private connecting = false;
+
+  /**
+   * Fetch a short-lived ticket for the stream URL (EventSource cannot send an
+   * Authorization header, and the access token must not appear in a URL)
+   */
+  private async fetchTicket(): Promise<string | null> {
+    try {
+      const response = await apiPost(API_ENDPOINTS.sseTicket);
+      if (!response.ok) {
+        return null;
+      }
+      const data = await response.json();
+      return data.ticket || null;
+    } catch (error) {
+      console.error('Failed to fetch SSE ticket:', error);
+      return null;
+    }
+  }
 
   /**
    * Connect to SSE endpoint
    */
-  connect(): void {
-    if (this.eventSource) {
+  async connect(): Promise<void> {
+    if (this.eventSource || this.connecting) {
       console.warn('SSE already connected');
       return;
     }
@@ -48,8 +68,21 @@ class SSEService {
 
     console.log('🔌 Connecting to SSE:', sseUrl);
 
+    this.connecting = true;
+    const ticket = await this.fetchTicket();
+    if (!this.connecting) {
+      // Disconnected while the ticket was being fetched
+      return;
+    }
+    this.connecting = false;
+    if (!ticket) {
+      this.handleError();
+      return;
+    }
+
     try {
-      this.eventSource = new EventSource(sseUrl);
+      // Only this user's and tenant's events are streamed
+      this.eventSource = new EventSource(`${sseUrl}?ticket=${encodeURIComponent(ticket)}`);
 
       // Listen to ALL events (including unknown ones)
       this.eventSource.onmessage = (e) => {
@@ -106,6 +139,7 @@ class SSEService {
    * Disconnect from SSE
    */
   disconnect(): void {
+    this.connecting = false;
     if (this.eventSource) {
       console.log('Disconnecting SSE...');
       this.eventSource.close();
@@ -156,7 +190,7 @@ class SSEService {
   }
 
   /**
-   * Handle SSE errors and attempt reconnection
+   * Handle SSE errors and attempt reconnection (each attempt fetches a new ticket)
    */
   private handleError(): void {
     this.disconnect();